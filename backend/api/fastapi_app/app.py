@@ -12,7 +12,7 @@ import time
 import datetime as dt
 import logging
 from uuid import UUID
-from anyio import create_task_group
+from anyio import CancelScope, create_task_group
 import os
 import inspect
 
@@ -23,7 +23,7 @@ if os.getenv("CONFIG_SKIP_DOTENV", "").strip().lower() not in {"1", "true", "yes
 
 import core.log  # configure root logger
 
-from .deps import settings, strict_api_key_auth
+from .deps import count_db_queries, get_sessionmaker, settings, strict_api_key_auth
 from .routes import (
     health,
     runs,
@@ -37,6 +37,7 @@ from .routes import (
     plans,
     config as cfg,
     audit,
+    dashboard,
 )
 from .routes.qa_report import router as qa_router
 from .middleware.request_id import RequestIdMiddleware
@@ -53,6 +54,10 @@ from core.storage.postgres_adapter import PostgresAdapter
 from core.storage.file_adapter import FileAdapter
 from core.storage.composite_adapter import CompositeAdapter
 from core.events.publisher import EventPublisher
+from core.storage.retention import retention_interval_s, retention_loop
+from core.storage.rollups import compaction_loop, rollup_interval_s
+from core.llm.circuit_breaker import probe_interval_s, probe_loop
+from core.llm.warmup import warmup_enabled, warmup_loop
 
 TAGS_METADATA = [
     {"name": "health", "description": "Healthcheck et disponibilité DB."},
@@ -67,6 +72,7 @@ TAGS_METADATA = [
         "description": "Gestion des feedbacks auto ou humains: création et listing par nœud ou run.",
     },
     {"name": "audit", "description": "Journal des actions opérateur et système."},
+    {"name": "metrics", "description": "Séries agrégées (rollups) pour le tableau de bord."},
 ]
 
 def _build_storage():
@@ -83,7 +89,10 @@ def _build_storage():
             try:
                 from sqlalchemy.engine import make_url
                 if make_url(settings.database_url).get_backend_name() == "postgresql":
-                    adapters.append(PostgresAdapter(settings.database_url))
+                    pg = PostgresAdapter(settings.database_url)
+                    # Écritures de l'orchestrateur: comptées avec celles de l'API
+                    count_db_queries(pg.engine)
+                    adapters.append(pg)
                 else:
                     # ignore silencieusement en env de test (ex: sqlite)
                     pass
@@ -97,6 +106,14 @@ def _build_storage():
         adapters.append(FileAdapter(base_dir=runs_root))
     return CompositeAdapter(adapters)
 
+async def _background_task(scopes: list, loop) -> None:
+    # Un CancelScope par tâche (un scope ne peut servir qu'à un seul bloc 'with')
+    scope = CancelScope()
+    scopes.append(scope)
+    with scope:
+        await loop(get_sessionmaker())
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Configure 'api.access' logger so it's capturable by tests and present in prod
@@ -125,6 +142,21 @@ async def lifespan(app: FastAPI):
         # Uptime
         app.state.started_at = dt.datetime.now(dt.timezone.utc)
         app.state.started_monotonic = time.monotonic()
+        # Tâches périodiques: compaction des rollups (ROLLUP_INTERVAL_S) et
+        # rétention/archivage (RETENTION_INTERVAL_S); 0 = désactivée
+        app.state.background_scopes = []
+        if rollup_interval_s() > 0:
+            tg.start_soon(_background_task, app.state.background_scopes, compaction_loop)
+        if retention_interval_s() > 0:
+            tg.start_soon(_background_task, app.state.background_scopes, retention_loop)
+        # Sonde des providers LLM (LLM_HEALTH_PROBE_INTERVAL_S): rouvre tôt
+        # les circuits d'un provider revenu, ouvre ceux d'un provider tombé
+        if probe_interval_s() > 0:
+            tg.start_soon(_background_task, app.state.background_scopes, lambda _sm: probe_loop())
+        # Préchargement des modèles Ollama de la matrice agents (OLLAMA_WARMUP):
+        # le 1er nœud ne paie plus le chargement à froid
+        if warmup_enabled():
+            tg.start_soon(_background_task, app.state.background_scopes, warmup_loop)
         # --- application running ---
         yield
         # Désactive l'édition d'événements pendant l'extinction pour éviter
@@ -132,6 +164,8 @@ async def lifespan(app: FastAPI):
         try:
             app.state.event_publisher.disabled = True
             app.state.shutting_down = True
+            for scope in app.state.background_scopes:
+                scope.cancel()
         except Exception:
             pass
         # Ferme proprement les adaptateurs (ex: engine async PG)
@@ -208,6 +242,7 @@ app.include_router(agents.router, dependencies=protected)
 app.include_router(feedbacks.router, dependencies=protected)
 app.include_router(qa_router, dependencies=protected)
 app.include_router(cfg.router, dependencies=protected)
+app.include_router(dashboard.router, dependencies=protected)
 
 # Redirection vers Swagger
 @app.get("/", include_in_schema=False)
@@ -10,7 +10,7 @@ from fastapi import Header, HTTPException, status, Request, Depends, Query
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 from sqlalchemy import event
-from sqlalchemy.engine import make_url
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -20,7 +20,7 @@ from sqlalchemy.ext.asyncio import (
 from zoneinfo import ZoneInfo
 from datetime import timezone, datetime, timedelta
 
-from core.telemetry.metrics import metrics_enabled, get_db_pool_in_use
+from core.telemetry.metrics import metrics_enabled, get_db_pool_in_use, get_db_queries_total
 
 logger = logging.getLogger(__name__)
 _db_pool_hooks_attached = False
@@ -45,6 +45,23 @@ def cap_date_range(
             )
 
 
+def _count_query(*_, **__) -> None:
+    get_db_queries_total().inc()
+
+
+def count_db_queries(engine: AsyncEngine | Engine) -> None:
+    """Compte les requêtes SQL de cette engine seulement (``db_queries_total``).
+
+    Écoute attachée à ``engine.sync_engine`` et non à la classe ``Engine``:
+    les engines de tests, d'outils ou d'autres bibliothèques ne sont pas comptées.
+    Idempotent.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not metrics_enabled() or event.contains(sync_engine, "before_cursor_execute", _count_query):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _count_query)
+
+
 def _setup_db_pool_metrics(engine: AsyncEngine) -> None:
     global _db_pool_hooks_attached
     if _db_pool_hooks_attached or not metrics_enabled():
@@ -66,6 +83,7 @@ def _setup_db_pool_metrics(engine: AsyncEngine) -> None:
     try:
         event.listen(pool, "checkout", _checkout)
         event.listen(pool, "checkin", _checkin)
+        count_db_queries(engine)
         _db_pool_hooks_attached = True
         logger.debug("db_pool_in_use hooks attached")
     except Exception:
@@ -1,5 +1,6 @@
 from __future__ import annotations
 from typing import Optional
+import asyncio
 import os
 from uuid import UUID
 from pathlib import Path
@@ -18,11 +19,36 @@ from backend.api.utils.pagination import (
 )
 from ..ordering import apply_order
 from core.storage.db_models import Artifact, Node  # type: ignore
+from core.io.run_index import aload_index, aread_text
+from core.storage.blob_store import LocalBlobStore, get_blob_store, resolve_content
+from core.io.archive import restore_for_path
+from core.io.compression import ZSTD_SUFFIX, decompress, is_compressed, plain_path, resolve_path
 
 router_nodes = APIRouter(prefix="/nodes", tags=["artifacts"], dependencies=[Depends(strict_api_key_auth)])
 router_artifacts = APIRouter(prefix="/artifacts", tags=["artifacts"], dependencies=[Depends(strict_api_key_auth)])
 
 ORDERABLE = {"created_at": Artifact.created_at, "type": Artifact.type}
+PREVIEW_CHARS = 280
+
+
+async def _load_content(a: Artifact) -> Optional[str]:
+    """Contenu inline ou, pour un artifact hors ligne, lecture du blob (hors event loop)."""
+    if a.content is not None or not getattr(a, "content_hash", None):
+        return a.content
+    return await asyncio.to_thread(resolve_content, None, a.content_hash)
+
+
+def _preview(
+    summary: Optional[str], head: Optional[str], length: int, stored: Optional[str] = None
+) -> Optional[str]:
+    if summary:
+        return summary
+    if stored:
+        # Artifact hors ligne: aperçu calculé à l'écriture ("…" inclus)
+        return stored
+    if head:
+        return head + ("…" if length > PREVIEW_CHARS else "")
+    return None
 
 @router_nodes.get("/{node_id}/artifacts", response_model=Page[ArtifactOut])
 async def list_artifacts(
@@ -33,71 +59,94 @@ async def list_artifacts(
     pagination: PaginationParams = Depends(pagination_params),
     type: Optional[str] = Query(None, description="Filtre par type d'artifact"),
     name_contains: Optional[str] = Query(None, description="Filtre nom (path ILIKE)"),
+    include_content: bool = Query(
+        True,
+        description="Inclure le contenu complet (false: aperçu calculé en SQL, contenu via /artifacts/{id}/content).",
+    ),
 ):
-    base = select(Artifact).where(Artifact.node_id == node_id)
+    filters = [Artifact.node_id == node_id]
     if type:
-        base = base.where(Artifact.type == type)
+        filters.append(Artifact.type == type)
     if name_contains:
-        base = base.where(Artifact.path.ilike(f"%{name_contains}%"))
-
-    total_stmt = select(func.count(Artifact.id)).where(Artifact.node_id == node_id)
-    if type:
-        total_stmt = total_stmt.where(Artifact.type == type)
-    if name_contains:
-        total_stmt = total_stmt.where(Artifact.path.ilike(f"%{name_contains}%"))
+        filters.append(Artifact.path.ilike(f"%{name_contains}%"))
 
+    total_stmt = select(func.count(Artifact.id)).where(*filters)
     total = (await session.execute(total_stmt)).scalar_one()
+
+    if include_content:
+        base = select(Artifact).where(*filters)
+    else:
+        # Mode léger: ne transfère que les PREVIEW_CHARS premiers caractères
+        base = select(
+            Artifact.id,
+            Artifact.node_id,
+            Artifact.type,
+            Artifact.path,
+            Artifact.summary,
+            Artifact.created_at,
+            Artifact.preview,
+            func.left(Artifact.content, PREVIEW_CHARS).label("head"),
+            func.char_length(Artifact.content).label("content_length"),
+        ).where(*filters)
     stmt = apply_order(
         base, pagination.order_by, pagination.order_dir, ORDERABLE, "-created_at"
     ).limit(pagination.limit).offset(pagination.offset)
 
-    rows = (await session.execute(stmt)).scalars().all()
-
-    def _preview(a: Artifact) -> str | None:
-        if getattr(a, "summary", None):
-            return a.summary
-        if getattr(a, "content", None):
-            return a.content[:280] + ("…" if len(a.content) > 280 else "")
-        return None
-
-    items = [
-        ArtifactOut(
-            id=a.id,
-            node_id=a.node_id,
-            type=a.type,
-            path=a.path,
-            content=a.content,
-            summary=a.summary,
-            created_at=a.created_at,
-            preview=_preview(a),
-        )
-        for a in rows
-    ]
-    # Fallback: si aucun artifact en DB, tente de lire le FS (.runs/<run>/nodes/<key>/artifact_*.md)
+    if include_content:
+        rows = (await session.execute(stmt)).scalars().all()
+        items = []
+        for a in rows:
+            content = await _load_content(a)
+            items.append(
+                ArtifactOut(
+                    id=a.id,
+                    node_id=a.node_id,
+                    type=a.type,
+                    path=a.path,
+                    content=content,
+                    summary=a.summary,
+                    created_at=a.created_at,
+                    preview=_preview(a.summary, content[:PREVIEW_CHARS] if content else None, len(content or "")),
+                )
+            )
+    else:
+        rows = (await session.execute(stmt)).all()
+        items = [
+            ArtifactOut(
+                id=r.id,
+                node_id=r.node_id,
+                type=r.type,
+                path=r.path,
+                content=None,
+                summary=r.summary,
+                created_at=r.created_at,
+                preview=_preview(r.summary, r.head, r.content_length or 0, r.preview),
+            )
+            for r in rows
+        ]
+    # Fallback: si aucun artifact en DB, consulte l'index du run (.runs/<run>/index.json)
     if total == 0:
         node = await session.get(Node, node_id)
         if node and getattr(node, "key", None):
-            base = Path(os.getenv("ARTIFACTS_DIR", settings.artifacts_dir)) / str(getattr(node, "run_id")) / "nodes" / node.key
-            if base.is_dir():
-                for p in base.glob("artifact_*.md"):
-                    try:
-                        txt = p.read_text(encoding="utf-8")
-                    except Exception:
-                        txt = None
-                    items.append(
-                        ArtifactOut(
-                            id=node_id,  # placeholder
-                            node_id=node_id,
-                            type="markdown",
-                            path=str(p),
-                            content=txt,
-                            summary=None,
-                            created_at=rows[0].created_at if rows else getattr(node, "created_at"),
-                            preview=(txt[:280] + ("…" if txt and len(txt) > 280 else "")) if txt else None,
-                        )
+            run_dir = Path(os.getenv("ARTIFACTS_DIR", settings.artifacts_dir)) / str(getattr(node, "run_id"))
+            entry = ((await aload_index(run_dir)).get("nodes") or {}).get(node.key) or {}
+            md = entry.get("markdown")
+            if md and md.get("path"):
+                p = run_dir / md["path"]
+                txt = await aread_text(p) if include_content else None
+                items.append(
+                    ArtifactOut(
+                        id=node_id,  # placeholder
+                        node_id=node_id,
+                        type="markdown",
+                        path=str(p),
+                        content=txt,
+                        summary=None,
+                        created_at=getattr(node, "created_at"),
+                        preview=md.get("preview"),
                     )
-                if items:
-                    total = len(items)
+                )
+                total = len(items)
 
     links = set_pagination_headers(
         response, request, total, pagination.limit, pagination.offset
@@ -120,33 +169,25 @@ async def get_artifact(
     if not row:
         raise HTTPException(status_code=404, detail="Artifact not found")
 
+    content = await _load_content(row)
     # preview (même logique que la liste)
-    preview = row.summary or (row.content[:280] + ("…" if row.content and len(row.content) > 280 else "")) if row.content else None
+    preview = row.summary or (content[:280] + ("…" if content and len(content) > 280 else "")) if content else None
 
     return ArtifactOut(
         id=row.id,
         node_id=row.node_id,
         type=row.type,
         path=row.path,
-        content=row.content,
+        content=content,
         summary=row.summary,
         created_at=row.created_at,
         preview=preview,
     )
 
-# --- NEW (optionnel): GET /artifacts/{artifact_id}/download ---
-@router_artifacts.get("/{artifact_id}/download")
-async def download_artifact(
-    artifact_id: UUID,
-    session: AsyncSession = Depends(get_session),
-):
-    row = (await session.execute(select(Artifact).where(Artifact.id == artifact_id))).scalar_one_or_none()
-    if not row or not row.path:
-        raise HTTPException(status_code=404, detail="Artifact not found or no path")
-
-    # Sécurité : le fichier doit être sous ARTIFACTS_DIR (whitelist)
+def _resolve_artifact_file(path: str) -> Path:
+    """Résout le chemin disque d'un artifact en restant sous ARTIFACTS_DIR (whitelist)."""
     root = Path(settings.artifacts_dir).resolve()
-    target = (root / Path(row.path).name).resolve() if not Path(row.path).is_absolute() else Path(row.path).resolve()
+    target = (root / Path(path).name).resolve() if not Path(path).is_absolute() else Path(path).resolve()
 
     # Permettre les paths absolus, mais exige qu'ils restent dans root (si tu veux restreindre fortement)
     try:
@@ -155,21 +196,243 @@ async def download_artifact(
         inside = False
     if not inside:
         # fallback : autoriser strictement root/<basename>
-        target = (root / Path(row.path).name).resolve()
+        target = (root / Path(path).name).resolve()
+    return target
+
+
+async def _resolve_on_disk(path: str) -> Optional[Path]:
+    """Fichier (clair ou .zst) d'un artifact; ré-extrait le run archivé au besoin."""
+    candidate = _resolve_artifact_file(path)
+    target = resolve_path(candidate)
+    if target is None and await asyncio.to_thread(restore_for_path, candidate):
+        target = resolve_path(candidate)
+    return target
+
+
+def _iter_file(p: Path, start: int = 0, end: Optional[int] = None, chunk_size: int = 64 * 1024):
+    """Itère [start, end] (inclus) par blocs; générateur sync exécuté en threadpool."""
+    with p.open("rb") as f:
+        f.seek(start)
+        remaining = None if end is None else end - start + 1
+        while remaining is None or remaining > 0:
+            chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+def _iter_bytes(data: bytes, chunk_size: int = 64 * 1024):
+    for i in range(0, len(data), chunk_size):
+        yield data[i : i + chunk_size]
+
+
+def _parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Interprète un en-tête Range mono-intervalle (bytes=a-b, bytes=a-, bytes=-n).
+    Retourne None si absent/ignoré, lève 416 si non satisfiable.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
 
-    if not target.exists() or not target.is_file():
+
+def _media_type(path: Optional[str]) -> str:
+    name = (path or "").lower()
+    if name.endswith(ZSTD_SUFFIX):
+        name = name[: -len(ZSTD_SUFFIX)]
+    if name.endswith(".json"):
+        return "application/json"
+    if name.endswith(".md"):
+        return "text/markdown; charset=utf-8"
+    return "text/plain; charset=utf-8"
+
+
+# --- GET /artifacts/{artifact_id}/content (Range + gzip) ---
+@router_artifacts.get("/{artifact_id}/content")
+async def get_artifact_content(
+    artifact_id: UUID,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Contenu brut d'un artifact, depuis la DB ou à défaut depuis le disque.
+    - Range (bytes, un seul intervalle) -> 206 + Content-Range.
+    - Si le client accepte gzip et qu'une version pré-compressée <fichier>.gz
+      existe, elle est servie telle quelle (Content-Encoding: gzip).
+    - Fichiers/blobs compressés zstd: décodés à la volée (ou transmis tels
+      quels avec Content-Encoding: zstd si le client l'accepte, sans Range).
+    """
+    row = (
+        await session.execute(
+            select(
+                Artifact.path,
+                Artifact.content_hash,
+                Artifact.codec,
+                func.octet_length(Artifact.content).label("size"),
+            ).where(Artifact.id == artifact_id)
+        )
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    media_type = _media_type(row.path)
+    headers = {"Accept-Ranges": "bytes"}
+    range_header = request.headers.get("range")
+
+    if row.size is not None:
+        rng = _parse_range(range_header, row.size)
+        if rng is None:
+            content = (
+                await session.execute(select(Artifact.content).where(Artifact.id == artifact_id))
+            ).scalar_one()
+            data = (content or "").encode("utf-8")
+            headers["Content-Length"] = str(len(data))
+            return StreamingResponse(_iter_bytes(data), media_type=media_type, headers=headers)
+        start, end = rng
+        # Découpe côté Postgres (octets UTF-8): seul l'intervalle demandé transite
+        data = (
+            await session.execute(
+                select(
+                    func.substring(func.convert_to(Artifact.content, "UTF8"), start + 1, end - start + 1)
+                ).where(Artifact.id == artifact_id)
+            )
+        ).scalar_one() or b""
+        headers["Content-Range"] = f"bytes {start}-{end}/{row.size}"
+        headers["Content-Length"] = str(len(data))
+        return StreamingResponse(
+            _iter_bytes(bytes(data)), status_code=206, media_type=media_type, headers=headers
+        )
+
+    if row.content_hash:
+        # Blob hors ligne: servi directement depuis le blob store
+        store = get_blob_store()
+        # L'encodage se lit sur les octets (trame zstd), pas sur row.codec
+        if isinstance(store, LocalBlobStore) and not is_compressed(
+            await asyncio.to_thread(store.peek_object, row.content_hash)
+        ):
+            target = store.path_for(row.content_hash)
+        else:
+            data = await asyncio.to_thread(
+                lambda: decompress(store.get_object(row.content_hash))
+            )
+            rng = _parse_range(range_header, len(data))
+            if rng is None:
+                headers["Content-Length"] = str(len(data))
+                return StreamingResponse(_iter_bytes(data), media_type=media_type, headers=headers)
+            start, end = rng
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                _iter_bytes(data[start : end + 1]), status_code=206, media_type=media_type, headers=headers
+            )
+    elif row.path:
+        target = await _resolve_on_disk(row.path)
+        if target is None:
+            raise HTTPException(status_code=404, detail="File not found on disk")
+    else:
+        raise HTTPException(status_code=404, detail="Artifact has no content")
+    if not target.is_file():
         raise HTTPException(status_code=404, detail="File not found on disk")
 
-    def file_iterator(p: Path, chunk_size: int = 64 * 1024):
-        with p.open("rb") as f:
-            while True:
-                chunk = f.read(chunk_size)
-                if not chunk:
-                    break
-                yield chunk
+    if target.name.endswith(ZSTD_SUFFIX):
+        accepted = (request.headers.get("accept-encoding") or "").lower()
+        if "zstd" in accepted and not range_header:
+            headers.update(
+                {
+                    "Content-Encoding": "zstd",
+                    "Content-Length": str(target.stat().st_size),
+                    "Vary": "Accept-Encoding",
+                }
+            )
+            headers.pop("Accept-Ranges")
+            return StreamingResponse(_iter_file(target), media_type=media_type, headers=headers)
+        data = await asyncio.to_thread(lambda: decompress(target.read_bytes()))
+        rng = _parse_range(range_header, len(data))
+        if rng is None:
+            headers["Content-Length"] = str(len(data))
+            return StreamingResponse(_iter_bytes(data), media_type=media_type, headers=headers)
+        start, end = rng
+        headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            _iter_bytes(data[start : end + 1]), status_code=206, media_type=media_type, headers=headers
+        )
+
+    gz = target.with_name(target.name + ".gz")
+    accepts_gzip = "gzip" in (request.headers.get("accept-encoding") or "").lower()
+    if accepts_gzip and not range_header and gz.is_file():
+        headers.update(
+            {
+                "Content-Encoding": "gzip",
+                "Content-Length": str(gz.stat().st_size),
+                "Vary": "Accept-Encoding",
+            }
+        )
+        # Pas de Range sur la représentation compressée
+        headers.pop("Accept-Ranges")
+        return StreamingResponse(_iter_file(gz), media_type=media_type, headers=headers)
+
+    size = target.stat().st_size
+    rng = _parse_range(range_header, size)
+    if rng is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(_iter_file(target), media_type=media_type, headers=headers)
+    start, end = rng
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_file(target, start, end), status_code=206, media_type=media_type, headers=headers
+    )
 
+
+# --- NEW (optionnel): GET /artifacts/{artifact_id}/download ---
+@router_artifacts.get("/{artifact_id}/download")
+async def download_artifact(
+    artifact_id: UUID,
+    session: AsyncSession = Depends(get_session),
+):
+    row = (await session.execute(select(Artifact).where(Artifact.id == artifact_id))).scalar_one_or_none()
+    if not row or not row.path:
+        raise HTTPException(status_code=404, detail="Artifact not found or no path")
+
+    target = await _resolve_on_disk(row.path)
+    if target is None or not target.is_file():
+        raise HTTPException(status_code=404, detail="File not found on disk")
+
+    if target.name.endswith(ZSTD_SUFFIX):
+        # Téléchargement toujours en clair, sous le nom d'origine
+        data = await asyncio.to_thread(lambda: decompress(target.read_bytes()))
+        return StreamingResponse(
+            _iter_bytes(data),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{plain_path(target).name}"'},
+        )
     return StreamingResponse(
-        file_iterator(target),
+        _iter_file(target),
         media_type="application/octet-stream",
         headers={"Content-Disposition": f'attachment; filename="{target.name}"'},
     )
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..deps import (
+    cap_date_range,
+    get_session,
+    get_sessionmaker,
+    read_timezone,
+    strict_api_key_auth,
+    to_tz,
+)
+from ..schemas_base import DashboardMetricsOut, UsageRollupOut, UsageRollupsOut
+from core.storage.rollups import (
+    GRAIN,
+    USAGE_DIMENSIONS,
+    USAGE_STATE_NAME,
+    bucket_count,
+    query_dashboard,
+    query_usage_rollups,
+    schedule_refresh,
+)
+
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(strict_api_key_auth)])
+
+MAX_BUCKETS = 2000
+MAX_DAILY_RANGE_DAYS = 366
+_UNITS = {"m": 60, "h": 3600, "d": 86400}
+
+
+def parse_bucket(raw: str) -> timedelta:
+    """'15m' | '1h' | '1d' | '<secondes>' -> timedelta multiple de la granularité des rollups."""
+    value = (raw or "").strip().lower()
+    m = re.fullmatch(r"(\d+)\s*([mhd]?)", value)
+    if not m:
+        raise HTTPException(status_code=400, detail="bucket invalide (ex: 15m, 1h, 1d)")
+    seconds = int(m.group(1)) * _UNITS.get(m.group(2), 1)
+    grain = int(GRAIN.total_seconds())
+    if seconds < grain or seconds % grain:
+        raise HTTPException(
+            status_code=400, detail=f"bucket doit être un multiple de {grain // 60} minutes"
+        )
+    return timedelta(seconds=seconds)
+
+
+@router.get("/dashboard", response_model=DashboardMetricsOut)
+async def get_dashboard_metrics(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    sessionmaker=Depends(get_sessionmaker),
+    tz=Depends(read_timezone),
+    start: Optional[datetime] = Query(None, alias="from", description="Début (défaut: now - 24h)"),
+    end: Optional[datetime] = Query(None, alias="to", description="Fin exclue (défaut: now)"),
+    bucket: str = Query("1h", description="Taille de tranche: 5m, 15m, 1h, 1d..."),
+):
+    """
+    Séries pré-agrégées du cockpit: runs par statut et par tranche, percentiles
+    de durée, tokens LLM et histogramme des scores de feedback.
+    Servi depuis ``dashboard_rollups``; des agrégats trop anciens déclenchent un
+    rafraîchissement incrémental en tâche de fond (``refreshed_at`` = dernier passage).
+    """
+    now = datetime.now(timezone.utc)
+    end = end or now
+    start = start or end - timedelta(hours=24)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    cap_date_range(start, end)
+    size = parse_bucket(bucket)
+    if bucket_count(start, end, size) > MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"au plus {MAX_BUCKETS} tranches par requête")
+
+    schedule_refresh(request.app.state.task_group, sessionmaker)
+    data = await query_dashboard(session, start=start, end=end, bucket=size, tz=tz)
+    refreshed_at = (
+        await session.execute(
+            text("SELECT updated_at FROM rollup_state WHERE name = 'dashboard'")
+        )
+    ).scalar_one_or_none()
+    for b in data["buckets"]:
+        b["start"] = to_tz(b["start"], tz)
+    return DashboardMetricsOut(
+        start=to_tz(start, tz),
+        end=to_tz(end, tz),
+        bucket_s=int(size.total_seconds()),
+        refreshed_at=to_tz(refreshed_at, tz),
+        **data,
+    )
+
+
+@router.get("/rollups", response_model=UsageRollupsOut)
+async def get_usage_rollups(
+    session: AsyncSession = Depends(get_session),
+    tz=Depends(read_timezone),
+    granularity: str = Query("hour", pattern="^(hour|day)$"),
+    kind: Optional[str] = Query(None, pattern="^(run|node)$"),
+    start: Optional[datetime] = Query(None, alias="from", description="Début (défaut: now - 7j)"),
+    end: Optional[datetime] = Query(None, alias="to", description="Fin exclue (défaut: now)"),
+    group_by: Optional[str] = Query(
+        None, description="Dimensions séparées par des virgules: status,role,provider,model"
+    ),
+    status: Optional[str] = Query(None),
+    role: Optional[str] = Query(None),
+    provider: Optional[str] = Query(None),
+    model: Optional[str] = Query(None),
+):
+    """
+    Historique agrégé (heure/jour) des runs et nœuds: volumes, durées,
+    latences et tokens LLM par statut, rôle, provider et modèle.
+    Servi depuis ``usage_rollups_hourly`` / ``usage_rollups_daily``, tenus à
+    jour par la compaction en tâche de fond (``watermark`` = données couvertes).
+    """
+    now = datetime.now(timezone.utc)
+    end = end or now
+    start = start or end - timedelta(days=7)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if granularity == "day":
+        cap_date_range(start, end, max_days=MAX_DAILY_RANGE_DAYS)
+    else:
+        cap_date_range(start, end)
+    dims = [d.strip() for d in (group_by or "").split(",") if d.strip()]
+    unknown = [d for d in dims if d not in USAGE_DIMENSIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"group_by invalide: {', '.join(unknown)}")
+
+    items = await query_usage_rollups(
+        session,
+        granularity=granularity,
+        start=start,
+        end=end,
+        kind=kind,
+        group_by=dims,
+        filters={"status": status, "role": role, "provider": provider, "model": model},
+    )
+    watermark = (
+        await session.execute(
+            text("SELECT watermark FROM rollup_state WHERE name = :n"), {"n": USAGE_STATE_NAME}
+        )
+    ).scalar_one_or_none()
+    return UsageRollupsOut(
+        granularity=granularity,
+        start=to_tz(start, tz),
+        end=to_tz(end, tz),
+        group_by=[d for d in USAGE_DIMENSIONS if d in dims],
+        watermark=to_tz(watermark, tz),
+        items=[UsageRollupOut(**{**it, "start": to_tz(it["start"], tz)}) for it in items],
+    )
@@ -24,6 +24,8 @@ from backend.api.utils.pagination import (
 from ..ordering import apply_order
 from core.storage.db_models import Event, Run  # type: ignore
 from core.events.types import EventType
+from core.io.run_index import aload_index, sidecar_meta
+from core.storage.retention import load_archived_events
 import anyio
 
 router = APIRouter(prefix="", tags=["events"], dependencies=[Depends(strict_api_key_auth)])
@@ -32,6 +34,47 @@ log = logging.getLogger("api.events")
 
 ORDERABLE = {"timestamp": Event.timestamp, "level": Event.level}
 
+def _filter_archived(
+    rows: list[dict],
+    *,
+    level: Optional[str],
+    q: Optional[str],
+    ts_from: Optional[datetime],
+    ts_to: Optional[datetime],
+    request_id: Optional[str],
+) -> list[EventOut]:
+    """Applique aux événements archivés (JSONL) les filtres de la requête SQL."""
+    utc = dt.timezone.utc
+    ts_from = ts_from.replace(tzinfo=utc) if ts_from and ts_from.tzinfo is None else ts_from
+    ts_to = ts_to.replace(tzinfo=utc) if ts_to and ts_to.tzinfo is None else ts_to
+    out: list[EventOut] = []
+    for r in rows:
+        try:
+            ev = EventOut(
+                id=r["id"],
+                run_id=r.get("run_id"),
+                node_id=r.get("node_id"),
+                level=r["level"],
+                message=r.get("message") or "",
+                timestamp=r["timestamp"],
+                request_id=r.get("request_id"),
+            )
+        except Exception:
+            continue
+        if level and ev.level != level:
+            continue
+        if q and q.lower() not in (ev.message or "").lower():
+            continue
+        if ts_from and ev.timestamp < ts_from:
+            continue
+        if ts_to and ev.timestamp > ts_to:
+            continue
+        if request_id and ev.request_id != request_id:
+            continue
+        out.append(ev)
+    return out
+
+
 @router.get("/events", response_model=Page[EventOut])
 @router.get("/runs/{run_id_path}/events", response_model=Page[EventOut])
 async def list_events(
@@ -92,6 +135,23 @@ async def list_events(
         )
         for e in rows
     ]
+    # Run dont la partition d'événements a été archivée par la rétention
+    if db_total == 0:
+        archived = _filter_archived(
+            await load_archived_events(run_id),
+            level=level,
+            q=q,
+            ts_from=ts_from,
+            ts_to=ts_to,
+            request_id=request_id,
+        )
+        if archived:
+            field = pagination.order_by or "-timestamp"
+            key = field.lstrip("-")
+            reverse = field.startswith("-") or pagination.order_dir == "desc"
+            archived.sort(key=lambda e: getattr(e, key), reverse=reverse)
+            db_total = total = len(archived)
+            items = archived[pagination.offset : pagination.offset + pagination.limit]
     db_request_id = next((e.request_id for e in items if e.request_id), None)
     run_request_id = None
     fs_request_id = None
@@ -107,12 +167,20 @@ async def list_events(
         if not isinstance(meta_dict, dict):
             meta_dict = {}
         run_request_id = meta_dict.get("request_id")
-    try:
-        runs_root = Path(os.getenv("ARTIFACTS_DIR", settings.artifacts_dir))
-        meta_json = json.loads((runs_root / str(run_id) / "run.json").read_text())
-        fs_request_id = meta_json.get("meta", {}).get("request_id")
-    except Exception:
-        fs_request_id = None
+    # Index FS du run: lu (hors event loop) seulement si la DB ne suffit pas
+    fs_fallback_nodes = (
+        pagination.offset == 0
+        and not any([level, q, ts_from, ts_to, request_id])
+        and not any(e.level == "NODE_COMPLETED" for e in items)
+    )
+    run_index: dict = {}
+    if fs_fallback_nodes or not (db_request_id or run_request_id):
+        try:
+            runs_root = Path(os.getenv("ARTIFACTS_DIR", settings.artifacts_dir))
+            run_index = await aload_index(runs_root / str(run_id))
+        except Exception:
+            run_index = {}
+    fs_request_id = (run_index.get("run") or {}).get("request_id")
     chosen_request_id = db_request_id or run_request_id or fs_request_id
     synthetic_items: list[EventOut] = []
 
@@ -201,36 +269,33 @@ async def list_events(
                 )
             )
 
-    # Fallback: si aucun NODE_COMPLETED en base, on reconstruit depuis les artifacts *.llm.json
-    if pagination.offset == 0 and run_id and not any([level, q, ts_from, ts_to, request_id]) and not any(e.level == "NODE_COMPLETED" for e in items):
-        base = Path(os.getenv("ARTIFACTS_DIR", settings.artifacts_dir)) / str(run_id) / "nodes"
-        if base.exists():
-            for llm_path in base.glob("*/artifact_*.llm.json"):
+    # Fallback: si aucun NODE_COMPLETED en base, on reconstruit depuis l'index (sidecars *.llm.json)
+    if fs_fallback_nodes:
+        for node_key, entry in sorted((run_index.get("nodes") or {}).items()):
+            if not entry.get("sidecar"):
+                continue
+            meta = sidecar_meta(entry, str(run_id))
+            meta["usage"].setdefault("completion_tokens", 0)
+            if chosen_request_id and not meta["request_id"]:
+                meta["request_id"] = chosen_request_id
+            node_uuid = None
+            for candidate in (entry.get("node_id"), node_key):
                 try:
-                    meta = json.loads(llm_path.read_text())
+                    node_uuid = UUID(str(candidate))
+                    break
                 except Exception:
                     continue
-                usage = meta.get("usage") or {}
-                usage.setdefault("completion_tokens", 0)
-                meta["usage"] = usage
-                if chosen_request_id and "request_id" not in meta:
-                    meta["request_id"] = chosen_request_id
-                node_key = llm_path.parent.name
-                try:
-                    node_uuid = UUID(node_key)
-                except Exception:
-                    node_uuid = None
-                synthetic_items.append(
-                    EventOut(
-                        id=uuid.uuid4(),
-                        run_id=run_id,
-                        node_id=node_uuid,
-                        level="NODE_COMPLETED",
-                        message=json.dumps(meta),
-                        timestamp=dt.datetime.now(dt.timezone.utc),
-                        request_id=meta.get("request_id"),
-                    )
+            synthetic_items.append(
+                EventOut(
+                    id=uuid.uuid4(),
+                    run_id=run_id,
+                    node_id=node_uuid,
+                    level="NODE_COMPLETED",
+                    message=json.dumps(meta),
+                    timestamp=dt.datetime.now(dt.timezone.utc),
+                    request_id=meta.get("request_id"),
                 )
+            )
     # Applique un tri cohérent avec order_by/order_dir sur les éléments synthétiques ajoutés
     # Par défaut (None), l'API ordonne par -timestamp
     order_by = pagination.order_by
@@ -24,6 +24,7 @@ from backend.api.utils.pagination import (
 )
 from ..ordering import apply_order
 from core.storage.db_models import Feedback, Run, RunStatus, Node, NodeStatus
+from core.storage.run_cache import invalidate_run
 
 router = APIRouter(prefix="/feedbacks", tags=["feedbacks"], dependencies=[Depends(strict_api_key_auth)])
 
@@ -142,6 +143,7 @@ async def create_feedback(
     session.add(fb)
     await session.commit()
     await session.refresh(fb)
+    invalidate_run(payload.run_id)
     return FeedbackOut(
         id=fb.id,
         run_id=fb.run_id,
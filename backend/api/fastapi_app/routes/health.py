@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..deps import get_session
 from core.services.orchestrator_service import get_health as get_orchestrator_health
+from core.llm.circuit_breaker import breakers_summary
 import time
 import datetime as dt
 
@@ -36,6 +37,7 @@ async def healthcheck(request: Request, session: AsyncSession = Depends(get_sess
             "db_ok": True,
             "uptime_s": uptime_s,
             "orchestrator": orch,
+            "llm": breakers_summary(),
         }
     except Exception as e:
         rid = getattr(request.state, "request_id", None)
@@ -59,4 +61,5 @@ async def healthcheck(request: Request, session: AsyncSession = Depends(get_sess
             "error": str(e),
             "uptime_s": uptime_s,
             "orchestrator": orch,
+            "llm": breakers_summary(),
         }
@@ -11,6 +11,7 @@ from backend.api.fastapi_app.deps import strict_api_key_auth, get_session
 from backend.api.schemas.node_actions import NodeActionRequest, NodeActionResponse
 from backend.orchestrator import orchestrator_adapter
 from core.storage.db_models import AuditLog, AuditSource
+from core.storage.run_cache import invalidate_run
 
 router = APIRouter(prefix="/nodes", tags=["nodes"], dependencies=[Depends(strict_api_key_auth)])
 
@@ -65,6 +66,7 @@ async def node_action_route(
             )
         )
         await session.commit()
+        invalidate_run(run_uuid)
     except Exception:
         await session.rollback()
 
@@ -1,7 +1,8 @@
 from __future__ import annotations
-from typing import Optional, List, Tuple
+from typing import Any, Optional, List, Tuple
 from uuid import UUID
 from datetime import datetime
+import asyncio
 import os
 import json
 from pathlib import Path
@@ -57,6 +58,9 @@ from core.storage.db_models import (
     AuditSource,
 )  # type: ignore
 from core.events.types import EventType
+from core.storage.run_cache import run_cache, invalidate_run, is_terminal
+from core.io.run_index import aload_index
+from core.telemetry.tracing import TRACE_FILE
 from backend.orchestrator import orchestrator_adapter as orch
 from pydantic import BaseModel, Field
 
@@ -130,6 +134,12 @@ def _percentile(values: List[float], pct: float) -> Optional[float]:
     return values_sorted[f] + (values_sorted[c] - values_sorted[f]) * (k - f)
 
 
+def _tz_key(tz: Any) -> Optional[str]:
+    if tz is None:
+        return None
+    return getattr(tz, "key", None) or str(tz)
+
+
 def _artifact_preview(content: Optional[str], summary: Optional[str]) -> Optional[str]:
     if summary:
         return summary
@@ -248,6 +258,7 @@ async def run_action(
         except Exception:
             await session.rollback()
             raise HTTPException(status_code=500, detail="DB update failed")
+        invalidate_run(run_id)
         try:
             await orch.cancel(run_id)
         except Exception:
@@ -277,6 +288,7 @@ async def run_action(
         except Exception:
             await session.rollback()
             raise HTTPException(status_code=500, detail="DB update failed")
+        invalidate_run(run_id)
         try:
             await orch.pause(run_id)
         except Exception:
@@ -306,6 +318,7 @@ async def run_action(
         except Exception:
             await session.rollback()
             raise HTTPException(status_code=500, detail="DB update failed")
+        invalidate_run(run_id)
         try:
             await orch.resume(run_id)
         except Exception:
@@ -349,6 +362,7 @@ async def run_action(
     except Exception:
         await session.rollback()
         raise HTTPException(status_code=500, detail="DB update failed")
+    invalidate_run(run_id)
     return {"status": RunStatus.completed.value, "skipped_nodes": skipped_ids}
 
 @router.get("", response_model=Page[RunListItemOut])
@@ -443,6 +457,18 @@ async def get_run(
         le=50,
     ),
 ):
+    cache_key = (
+        "run",
+        str(run_id),
+        include_events,
+        include_nodes,
+        include_artifacts,
+        _tz_key(tz),
+    )
+    cached = run_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     run = (await session.execute(select(Run).where(Run.id == run_id))).scalar_one_or_none()
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
@@ -526,28 +552,22 @@ async def get_run(
                 elif lvl == "NODE_FAILED":
                     status = "failed"
 
-    # 3) Fallback fichier (si rien de concluant)
+    # 3) Fallback fichier (si rien de concluant): une lecture de l'index du run
     if status in ("queued", "running") and not final_event_level:
         try:
             runs_root = Path(os.getenv("ARTIFACTS_DIR", settings.artifacts_dir))
-            run_dir = runs_root / str(run_id)
-            # a) run.json explicite
-            try:
-                meta = json.loads((run_dir / "run.json").read_text())
-                if isinstance(meta, dict) and meta.get("ended_at"):
-                    s = (meta.get("status") or "completed").lower()
-                    if s in ("completed", "failed"):
-                        status = s
-            except Exception:
-                pass
-            # b) En l'absence de run.json, présence d'un sidecar LLM sur un nœud unique
+            run_index = await aload_index(runs_root / str(run_id))
+            # a) statut final consigné par l'orchestrateur
+            run_meta = run_index.get("run") or {}
+            if run_meta.get("ended_at"):
+                s = (run_meta.get("status") or "completed").lower()
+                if s in ("completed", "failed"):
+                    status = s
+            # b) Sinon, présence d'un sidecar LLM sur un nœud unique
             if status in ("queued", "running") and nodes_total <= 1:
-                nodes_dir = run_dir / "nodes"
-                # Cherche un artifact *.llm.json qui indiquerait la fin d'un nœud
-                if nodes_dir.exists():
-                    has_sidecar = any(p.name.endswith(".llm.json") for p in nodes_dir.rglob("artifact_*.llm.json"))
-                    if has_sidecar:
-                        status = "completed"
+                nodes_idx = run_index.get("nodes") or {}
+                if any(entry.get("sidecar") for entry in nodes_idx.values()):
+                    status = "completed"
         except Exception:
             # tolérant aux erreurs: on reste sur le statut courant
             pass
@@ -663,7 +683,7 @@ async def get_run(
         ).all()
         artifacts_embedded = []
         for artifact, node in artifact_rows:
-            preview = _artifact_preview(artifact.content, artifact.summary)
+            preview = _artifact_preview(artifact.content or artifact.preview, artifact.summary)
             artifacts_embedded.append(
                 ArtifactOut(
                     id=artifact.id,
@@ -701,7 +721,7 @@ async def get_run(
             for e in evt_rows
         ]
 
-    return RunOut(
+    out = RunOut(
         id=run.id,
         title=run.title,
         status=status,
@@ -725,12 +745,21 @@ async def get_run(
         events=events_embedded,
         artifacts=artifacts_embedded,
     )
+    # Run terminé en base: la réponse ne bougera plus avant invalidation
+    if is_terminal(run.status):
+        run_cache.set(cache_key, out)
+    return out
 
 @router.get("/{run_id}/summary", response_model=RunSummaryOut)
 async def get_run_summary(
     run_id: UUID,
     session: AsyncSession = Depends(get_session),
 ):
+    cache_key = ("summary", str(run_id))
+    cached = run_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     run = (await session.execute(select(Run).where(Run.id == run_id))).scalar_one_or_none()
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
@@ -775,7 +804,7 @@ async def get_run_summary(
         llm_p95_latency,
     ) = await _collect_llm_metrics(session, run_id)
 
-    return RunSummaryOut(
+    out = RunSummaryOut(
         nodes_total=nodes_total,
         nodes_completed=nodes_completed,
         nodes_failed=nodes_failed,
@@ -789,6 +818,9 @@ async def get_run_summary(
         llm_avg_latency_ms=round(llm_avg_latency, 2) if llm_avg_latency is not None else None,
         llm_p95_latency_ms=round(llm_p95_latency, 2) if llm_p95_latency is not None else None,
     )
+    if is_terminal(run.status):
+        run_cache.set(cache_key, out)
+    return out
 
 
 @router.get("/{run_id}/incident", response_model=RunIncidentOut)
@@ -798,9 +830,45 @@ async def get_run_incident(
     session: AsyncSession = Depends(get_session),
     tz=Depends(read_timezone),
 ):
-    run = (await session.execute(select(Run).where(Run.id == run_id))).scalar_one_or_none()
-    if not run:
-        raise HTTPException(status_code=404, detail="Run not found")
+    cache_key = ("incident", str(run_id), _tz_key(tz))
+    incident = run_cache.get(cache_key)
+    if incident is None:
+        run = (await session.execute(select(Run).where(Run.id == run_id))).scalar_one_or_none()
+        if not run:
+            raise HTTPException(status_code=404, detail="Run not found")
+        incident = await _build_run_incident(session, run, tz)
+        if is_terminal(run.status):
+            run_cache.set(cache_key, incident)
+
+    if export:
+        payload = jsonable_encoder(incident)
+        filename = f"run-{run_id}-incident.json"
+        headers = {"Content-Disposition": f"attachment; filename={filename}"}
+        return JSONResponse(content=payload, headers=headers)
+
+    return incident
+
+
+@router.get("/{run_id}/trace")
+async def get_run_trace(
+    run_id: UUID,
+    export: bool = Query(False, description="Retourner la trace en téléchargement."),
+):
+    """Trace d'exécution du run (Chrome trace-event: chrome://tracing, Perfetto)."""
+    runs_root = Path(os.getenv("ARTIFACTS_DIR", settings.artifacts_dir))
+    path = runs_root / str(run_id) / TRACE_FILE
+    try:
+        payload = await asyncio.to_thread(path.read_bytes)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    headers = {}
+    if export:
+        headers["Content-Disposition"] = f"attachment; filename=run-{run_id}-trace.json"
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+async def _build_run_incident(session: AsyncSession, run: Run, tz: Any) -> RunIncidentOut:
+    run_id = run.id
 
     nodes_total = (
         await session.execute(select(func.count()).select_from(Node).where(Node.run_id == run_id))
@@ -911,7 +979,7 @@ async def get_run_incident(
                         content=None,
                         summary=art.summary,
                         created_at=to_tz(art.created_at, tz),
-                        preview=_artifact_preview(art.content, art.summary),
+                        preview=_artifact_preview(art.content or art.preview, art.summary),
                     )
                 )
 
@@ -957,7 +1025,7 @@ async def get_run_incident(
         for evt in recent_events_rows
     ]
 
-    incident = RunIncidentOut(
+    return RunIncidentOut(
         run=RunIncidentRunOut(
             id=run.id,
             title=run.title,
@@ -971,11 +1039,3 @@ async def get_run_incident(
         recent_events=recent_events,
         signals=[signal for signal in signals if isinstance(signal, dict)],
     )
-
-    if export:
-        payload = jsonable_encoder(incident)
-        filename = f"run-{run_id}-incident.json"
-        headers = {"Content-Disposition": f"attachment; filename={filename}"}
-        return JSONResponse(content=payload, headers=headers)
-
-    return incident
@@ -125,6 +125,15 @@ RATE_LIMIT = 3
 WINDOW_SEC = 60
 
 
+def _rate_limit() -> int:
+    """Lancements autorisés par fenêtre (TASKS_RATE_LIMIT, défaut RATE_LIMIT; 0 = illimité)."""
+    raw = (os.getenv("TASKS_RATE_LIMIT") or "").strip()
+    try:
+        return max(0, int(raw)) if raw else RATE_LIMIT
+    except Exception:
+        return RATE_LIMIT
+
+
 def _check_rate_limit(request: Request) -> None:
     store: Dict[str, tuple[int, float]] = request.app.state.rate_limits
     ip = request.client.host if request.client else "?"
@@ -135,7 +144,8 @@ def _check_rate_limit(request: Request) -> None:
     if now - start > WINDOW_SEC:
         store[key] = (1, now)
         return
-    if count >= RATE_LIMIT:
+    limit = _rate_limit()
+    if limit and count >= limit:
         raise HTTPException(status_code=429, detail="Too Many Requests")
     store[key] = (count + 1, start)
 
@@ -1,9 +1,10 @@
-from pydantic import BaseModel, ConfigDict, Field, model_validator, StrictBool
-from typing import Generic, List, Optional, TypeVar, Any, Dict, Union
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator, StrictBool
+from typing import Generic, List, Optional, TypeVar, Any, Dict, Union, Literal
 from uuid import UUID
 from datetime import datetime
 
 from .schemas.feedbacks import FeedbackOut
+from core.llm.routing import parse_goal
 
 T = TypeVar("T")
 
@@ -29,6 +30,16 @@ class LLMOptions(BaseModel):
     supervisor: Optional[LLMRoleOptions] = None
     manager: Optional[LLMRoleOptions] = None
     executor: Optional[LLMRoleOptions] = None
+    # Objectif de routage des modèles pour le run: preferred, fastest, cheapest, p95<X
+    routing: Optional[str] = None
+
+    @field_validator("routing")
+    @classmethod
+    def _check_routing(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None:
+            parse_goal(v)
+            return v.strip().lower()
+        return v
 
 # ---------- Task options ----------
 class TaskOptions(BaseModel):
@@ -41,6 +52,8 @@ class TaskOptions(BaseModel):
     override: List[str] = Field(default_factory=list)
     use_supervisor: StrictBool = False  # si vous déclenchez la génération via superviseur
     llm: Optional[LLMOptions] = None
+    # Échéance du run en secondes: budgets par nœud, timeouts LLM réduits, échec rapide
+    deadline_s: Optional[float] = Field(default=None, gt=0)
 
 
 # ---------- Task spec ----------
@@ -221,6 +234,73 @@ class AuditLogOut(BaseModel):
     created_at: datetime
 
 
+# ---------- Dashboard ------------------------------------------------------
+
+
+class DashboardBucketOut(BaseModel):
+    start: datetime
+    runs: Dict[str, int] = Field(default_factory=dict)
+    total: int = 0
+    duration_avg_ms: Optional[float] = None
+    duration_p50_ms: Optional[float] = None
+    duration_p95_ms: Optional[float] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+
+
+class DashboardTotalsOut(BaseModel):
+    runs: Dict[str, int] = Field(default_factory=dict)
+    total: int = 0
+    success_rate: Optional[float] = None
+    duration_avg_ms: Optional[float] = None
+    duration_p50_ms: Optional[float] = None
+    duration_p95_ms: Optional[float] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+
+
+class FeedbackScoreBandOut(BaseModel):
+    band: str
+    count: int
+
+
+class DashboardMetricsOut(BaseModel):
+    start: datetime
+    end: datetime
+    bucket_s: int
+    refreshed_at: Optional[datetime] = None
+    buckets: List[DashboardBucketOut]
+    totals: DashboardTotalsOut
+    feedback_scores: List[FeedbackScoreBandOut]
+    feedbacks_total: int = 0
+
+
+class UsageRollupOut(BaseModel):
+    start: datetime
+    kind: str
+    status: Optional[str] = None
+    role: Optional[str] = None
+    provider: Optional[str] = None
+    model: Optional[str] = None
+    count: int = 0
+    duration_avg_ms: Optional[float] = None
+    duration_max_ms: Optional[int] = None
+    latency_avg_ms: Optional[float] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class UsageRollupsOut(BaseModel):
+    granularity: Literal["hour", "day"]
+    start: datetime
+    end: datetime
+    group_by: List[str] = Field(default_factory=list)
+    watermark: Optional[datetime] = None
+    items: List[UsageRollupOut]
+
+
 # ---------- Agents ---------------------------------------------------------
 
 
@@ -11,6 +11,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.storage.db_models import Run, RunStatus, Node, NodeStatus, Event
+from core.io.compression import glob_sidecars, read_text
 
 
 def artifacts_root() -> Path:
@@ -74,9 +75,9 @@ def make_callbacks(
         meta: dict[str, Any] = {}
         node_dir = artifacts_root() / str(run_id) / "nodes" / node_key
         if node_dir.is_dir():
-            for p in node_dir.glob("*.llm.json"):
+            for p in glob_sidecars(node_dir):
                 try:
-                    data = json.loads(p.read_text(encoding="utf-8"))
+                    data = json.loads(read_text(p))
                 except Exception:
                     continue
                 usage = data.get("usage") or {}
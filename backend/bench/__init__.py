@@ -0,0 +1 @@
+"""Banc de charge de l'API et de l'orchestrateur (cf. ``python -m bench.harness``)."""
@@ -0,0 +1,98 @@
+# bench/dags.py
+"""
+DAGs synthétiques pour le banc de charge, au format ``task.plan`` de
+``POST /tasks`` (``{"id", "title", "deps", ...}``).
+
+Formes disponibles:
+- ``chain``   : n1 -> n2 -> ... -> nN (latence séquentielle)
+- ``fanout``  : une racine, N-2 branches parallèles, un nœud de synthèse
+- ``diamond`` : racine -> deux branches -> jointure, répété en série
+- ``layered`` : couches aléatoires, dépendances tirées dans la couche précédente
+
+Toutes les formes sont déterministes pour une graine donnée.
+"""
+from __future__ import annotations
+
+import random
+from typing import Any, Callable, Dict, List, Optional
+
+Plan = List[Dict[str, Any]]
+
+
+def _node(i: int, deps: List[str], llm: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    node: Dict[str, Any] = {
+        "id": f"n{i}",
+        "title": f"Bench node {i}",
+        "type": "execute",
+        "suggested_agent_role": "Writer_FR",
+        "deps": deps,
+    }
+    if llm:
+        node["llm"] = dict(llm)
+    return node
+
+
+def chain(size: int, *, seed: int = 0, llm: Optional[Dict[str, Any]] = None) -> Plan:
+    size = max(1, size)
+    return [_node(i, [f"n{i - 1}"] if i > 1 else [], llm) for i in range(1, size + 1)]
+
+
+def fanout(size: int, *, seed: int = 0, llm: Optional[Dict[str, Any]] = None) -> Plan:
+    size = max(3, size)
+    plan = [_node(1, [], llm)]
+    plan += [_node(i, ["n1"], llm) for i in range(2, size)]
+    plan.append(_node(size, [f"n{i}" for i in range(2, size)], llm))
+    return plan
+
+
+def diamond(size: int, *, seed: int = 0, llm: Optional[Dict[str, Any]] = None) -> Plan:
+    # Motif de 3 nœuds (deux branches + jointure) accroché au nœud précédent
+    size = max(4, size)
+    plan = [_node(1, [], llm)]
+    i, tail = 2, "n1"
+    while i + 2 <= size:
+        a, b, join = i, i + 1, i + 2
+        plan.append(_node(a, [tail], llm))
+        plan.append(_node(b, [tail], llm))
+        plan.append(_node(join, [f"n{a}", f"n{b}"], llm))
+        tail, i = f"n{join}", i + 3
+    while i <= size:
+        plan.append(_node(i, [tail], llm))
+        tail, i = f"n{i}", i + 1
+    return plan
+
+
+def layered(
+    size: int, *, seed: int = 0, llm: Optional[Dict[str, Any]] = None, max_width: int = 4
+) -> Plan:
+    rng = random.Random(seed)
+    size = max(1, size)
+    plan: Plan = []
+    previous: List[str] = []
+    i = 1
+    while i <= size:
+        width = min(rng.randint(1, max(1, max_width)), size - i + 1)
+        layer = []
+        for _ in range(width):
+            deps = sorted(rng.sample(previous, rng.randint(1, min(2, len(previous))))) if previous else []
+            plan.append(_node(i, deps, llm))
+            layer.append(f"n{i}")
+            i += 1
+        previous = layer
+    return plan
+
+
+SHAPES: Dict[str, Callable[..., Plan]] = {
+    "chain": chain,
+    "fanout": fanout,
+    "diamond": diamond,
+    "layered": layered,
+}
+
+
+def build(shape: str, size: int, *, seed: int = 0, llm: Optional[Dict[str, Any]] = None) -> Plan:
+    try:
+        factory = SHAPES[shape]
+    except KeyError:
+        raise ValueError(f"forme de DAG inconnue: {shape} (attendu: {', '.join(SHAPES)})")
+    return factory(size, seed=seed, llm=llm)
@@ -0,0 +1,412 @@
+# bench/harness.py
+"""
+Banc de charge de bout en bout: API + orchestrateur + Postgres, LLM simulé.
+
+Déroulé:
+1. démarre l'API (uvicorn, sous-processus) avec le provider ``fake``
+   (latence/jitter configurables) — ou cible une API existante (``--base-url``);
+2. lance ``--runs`` runs ``POST /tasks`` (``--concurrency`` en parallèle) sur
+   des DAGs synthétiques (``bench.dags``);
+3. pendant chaque run: suit le flux SSE (``/events/stream``) et interroge
+   ``/runs/{id}`` puis ``/events`` jusqu'à l'état terminal;
+4. écrit un JSON de résultats (débits runs/s et nœuds/s, p50/p95/p99 des
+   latences HTTP et du retard de livraison SSE, requêtes SQL par nœud);
+5. compare aux budgets (``bench-budgets.json``) et, si fourni, à une
+   référence précédente (``--baseline``): code retour 1 en cas de régression.
+
+La base doit être migrée au préalable (``make api-migrate``).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from bench import dags
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_BUDGETS = REPO_ROOT / "bench-budgets.json"
+TERMINAL_STATUSES = {"completed", "failed", "canceled"}
+LATENCY_KEYS = ("create", "run_detail", "events", "sse_lag", "run_total")
+
+# Métriques où "plus haut" est meilleur (le reste: plus bas est meilleur)
+HIGHER_IS_BETTER = {"runs_per_s", "nodes_per_s"}
+
+
+# ---- Statistiques et budgets -------------------------------------------------
+
+
+def percentiles(values: Iterable[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/max (rang le plus proche) en ms; None si aucune mesure."""
+    data = sorted(float(v) for v in values)
+    out: Dict[str, Optional[float]] = {"count": len(data)}
+    for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+        out[name] = round(data[max(0, math.ceil(q * len(data)) - 1)], 2) if data else None
+    out["max"] = round(data[-1], 2) if data else None
+    return out
+
+
+def lookup(results: Dict[str, Any], path: str) -> Optional[float]:
+    """Valeur numérique à un chemin pointé (``latency_ms.sse_lag.p95``), None si absente."""
+    cur: Any = results
+    for part in path.split("."):
+        if not isinstance(cur, dict) or part not in cur:
+            return None
+        cur = cur[part]
+    return float(cur) if isinstance(cur, (int, float)) and not isinstance(cur, bool) else None
+
+
+def check_budgets(results: Dict[str, Any], budgets: Dict[str, Any]) -> List[str]:
+    """
+    Violations des budgets absolus: ``{"min": {chemin: seuil}, "max": {chemin: seuil}}``.
+    Une métrique absente (ex: métriques Prometheus désactivées) est ignorée.
+    """
+    violations = []
+    for bound, op in (("min", lambda v, t: v < t), ("max", lambda v, t: v > t)):
+        for path, threshold in (budgets.get(bound) or {}).items():
+            value = lookup(results, path)
+            if value is not None and op(value, float(threshold)):
+                violations.append(f"{path}={value:g} hors budget ({bound} {float(threshold):g})")
+    return violations
+
+
+def check_baseline(
+    results: Dict[str, Any], baseline: Dict[str, Any], paths: Iterable[str], tolerance: float
+) -> List[str]:
+    """Régressions relatives (> *tolerance*) par rapport à un résultat de référence."""
+    violations = []
+    for path in paths:
+        value, ref = lookup(results, path), lookup(baseline, path)
+        if value is None or not ref:
+            continue
+        if path in HIGHER_IS_BETTER:
+            worse = value < ref * (1 - tolerance)
+        else:
+            worse = value > ref * (1 + tolerance)
+        if worse:
+            violations.append(f"{path}={value:g} régresse vs référence {ref:g} (tolérance {tolerance:.0%})")
+    return violations
+
+
+def baseline_paths() -> List[str]:
+    paths = ["runs_per_s", "nodes_per_s", "db_queries_per_node"]
+    paths += [f"latency_ms.{k}.{p}" for k in LATENCY_KEYS for p in ("p50", "p95", "p99")]
+    return paths
+
+
+_COUNTER_RE = re.compile(r"^db_queries_total\s+([0-9.eE+-]+)\s*$", re.MULTILINE)
+
+
+def parse_db_queries(metrics_text: str) -> Optional[float]:
+    m = _COUNTER_RE.search(metrics_text or "")
+    return float(m.group(1)) if m else None
+
+
+# ---- Serveur ----------------------------------------------------------------
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args: argparse.Namespace) -> subprocess.Popen:
+    env = dict(os.environ)
+    backend = str(REPO_ROOT / "backend")
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (backend, env.get("PYTHONPATH")) if p)
+    for role in ("EXECUTOR", "MANAGER", "REVIEWER", "SUPERVISOR"):
+        env[f"{role}_PROVIDER"] = "fake"
+        env[f"{role}_MODEL"] = args.model
+    env.update(
+        {
+            "API_KEY": args.api_key,
+            "METRICS_ENABLED": "1",
+            "TASKS_RATE_LIMIT": "0",
+            "FAKE_LLM_LATENCY_MS": str(args.latency_ms),
+            "FAKE_LLM_JITTER_MS": str(args.jitter_ms),
+            "FAKE_LLM_SEED": str(args.seed),
+            "ARTIFACTS_DIR": args.artifacts_dir,
+            "CONFIG_SKIP_DOTENV": "1",
+        }
+    )
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    cmd = [
+        sys.executable, "-m", "uvicorn", "backend.api.fastapi_app.app:app",
+        "--host", "127.0.0.1", "--port", str(args.port), "--log-level", "warning",
+    ]
+    log = open(Path(args.artifacts_dir) / "api.log", "ab")
+    try:
+        return subprocess.Popen(cmd, cwd=str(REPO_ROOT), env=env, stdout=log, stderr=subprocess.STDOUT)
+    finally:
+        log.close()
+
+
+async def wait_ready(client: httpx.AsyncClient, proc: Optional[subprocess.Popen], timeout_s: float) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"l'API s'est arrêtée au démarrage (code {proc.returncode}), cf. api.log")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("l'API n'a pas répondu sur /health à temps")
+
+
+# ---- Charge -----------------------------------------------------------------
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latency: Dict[str, List[float]] = {k: [] for k in LATENCY_KEYS}
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.errors: List[str] = []
+
+    async def timed(self, key: str, coro):
+        t0 = time.perf_counter()
+        res = await coro
+        self.latency[key].append((time.perf_counter() - t0) * 1000)
+        return res
+
+
+def _parse_ts(raw: Optional[str]) -> Optional[datetime]:
+    try:
+        ts = datetime.fromisoformat(raw)
+    except Exception:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+async def follow_sse(client: httpx.AsyncClient, run_id: str, rec: Recorder, done: asyncio.Event) -> None:
+    """Retard de livraison SSE = réception - horodatage de l'événement (même hôte)."""
+    try:
+        async with client.stream("GET", "/events/stream", params={"run_id": run_id}, timeout=None) as resp:
+            async for line in resp.aiter_lines():
+                if line.startswith("data:"):
+                    try:
+                        payload = json.loads(line[5:].strip())
+                    except ValueError:
+                        continue
+                    ts = _parse_ts(payload.get("timestamp"))
+                    if ts is not None:
+                        lag = (datetime.now(timezone.utc) - ts).total_seconds() * 1000
+                        rec.latency["sse_lag"].append(max(0.0, lag))
+                if done.is_set():
+                    return
+    except (httpx.HTTPError, asyncio.CancelledError):
+        return
+
+
+async def drive_run(
+    client: httpx.AsyncClient, index: int, args: argparse.Namespace, rec: Recorder
+) -> int:
+    """Un run complet; retourne le nombre de nœuds du DAG (0 si le run n'a pas abouti)."""
+    shape = args.shapes[index % len(args.shapes)]
+    plan = dags.build(shape, args.nodes, seed=args.seed + index, llm={"provider": "fake", "model": args.model})
+    payload = {"title": f"bench {shape} #{index}", "task": {"title": f"bench {shape}", "plan": plan}}
+    t0 = time.perf_counter()
+    resp = await rec.timed("create", client.post("/tasks", json=payload))
+    if resp.status_code != 202:
+        rec.errors.append(f"POST /tasks -> {resp.status_code}")
+        rec.failed += 1
+        return 0
+    run_id = resp.json()["run_id"]
+
+    done = asyncio.Event()
+    sse = asyncio.create_task(follow_sse(client, run_id, rec, done))
+    status = None
+    try:
+        deadline = time.monotonic() + args.run_timeout_s
+        while time.monotonic() < deadline:
+            r = await rec.timed("run_detail", client.get(f"/runs/{run_id}"))
+            await rec.timed("events", client.get("/events", params={"run_id": run_id, "limit": 50}))
+            if r.status_code == 200:
+                status = str(r.json().get("status") or "").lower()
+                if status in TERMINAL_STATUSES:
+                    break
+            await asyncio.sleep(args.poll_interval_s)
+    finally:
+        done.set()
+        # Laisse au flux SSE le temps de livrer les derniers événements
+        try:
+            await asyncio.wait_for(asyncio.shield(sse), timeout=1.0)
+        except asyncio.TimeoutError:
+            sse.cancel()
+
+    if status == "completed":
+        rec.completed += 1
+        rec.latency["run_total"].append((time.perf_counter() - t0) * 1000)
+        return len(plan)
+    if status in TERMINAL_STATUSES:
+        rec.failed += 1
+    else:
+        rec.timed_out += 1
+    return 0
+
+
+async def scrape_db_queries(client: httpx.AsyncClient) -> Optional[float]:
+    try:
+        r = await client.get("/metrics")
+        return parse_db_queries(r.text) if r.status_code == 200 else None
+    except httpx.HTTPError:
+        return None
+
+
+async def run_bench(args: argparse.Namespace) -> Dict[str, Any]:
+    started_at = datetime.now(timezone.utc).isoformat()
+    proc = None
+    base_url = args.base_url
+    if not base_url:
+        args.port = args.port or _free_port()
+        base_url = f"http://127.0.0.1:{args.port}"
+        proc = start_server(args)
+    limits = httpx.Limits(max_connections=args.concurrency * 3 + 10)
+    headers = {"X-API-Key": args.api_key}
+    try:
+        async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+            await wait_ready(client, proc, args.startup_timeout_s)
+            rec = Recorder()
+            queries_before = await scrape_db_queries(client)
+            sem = asyncio.Semaphore(args.concurrency)
+
+            async def _one(i: int) -> int:
+                async with sem:
+                    try:
+                        return await drive_run(client, i, args, rec)
+                    except Exception as e:
+                        rec.errors.append(repr(e))
+                        rec.failed += 1
+                        return 0
+
+            t0 = time.perf_counter()
+            nodes = sum(await asyncio.gather(*(_one(i) for i in range(args.runs))))
+            wall = time.perf_counter() - t0
+            queries_after = await scrape_db_queries(client)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    queries = (
+        queries_after - queries_before
+        if queries_before is not None and queries_after is not None
+        else None
+    )
+    return {
+        "started_at": started_at,
+        "config": {
+            "runs": args.runs,
+            "concurrency": args.concurrency,
+            "shapes": args.shapes,
+            "nodes": args.nodes,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "seed": args.seed,
+        },
+        "duration_s": round(wall, 3),
+        "runs": {
+            "completed": rec.completed,
+            "failed": rec.failed,
+            "timed_out": rec.timed_out,
+        },
+        "nodes": nodes,
+        "runs_per_s": round(rec.completed / wall, 3) if wall else None,
+        "nodes_per_s": round(nodes / wall, 3) if wall else None,
+        "latency_ms": {k: percentiles(v) for k, v in rec.latency.items()},
+        "db_queries": queries,
+        # Inclut les requêtes des endpoints sondés: comparer à configuration constante
+        "db_queries_per_node": round(queries / nodes, 2) if queries is not None and nodes else None,
+        "errors": rec.errors[:20],
+    }
+
+
+def _load_json(path: Optional[str]) -> Dict[str, Any]:
+    if not path or not Path(path).is_file():
+        return {}
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Banc de charge API + orchestrateur (LLM simulé)")
+    p.add_argument("--runs", type=int, default=int(os.getenv("BENCH_RUNS", "20")))
+    p.add_argument("--concurrency", type=int, default=int(os.getenv("BENCH_CONCURRENCY", "5")))
+    p.add_argument(
+        "--shapes",
+        type=lambda s: [x.strip() for x in s.split(",") if x.strip()],
+        default=list(dags.SHAPES),
+        help="formes de DAG séparées par des virgules (chain,fanout,diamond,layered)",
+    )
+    p.add_argument("--nodes", type=int, default=8, help="nœuds par DAG")
+    p.add_argument("--latency-ms", type=float, default=float(os.getenv("FAKE_LLM_LATENCY_MS", "50")))
+    p.add_argument("--jitter-ms", type=float, default=float(os.getenv("FAKE_LLM_JITTER_MS", "20")))
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--model", default="fake-1")
+    p.add_argument("--base-url", default=None, help="cible une API déjà lancée (sinon démarrée ici)")
+    p.add_argument("--port", type=int, default=0)
+    p.add_argument("--database-url", default=os.getenv("DATABASE_URL", ""))
+    p.add_argument("--api-key", default=os.getenv("API_KEY") or "bench-key")
+    p.add_argument("--artifacts-dir", default=None, help="défaut: dossier temporaire")
+    p.add_argument("--poll-interval-s", type=float, default=0.2)
+    p.add_argument("--run-timeout-s", type=float, default=120.0)
+    p.add_argument("--startup-timeout-s", type=float, default=60.0)
+    p.add_argument("--out", default=str(REPO_ROOT / ".runs" / "bench" / "results.json"))
+    p.add_argument("--budgets", default=str(DEFAULT_BUDGETS))
+    p.add_argument("--baseline", default=None, help="résultats de référence (JSON)")
+    p.add_argument("--tolerance", type=float, default=0.2, help="régression relative tolérée vs référence")
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    unknown = [s for s in args.shapes if s not in dags.SHAPES]
+    if unknown:
+        print(f"formes inconnues: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    args.artifacts_dir = args.artifacts_dir or tempfile.mkdtemp(prefix="crew-bench-")
+
+    results = asyncio.run(run_bench(args))
+    violations = check_budgets(results, _load_json(args.budgets))
+    baseline = _load_json(args.baseline)
+    if baseline:
+        violations += check_baseline(results, baseline, baseline_paths(), args.tolerance)
+    if results["runs"]["completed"] < args.runs:
+        violations.append(f"{args.runs - results['runs']['completed']} run(s) non terminés avec succès")
+    results["violations"] = violations
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(json.dumps({k: results[k] for k in ("runs", "runs_per_s", "nodes_per_s", "db_queries_per_node")}))
+    for k in LATENCY_KEYS:
+        pct = results["latency_ms"][k]
+        print(f"  {k:<11} p50={pct['p50']} p95={pct['p95']} p99={pct['p99']} (n={pct['count']})")
+    for v in violations:
+        print(f"RÉGRESSION: {v}", file=sys.stderr)
+    print(f"résultats: {out} (logs API: {args.artifacts_dir})")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
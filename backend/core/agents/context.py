@@ -0,0 +1,278 @@
+# core/agents/context.py
+"""
+Contexte des dépendances injecté dans le prompt des exécutants.
+
+Avant l'appel d'un agent exécutant, ``assemble_context`` relit les livrables
+Markdown des dépendances du nœud (``.runs/<run>/nodes/<dep>/artifact_<dep>.md``,
+clairs ou ``.zst``) et les fait tenir dans un budget de tokens propre au rôle:
+les dépendances courtes passent en entier, le reste du budget est partagé à
+parts égales entre les plus longues, réduites par extraction (titres et
+premières phrases d'abord, puis paragraphes complets dans l'ordre). Les
+extraits sont mis en cache par hash de l'artifact et budget.
+
+Le contexte est porté par un ``ContextVar`` (``context_scope``) autour de
+l'appel d'``agent_runner``; ses métadonnées (sources, tokens, troncatures)
+sont consignées dans le sidecar LLM du nœud.
+
+Comptage: ``tiktoken`` si installé (dépendance optionnelle), sinon estimation
+à CHARS_PER_TOKEN caractères par token.
+
+Variables d'environnement:
+- CONTEXT_MAX_TOKENS         : budget par défaut (défaut 2000; 0 = pas de contexte)
+- CONTEXT_MAX_TOKENS_<ROLE>  : budget d'un rôle (ex. CONTEXT_MAX_TOKENS_WRITER_FR)
+- CONTEXT_WINDOW_RATIO       : part maximale de la fenêtre Ollama (OLLAMA_NUM_CTX)
+  réservée au contexte (défaut 0.5)
+- CONTEXT_CACHE_SIZE         : extraits conservés en mémoire (défaut 256)
+"""
+from __future__ import annotations
+
+import contextvars
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.io.artifacts_fs import md_path
+from core.io.compression import read_text
+from core.llm.rate_limiter import CHARS_PER_TOKEN
+from core.storage.node_cache import sha256_text
+
+try:  # dépendance optionnelle
+    import tiktoken as _tiktoken  # type: ignore
+except Exception:  # pragma: no cover - tiktoken absent
+    _tiktoken = None
+
+TRUNC_MARK = " […]"
+
+_current: contextvars.ContextVar[Optional["DependencyContext"]] = contextvars.ContextVar(
+    "dependency_context", default=None
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        raw = os.getenv(name, "")
+        return max(0, int(float(raw.strip()))) if raw.strip() else default
+    except Exception:
+        return default
+
+
+def _env_float(name: str, default: float, minimum: float = 0.0) -> float:
+    try:
+        raw = os.getenv(name, "")
+        return max(minimum, float(raw.strip())) if raw.strip() else default
+    except Exception:
+        return default
+
+
+# ---- Comptage des tokens --------------------------------------------------------
+
+
+@lru_cache(maxsize=16)
+def _encoding(model: str):
+    try:
+        return _tiktoken.encoding_for_model(model)
+    except Exception:
+        return _tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: Optional[str], model: Optional[str] = None) -> int:
+    if not text:
+        return 0
+    if _tiktoken is not None:
+        try:
+            return len(_encoding(model or "").encode(text))
+        except Exception:
+            pass
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _cut(text: str, max_tokens: int, model: Optional[str]) -> str:
+    """Coupe franche au budget (dernier recours de l'extraction)."""
+    limit = max(0, max_tokens - count_tokens(TRUNC_MARK, model))
+    out = text[: limit * CHARS_PER_TOKEN]
+    while out and count_tokens(out, model) > limit:
+        out = out[: int(len(out) * 0.9)]
+    return out.rstrip() + TRUNC_MARK if out else ""
+
+
+# ---- Extraction -----------------------------------------------------------------
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+_extracts: "OrderedDict[Tuple[str, int, str], str]" = OrderedDict()
+_extracts_lock = threading.Lock()
+
+
+def _lead(block: str) -> str:
+    """Tête d'un bloc: un titre tel quel, sinon sa première ligne/phrase."""
+    first = block.splitlines()[0]
+    if first.lstrip().startswith("#"):
+        return first
+    return _SENTENCE_RE.split(first, maxsplit=1)[0]
+
+
+def _extract(text: str, max_tokens: int, model: Optional[str]) -> str:
+    blocks = [b.strip() for b in re.split(r"\n\s*\n", text) if b.strip()]
+    keep = [""] * len(blocks)
+    used = 0
+    mark = count_tokens(TRUNC_MARK, model)
+    # 1) Têtes de blocs dans l'ordre (structure du livrable)
+    for i, block in enumerate(blocks):
+        lead = _lead(block)
+        cost = count_tokens(lead, model) + (0 if lead == block else mark)
+        if used + cost > max_tokens:
+            break
+        keep[i], used = lead, used + cost
+    # 2) Blocs complets dans l'ordre tant que le budget le permet
+    for i, block in enumerate(blocks):
+        if not keep[i] or keep[i] == block:
+            continue
+        extra = count_tokens(block, model) - count_tokens(keep[i], model) - mark
+        if used + extra <= max_tokens:
+            keep[i], used = block, used + extra
+    parts = [k if k == b else k + TRUNC_MARK for k, b in zip(keep, blocks) if k]
+    out = "\n\n".join(parts)
+    if not out or count_tokens(out, model) > max_tokens:
+        out = _cut(out or text, max_tokens, model)
+    return out
+
+
+def extract(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """``text`` réduit à ``max_tokens`` par extraction; mis en cache par hash et budget."""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    key = (sha256_text(text), max_tokens, model or "")
+    with _extracts_lock:
+        if key in _extracts:
+            _extracts.move_to_end(key)
+            return _extracts[key]
+    out = _extract(text, max_tokens, model)
+    with _extracts_lock:
+        _extracts[key] = out
+        while len(_extracts) > _env_int("CONTEXT_CACHE_SIZE", 256):
+            _extracts.popitem(last=False)
+    return out
+
+
+def reset_context_cache() -> None:
+    with _extracts_lock:
+        _extracts.clear()
+
+
+# ---- Budget et assemblage -------------------------------------------------------
+
+
+def context_budget(role: Optional[str], provider: Optional[str] = None) -> int:
+    """Budget du rôle (CONTEXT_MAX_TOKENS_<ROLE>, sinon CONTEXT_MAX_TOKENS), borné par la fenêtre Ollama."""
+    role_key = "CONTEXT_MAX_TOKENS_" + re.sub(r"\W", "_", role or "").upper()
+    budget = _env_int(role_key, _env_int("CONTEXT_MAX_TOKENS", 2000))
+    if (provider or "").lower() == "ollama":
+        from core.llm.providers.ollama import num_ctx
+
+        window = num_ctx()
+        if window:
+            budget = min(budget, int(window * _env_float("CONTEXT_WINDOW_RATIO", 0.5)))
+    return budget
+
+
+def _allocate(sizes: Dict[str, int], budget: int) -> Dict[str, int]:
+    """Partage équitable: les plus courts en entier, le reste à parts égales."""
+    alloc: Dict[str, int] = {}
+    remaining = budget
+    left = sorted(sizes, key=lambda k: sizes[k])
+    while left:
+        share = remaining // len(left)
+        if sizes[left[0]] <= share:
+            key = left.pop(0)
+            alloc[key] = sizes[key]
+            remaining -= sizes[key]
+            continue
+        for key in left:
+            alloc[key] = share
+        break
+    return alloc
+
+
+@dataclass
+class DependencyContext:
+    text: str
+    budget: int
+    tokens: int
+    sources: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Métadonnées pour le sidecar (sans le texte, déjà dans le prompt)."""
+        return {"budget": self.budget, "tokens": self.tokens, "sources": self.sources}
+
+
+def assemble_context(
+    run_id: str,
+    dag: Any,
+    node: Any,
+    *,
+    role: Optional[str] = None,
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+) -> Optional[DependencyContext]:
+    """Livrables des dépendances de ``node`` dans le budget du rôle; None si rien à injecter."""
+    budget = context_budget(role, provider)
+    deps = list(getattr(node, "deps", None) or [])
+    if budget <= 0 or not deps:
+        return None
+
+    docs: Dict[str, Tuple[str, str]] = {}
+    for dep in deps:
+        try:
+            body = read_text(md_path(run_id, dep)).strip()
+        except Exception:
+            continue
+        if body:
+            dep_node = dag.nodes.get(dep) if isinstance(getattr(dag, "nodes", None), dict) else None
+            title = getattr(dep_node, "title", None) or dep
+            docs[dep] = (f"### {title} ({dep})", body)
+    if not docs:
+        return None
+
+    headers = sum(count_tokens(h, model) + 1 for h, _ in docs.values())
+    sizes = {dep: count_tokens(body, model) for dep, (_, body) in docs.items()}
+    alloc = _allocate(sizes, max(0, budget - headers))
+
+    parts: List[str] = []
+    sources: List[Dict[str, Any]] = []
+    for dep, (header, body) in docs.items():
+        kept = extract(body, alloc[dep], model)
+        kept_tokens = count_tokens(kept, model)
+        sources.append(
+            {
+                "node_key": dep,
+                "sha256": sha256_text(body),
+                "tokens": sizes[dep],
+                "kept_tokens": kept_tokens,
+                "truncated": kept != body,
+            }
+        )
+        if kept:
+            parts.append(f"{header}\n{kept}")
+    text = "\n\n".join(parts)
+    return DependencyContext(text=text, budget=budget, tokens=count_tokens(text, model), sources=sources)
+
+
+def current_context() -> Optional[DependencyContext]:
+    return _current.get()
+
+
+@contextmanager
+def context_scope(ctx: Optional[DependencyContext]) -> Iterator[Optional[DependencyContext]]:
+    token = _current.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _current.reset(token)
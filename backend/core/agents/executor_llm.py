@@ -2,10 +2,12 @@ PROMPT_TRUNC = 800
 import json
 from pathlib import Path
 
+from .context import current_context
 from .registry import resolve_agent
 from .recruiter import arecruit
 from .schemas import PlanNodeModel
 from core.llm.providers.base import LLMRequest
+from core.llm.routing import effective_goal, route
 from core.llm.runner import run_llm
 from core.storage.composite_adapter import CompositeAdapter
 from orchestrator.sidecars import normalize_llm_sidecar
@@ -25,9 +27,18 @@ async def agent_runner(node: PlanNodeModel, storage: CompositeAdapter | None = N
         brief.append("Acceptance: " + "; ".join(node.acceptance))
     if node.notes:
         brief.append("Notes: " + "; ".join(node.notes))
+    # Livrables des dépendances (assemblés par l'exécuteur dans le budget du rôle)
+    context = current_context()
+    if context is not None and context.text:
+        brief.append("Contexte (livrables des dépendances):\n" + context.text)
     user_msg = "\n".join(brief)
 
-    req = LLMRequest(system=system_prompt, prompt=user_msg, model=spec.model, provider=spec.provider)
+    # Routage selon l'objectif du run (None = modèle du recrutement);
+    # marge de l'échéance entamée: modèles les plus rapides
+    goal = effective_goal()
+    decision = route(spec.candidates, role=role, goal=goal) if spec.candidates else None
+    provider, model = (decision.provider, decision.model) if decision else (spec.provider, spec.model)
+    req = LLMRequest(system=system_prompt, prompt=user_msg, model=model, provider=provider, role=role)
     resp = await run_llm(req)
 
     content = resp.text.strip()
@@ -54,6 +65,8 @@ async def agent_runner(node: PlanNodeModel, storage: CompositeAdapter | None = N
             "final": (final_prompt or "")[:PROMPT_TRUNC],
         },
     }
+    if decision:
+        meta["routing"] = decision.to_dict()
     return {"markdown": content, "llm": meta}
 
 
@@ -1,13 +1,13 @@
 import json
 from typing import List
 
-from pydantic import ValidationError
-
 from .schemas import PlanNodeModel, ManagerOutput, parse_manager_json
 from .registry import resolve_agent, AgentSpec
 from .recruiter import arecruit
-from core.llm.providers.base import LLMRequest
+from core.llm.providers.base import LLMRequest, OutputDiverged
 from core.llm.runner import run_llm
+from core.llm import structured
+from core.llm.retry_policy import consume as consume_retry
 
 
 async def run_manager(subplan: List[PlanNodeModel]) -> ManagerOutput:
@@ -32,19 +32,34 @@ async def run_manager(subplan: List[PlanNodeModel]) -> ManagerOutput:
     ids = {n.id for n in subplan}
     prompt = base_prompt
     last_err: Exception | None = None
-    for _ in range(3):
-        req = LLMRequest(system=system_prompt, prompt=prompt, model=spec.model, provider=spec.provider)
-        resp = await run_llm(req)
+    for attempt in range(3):
+        # Sortie structurée côté provider + validation au fil du streaming
+        req = LLMRequest(
+            system=system_prompt,
+            prompt=prompt,
+            model=spec.model,
+            provider=spec.provider,
+            role="Manager_Generic",
+            response_format=structured.response_format(ManagerOutput),
+            stream=structured.stream_validator(ManagerOutput),
+        )
         try:
-            out = parse_manager_json(resp.text)
+            resp = await run_llm(req)
+            # Fences, virgules finales, sortie tronquée...: réparation locale avant tout retry
+            out, repaired = structured.parse_structured(resp.text, parse_manager_json)
             for a in out.assignments:
                 if a.node_id not in ids:
                     raise ValueError(f"Unknown node_id {a.node_id} in assignment")
             if not out.quality_checks:
                 out.quality_checks.append("Vérifier conformité aux critères d'acceptation.")
+            structured.record("Manager_Generic", "repaired" if repaired else "valid")
             return out
-        except (ValidationError, ValueError) as err:
+        except ValueError as err:
+            structured.record("Manager_Generic", "diverged" if isinstance(err, OutputDiverged) else "invalid")
             last_err = err
+            # Réparation = retry LLM, prélevé sur le budget du nœud/run courant
+            if attempt == 2 or not consume_retry("manager", reason=str(err)[:200]):
+                break
             prompt = (
                 base_prompt
                 + f"\n\nLa réponse précédente était invalide ({err}). Merci de fournir uniquement un JSON conforme au schéma ManagerOutput."
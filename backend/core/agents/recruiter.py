@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 from sqlalchemy.pool import NullPool
 
 from .registry import AgentSpec, register_agent, ensure_seed_if_empty
+from core.llm.routing import candidates_from_models
 from backend.api.fastapi_app.models.agent import AgentTemplate, AgentModelsMatrix
 
 
@@ -169,7 +170,16 @@ async def arecruit(role: str) -> AgentSpec:
                 "Assure-toi que \"plan\" contient au moins 3 nœuds pertinents."
             )
 
-        spec = AgentSpec(role=role, system_prompt=system_prompt, provider=final_provider, model=final_model, tools=tools)
+        # Surcharge d'environnement: modèle imposé, pas de routage
+        candidates = [] if env_override else candidates_from_models(models_dict)
+        spec = AgentSpec(
+            role=role,
+            system_prompt=system_prompt,
+            provider=final_provider,
+            model=final_model,
+            tools=tools,
+            candidates=candidates,
+        )
 
         # Mémorise dans le registre dynamique
         register_agent(spec)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 import logging
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Any
 
 from sqlalchemy import select
@@ -23,6 +23,8 @@ class AgentSpec:
     provider: str
     model: str
     tools: List[str]
+    # Entrées preferred/fallbacks de la matrice (routage par appel, cf. core.llm.routing)
+    candidates: List[Dict[str, Any]] = field(default_factory=list)
 
 
 # Registre dynamique en mémoire: rempli par le recruiter DB
@@ -3,13 +3,13 @@ from __future__ import annotations
 import json
 from typing import Any, Dict
 
-from pydantic import ValidationError
-
 from .registry import resolve_agent
 from .recruiter import arecruit
 from .schemas import SupervisorPlan, parse_supervisor_json
-from core.llm.providers.base import LLMRequest
+from core.llm.providers.base import LLMRequest, OutputDiverged
 from core.llm import runner as llm_runner
+from core.llm import structured
+from core.llm.retry_policy import consume as consume_retry
 
 
 async def run(task: Dict[str, Any], storage: Any = None) -> SupervisorPlan:
@@ -27,22 +27,34 @@ async def run(task: Dict[str, Any], storage: Any = None) -> SupervisorPlan:
     task_json = json.dumps(task, ensure_ascii=False)
     user_msg = task_json
     last_err: Exception | None = None
-    for _ in range(3):
-        req = LLMRequest(system=system_prompt, prompt=user_msg, model=spec.model, provider=spec.provider)
-        resp = await llm_runner.run_llm(req)
-        # Tolérance: supprime les éventuelles fences Markdown (```json ... ```)
-        txt = resp.text.strip() if isinstance(resp.text, str) else str(resp.text)
-        if txt.startswith("```"):
-            # enlève les 1ères et dernières fences
-            txt = txt.strip().lstrip("`").lstrip("json").lstrip().rstrip("`").strip()
+    for attempt in range(3):
+        # Sortie structurée côté provider + validation au fil du streaming
+        req = LLMRequest(
+            system=system_prompt,
+            prompt=user_msg,
+            model=spec.model,
+            provider=spec.provider,
+            role="Supervisor",
+            response_format=structured.response_format(SupervisorPlan),
+            stream=structured.stream_validator(SupervisorPlan),
+        )
         try:
-            plan = parse_supervisor_json(txt)
+            resp = await llm_runner.run_llm(req)
+            txt = resp.text if isinstance(resp.text, str) else str(resp.text)
+            # Fences, virgules finales, sortie tronquée...: réparation locale avant tout retry
+            plan, repaired = structured.parse_structured(txt, parse_supervisor_json)
+            structured.record("Supervisor", "repaired" if repaired else "valid")
             return plan
-        except ValidationError as err:
+        except ValueError as err:
+            structured.record("Supervisor", "diverged" if isinstance(err, OutputDiverged) else "invalid")
             last_err = err
+            # Réparation = retry LLM, prélevé sur le budget du nœud/run courant
+            if attempt == 2 or not consume_retry("supervisor", reason=str(err)[:200]):
+                break
             user_msg = (
                 task_json
-                + "\nLa réponse précédente n'était pas un JSON valide. Réponds uniquement avec un JSON valide conforme au schéma."
+                + f"\nLa réponse précédente n'était pas un JSON valide ({str(err)[:200]}). "
+                "Réponds uniquement avec un JSON valide conforme au schéma."
             )
 
     raise last_err or RuntimeError("Supervisor output invalid")
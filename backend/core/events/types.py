@@ -10,3 +10,5 @@ class EventType(str, Enum):
     RUN_CANCELED = "RUN_CANCELED"
     RUN_PAUSED = "RUN_PAUSED"
     RUN_RESUMED = "RUN_RESUMED"
+    RETRY_EXHAUSTED = "RETRY_EXHAUSTED"
+    DEADLINE_MISSED = "DEADLINE_MISSED"
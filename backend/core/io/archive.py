@@ -0,0 +1,155 @@
+# core/io/archive.py
+"""
+Archives hors ligne des runs anciens (cf. ``core.storage.retention``).
+
+Arborescence (``ARCHIVE_DIR``, défaut ``<ARTIFACTS_DIR>/archive``):
+
+    events/<YYYY_MM>/<run_id>.jsonl.gz   événements d'une partition mensuelle détachée
+    events/<YYYY_MM>/manifest.json       bornes, nombre de lignes et de runs
+    runs/<run_id>.tar.gz                 dossier .runs/<run_id> élagué
+
+Les lectures restent possibles à la demande: :func:`read_archived_events`
+relit les événements d'un run, :func:`restore_run_dir` ré-extrait son dossier
+sous ``ARTIFACTS_DIR`` (index, markdown et sidecars redeviennent servis par les
+chemins FS habituels).
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+EVENTS_DIR = "events"
+RUNS_DIR = "runs"
+
+_restore_lock = threading.Lock()
+
+
+def runs_root() -> Path:
+    return Path(os.getenv("ARTIFACTS_DIR") or os.getenv("RUNS_ROOT") or ".runs")
+
+
+def archive_root() -> Path:
+    raw = (os.getenv("ARCHIVE_DIR") or "").strip()
+    return Path(raw) if raw else runs_root() / "archive"
+
+
+def run_archive_path(run_id: str) -> Path:
+    return archive_root() / RUNS_DIR / f"{run_id}.tar.gz"
+
+
+def events_archive_dir(month_key: str) -> Path:
+    return archive_root() / EVENTS_DIR / month_key
+
+
+# ---- Événements --------------------------------------------------------------
+
+
+def write_run_events(month_key: str, run_id: Optional[str], rows: Iterable[Dict[str, Any]]) -> int:
+    """Écrit (atomiquement) les événements d'un run pour une partition; retourne le nombre de lignes."""
+    target_dir = events_archive_dir(month_key)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    target = target_dir / f"{run_id or '_none'}.jsonl.gz"
+    count = 0
+    with tempfile.NamedTemporaryFile("wb", delete=False, dir=str(target_dir), suffix=".tmp") as tmp:
+        with gzip.GzipFile(fileobj=tmp, mode="wb") as gz:
+            for row in rows:
+                gz.write(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+                count += 1
+        tmp.flush()
+        os.fsync(tmp.fileno())
+        tmp_path = tmp.name
+    os.replace(tmp_path, target)
+    return count
+
+
+def write_manifest(month_key: str, manifest: Dict[str, Any]) -> None:
+    target_dir = events_archive_dir(month_key)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    (target_dir / "manifest.json").write_text(
+        json.dumps(manifest, ensure_ascii=False, default=str), encoding="utf-8"
+    )
+
+
+def read_archived_events(run_id: str) -> List[Dict[str, Any]]:
+    """Événements archivés d'un run (toutes partitions confondues), [] si aucun."""
+    base = archive_root() / EVENTS_DIR
+    out: List[Dict[str, Any]] = []
+    if not base.is_dir():
+        return out
+    for path in sorted(base.glob(f"*/{run_id}.jsonl.gz")):
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as fh:
+                for line in fh:
+                    line = line.strip()
+                    if line:
+                        out.append(json.loads(line))
+        except Exception:
+            continue
+    return out
+
+
+# ---- Dossiers de run ---------------------------------------------------------
+
+
+def archive_run_dir(run_dir: Path) -> Optional[Path]:
+    """Archive ``.runs/<run_id>`` en tar.gz puis supprime le dossier; None si absent."""
+    run_dir = Path(run_dir)
+    if not run_dir.is_dir():
+        return None
+    target = run_archive_path(run_dir.name)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", delete=False, dir=str(target.parent), suffix=".tmp") as tmp:
+        with tarfile.open(fileobj=tmp, mode="w:gz") as tar:
+            tar.add(str(run_dir), arcname=run_dir.name)
+        tmp.flush()
+        os.fsync(tmp.fileno())
+        tmp_path = tmp.name
+    os.replace(tmp_path, target)
+    shutil.rmtree(run_dir, ignore_errors=True)
+    return target
+
+
+def restore_run_dir(run_dir: Path) -> bool:
+    """Ré-extrait un dossier de run archivé s'il est absent; True si le dossier existe au retour."""
+    run_dir = Path(run_dir)
+    if run_dir.is_dir():
+        return True
+    archive = run_archive_path(run_dir.name)
+    if not archive.is_file():
+        return False
+    with _restore_lock:
+        if run_dir.is_dir():
+            return True
+        run_dir.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=str(run_dir.parent), prefix=".restore-"))
+        try:
+            with tarfile.open(archive, "r:gz") as tar:
+                tar.extractall(staging, filter="data")
+            extracted = staging / run_dir.name
+            if not extracted.is_dir():
+                return False
+            os.replace(extracted, run_dir)
+        except Exception:
+            return False
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    return run_dir.is_dir()
+
+
+def restore_for_path(path: Path) -> bool:
+    """Restaure le run contenant *path* (``<ARTIFACTS_DIR>/<run_id>/...``) si archivé."""
+    root = runs_root().resolve()
+    try:
+        rel = Path(path).resolve().relative_to(root)
+    except Exception:
+        return False
+    if len(rel.parts) < 2:
+        return False
+    return restore_run_dir(root / rel.parts[0])
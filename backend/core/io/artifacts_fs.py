@@ -5,6 +5,8 @@ import os, json
 from pathlib import Path
 from typing import Optional, Dict, Any
 from orchestrator.sidecars import normalize_llm_sidecar
+from core.io.run_index import record_markdown, record_sidecar
+from core.io.compression import glob_sidecars, read_text, resolve_path, write_text
 
 def runs_root() -> Path:
     return Path(os.getenv("ARTIFACTS_DIR") or os.getenv("RUNS_ROOT") or ".runs")
@@ -25,8 +27,8 @@ def ensure_dirs(run_id: str, node_key: str) -> Path:
 
 def write_md(run_id: str, node_key: str, content_md: str) -> Path:
     ensure_dirs(run_id, node_key)
-    p = md_path(run_id, node_key)
-    p.write_text(content_md, encoding="utf-8")
+    p = write_text(md_path(run_id, node_key), content_md)
+    record_markdown(p, node_key, content_md)
     return p
 
 def write_llm_sidecar(
@@ -34,25 +36,26 @@ def write_llm_sidecar(
 ) -> Dict[str, Any]:
     """Écrit un sidecar LLM normalisé et le retourne."""
     ensure_dirs(run_id, node_key)
-    p = llm_sidecar_path(run_id, node_key)
     meta_norm = normalize_llm_sidecar(meta, run_id=run_id, node_id=node_id)
-    p.write_text(json.dumps(meta_norm, ensure_ascii=False, indent=2), encoding="utf-8")
+    payload = json.dumps(meta_norm, ensure_ascii=False, indent=2)
+    p = write_text(llm_sidecar_path(run_id, node_key), payload, sidecar=True)
+    record_sidecar(p, node_key, meta_norm, len(payload.encode("utf-8")), node_id=node_id)
     return meta_norm
 
 def read_first_llm_meta(run_id: str, node_key: str) -> Dict[str, Any]:
     """
-    Lecture robuste: .runs/<run>/nodes/<key>/*.llm.json
+    Lecture robuste: .runs/<run>/nodes/<key>/*.llm.json (ou .llm.json.zst)
     Retourne {} si rien.
     """
     nd = node_dir(run_id, node_key)
     if not nd.is_dir():
         return {}
     preferred = [llm_sidecar_path(run_id, node_key)]
-    candidates = preferred + sorted(nd.glob("*.llm.json"))
+    candidates = preferred + glob_sidecars(nd)
     for p in candidates:
         try:
-            if p.exists():
-                obj = json.loads(p.read_text(encoding="utf-8"))
+            if resolve_path(p) is not None:
+                obj = json.loads(read_text(p))
                 if isinstance(obj, dict):
                     return {
                         "provider": obj.get("provider"),
@@ -71,9 +74,9 @@ def legacy_llm_sidecar_path(node_key: str) -> Path:
 
 def read_legacy_llm_meta(node_key: str) -> Dict[str, Any]:
     p = legacy_llm_sidecar_path(node_key)
-    if p.exists():
+    if resolve_path(p) is not None:
         try:
-            obj = json.loads(p.read_text(encoding="utf-8"))
+            obj = json.loads(read_text(p))
             if isinstance(obj, dict):
                 return {
                     "provider": obj.get("provider"),
@@ -0,0 +1,194 @@
+# core/io/compression.py
+"""
+Compression zstd transparente des artifacts et sidecars.
+
+Désactivée par défaut; activée par ``ARTIFACT_COMPRESSION=zstd`` (paquet
+``zstandard`` requis, sinon écriture en clair).
+
+- Disque: le fichier compressé porte le suffixe ``.zst``
+  (``artifact_<key>.md.zst``, ``artifact_<key>.llm.json.zst``); les lectures
+  acceptent indifféremment la version claire ou compressée.
+- DB/blob store: le blob est compressé et la colonne ``artifacts.codec``
+  vaut ``"zstd"``.
+
+Les sidecars LLM (petits JSON très répétitifs) peuvent utiliser un
+dictionnaire entraîné (``ARTIFACT_ZSTD_DICT=<fichier>``, cf.
+``tools/train_zstd_dict.py``). L'identifiant du dictionnaire est inscrit dans
+la trame: la décompression le recharge au besoin.
+
+Variables d'environnement:
+- ``ARTIFACT_COMPRESSION``: ``zstd`` | ``none`` (défaut).
+- ``ARTIFACT_ZSTD_LEVEL``: niveau de compression (défaut 3).
+- ``ARTIFACT_ZSTD_DICT``: chemin d'un dictionnaire entraîné pour les sidecars.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+ZSTD_CODEC = "zstd"
+ZSTD_SUFFIX = ".zst"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+try:  # dépendance optionnelle
+    import zstandard as _zstd  # type: ignore
+except Exception:  # pragma: no cover - zstandard absent
+    _zstd = None
+
+
+def zstd_available() -> bool:
+    return _zstd is not None
+
+
+def _level() -> int:
+    try:
+        raw = os.getenv("ARTIFACT_ZSTD_LEVEL", "")
+        return int(raw.strip()) if raw.strip() else 3
+    except Exception:
+        return 3
+
+
+def compression_codec() -> Optional[str]:
+    """Codec actif pour les nouvelles écritures (None = en clair)."""
+    raw = (os.getenv("ARTIFACT_COMPRESSION") or "").strip().lower()
+    if raw == ZSTD_CODEC and _zstd is not None:
+        return ZSTD_CODEC
+    return None
+
+
+@lru_cache(maxsize=8)
+def _load_dict(path: str):
+    return _zstd.ZstdCompressionDict(Path(path).read_bytes())
+
+
+def _sidecar_dict():
+    path = (os.getenv("ARTIFACT_ZSTD_DICT") or "").strip()
+    if not path or _zstd is None:
+        return None
+    try:
+        return _load_dict(path)
+    except Exception:
+        return None
+
+
+def is_compressed(data: bytes) -> bool:
+    return data[:4] == ZSTD_MAGIC
+
+
+def compress(data: bytes, *, sidecar: bool = False) -> bytes:
+    if _zstd is None:
+        raise RuntimeError("zstandard requis pour ARTIFACT_COMPRESSION=zstd")
+    dict_data = _sidecar_dict() if sidecar else None
+    cctx = _zstd.ZstdCompressor(level=_level(), dict_data=dict_data, write_content_size=True)
+    return cctx.compress(data)
+
+
+def decompress(data: bytes) -> bytes:
+    """Décompresse une trame zstd; les données en clair sont renvoyées telles quelles."""
+    if not is_compressed(data):
+        return data
+    if _zstd is None:
+        raise RuntimeError("zstandard requis pour lire un contenu compressé")
+    dict_data = None
+    try:
+        dict_id = _zstd.get_frame_parameters(data).dict_id
+    except Exception:
+        dict_id = 0
+    if dict_id:
+        dict_data = _sidecar_dict()
+        if dict_data is None or dict_data.dict_id() != dict_id:
+            raise RuntimeError(f"dictionnaire zstd {dict_id} introuvable (ARTIFACT_ZSTD_DICT)")
+    return _zstd.ZstdDecompressor(dict_data=dict_data).decompress(data)
+
+
+def decode_text(data: bytes) -> str:
+    return decompress(data).decode("utf-8")
+
+
+# ---- Disque ----------------------------------------------------------------
+
+
+def compressed_path(path: Path) -> Path:
+    return Path(path).with_name(Path(path).name + ZSTD_SUFFIX)
+
+
+def plain_path(path: Path) -> Path:
+    p = Path(path)
+    return p.with_name(p.name[: -len(ZSTD_SUFFIX)]) if p.name.endswith(ZSTD_SUFFIX) else p
+
+
+def resolve_path(path: Path) -> Optional[Path]:
+    """Version existante d'un fichier: claire, sinon ``.zst``; None si absent."""
+    p = plain_path(path)
+    for cand in (p, compressed_path(p)):
+        if cand.is_file():
+            return cand
+    return None
+
+
+def encode_for_disk(path: Path, text: str, *, sidecar: bool = False) -> tuple[Path, bytes]:
+    """Chemin cible et octets à écrire selon le codec actif."""
+    p = plain_path(path)
+    data = text.encode("utf-8")
+    if compression_codec() == ZSTD_CODEC:
+        return compressed_path(p), compress(data, sidecar=sidecar)
+    return p, data
+
+
+def _drop_stale(target: Path) -> None:
+    # Une seule représentation par fichier: retire l'autre variante éventuelle
+    plain = plain_path(target)
+    other = plain if target != plain else compressed_path(plain)
+    try:
+        other.unlink()
+    except FileNotFoundError:
+        pass
+    except Exception:
+        pass
+
+
+def write_text(path: Path, text: str, *, sidecar: bool = False) -> Path:
+    """Écrit *text* (compressé si activé) et retourne le chemin réellement écrit."""
+    target, data = encode_for_disk(path, text, sidecar=sidecar)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(data)
+    _drop_stale(target)
+    return target
+
+
+def atomic_write_text(path: Path, text: str, *, sidecar: bool = False) -> Path:
+    """Comme :func:`write_text`, via fichier temporaire + fsync + os.replace."""
+    target, data = encode_for_disk(path, text, sidecar=sidecar)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", delete=False, dir=str(target.parent)) as tmp:
+        tmp.write(data)
+        tmp.flush()
+        os.fsync(tmp.fileno())
+        tmp_path = tmp.name
+    os.replace(tmp_path, target)
+    _drop_stale(target)
+    return target
+
+
+def read_text(path: Path) -> str:
+    """Lit un fichier clair ou ``.zst`` (FileNotFoundError si aucun n'existe)."""
+    found = resolve_path(path)
+    if found is None:
+        raise FileNotFoundError(str(path))
+    return decode_text(found.read_bytes())
+
+
+def glob_sidecars(directory: Path, pattern: str = "*.llm.json") -> list[Path]:
+    """Sidecars d'un dossier, versions claires et compressées confondues."""
+    d = Path(directory)
+    return sorted(set(d.glob(pattern)) | set(d.glob(pattern + ZSTD_SUFFIX)))
+
+
+def train_dictionary(samples: Iterable[bytes], dict_size: int = 16 * 1024) -> bytes:
+    """Entraîne un dictionnaire zstd à partir d'échantillons (sidecars en clair)."""
+    if _zstd is None:
+        raise RuntimeError("zstandard requis pour entraîner un dictionnaire")
+    return _zstd.train_dictionary(dict_size, list(samples)).as_bytes()
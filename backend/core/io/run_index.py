@@ -0,0 +1,329 @@
+# core/io/run_index.py
+"""
+Index (manifeste) par run: .runs/<run_id>/index.json
+
+Tenu à jour par les helpers d'écriture (write_md / write_llm_sidecar) et par
+l'api_runner (statut final). Les routes API le consultent en UNE lecture au
+lieu de parcourir l'arborescence (glob/rglob) ou de relire les markdown.
+
+Format:
+    {
+      "version": 1,
+      "run_id": "...",
+      "run": {"status": "...", "ended_at": "...", "request_id": "..."},
+      "nodes": {
+        "<node_key>": {
+          "node_id": "<uuid|None>",
+          "markdown": {"path": "nodes/<key>/artifact_<key>.md", "size": 12, "preview": "..."},
+          "sidecar": {"path": "nodes/<key>/artifact_<key>.llm.json", "size": 34},
+          (chemins suffixés ".zst" quand les fichiers sont compressés)
+          "llm": {"provider": "...", "model": "...", "latency_ms": 1, "usage": {...}}
+        }
+      }
+    }
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import weakref
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from core.io.archive import restore_run_dir
+from core.io.compression import ZSTD_SUFFIX, read_text
+
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+PREVIEW_CHARS = 280
+
+# Un verrou par run: les écritures de runs différents ne se sérialisent pas.
+# Références faibles: le verrou disparaît dès qu'aucune écriture ne le tient.
+_run_locks: weakref.WeakValueDictionary[str, threading.Lock] = weakref.WeakValueDictionary()
+_run_locks_guard = threading.Lock()
+
+
+def _run_lock(run_dir: Path) -> threading.Lock:
+    key = os.path.abspath(run_dir)
+    with _run_locks_guard:
+        lock = _run_locks.get(key)
+        if lock is None:
+            lock = _run_locks[key] = threading.Lock()
+        return lock
+
+
+def index_path(run_dir: Path) -> Path:
+    return Path(run_dir) / INDEX_NAME
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _preview(text: Optional[str]) -> Optional[str]:
+    if not text:
+        return None
+    return text[:PREVIEW_CHARS] + ("…" if len(text) > PREVIEW_CHARS else "")
+
+
+def _llm_summary(meta: Dict[str, Any]) -> Dict[str, Any]:
+    out = {
+        "provider": meta.get("provider"),
+        "model": meta.get("model_used") or meta.get("model"),
+        "latency_ms": meta.get("latency_ms"),
+        "usage": meta.get("usage"),
+    }
+    if meta.get("request_id"):
+        out["request_id"] = meta.get("request_id")
+    return out
+
+
+# Clés d'un sidecar LLM normalisé (spec v1.0, orchestrator/sidecars.py)
+SIDECAR_FIELDS = (
+    "version",
+    "provider",
+    "model",
+    "model_used",
+    "run_id",
+    "node_id",
+    "latency_ms",
+    "usage",
+    "cost",
+    "prompts",
+    "timestamps",
+    "request_id",
+)
+
+
+def sidecar_meta(entry: Dict[str, Any], run_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Sidecar d'un nœud reconstitué depuis son entrée d'index: même forme que le
+    fichier ``*.llm.json``, les champs absents de l'index (prompts, coût,
+    horodatages) valant explicitement None.
+    """
+    llm = entry.get("llm") or {}
+    meta: Dict[str, Any] = dict.fromkeys(SIDECAR_FIELDS)
+    meta.update(
+        {
+            "version": "1.0",
+            "provider": llm.get("provider"),
+            "model": llm.get("model"),
+            "model_used": llm.get("model"),
+            "run_id": run_id,
+            "node_id": entry.get("node_id"),
+            "latency_ms": llm.get("latency_ms"),
+            "usage": dict(llm.get("usage") or {}),
+            "request_id": llm.get("request_id"),
+        }
+    )
+    return meta
+
+
+def _read(run_dir: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(index_path(run_dir).read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def _write(run_dir: Path, data: Dict[str, Any]) -> None:
+    # tmp + os.replace: atomique sans fsync (index reconstructible)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "w", delete=False, dir=str(run_dir), encoding="utf-8", suffix=".tmp"
+    ) as tmp:
+        json.dump(data, tmp, ensure_ascii=False)
+        tmp_path = tmp.name
+    os.replace(tmp_path, index_path(run_dir))
+
+
+def _update(run_dir: Path, mutate: Callable[[Dict[str, Any]], None]) -> None:
+    run_dir = Path(run_dir)
+    with _run_lock(run_dir):
+        # Premier enregistrement: part de l'existant sur disque (fichiers
+        # éventuellement écrits hors helpers) pour que l'index reste complet.
+        data = _read(run_dir) or _scan(run_dir)
+        data.setdefault("version", INDEX_VERSION)
+        data.setdefault("run_id", run_dir.name)
+        data.setdefault("run", {})
+        data.setdefault("nodes", {})
+        mutate(data)
+        data["updated_at"] = _now_iso()
+        _write(run_dir, data)
+
+
+def _node_entry(data: Dict[str, Any], node_key: str) -> Dict[str, Any]:
+    return data["nodes"].setdefault(node_key, {})
+
+
+def _run_dir_of(artifact_path: Path) -> Path:
+    # <root>/<run_id>/nodes/<node_key>/<fichier>
+    return Path(artifact_path).parents[2]
+
+
+def record_markdown(artifact_path: Path, node_key: str, content: str) -> None:
+    """Référence l'artifact markdown d'un nœud dans l'index du run."""
+    run_dir = _run_dir_of(artifact_path)
+    rel = Path(artifact_path).relative_to(run_dir).as_posix()
+
+    def _mutate(data: Dict[str, Any]) -> None:
+        _node_entry(data, node_key)["markdown"] = {
+            "path": rel,
+            "size": len(content.encode("utf-8")),
+            "preview": _preview(content),
+            "updated_at": _now_iso(),
+        }
+
+    try:
+        _update(run_dir, _mutate)
+    except Exception:
+        pass
+
+
+def record_sidecar(
+    artifact_path: Path, node_key: str, meta: Dict[str, Any], size: int, node_id: str | None = None
+) -> None:
+    """Référence le sidecar LLM d'un nœud (+ résumé provider/model/usage)."""
+    run_dir = _run_dir_of(artifact_path)
+    rel = Path(artifact_path).relative_to(run_dir).as_posix()
+
+    def _mutate(data: Dict[str, Any]) -> None:
+        entry = _node_entry(data, node_key)
+        entry["sidecar"] = {"path": rel, "size": size, "updated_at": _now_iso()}
+        entry["llm"] = _llm_summary(meta)
+        if node_id:
+            entry["node_id"] = node_id
+
+    try:
+        _update(run_dir, _mutate)
+    except Exception:
+        pass
+
+
+def record_run(run_dir: Path, **fields: Any) -> None:
+    """Met à jour le bloc "run" (statut, horodatages, request_id)."""
+
+    def _mutate(data: Dict[str, Any]) -> None:
+        data["run"].update({k: v for k, v in fields.items() if v is not None})
+
+    try:
+        _update(Path(run_dir), _mutate)
+    except Exception:
+        pass
+
+
+def _scan(run_dir: Path) -> Dict[str, Any]:
+    """Parcours unique du layout legacy: run.json + nodes/<key>/artifact_*."""
+    if not run_dir.is_dir():
+        return {}
+    data: Dict[str, Any] = {
+        "version": INDEX_VERSION,
+        "run_id": run_dir.name,
+        "run": {},
+        "nodes": {},
+    }
+    try:
+        legacy = json.loads((run_dir / "run.json").read_text(encoding="utf-8"))
+        if isinstance(legacy, dict):
+            meta = legacy.get("meta") if isinstance(legacy.get("meta"), dict) else {}
+            data["run"] = {
+                k: v
+                for k, v in {
+                    "status": legacy.get("status"),
+                    "ended_at": legacy.get("ended_at"),
+                    "request_id": meta.get("request_id"),
+                }.items()
+                if v is not None
+            }
+    except Exception:
+        pass
+    nodes_dir = run_dir / "nodes"
+    if nodes_dir.is_dir():
+        for nd in sorted(p for p in nodes_dir.iterdir() if p.is_dir()):
+            entry: Dict[str, Any] = {}
+            for md in sorted(nd.glob("artifact_*.md")) + sorted(nd.glob("artifact_*.md" + ZSTD_SUFFIX)):
+                try:
+                    txt = read_text(md)
+                except Exception:
+                    continue
+                entry["markdown"] = {
+                    "path": md.relative_to(run_dir).as_posix(),
+                    "size": len(txt.encode("utf-8")),
+                    "preview": _preview(txt),
+                }
+                break
+            for sc in sorted(nd.glob("artifact_*.llm.json")) + sorted(
+                nd.glob("artifact_*.llm.json" + ZSTD_SUFFIX)
+            ):
+                try:
+                    raw = read_text(sc)
+                    meta = json.loads(raw)
+                except Exception:
+                    continue
+                if isinstance(meta, dict):
+                    entry["sidecar"] = {
+                        "path": sc.relative_to(run_dir).as_posix(),
+                        "size": len(raw.encode("utf-8")),
+                    }
+                    entry["llm"] = _llm_summary(meta)
+                    break
+            if entry:
+                data["nodes"][nd.name] = entry
+    data["updated_at"] = _now_iso()
+    return data
+
+
+def rebuild_index(run_dir: Path) -> Dict[str, Any]:
+    """
+    Reconstruit l'index d'un run écrit avant son introduction, persisté si le
+    run est terminé.
+    """
+    run_dir = Path(run_dir)
+    data = _scan(run_dir)
+    if not data:
+        return {}
+    # Persiste seulement un run legacy terminé: un dossier en cours d'écriture
+    # (sans index) ne doit pas figer un instantané partiel.
+    if data["run"].get("ended_at"):
+        try:
+            with _run_lock(run_dir):
+                if not index_path(run_dir).exists():
+                    _write(run_dir, data)
+        except Exception:
+            pass
+    return data
+
+
+def load_index(run_dir: Path, *, rebuild_legacy: bool = True) -> Dict[str, Any]:
+    """Lit index.json ({} si absent); reconstruit pour les runs legacy.
+
+    Un dossier élagué par la rétention est ré-extrait de l'archive au passage.
+    """
+    if not Path(run_dir).is_dir():
+        restore_run_dir(Path(run_dir))
+    data = _read(Path(run_dir))
+    if data or not rebuild_legacy:
+        return data
+    return rebuild_index(Path(run_dir))
+
+
+async def aload_index(run_dir: Path, *, rebuild_legacy: bool = True) -> Dict[str, Any]:
+    """Variante async: l'I/O est déportée dans un thread (hors event loop)."""
+    return await asyncio.to_thread(load_index, Path(run_dir), rebuild_legacy=rebuild_legacy)
+
+
+async def aread_text(path: Path) -> Optional[str]:
+    """Lecture de contenu à la demande (clair ou .zst), hors event loop."""
+
+    def _read_text() -> Optional[str]:
+        try:
+            return read_text(Path(path))
+        except Exception:
+            return None
+
+    return await asyncio.to_thread(_read_text)
@@ -6,6 +6,27 @@ import os
 from typing import Any, Dict
 
 
+_clients: Dict[tuple, Any] = {}
+
+
+def _openai_client(api_key: str):
+    """Client ``AsyncOpenAI`` partagé (pool HTTP réutilisé), un par configuration."""
+    key = (
+        api_key,
+        os.getenv("OPENAI_BASE_URL") or None,
+        os.getenv("OPENAI_ORG") or None,
+        os.getenv("OPENAI_PROJECT") or None,
+    )
+    client = _clients.get(key)
+    if client is None:
+        from openai import AsyncOpenAI  # import local pour éviter la dépendance si inutilisée
+
+        client = _clients[key] = AsyncOpenAI(
+            api_key=key[0], base_url=key[1], organization=key[2], project=key[3]
+        )
+    return client
+
+
 async def call_json(
     *,
     system: str,
@@ -30,14 +51,7 @@ async def call_json(
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY manquant pour l'appel LLM")
 
-    from openai import AsyncOpenAI  # import local pour éviter la dépendance si inutilisée
-
-    client = AsyncOpenAI(
-        api_key=api_key,
-        base_url=os.getenv("OPENAI_BASE_URL") or None,
-        organization=os.getenv("OPENAI_ORG") or None,
-        project=os.getenv("OPENAI_PROJECT") or None,
-    )
+    client = _openai_client(api_key)
 
     kwargs: Dict[str, Any] = {
         "model": model,
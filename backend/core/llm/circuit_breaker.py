@@ -0,0 +1,399 @@
+# core/llm/circuit_breaker.py
+"""
+Disjoncteurs (circuit breakers) par provider et par couple provider/modèle.
+
+``run_llm`` consulte le disjoncteur avant chaque tentative: un circuit ouvert
+est sauté immédiatement (pas de timeout ni d'erreur de connexion à payer),
+on passe au provider suivant de ``fallback_order``.
+
+États:
+- closed    : appels autorisés; ouverture si, sur la fenêtre glissante des
+  derniers appels, le taux d'échec (erreurs + timeouts) dépasse le seuil, ou
+  après N échecs consécutifs (daemon arrêté: ouverture sans attendre la fenêtre)
+- open      : appels refusés pendant ``open_s`` (doublé à chaque réouverture,
+  borné par ``open_max_s``)
+- half_open : à l'échéance, ``half_open_probes`` appels d'essai; un succès
+  referme le circuit, un échec le rouvre
+
+Deux niveaux: le disjoncteur provider (``model="*"``) agrège tous les modèles
+(indisponibilité du daemon/API); le disjoncteur modèle isole un modèle absent
+ou défaillant (``ModelUnavailable`` n'incrimine pas le provider). Les 429
+(``ProviderRateLimited``) sont neutres: la limitation de débit n'est pas une panne.
+
+Variables d'environnement:
+- LLM_CB_ENABLED           : 1 (défaut) / 0
+- LLM_CB_WINDOW            : taille de la fenêtre glissante (défaut 20 appels)
+- LLM_CB_MIN_CALLS         : appels minimum avant d'évaluer le taux (défaut 5)
+- LLM_CB_FAILURE_RATE      : taux d'échec d'ouverture (défaut 0.5)
+- LLM_CB_CONSECUTIVE       : échecs consécutifs d'ouverture (défaut 3)
+- LLM_CB_OPEN_S            : durée d'ouverture initiale (défaut 30 s)
+- LLM_CB_OPEN_MAX_S        : durée d'ouverture maximale (défaut 300 s)
+- LLM_CB_HALF_OPEN_PROBES  : appels d'essai en half-open (défaut 1)
+- LLM_HEALTH_PROBE_INTERVAL_S : sonde de fond des providers (défaut 0 = désactivée)
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import anyio
+
+from core.llm.providers.base import ModelUnavailable, ProviderRateLimited
+from core.telemetry.metrics import (
+    metrics_enabled,
+    get_llm_circuit_state,
+    get_llm_circuit_transitions_total,
+    get_llm_circuit_rejections_total,
+)
+
+log = logging.getLogger("crew.llm.breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+PROVIDER_SCOPE = "*"
+
+
+def breaker_enabled() -> bool:
+    return (os.getenv("LLM_CB_ENABLED", "1") or "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def _env_float(name: str, default: float, minimum: float = 0.0) -> float:
+    try:
+        raw = os.getenv(name, "")
+        return max(minimum, float(raw.strip())) if raw.strip() else default
+    except Exception:
+        return default
+
+
+def _env_int(name: str, default: int, minimum: int = 1) -> int:
+    return int(_env_float(name, default, minimum))
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        provider: str,
+        model: str = PROVIDER_SCOPE,
+        *,
+        window: Optional[int] = None,
+        min_calls: Optional[int] = None,
+        failure_rate: Optional[float] = None,
+        consecutive: Optional[int] = None,
+        open_s: Optional[float] = None,
+        open_max_s: Optional[float] = None,
+        half_open_probes: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.provider = provider
+        self.model = model
+        self.window = window or _env_int("LLM_CB_WINDOW", 20)
+        self.min_calls = min_calls or _env_int("LLM_CB_MIN_CALLS", 5)
+        self.failure_rate = failure_rate or _env_float("LLM_CB_FAILURE_RATE", 0.5, 0.01)
+        self.consecutive = consecutive or _env_int("LLM_CB_CONSECUTIVE", 3)
+        self.open_s = open_s or _env_float("LLM_CB_OPEN_S", 30.0, 0.01)
+        self.open_max_s = max(self.open_s, open_max_s or _env_float("LLM_CB_OPEN_MAX_S", 300.0, 0.01))
+        self.half_open_probes = half_open_probes or _env_int("LLM_CB_HALF_OPEN_PROBES", 1)
+        self.clock = clock
+
+        self.state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=self.window)  # True = échec
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._cooldown = self.open_s
+        self._probes = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.successes = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    # ---- Transitions ----
+
+    def _set_state(self, state: str) -> None:
+        if state == self.state:
+            return
+        log.warning(
+            "llm.circuit provider=%s model=%s %s -> %s", self.provider, self.model, self.state, state
+        )
+        self.state = state
+        if metrics_enabled():
+            get_llm_circuit_state().labels(self.provider, self.model).set(STATE_VALUES[state])
+            get_llm_circuit_transitions_total().labels(self.provider, self.model, state).inc()
+
+    def _open(self, now: float) -> None:
+        self._opened_at = now
+        self._probes = 0
+        self._set_state(OPEN)
+
+    def _close(self) -> None:
+        self._outcomes.clear()
+        self._consecutive = 0
+        self._opened_at = None
+        self._cooldown = self.open_s
+        self._probes = 0
+        self._set_state(CLOSED)
+
+    def _refresh(self, now: float) -> None:
+        if self.state == OPEN and self._opened_at is not None and now - self._opened_at >= self._cooldown:
+            self._probes = 0
+            self._set_state(HALF_OPEN)
+
+    # ---- API ----
+
+    def available(self) -> bool:
+        """Un appel serait-il autorisé (sans réserver d'essai half-open)?"""
+        with self._lock:
+            self._refresh(self.clock())
+            if self.state == OPEN:
+                return False
+            return self.state == CLOSED or self._probes < self.half_open_probes
+
+    def acquire(self) -> bool:
+        """Autorise un appel; en half-open, réserve un des essais."""
+        with self._lock:
+            self._refresh(self.clock())
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            self.rejected += 1
+        if metrics_enabled():
+            get_llm_circuit_rejections_total().labels(self.provider, self.model).inc()
+        return False
+
+    def release(self) -> None:
+        """Appel abandonné (annulé) sans verdict: rend l'essai half-open réservé."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.successes += 1
+            if self.state != CLOSED:
+                self._close()
+                return
+            self._consecutive = 0
+            self._outcomes.append(False)
+
+    def record_failure(self, *, timeout: bool = False, error: Optional[str] = None) -> None:
+        with self._lock:
+            now = self.clock()
+            self.failures += 1
+            self.timeouts += int(timeout)
+            self.last_error = error
+            if self.state == HALF_OPEN:
+                # Essai raté: réouverture avec backoff
+                self._cooldown = min(self.open_max_s, self._cooldown * 2)
+                self._open(now)
+                return
+            if self.state == OPEN:
+                return
+            self._consecutive += 1
+            self._outcomes.append(True)
+            n = len(self._outcomes)
+            rate = sum(self._outcomes) / n if n else 0.0
+            if self._consecutive >= self.consecutive or (n >= self.min_calls and rate >= self.failure_rate):
+                self._open(now)
+
+    def force_half_open(self) -> None:
+        """Sonde de fond réussie: autorise un essai sans attendre l'échéance."""
+        with self._lock:
+            if self.state == OPEN:
+                self._probes = 0
+                self._set_state(HALF_OPEN)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = self.clock()
+            self._refresh(now)
+            n = len(self._outcomes)
+            retry_in = None
+            if self.state == OPEN and self._opened_at is not None:
+                retry_in = round(max(0.0, self._opened_at + self._cooldown - now), 3)
+            return {
+                "provider": self.provider,
+                "model": self.model,
+                "state": self.state,
+                "failure_rate": round(sum(self._outcomes) / n, 3) if n else 0.0,
+                "window_calls": n,
+                "consecutive_failures": self._consecutive,
+                "successes": self.successes,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "rejected": self.rejected,
+                "retry_in_s": retry_in,
+                "last_error": self.last_error,
+            }
+
+
+# ---- Registre du process ----------------------------------------------------
+
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider: str, model: Optional[str] = None) -> CircuitBreaker:
+    key = ((provider or "unknown").lower(), model or PROVIDER_SCOPE)
+    with _breakers_lock:
+        cb = _breakers.get(key)
+        if cb is None:
+            cb = _breakers[key] = CircuitBreaker(*key)
+        return cb
+
+
+def _pair(provider: str, model: Optional[str]) -> List[CircuitBreaker]:
+    out = [get_breaker(provider)]
+    if model:
+        out.append(get_breaker(provider, model))
+    return out
+
+
+def acquire(provider: str, model: Optional[str]) -> bool:
+    """Vrai si provider et modèle acceptent l'appel (les deux niveaux doivent être passants)."""
+    if not breaker_enabled():
+        return True
+    pair = _pair(provider, model)
+    # available() d'abord: ne pas consommer l'essai half-open d'un niveau si l'autre refuse
+    closed_off = [cb for cb in pair if not cb.available()]
+    if closed_off:
+        for cb in closed_off:
+            cb.acquire()  # comptabilise le refus
+        return False
+    return all(cb.acquire() for cb in pair)
+
+
+def is_available(provider: str, model: Optional[str] = None) -> bool:
+    """Comme ``acquire`` sans réserver d'essai ni créer de disjoncteur (routage)."""
+    if not breaker_enabled():
+        return True
+    prov = (provider or "unknown").lower()
+    keys = [(prov, PROVIDER_SCOPE)] + ([(prov, model)] if model else [])
+    with _breakers_lock:
+        pair = [_breakers.get(k) for k in keys]
+    return all(cb.available() for cb in pair if cb is not None)
+
+
+def release(provider: str, model: Optional[str]) -> None:
+    if breaker_enabled():
+        for cb in _pair(provider, model):
+            cb.release()
+
+
+def record_success(provider: str, model: Optional[str]) -> None:
+    if breaker_enabled():
+        for cb in _pair(provider, model):
+            cb.record_success()
+
+
+def record_failure(provider: str, model: Optional[str], exc: BaseException) -> None:
+    """
+    Échec d'appel; neutre pour les 429, limité au modèle pour ``ModelUnavailable``.
+    Un niveau sans verdict rend son essai half-open réservé par ``acquire``.
+    """
+    if not breaker_enabled():
+        return
+    pair = _pair(provider, model)
+    if isinstance(exc, ProviderRateLimited):
+        for cb in pair:
+            cb.release()
+        return
+    from core.llm.providers.base import ProviderTimeout
+
+    timeout = isinstance(exc, ProviderTimeout)
+    err = f"{type(exc).__name__}: {exc}"[:200]
+    targets = pair
+    if isinstance(exc, ModelUnavailable):
+        pair[0].release()
+        targets = pair[1:]
+    for cb in targets:
+        cb.record_failure(timeout=timeout, error=err)
+
+
+def breakers_snapshot() -> List[Dict[str, Any]]:
+    with _breakers_lock:
+        items = sorted(_breakers.items())
+    return [cb.snapshot() for _, cb in items]
+
+
+def breakers_summary() -> Dict[str, Any]:
+    """Vue condensée pour /health: circuits non fermés + détail."""
+    circuits = breakers_snapshot()
+    return {
+        "enabled": breaker_enabled(),
+        "open": [f"{c['provider']}:{c['model']}" for c in circuits if c["state"] == OPEN],
+        "half_open": [f"{c['provider']}:{c['model']}" for c in circuits if c["state"] == HALF_OPEN],
+        "circuits": circuits,
+    }
+
+
+def reset_breakers() -> None:
+    with _breakers_lock:
+        _breakers.clear()
+
+
+# ---- Sonde de fond ------------------------------------------------------------
+
+Probe = Callable[[], Awaitable[bool]]
+
+
+def probe_interval_s() -> float:
+    return _env_float("LLM_HEALTH_PROBE_INTERVAL_S", 0.0)
+
+
+def _default_probe(provider: str) -> Optional[Probe]:
+    """Sonde légère par provider (méthode ``probe`` du provider, si elle existe)."""
+    try:
+        from core.llm.runner import _provider_factory
+
+        instance = _provider_factory(provider)
+    except Exception:
+        return None
+    probe = getattr(instance, "probe", None)
+    return probe if callable(probe) else None
+
+
+async def probe_once(probes: Optional[Dict[str, Probe]] = None) -> Dict[str, bool]:
+    """Sonde chaque provider connu du registre; succès -> half-open, échec -> échec enregistré."""
+    with _breakers_lock:
+        providers = sorted({p for p, m in _breakers if m == PROVIDER_SCOPE})
+    results: Dict[str, bool] = {}
+    for name in providers:
+        probe = (probes or {}).get(name) or _default_probe(name)
+        if probe is None:
+            continue
+        try:
+            ok = bool(await asyncio.wait_for(probe(), timeout=_env_float("LLM_HEALTH_PROBE_TIMEOUT_S", 5.0, 0.1)))
+        except Exception:
+            ok = False
+        results[name] = ok
+        cb = get_breaker(name)
+        if ok:
+            cb.force_half_open()
+        elif cb.state == CLOSED:
+            cb.record_failure(error="health probe failed")
+    return results
+
+
+async def probe_loop(interval_s: Optional[float] = None, probes: Optional[Dict[str, Probe]] = None) -> None:
+    """Boucle de sonde (tâche de fond de l'API); un échec n'interrompt pas la boucle."""
+    interval = probe_interval_s() if interval_s is None else interval_s
+    if interval <= 0:
+        return
+    while True:
+        await anyio.sleep(interval)
+        try:
+            res = await probe_once(probes)
+            log.debug("sonde providers LLM: %s", res)
+        except Exception:
+            log.warning("sonde providers LLM échouée", exc_info=True)
+
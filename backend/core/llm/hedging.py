@@ -0,0 +1,147 @@
+# core/llm/hedging.py
+"""
+Requêtes LLM « couvertes » (hedging) pour couper la queue de latence.
+
+Si le provider principal n'a pas répondu après un délai ``hedge_delay_s``
+(quantile glissant des latences observées pour ce provider/modèle, p90 par
+défaut), ``run_llm`` lance la même requête sur l'entrée suivante de
+``fallback_order`` (ou de ``LLM_FALLBACK_ORDER`` si l'appelant n'en fournit
+pas), garde la première réponse réussie et annule l'autre.
+
+Opt-in par rôle d'agent (``LLMRequest.role``). Le coût est plafonné par un
+budget: chaque requête éligible crédite ``LLM_HEDGE_MAX_RATIO`` jeton, chaque
+hedge en consomme un (au plus ~10 % de requêtes doublées par défaut).
+
+Variables d'environnement:
+- LLM_HEDGE_ROLES        : rôles couverts, séparés par virgules ("*" = tous; défaut vide)
+- LLM_HEDGE_QUANTILE     : quantile de latence déclencheur (défaut 0.9)
+- LLM_HEDGE_WINDOW       : latences conservées par provider/modèle (défaut 200)
+- LLM_HEDGE_MIN_SAMPLES  : échantillons avant d'utiliser le quantile (défaut 20)
+- LLM_HEDGE_DELAY_MS     : délai tant que l'historique est insuffisant (défaut 5000)
+- LLM_HEDGE_MIN_DELAY_MS : plancher du délai (défaut 250)
+- LLM_HEDGE_MAX_RATIO    : part max de requêtes doublées (défaut 0.1)
+- LLM_HEDGE_BURST        : hedges disponibles d'avance (défaut 2)
+- LLM_HEDGE_SAME_TARGET  : 1 pour doubler sur le même provider/modèle à défaut
+  d'alternative (défaut 0)
+"""
+from __future__ import annotations
+
+import math
+import os
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+def _env_float(name: str, default: float, minimum: float = 0.0) -> float:
+    try:
+        raw = os.getenv(name, "")
+        return max(minimum, float(raw.strip())) if raw.strip() else default
+    except Exception:
+        return default
+
+
+def hedge_roles() -> set[str]:
+    raw = os.getenv("LLM_HEDGE_ROLES", "") or ""
+    return {r.strip().lower() for r in raw.split(",") if r.strip()}
+
+
+def hedging_enabled(role: Optional[str]) -> bool:
+    roles = hedge_roles()
+    return "*" in roles or bool(role and role.strip().lower() in roles)
+
+
+def hedge_targets(order: List[str], idx: int) -> List[str]:
+    """Alternatives au provider ``order[idx]``: suite de l'ordre, sinon LLM_FALLBACK_ORDER."""
+    primary = order[idx]
+    rest = [p for p in order[idx + 1:] if p != primary]
+    if not rest and len(order) == 1:
+        raw = os.getenv("LLM_FALLBACK_ORDER", "ollama,openai") or ""
+        rest = [p.strip() for p in raw.split(",") if p.strip() and p.strip() != primary]
+    if not rest and os.getenv("LLM_HEDGE_SAME_TARGET", "0") == "1":
+        rest = [primary]
+    return rest
+
+
+class LatencyTracker:
+    """Latences récentes (ms) des appels réussis, par provider/modèle."""
+
+    def __init__(self, window: Optional[int] = None) -> None:
+        self.window = window or int(_env_float("LLM_HEDGE_WINDOW", 200, 1))
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, provider: str, model: str, latency_ms: float) -> None:
+        with self._lock:
+            self._samples.setdefault((provider, model), deque(maxlen=self.window)).append(float(latency_ms))
+
+    def quantile(self, provider: str, model: str, q: float) -> Optional[float]:
+        with self._lock:
+            values = sorted(self._samples.get((provider, model)) or ())
+        if not values:
+            return None
+        return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+    def count(self, provider: str, model: str) -> int:
+        with self._lock:
+            return len(self._samples.get((provider, model)) or ())
+
+
+class HedgeBudget:
+    """Budget de hedges: +ratio par requête éligible, -1 par hedge, plafonné à ``burst``."""
+
+    def __init__(self, ratio: Optional[float] = None, burst: Optional[float] = None) -> None:
+        self.ratio = _env_float("LLM_HEDGE_MAX_RATIO", 0.1) if ratio is None else ratio
+        self.burst = _env_float("LLM_HEDGE_BURST", 2.0, 1.0) if burst is None else burst
+        self.tokens = self.burst
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            return True
+
+
+_tracker: Optional[LatencyTracker] = None
+_budget: Optional[HedgeBudget] = None
+_state_lock = threading.Lock()
+
+
+def get_tracker() -> LatencyTracker:
+    global _tracker
+    with _state_lock:
+        if _tracker is None:
+            _tracker = LatencyTracker()
+        return _tracker
+
+
+def get_budget() -> HedgeBudget:
+    global _budget
+    with _state_lock:
+        if _budget is None:
+            _budget = HedgeBudget()
+        return _budget
+
+
+def reset_hedging() -> None:
+    global _tracker, _budget
+    with _state_lock:
+        _tracker = None
+        _budget = None
+
+
+def hedge_delay_s(provider: str, model: str, timeout_s: float) -> float:
+    """Délai avant hedge: quantile glissant si assez d'historique, sinon LLM_HEDGE_DELAY_MS."""
+    tracker = get_tracker()
+    delay_ms = _env_float("LLM_HEDGE_DELAY_MS", 5000.0)
+    if tracker.count(provider, model) >= int(_env_float("LLM_HEDGE_MIN_SAMPLES", 20, 1)):
+        q = min(0.999, _env_float("LLM_HEDGE_QUANTILE", 0.9, 0.01))
+        delay_ms = tracker.quantile(provider, model, q) or delay_ms
+    delay_ms = max(_env_float("LLM_HEDGE_MIN_DELAY_MS", 250.0), delay_ms)
+    return min(delay_ms / 1000.0, float(timeout_s or delay_ms / 1000.0))
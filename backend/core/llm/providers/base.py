@@ -1,13 +1,21 @@
 # core/llm/providers/base.py
 from dataclasses import dataclass
 from pydantic import BaseModel, Field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Protocol
 try:
     from sqlmodel import SQLModel
 except Exception:  # fallback pour tests/environnements minimaux
     from pydantic import BaseModel as SQLModel
 
 
+class StreamSink(Protocol):
+    """Reçoit le texte au fil du streaming; ``feed`` peut lever OutputDiverged."""
+
+    def reset(self) -> None: ...
+
+    def feed(self, chunk: str) -> None: ...
+
+
 @dataclass
 class LLMRequest:
     system: Optional[str]
@@ -18,6 +26,13 @@ class LLMRequest:
     max_tokens: int = 1500
     stop: Optional[List[str]] = None
     timeout_s: int = 60
+    # Rôle de l'agent appelant (politiques par rôle: hedging...)
+    role: Optional[str] = None
+    # Sortie structurée (format OpenAI: {"type": "json_object"} ou
+    # {"type": "json_schema", "json_schema": {"name": ..., "schema": {...}}})
+    response_format: Optional[Dict[str, Any]] = None
+    # Streaming: chunks transmis au fur et à mesure (validation incrémentale)
+    stream: Optional[StreamSink] = None
 
 class LLMResponse(SQLModel):
 
@@ -36,10 +51,48 @@ class LLMResponse(SQLModel):
     raw: Optional[Dict[str, Any]] = None
     usage: Dict[str, Any] = Field(default_factory=dict)
 
+
+def usage_dict(usage: Any) -> Dict[str, Any]:
+    """Usage tokens en dict: les SDK renvoient des objets (ex.: ``CompletionUsage`` OpenAI)."""
+    if isinstance(usage, dict):
+        return usage
+    dump = getattr(usage, "model_dump", None)
+    if callable(dump):
+        try:
+            return dump(exclude_none=True)
+        except Exception:
+            pass
+    return dict(getattr(usage, "__dict__", None) or {})
+
 class ProviderError(Exception): ...
 class ProviderUnavailable(ProviderError): ...
 class ProviderTimeout(ProviderError): ...
 
+
+class OutputDiverged(ValueError):
+    """Sortie structurée invalide détectée en streaming: appel interrompu.
+    Ni panne du provider (pas de verdict disjoncteur) ni motif de bascule."""
+
+
+class ModelUnavailable(ProviderUnavailable):
+    """Modèle absent/refusé (ex.: 404 Ollama): le provider lui-même reste joignable."""
+
+
+class ProviderRateLimited(ProviderUnavailable):
+    """HTTP 429: ``retry_after_s`` reprend l'en-tête Retry-After s'il est connu,
+    ``headers`` les en-têtes de limitation (x-ratelimit-*) de la réponse."""
+
+    def __init__(
+        self,
+        message: str = "",
+        *,
+        retry_after_s: Optional[float] = None,
+        headers: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+        self.headers = headers or {}
+
 class LLMProvider:
     async def generate(self, req: LLMRequest) -> LLMResponse:
         raise NotImplementedError
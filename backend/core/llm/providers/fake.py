@@ -0,0 +1,306 @@
+# core/llm/providers/fake.py
+"""
+Provider factice déterministe (benchmarks, tests de charge, démos hors ligne).
+
+Aucun appel réseau. Chaque appel tire son aléa d'un générateur dérivé de
+``(FAKE_LLM_SEED, hash du prompt, n° d'appel pour ce prompt)``: le résultat ne
+dépend pas de l'ordonnancement concurrent, et une nouvelle tentative sur le
+même prompt tire un nouvel échantillon (une 429 injectée peut réussir au retry).
+
+Variables d'environnement:
+- FAKE_LLM_LATENCY         : distribution du délai avant le premier token,
+                             ``fixed`` (défaut), ``lognormal`` ou ``replay``
+- FAKE_LLM_LATENCY_MS      : valeur fixe / médiane lognormale (défaut 0)
+- FAKE_LLM_JITTER_MS       : bruit uniforme ± ajouté en mode ``fixed`` (défaut 0)
+- FAKE_LLM_LATENCY_SIGMA   : écart-type (log) en mode ``lognormal`` (défaut 0.5)
+- FAKE_LLM_REPLAY_DIR      : dossier parcouru (récursif) pour les ``latency_ms``
+                             des sidecars ``*.llm.json`` (défaut ARTIFACTS_DIR/.runs)
+- FAKE_LLM_COMPLETION_TOKENS: tokens de réponse (défaut 0 = dérivé du prompt)
+- FAKE_LLM_CHUNK_TOKENS    : tokens par chunk en streaming (défaut 8)
+- FAKE_LLM_CHUNK_INTERVAL_MS: délai entre deux chunks (défaut 0)
+- FAKE_LLM_RATE_429 / FAKE_LLM_RATE_5XX / FAKE_LLM_RATE_TIMEOUT: probabilités
+                             d'échec injecté (défaut 0)
+- FAKE_LLM_RETRY_AFTER_S   : Retry-After annoncé sur les 429 (défaut 1)
+- FAKE_LLM_TIMEOUT_MS      : attente avant un timeout injecté (défaut: timeout_s de la requête)
+- FAKE_LLM_SEED            : graine (défaut 0)
+- FAKE_LLM_CALL_COUNTS_MAX : prompts distincts suivis pour la numérotation des
+                             appels (LRU, défaut 10000; 0 = illimité)
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+from core.llm.providers.base import (
+    LLMProvider,
+    LLMRequest,
+    LLMResponse,
+    ProviderRateLimited,
+    ProviderTimeout,
+    ProviderUnavailable,
+)
+from core.llm.registry import register_provider
+
+LATENCY_MODELS = ("fixed", "lognormal", "replay")
+CHARS_PER_TOKEN = 4
+_FILLER = (
+    "Cette section synthétise les éléments attendus, détaille les hypothèses "
+    "retenues et propose une structure exploitable pour la suite du travail. "
+)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        raw = os.getenv(name, "")
+        return max(0.0, float(raw.strip())) if raw.strip() else default
+    except Exception:
+        return default
+
+
+def _env_rate(name: str) -> float:
+    return min(1.0, _env_float(name, 0.0))
+
+
+def _tokens(text: str) -> int:
+    # Approximation grossière (~4 caractères par token), suffisante pour l'usage simulé
+    return max(1, len(text or "") // CHARS_PER_TOKEN)
+
+
+@dataclass
+class FakeConfig:
+    latency: str = "fixed"
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    sigma: float = 0.5
+    replay_dir: Optional[str] = None
+    completion_tokens: int = 0
+    chunk_tokens: int = 8
+    chunk_interval_ms: float = 0.0
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    rate_timeout: float = 0.0
+    retry_after_s: float = 1.0
+    timeout_ms: Optional[float] = None
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeConfig":
+        latency = (os.getenv("FAKE_LLM_LATENCY") or "fixed").strip().lower()
+        timeout_raw = (os.getenv("FAKE_LLM_TIMEOUT_MS") or "").strip()
+        return cls(
+            latency=latency if latency in LATENCY_MODELS else "fixed",
+            latency_ms=_env_float("FAKE_LLM_LATENCY_MS", 0.0),
+            jitter_ms=_env_float("FAKE_LLM_JITTER_MS", 0.0),
+            sigma=_env_float("FAKE_LLM_LATENCY_SIGMA", 0.5),
+            replay_dir=(os.getenv("FAKE_LLM_REPLAY_DIR") or "").strip() or None,
+            completion_tokens=int(_env_float("FAKE_LLM_COMPLETION_TOKENS", 0.0)),
+            chunk_tokens=max(1, int(_env_float("FAKE_LLM_CHUNK_TOKENS", 8.0))),
+            chunk_interval_ms=_env_float("FAKE_LLM_CHUNK_INTERVAL_MS", 0.0),
+            rate_429=_env_rate("FAKE_LLM_RATE_429"),
+            rate_5xx=_env_rate("FAKE_LLM_RATE_5XX"),
+            rate_timeout=_env_rate("FAKE_LLM_RATE_TIMEOUT"),
+            retry_after_s=_env_float("FAKE_LLM_RETRY_AFTER_S", 1.0),
+            timeout_ms=_env_float("FAKE_LLM_TIMEOUT_MS", 0.0) if timeout_raw else None,
+            seed=int(_env_float("FAKE_LLM_SEED", 0.0)),
+        )
+
+
+# ---- Latences rejouées -------------------------------------------------------
+
+_replay_cache: Dict[str, List[float]] = {}
+_replay_lock = threading.Lock()
+
+
+def load_replay_latencies(directory: Optional[str] = None) -> List[float]:
+    """``latency_ms`` (> 0) des sidecars ``*.llm.json[.zst]`` sous *directory*, triées; mis en cache."""
+    from core.io.compression import decode_text, glob_sidecars
+
+    root = Path(directory or os.getenv("ARTIFACTS_DIR") or os.getenv("RUNS_ROOT") or ".runs")
+    key = str(root.resolve())
+    with _replay_lock:
+        cached = _replay_cache.get(key)
+        if cached is not None:
+            return cached
+        samples: List[float] = []
+        for path in glob_sidecars(root, "**/*.llm.json"):
+            try:
+                data = json.loads(decode_text(path.read_bytes()))
+                value = float(data.get("latency_ms") or 0)
+            except Exception:
+                continue
+            if value > 0:
+                samples.append(value)
+        samples.sort()
+        _replay_cache[key] = samples
+        return samples
+
+
+# ---- Provider ---------------------------------------------------------------
+
+
+@dataclass
+class FakePlan:
+    """Tirage d'un appel: issue, délai avant premier token, taille de la réponse."""
+
+    outcome: str  # ok | 429 | 5xx | timeout
+    ttft_ms: float
+    text: str
+    usage: Dict[str, int] = field(default_factory=dict)
+
+
+# Compteur d'appels par prompt, borné en LRU (FAKE_LLM_CALL_COUNTS_MAX)
+_call_counts: "OrderedDict[str, int]" = OrderedDict()
+_call_lock = threading.Lock()
+
+
+def _next_call_index(digest: str) -> int:
+    with _call_lock:
+        n = _call_counts.pop(digest, 0)
+        _call_counts[digest] = n + 1
+        cap = int(_env_float("FAKE_LLM_CALL_COUNTS_MAX", 10000))
+        while cap and len(_call_counts) > cap:
+            _call_counts.popitem(last=False)
+        return n
+
+
+def reset_call_counts() -> None:
+    """Remet à zéro les compteurs d'appels (rejouer une séquence identique)."""
+    with _call_lock:
+        _call_counts.clear()
+
+
+class FakeProvider(LLMProvider):
+    def __init__(
+        self,
+        config: Optional[FakeConfig] = None,
+        *,
+        latency_ms: Optional[float] = None,
+        jitter_ms: Optional[float] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        cfg = config or FakeConfig.from_env()
+        if latency_ms is not None:
+            cfg.latency_ms = latency_ms
+        if jitter_ms is not None:
+            cfg.jitter_ms = jitter_ms
+        if seed is not None:
+            cfg.seed = seed
+        self.config = cfg
+
+    # -- tirages --
+
+    def sample_latency_ms(self, rng: random.Random) -> float:
+        cfg = self.config
+        if cfg.latency == "lognormal" and cfg.latency_ms > 0:
+            return rng.lognormvariate(math.log(cfg.latency_ms), cfg.sigma)
+        if cfg.latency == "replay":
+            samples = load_replay_latencies(cfg.replay_dir)
+            if samples:
+                return rng.choice(samples)
+        jitter = rng.uniform(-cfg.jitter_ms, cfg.jitter_ms) if cfg.jitter_ms else 0.0
+        return max(0.0, cfg.latency_ms + jitter)
+
+    def plan(self, req: LLMRequest) -> FakePlan:
+        cfg = self.config
+        digest = hashlib.sha256(f"{req.model}\n{req.system or ''}\n{req.prompt}".encode("utf-8")).hexdigest()
+        rng = random.Random(f"{cfg.seed}:{digest}:{_next_call_index(digest)}")
+
+        roll = rng.random()
+        if roll < cfg.rate_429:
+            outcome = "429"
+        elif roll < cfg.rate_429 + cfg.rate_5xx:
+            outcome = "5xx"
+        elif roll < cfg.rate_429 + cfg.rate_5xx + cfg.rate_timeout:
+            outcome = "timeout"
+        else:
+            outcome = "ok"
+
+        ttft = self.sample_latency_ms(rng)
+        head = f"# Réponse simulée {digest[:12]}\n\n{(req.prompt or '').strip()[:200]}\n\n"
+        target = cfg.completion_tokens or min(req.max_tokens or 1500, max(16, _tokens(req.prompt) // 2))
+        body_chars = max(0, target * CHARS_PER_TOKEN - len(head))
+        text = head + (_FILLER * (body_chars // len(_FILLER) + 1))[:body_chars]
+        usage = {
+            "prompt_tokens": _tokens(req.system or "") + _tokens(req.prompt),
+            "completion_tokens": _tokens(text),
+        }
+        return FakePlan(outcome=outcome, ttft_ms=ttft, text=text, usage=usage)
+
+    def _chunks(self, text: str) -> List[str]:
+        size = self.config.chunk_tokens * CHARS_PER_TOKEN
+        return [text[i : i + size] for i in range(0, len(text), size)] or [""]
+
+    async def _fail(self, plan: FakePlan, req: LLMRequest) -> None:
+        if plan.outcome == "429":
+            await asyncio.sleep(plan.ttft_ms / 1000.0)
+            raise ProviderRateLimited("fake: HTTP 429 Too Many Requests", retry_after_s=self.config.retry_after_s)
+        if plan.outcome == "5xx":
+            await asyncio.sleep(plan.ttft_ms / 1000.0)
+            raise ProviderUnavailable("fake: HTTP 503 Service Unavailable")
+        if plan.outcome == "timeout":
+            wait_ms = self.config.timeout_ms if self.config.timeout_ms is not None else req.timeout_s * 1000.0
+            await asyncio.sleep(wait_ms / 1000.0)
+            raise ProviderTimeout(f"fake: timeout après {int(wait_ms)} ms")
+
+    # -- interface --
+
+    async def stream(self, req: LLMRequest) -> AsyncIterator[str]:
+        """Réponse découpée en chunks: premier après ``ttft``, puis toutes les ``chunk_interval_ms``."""
+        async for chunk in self._emit(self.plan(req), req):
+            yield chunk
+
+    async def _emit(self, plan: FakePlan, req: LLMRequest) -> AsyncIterator[str]:
+        await self._fail(plan, req)
+        await asyncio.sleep(plan.ttft_ms / 1000.0)
+        for i, chunk in enumerate(self._chunks(plan.text)):
+            if i and self.config.chunk_interval_ms:
+                await asyncio.sleep(self.config.chunk_interval_ms / 1000.0)
+            yield chunk
+
+    async def generate(self, req: LLMRequest) -> LLMResponse:
+        plan = self.plan(req)
+        if req.stream is not None:
+            # Streaming demandé: chunks transmis au validateur au fil de l'eau
+            req.stream.reset()
+            async for chunk in self._emit(plan, req):
+                req.stream.feed(chunk)
+            total_ms = plan.ttft_ms + (len(self._chunks(plan.text)) - 1) * self.config.chunk_interval_ms
+            return LLMResponse(
+                text=plan.text,
+                provider="fake",
+                model_used=req.model,
+                raw={"usage": plan.usage, "simulated_latency_ms": int(total_ms), "ttft_ms": int(plan.ttft_ms)},
+                usage=plan.usage,
+            )
+        await self._fail(plan, req)
+        chunks = self._chunks(plan.text)
+        # Réponse non streamée: premier token + émission des chunks restants
+        total_ms = plan.ttft_ms + (len(chunks) - 1) * self.config.chunk_interval_ms
+        if total_ms:
+            await asyncio.sleep(total_ms / 1000.0)
+        return LLMResponse(
+            text=plan.text,
+            provider="fake",
+            model_used=req.model,
+            raw={
+                "usage": plan.usage,
+                "simulated_latency_ms": int(total_ms),
+                "ttft_ms": int(plan.ttft_ms),
+                "chunks": len(chunks),
+            },
+            usage=plan.usage,
+        )
+
+
+@register_provider("fake")
+def _fake_factory():
+    return FakeProvider()
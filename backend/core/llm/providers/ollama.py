@@ -2,21 +2,111 @@
 """
 Provider Ollama conforme à l'interface LLMProvider.
 Utilise l'endpoint /api/chat d'Ollama (messages system/user).
-- Le modèle, le timeout, la température viennent de LLMRequest.
-- Aucune dépendance à des variables d'environnement ici.
+- Le modèle, le timeout, la température, max_tokens (→ num_predict) et stop
+  viennent de LLMRequest.
+- Les compteurs/durées natifs d'Ollama (prompt_eval_count, eval_count,
+  *_duration en ns) sont normalisés dans ``usage`` (prompt_tokens,
+  completion_tokens, load_ms, ttft_ms, tokens_per_s...).
 - Exceptions normalisées pour permettre le fallback.
+- ``response_format`` (format OpenAI) → ``format`` Ollama (schéma JSON ou
+  "json"); ``stream`` → réponse NDJSON transmise au validateur au fil de l'eau.
+
+Variables d'environnement (profil de performance, lues à chaque appel):
+- OLLAMA_KEEP_ALIVE : durée de maintien du modèle en mémoire ("30m", secondes,
+  -1 = toujours; vide = défaut du daemon)
+- OLLAMA_NUM_CTX    : taille de contexte (0/vide = défaut du modèle). Une valeur
+  différente entre deux appels force un rechargement: la garder stable.
 """
 
+import json
 import os
+from typing import Any, Dict, List, Optional, Union
+
 import httpx
 from core.llm.providers.base import (
     LLMProvider, LLMRequest, LLMResponse,
-    ProviderUnavailable, ProviderTimeout
+    ProviderUnavailable, ProviderTimeout, ModelUnavailable
 )
 
 # On lit juste la base URL ici (stable, pas critique) ; le reste vient de la requête
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434").rstrip("/")
 
+# Durées natives Ollama (ns) → champs usage (ms)
+_DURATIONS = (
+    ("load_duration", "load_ms"),
+    ("prompt_eval_duration", "prompt_eval_ms"),
+    ("eval_duration", "eval_ms"),
+    ("total_duration", "total_ms"),
+)
+
+
+def keep_alive() -> Optional[Union[int, str]]:
+    """OLLAMA_KEEP_ALIVE: entier = secondes (-1 = toujours), sinon durée Ollama ("30m")."""
+    raw = (os.getenv("OLLAMA_KEEP_ALIVE", "") or "").strip()
+    if not raw:
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        return raw
+
+
+def num_ctx() -> Optional[int]:
+    try:
+        value = int(os.getenv("OLLAMA_NUM_CTX", "0") or 0)
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+def normalize_usage(data: Any) -> Dict[str, Any]:
+    """Compteurs et timings d'une réponse Ollama au format ``usage`` (tokens, ms, tokens/s)."""
+    if not isinstance(data, dict):
+        return {}
+    usage: Dict[str, Any] = {}
+    try:
+        prompt = data.get("prompt_eval_count")
+        completion = data.get("eval_count")
+        if prompt is not None:
+            usage["prompt_tokens"] = int(prompt)
+        if completion is not None:
+            usage["completion_tokens"] = int(completion)
+        if usage:
+            usage["total_tokens"] = usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0)
+        for key, out in _DURATIONS:
+            ns = data.get(key)
+            if ns:
+                usage[out] = round(int(ns) / 1e6, 1)
+        # Pas de streaming: 1er token ≈ chargement + évaluation du prompt
+        if "prompt_eval_ms" in usage:
+            usage["ttft_ms"] = round(usage.get("load_ms", 0.0) + usage["prompt_eval_ms"], 1)
+        eval_ns = data.get("eval_duration")
+        if completion and eval_ns:
+            usage["tokens_per_s"] = round(int(completion) / (int(eval_ns) / 1e9), 2)
+    except (TypeError, ValueError):
+        pass
+    return usage
+
+
+def output_format(response_format: Optional[Dict[str, Any]]) -> Optional[Union[str, Dict[str, Any]]]:
+    """``response_format`` OpenAI → ``format`` Ollama (schéma JSON, "json" ou None)."""
+    if not response_format:
+        return None
+    if response_format.get("type") == "json_schema":
+        schema = (response_format.get("json_schema") or {}).get("schema")
+        return schema or "json"
+    return "json"
+
+
+def _raise_for_status(status: int, body: str, model: str) -> None:
+    if status == 404:
+        raise ModelUnavailable(
+            f"Modèle '{model}' introuvable côté Ollama (404). "
+            f"Assure-toi d'avoir fait: `ollama pull {model}`."
+        )
+    if status != 200:
+        raise ProviderUnavailable(f"Ollama status {status}: {body[:200]}")
+
 
 class OllamaProvider(LLMProvider):
     async def generate(self, req: LLMRequest) -> LLMResponse:
@@ -32,20 +122,31 @@ class OllamaProvider(LLMProvider):
             messages.append({"role": "system", "content": req.system})
         messages.append({"role": "user", "content": req.prompt})
 
-        payload = {
+        options: Dict[str, Any] = {"temperature": req.temperature}
+        if req.max_tokens and req.max_tokens > 0:
+            options["num_predict"] = req.max_tokens
+        if num_ctx():
+            options["num_ctx"] = num_ctx()
+        if req.stop:
+            options["stop"] = list(req.stop)
+        payload: Dict[str, Any] = {
             "model": req.model,
             "messages": messages,
-            "options": {
-                "temperature": req.temperature,
-                # Ollama ne prend pas max_tokens directement en chat;
-                # si besoin finement → basculer sur /api/generate (num_predict)
-            },
+            "options": options,
             "stream": False,
         }
+        if keep_alive() is not None:
+            payload["keep_alive"] = keep_alive()
+        fmt = output_format(req.response_format)
+        if fmt is not None:
+            payload["format"] = fmt
 
         # httpx gère nativement le timeout total via paramètre timeout=...
         try:
             async with httpx.AsyncClient(timeout=req.timeout_s) as client:
+                if req.stream is not None:
+                    payload["stream"] = True
+                    return await self._chat_stream(client, url, payload, req)
                 resp = await client.post(url, json=payload)
         except httpx.ConnectTimeout:
             raise ProviderTimeout("Ollama timeout (connect)")
@@ -62,13 +163,7 @@ class OllamaProvider(LLMProvider):
             raise ProviderUnavailable(f"Ollama erreur HTTP: {e}")
 
         # Statuts HTTP non-200
-        if resp.status_code == 404:
-            raise ProviderUnavailable(
-                f"Modèle '{req.model}' introuvable côté Ollama (404). "
-                f"Assure-toi d'avoir fait: `ollama pull {req.model}`."
-            )
-        if resp.status_code != 200:
-            raise ProviderUnavailable(f"Ollama status {resp.status_code}: {resp.text[:200]}")
+        _raise_for_status(resp.status_code, resp.text, req.model)
 
         # Corps de réponse
         try:
@@ -86,4 +181,70 @@ class OllamaProvider(LLMProvider):
             # tolérant : certaines versions peuvent renvoyer un autre champ
             text = data.get("response", "") if isinstance(data, dict) else ""
 
-        return LLMResponse(text=text or "", raw=data)
+        return LLMResponse(text=text or "", raw=data, usage=normalize_usage(data))
+
+    async def _chat_stream(
+        self, client: httpx.AsyncClient, url: str, payload: Dict[str, Any], req: LLMRequest
+    ) -> LLMResponse:
+        """/api/chat en NDJSON: chaque fragment est transmis au validateur ``req.stream``."""
+        req.stream.reset()
+        parts: List[str] = []
+        final: Dict[str, Any] = {}
+        async with client.stream("POST", url, json=payload) as resp:
+            if resp.status_code != 200:
+                body = (await resp.aread()).decode("utf-8", errors="replace")
+                _raise_for_status(resp.status_code, body, req.model)
+            async for line in resp.aiter_lines():
+                if not line.strip():
+                    continue
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    raise ProviderUnavailable("Réponse Ollama invalide (NDJSON)")
+                if data.get("error"):
+                    raise ProviderUnavailable(f"Ollama erreur: {data['error']}")
+                delta = (data.get("message") or {}).get("content") or ""
+                if delta:
+                    parts.append(delta)
+                    req.stream.feed(delta)
+                if data.get("done"):
+                    final = data
+        text = "".join(parts)
+        raw = {**final, "message": {"role": "assistant", "content": text}}
+        return LLMResponse(text=text, raw=raw, usage=normalize_usage(final))
+
+    async def warm_up(self, model: str, timeout_s: float = 300.0) -> Dict[str, Any]:
+        """
+        Précharge ``model`` (POST /api/generate sans prompt) avec le même
+        keep_alive/num_ctx que les appels, pour que le 1er nœud ne paie pas le
+        chargement. Retourne l'usage normalisé (``load_ms`` = démarrage à froid).
+        """
+        payload: Dict[str, Any] = {"model": model, "stream": False}
+        if keep_alive() is not None:
+            payload["keep_alive"] = keep_alive()
+        if num_ctx():
+            payload["options"] = {"num_ctx": num_ctx()}
+        try:
+            async with httpx.AsyncClient(timeout=timeout_s) as client:
+                resp = await client.post(f"{OLLAMA_BASE_URL}/api/generate", json=payload)
+        except httpx.TimeoutException as e:
+            raise ProviderTimeout(f"Ollama warm-up timeout: {e}")
+        except httpx.HTTPError as e:
+            raise ProviderUnavailable(f"Ollama indisponible: {e}")
+        if resp.status_code == 404:
+            raise ModelUnavailable(f"Modèle '{model}' introuvable côté Ollama (404).")
+        if resp.status_code != 200:
+            raise ProviderUnavailable(f"Ollama status {resp.status_code}: {resp.text[:200]}")
+        try:
+            return normalize_usage(resp.json())
+        except ValueError:
+            return {}
+
+    async def probe(self, timeout_s: float = 3.0) -> bool:
+        """Sonde légère (GET /api/tags) pour les disjoncteurs: daemon joignable?"""
+        try:
+            async with httpx.AsyncClient(timeout=timeout_s) as client:
+                resp = await client.get(f"{OLLAMA_BASE_URL}/api/tags")
+        except httpx.HTTPError:
+            return False
+        return resp.status_code == 200
@@ -1,17 +1,52 @@
 # core/llm/providers/openai.py
 import os
-import asyncio
 from typing import Optional
 
 from core.llm.providers.base import (
-    LLMProvider, LLMRequest, LLMResponse,
-    ProviderUnavailable, ProviderTimeout
+    LLMProvider, LLMRequest, LLMResponse, OutputDiverged,
+    ProviderUnavailable, ProviderTimeout, ProviderRateLimited, usage_dict
 )
+from core.llm.rate_limiter import parse_retry_after
+from core.llm.retry_policy import allow_retry
 
 # Paramétrables via .env
 _OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))            # + la 1ère tentative
-_OPENAI_BACKOFF_BASE_MS = int(os.getenv("OPENAI_BACKOFF_BASE_MS", "200"))  # 200ms, 400ms, 800ms…
-_OPENAI_BACKOFF_FACTOR = float(os.getenv("OPENAI_BACKOFF_FACTOR", "2.0"))
+_OPENAI_BACKOFF_BASE_MS = int(os.getenv("OPENAI_BACKOFF_BASE_MS", "200"))  # base du backoff (RETRY_* pour le reste)
+
+def _rate_limit_headers(headers) -> dict:
+    """Sous-ensemble utile des en-têtes (x-ratelimit-*, retry-after*)."""
+    if not headers:
+        return {}
+    try:
+        items = headers.items()
+    except Exception:
+        return {}
+    return {
+        k.lower(): v
+        for k, v in items
+        if k.lower().startswith("x-ratelimit-") or k.lower().startswith("retry-after")
+    }
+
+
+async def _consume_stream(stream, sink):
+    """Lit un flux de chunks (id, usage, textes); le validateur peut l'interrompre."""
+    rid, usage, parts = None, None, []
+    try:
+        async for event in stream:
+            rid = rid or getattr(event, "id", None)
+            usage = getattr(event, "usage", None) or usage
+            for choice in getattr(event, "choices", None) or []:
+                delta = getattr(getattr(choice, "delta", None), "content", None)
+                if delta:
+                    parts.append(delta)
+                    sink.feed(delta)
+    finally:
+        # Ferme la connexion HTTP: un flux interrompu (divergence, annulation) n'est pas lu jusqu'au bout
+        close = getattr(stream, "close", None)
+        if close is not None:
+            await close()
+    return rid, usage, parts
+
 
 class OpenAIProvider(LLMProvider):
     def __init__(self):
@@ -19,36 +54,48 @@ class OpenAIProvider(LLMProvider):
         if not api_key:
             raise ProviderUnavailable("OPENAI_API_KEY non défini")
         import openai  # lib officielle >= 1.x
-        self._client = openai.OpenAI(
+        # Client async: annuler la tâche (hedging, échéance) interrompt la requête HTTP
+        self._client = openai.AsyncOpenAI(
             api_key=api_key,
-            base_url=os.getenv("OPENAI_BASE_URL") or None
+            base_url=os.getenv("OPENAI_BASE_URL") or None,
+            # Pas de retry caché dans le SDK: 429 et backoff sont gérés ici / par run_llm
+            max_retries=0,
         )
 
     async def _chat_once(self, req: LLMRequest) -> LLMResponse:
         """
         Une tentative (sans retry). Laisse remonter les exceptions.
         """
-        def _call():
-            resp = self._client.chat.completions.create(
-                model=req.model,
-                messages=[
-                    {"role": "system", "content": req.system or ""},
-                    {"role": "user", "content": req.prompt or ""},
-                ],
-                temperature=req.temperature,
-                max_tokens=req.max_tokens or None,
-            )
+        extra = {}
+        if req.response_format:
+            extra["response_format"] = req.response_format
+        if req.stream is not None:
+            extra.update(stream=True, stream_options={"include_usage": True})
+            req.stream.reset()
+        # with_raw_response: en-têtes x-ratelimit-* pour le limiteur partagé
+        raw_resp = await self._client.chat.completions.with_raw_response.create(
+            model=req.model,
+            messages=[
+                {"role": "system", "content": req.system or ""},
+                {"role": "user", "content": req.prompt or ""},
+            ],
+            temperature=req.temperature,
+            max_tokens=req.max_tokens or None,
+            **extra,
+        )
+        resp = raw_resp.parse()
+        if req.stream is not None:
+            rid, usage, parts = await _consume_stream(resp, req.stream)
+            text = "".join(parts)
+        else:
+            rid, usage = getattr(resp, "id", None), getattr(resp, "usage", None)
             text = resp.choices[0].message.content if getattr(resp, "choices", None) else ""
-            raw = {
-                "id": getattr(resp, "id", None),
-                "usage": getattr(resp, "usage", None)  # <-- important pour tokens
-            }
-            return LLMResponse(text=text, raw=raw)
-
-        try:
-            return await asyncio.to_thread(_call)
-        except Exception:
-            raise  # classification faite au niveau supérieur
+        raw = {
+            "id": rid,
+            "usage": usage_dict(usage),  # <-- important pour tokens (objet SDK -> dict)
+            "rate_limit": _rate_limit_headers(getattr(raw_resp, "headers", None)),
+        }
+        return LLMResponse(text=text, raw=raw)
 
     def _classify(self, err: Exception) -> str:
         """
@@ -70,9 +117,11 @@ class OpenAIProvider(LLMProvider):
 
     async def generate(self, req: LLMRequest) -> LLMResponse:
         """
-        Retry court avec backoff pour 429/5xx/timeout, puis reclassement:
+        Retry court avec backoff (budget de retry partagé) pour 5xx/timeout, puis reclassement:
+        - 429 => ProviderRateLimited immédiat (Retry-After + en-têtes): l'attente
+          est gérée par le limiteur partagé de run_llm, pas par un backoff local
         - timeout => ProviderTimeout
-        - autres (429/5xx/4xx/unknown) => ProviderUnavailable (déclenche le fallback)
+        - autres (5xx/4xx/unknown) => ProviderUnavailable (déclenche le fallback)
         """
         attempts = _OPENAI_MAX_RETRIES + 1
         last_err: Optional[Exception] = None
@@ -80,14 +129,22 @@ class OpenAIProvider(LLMProvider):
         for i in range(attempts):
             try:
                 return await self._chat_once(req)
+            except OutputDiverged:
+                raise
             except Exception as e:
                 last_err = e
                 kind = self._classify(e)
-                if i == attempts - 1:
+                if kind == "rate_limit":
+                    headers = _rate_limit_headers(getattr(getattr(e, "response", None), "headers", None))
+                    raise ProviderRateLimited(
+                        f"OpenAI 429: {e}", retry_after_s=parse_retry_after(headers), headers=headers
+                    )
+                # Retry prélevé sur le budget du nœud/run courant (backoff avec jitter)
+                if i == attempts - 1 or not await allow_retry(
+                    "provider", i + 1, reason=f"openai:{kind}", base_s=_OPENAI_BACKOFF_BASE_MS / 1000.0
+                ):
+                    attempts = i + 1
                     break
-                delay = (_OPENAI_BACKOFF_BASE_MS * (_OPENAI_BACKOFF_FACTOR ** i)) / 1000.0
-                await asyncio.sleep(delay)
-                continue
 
         kind = self._classify(last_err) if last_err else "unknown"
         if kind == "timeout":
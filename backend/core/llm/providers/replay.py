@@ -0,0 +1,86 @@
+# core/llm/providers/replay.py
+"""
+Provider ``replay``: resservit les réponses enregistrées (``core.llm.replay``)
+avec leur timing d'origine, sans appel réseau.
+
+Variables d'environnement:
+- LLM_REPLAY_INDEX / LLM_REPLAY_DIR: source de l'index (cf. ``replay_source``)
+- LLM_REPLAY_SPEED: facteur de vitesse (1 = temps réel, 10 = dix fois plus
+  vite, 0 = sans attente); défaut 1
+- LLM_REPLAY_MISS : prompt absent de l'index -> ``fake`` (réponse simulée,
+  latence tirée des latences enregistrées; défaut) ou ``error``
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Optional
+
+from core.llm.providers.base import LLMProvider, LLMRequest, LLMResponse, ProviderUnavailable
+from core.llm.providers.fake import FakeConfig, FakeProvider
+from core.llm.registry import register_provider
+from core.llm.replay import ReplayIndex, get_index
+
+
+def replay_speed() -> float:
+    try:
+        raw = (os.getenv("LLM_REPLAY_SPEED") or "").strip()
+        return max(0.0, float(raw)) if raw else 1.0
+    except Exception:
+        return 1.0
+
+
+class ReplayProvider(LLMProvider):
+    def __init__(
+        self,
+        index: Optional[ReplayIndex] = None,
+        *,
+        speed: Optional[float] = None,
+        miss: Optional[str] = None,
+    ) -> None:
+        self.index = index or get_index()
+        self.speed = replay_speed() if speed is None else max(0.0, speed)
+        self.miss = (miss or os.getenv("LLM_REPLAY_MISS") or "fake").strip().lower()
+
+    def scaled_s(self, latency_ms: float) -> float:
+        return (latency_ms / 1000.0) / self.speed if self.speed > 0 else 0.0
+
+    async def generate(self, req: LLMRequest) -> LLMResponse:
+        entry = self.index.lookup(req.system, req.prompt)
+        if entry is None:
+            return await self._miss(req)
+        delay = self.scaled_s(entry.get("latency_ms") or 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        usage = dict(entry.get("usage") or {})
+        return LLMResponse(
+            text=entry["text"],
+            provider="replay",
+            model_used=entry.get("model") or req.model,
+            raw={
+                "usage": usage,
+                "replay": {
+                    "hit": True,
+                    "recorded_latency_ms": entry.get("latency_ms"),
+                    "recorded_provider": entry.get("provider"),
+                    "run_id": entry.get("run_id"),
+                },
+            },
+            usage=usage,
+        )
+
+    async def _miss(self, req: LLMRequest) -> LLMResponse:
+        if self.miss == "error":
+            raise ProviderUnavailable("replay: prompt absent de l'index")
+        latencies = self.index.latencies()
+        # Médiane enregistrée, ramenée à la vitesse de rejeu
+        median = latencies[len(latencies) // 2] if latencies else 0.0
+        cfg = FakeConfig(latency_ms=self.scaled_s(median) * 1000.0)
+        out = await FakeProvider(cfg).generate(req)
+        out.raw = {**(out.raw or {}), "replay": {"hit": False}}
+        return out
+
+
+@register_provider("replay")
+def _replay_factory():
+    return ReplayProvider()
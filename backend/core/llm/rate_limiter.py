@@ -0,0 +1,368 @@
+# core/llm/rate_limiter.py
+"""
+Limitation de débit adaptative partagée, par couple (provider, modèle).
+
+``run_llm`` acquiert un bail (``acquire``) avant chaque appel et le rend avec
+le verdict (``Lease.release``). Le limiteur combine:
+
+- deux seaux à jetons (requêtes/min et tokens/min), configurés par budget et
+  recalés sur les en-têtes ``x-ratelimit-remaining-*`` / ``x-ratelimit-reset-*``
+  renvoyés par le provider (la limite annoncée par le provider prime si elle
+  est plus stricte que le budget);
+- une concurrence AIMD: +1/limite par succès (croissance additive), divisée
+  par deux sur un 429 (au plus une fois par ``LLM_RL_DECREASE_INTERVAL_S``:
+  une rafale de 429 d'une même vague ne compte qu'une fois);
+- une pause globale ``Retry-After``: après un 429, aucun appel ne part vers ce
+  provider/modèle avant l'échéance indiquée.
+
+Tous les nœuds concurrents partagent le même état: au lieu d'osciller entre
+rafales et tempêtes de 429, le débit se stabilise juste sous la limite.
+
+Variables d'environnement (``<P>`` = provider, ``<M>`` = modèle normalisé,
+ex. ``GPT_4O_MINI``; la clé la plus spécifique l'emporte):
+- LLM_RL_ENABLED                      : 1 (défaut) / 0
+- LLM_RL_<P>_<M>_RPM, LLM_RL_<P>_RPM, LLM_RL_RPM : requêtes/min (0 = illimité, défaut)
+- LLM_RL_<P>_<M>_TPM, LLM_RL_<P>_TPM, LLM_RL_TPM : tokens/min (0 = illimité, défaut)
+- LLM_RL_MAX_CONCURRENCY              : concurrence max et initiale (défaut 16)
+- LLM_RL_MIN_CONCURRENCY              : plancher AIMD (défaut 1)
+- LLM_RL_DECREASE_FACTOR              : facteur multiplicatif sur 429 (défaut 0.5)
+- LLM_RL_DECREASE_INTERVAL_S          : intervalle min entre deux baisses (défaut 1)
+- LLM_RL_DEFAULT_RETRY_AFTER_S        : pause si 429 sans Retry-After (défaut 1)
+- LLM_RL_HEADROOM                     : part de la limite annoncée visée (défaut 0.95)
+- LLM_RL_MAX_RETRIES                  : nouveaux essais sur 429 après la pause (défaut 2)
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from core.telemetry.metrics import (
+    metrics_enabled,
+    get_llm_rate_limit_concurrency,
+    get_llm_rate_limited_total,
+    get_llm_rate_limit_wait_seconds_total,
+)
+
+log = logging.getLogger("crew.llm.ratelimit")
+
+CHARS_PER_TOKEN = 4
+_POLL_S = 0.02
+
+
+def limiter_enabled() -> bool:
+    return (os.getenv("LLM_RL_ENABLED", "1") or "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def max_retries() -> int:
+    """Nouveaux essais sur 429 dans run_llm, après la pause Retry-After (LLM_RL_MAX_RETRIES)."""
+    return int(_env_float("LLM_RL_MAX_RETRIES", 2))
+
+
+def _env_float(name: str, default: float, minimum: float = 0.0) -> float:
+    try:
+        raw = os.getenv(name, "")
+        return max(minimum, float(raw.strip())) if raw.strip() else default
+    except Exception:
+        return default
+
+
+def _norm(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", name or "").strip("_").upper()
+
+
+def _budget(provider: str, model: str, kind: str) -> float:
+    for key in (f"LLM_RL_{_norm(provider)}_{_norm(model)}_{kind}", f"LLM_RL_{_norm(provider)}_{kind}", f"LLM_RL_{kind}"):
+        if (os.getenv(key) or "").strip():
+            return _env_float(key, 0.0)
+    return 0.0
+
+
+def parse_duration_s(raw: Any) -> Optional[float]:
+    """'1s', '6m0s', '20ms', '1h2m3.5s' ou nombre de secondes."""
+    if raw is None:
+        return None
+    text = str(raw).strip().lower()
+    if not text:
+        return None
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+    total = 0.0
+    matched = False
+    for value, unit in re.findall(r"([\d.]+)\s*(ms|h|m|s)", text):
+        matched = True
+        total += float(value) * {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}[unit]
+    return total if matched else None
+
+
+def parse_retry_after(headers: Optional[Mapping[str, Any]]) -> Optional[float]:
+    """Retry-After (secondes ou date HTTP) / retry-after-ms, en secondes."""
+    if not headers:
+        return None
+    h = {str(k).lower(): v for k, v in headers.items()}
+    if h.get("retry-after-ms") is not None:
+        try:
+            return max(0.0, float(h["retry-after-ms"]) / 1000.0)
+        except ValueError:
+            pass
+    raw = h.get("retry-after")
+    if raw is None:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(raw)).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class TokenBucket:
+    """Seau à jetons: ``capacity`` par minute, rechargé en continu (0 = illimité)."""
+
+    def __init__(self, per_minute: float, clock=time.monotonic) -> None:
+        self.clock = clock
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self, now: float) -> None:
+        if self.unlimited:
+            return
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+
+    def wait_s(self, amount: float, now: float) -> float:
+        """0 si ``amount`` est disponible, sinon le temps de recharge nécessaire."""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.capacity
+
+    def take(self, amount: float, now: float) -> None:
+        if not self.unlimited:
+            self._refill(now)
+            self.level -= min(amount, self.capacity)
+
+    def give(self, amount: float) -> None:
+        if not self.unlimited:
+            self.level = min(self.capacity, self.level + amount)
+
+    def sync(self, limit: Optional[float], remaining: Optional[float], reset_s: Optional[float], now: float, headroom: float) -> None:
+        """Recale le seau sur les en-têtes du provider."""
+        if limit and limit > 0:
+            target = limit * headroom
+            self.capacity = target if self.unlimited else min(self.capacity, target)
+        if self.unlimited or remaining is None:
+            return
+        self._refill(now)
+        self.level = min(self.level, max(0.0, remaining - (1 - headroom) * (limit or 0)))
+        if reset_s and remaining <= 0:
+            # Rien avant le reset: on aligne la recharge sur l'échéance annoncée
+            self.level = -reset_s * self.capacity / 60.0
+
+
+class Lease:
+    def __init__(self, limiter: "RateLimiter", tokens: float, waited_s: float) -> None:
+        self.limiter = limiter
+        self.tokens = tokens
+        self.waited_s = waited_s
+        self._done = False
+
+    def release(
+        self,
+        outcome: str = "ok",
+        *,
+        retry_after_s: Optional[float] = None,
+        headers: Optional[Mapping[str, Any]] = None,
+        tokens_used: Optional[float] = None,
+    ) -> None:
+        """``outcome``: ok | rate_limited | error | cancelled."""
+        if self._done:
+            return
+        self._done = True
+        self.limiter._release(self, outcome, retry_after_s=retry_after_s, headers=headers, tokens_used=tokens_used)
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        *,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        min_concurrency: Optional[int] = None,
+        clock=time.monotonic,
+    ) -> None:
+        self.provider = provider
+        self.model = model
+        self.clock = clock
+        self.requests = TokenBucket(_budget(provider, model, "RPM") if rpm is None else rpm, clock)
+        self.tokens = TokenBucket(_budget(provider, model, "TPM") if tpm is None else tpm, clock)
+        self.max_concurrency = max_concurrency or int(_env_float("LLM_RL_MAX_CONCURRENCY", 16, 1))
+        self.min_concurrency = min(self.max_concurrency, min_concurrency or int(_env_float("LLM_RL_MIN_CONCURRENCY", 1, 1)))
+        self.decrease_factor = min(0.95, _env_float("LLM_RL_DECREASE_FACTOR", 0.5, 0.05))
+        self.decrease_interval_s = _env_float("LLM_RL_DECREASE_INTERVAL_S", 1.0)
+        self.headroom = min(1.0, _env_float("LLM_RL_HEADROOM", 0.95, 0.1))
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._last_decrease = float("-inf")
+        self.rate_limited = 0
+        self.waited_s = 0.0
+        self._lock = threading.Lock()
+
+    # ---- Acquisition ----
+
+    def _try_take(self, tokens: float) -> float:
+        """0 si le bail est accordé (état mis à jour), sinon l'attente estimée."""
+        with self._lock:
+            now = self.clock()
+            wait = max(
+                self.blocked_until - now,
+                self.requests.wait_s(1, now),
+                self.tokens.wait_s(tokens, now),
+            )
+            if wait <= 0 and self.in_flight >= int(self.limit):
+                wait = _POLL_S
+            if wait > 0:
+                return wait
+            self.in_flight += 1
+            self.requests.take(1, now)
+            self.tokens.take(tokens, now)
+            return 0.0
+
+    async def acquire(self, tokens: float = 0.0) -> Lease:
+        start = self.clock()
+        while True:
+            wait = self._try_take(tokens)
+            if wait <= 0:
+                break
+            await asyncio.sleep(min(wait, 1.0))
+        waited = max(0.0, self.clock() - start)
+        if waited:
+            with self._lock:
+                self.waited_s += waited
+            if metrics_enabled():
+                get_llm_rate_limit_wait_seconds_total().labels(self.provider, self.model).inc(waited)
+        return Lease(self, tokens, waited)
+
+    # ---- Retour d'expérience ----
+
+    def _release(
+        self,
+        lease: Lease,
+        outcome: str,
+        *,
+        retry_after_s: Optional[float],
+        headers: Optional[Mapping[str, Any]],
+        tokens_used: Optional[float],
+    ) -> None:
+        with self._lock:
+            now = self.clock()
+            self.in_flight = max(0, self.in_flight - 1)
+            if tokens_used is not None and tokens_used < lease.tokens:
+                self.tokens.give(lease.tokens - tokens_used)
+            if headers:
+                self._sync_headers(headers, now)
+            if outcome == "ok":
+                # Croissance additive: +1 sur une « fenêtre » de ``limit`` succès
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / max(1.0, self.limit))
+            elif outcome == "rate_limited":
+                self.rate_limited += 1
+                pause = retry_after_s
+                if pause is None:
+                    pause = parse_retry_after(headers)
+                if pause is None:
+                    pause = _env_float("LLM_RL_DEFAULT_RETRY_AFTER_S", 1.0)
+                self.blocked_until = max(self.blocked_until, now + pause)
+                if now - self._last_decrease >= self.decrease_interval_s:
+                    self._last_decrease = now
+                    self.limit = max(float(self.min_concurrency), self.limit * self.decrease_factor)
+                log.warning(
+                    "llm.rate_limited provider=%s model=%s pause_s=%.2f concurrency=%.1f",
+                    self.provider, self.model, pause, self.limit,
+                )
+            limit = self.limit
+        if metrics_enabled():
+            get_llm_rate_limit_concurrency().labels(self.provider, self.model).set(limit)
+            if outcome == "rate_limited":
+                get_llm_rate_limited_total().labels(self.provider, self.model).inc()
+
+    def _sync_headers(self, headers: Mapping[str, Any], now: float) -> None:
+        h = {str(k).lower(): v for k, v in headers.items()}
+
+        def num(key: str) -> Optional[float]:
+            try:
+                return float(h[key]) if h.get(key) is not None else None
+            except ValueError:
+                return None
+
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            limit = num(f"x-ratelimit-limit-{kind}")
+            remaining = num(f"x-ratelimit-remaining-{kind}")
+            reset = parse_duration_s(h.get(f"x-ratelimit-reset-{kind}"))
+            if limit is not None or remaining is not None:
+                bucket.sync(limit, remaining, reset, now, self.headroom)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = self.clock()
+            return {
+                "provider": self.provider,
+                "model": self.model,
+                "concurrency_limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "rpm": self.requests.capacity or None,
+                "tpm": self.tokens.capacity or None,
+                "blocked_for_s": round(max(0.0, self.blocked_until - now), 3),
+                "rate_limited": self.rate_limited,
+                "waited_s": round(self.waited_s, 3),
+            }
+
+
+# ---- Registre du process ----------------------------------------------------
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str, model: str) -> RateLimiter:
+    key = ((provider or "unknown").lower(), model or "")
+    with _limiters_lock:
+        rl = _limiters.get(key)
+        if rl is None:
+            rl = _limiters[key] = RateLimiter(*key)
+        return rl
+
+
+def estimate_tokens(system: Optional[str], prompt: Optional[str], max_tokens: Optional[int]) -> float:
+    return (len(system or "") + len(prompt or "")) / CHARS_PER_TOKEN + float(max_tokens or 0)
+
+
+def limiters_snapshot() -> list[Dict[str, Any]]:
+    with _limiters_lock:
+        items = sorted(_limiters.items())
+    return [rl.snapshot() for _, rl in items]
+
+
+def reset_limiters() -> None:
+    with _limiters_lock:
+        _limiters.clear()
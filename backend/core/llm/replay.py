@@ -0,0 +1,173 @@
+# core/llm/replay.py
+"""
+Index de rejeu du trafic LLM enregistré dans les sidecars ``*.llm.json``.
+
+Chaque sidecar d'agent contient les prompts envoyés (tronqués à
+``PROMPT_TRUNC`` caractères), la réponse (``markdown``), ``latency_ms``,
+``usage``, provider et modèle. L'index associe la clé
+``sha256(system[:800] \\0 user[:800])`` à la liste des réponses enregistrées
+pour ce prompt; le provider ``replay`` (``core.llm.providers.replay``) les
+resservit dans l'ordre d'enregistrement, avec leur latence d'origine.
+
+Sources: arborescence ``.runs/**`` (sidecars clairs ou ``.zst``), artifacts
+DB (cf. ``tools/replay_run.py index --database-url``) ou index pré-calculé
+(JSON, ``.json.gz`` accepté).
+
+Limite connue: ``markdown`` est la réponse post-traitée par l'agent (titre,
+gabarit de rôle); le volume servi est représentatif, pas l'octet près.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# Même troncature que les prompts enregistrés (core.agents.executor_llm)
+PROMPT_TRUNC = 800
+INDEX_VERSION = 1
+
+
+def prompt_key(system: Optional[str], prompt: Optional[str]) -> str:
+    raw = f"{(system or '')[:PROMPT_TRUNC]}\0{(prompt or '')[:PROMPT_TRUNC]}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def entry_from_sidecar(data: Dict[str, Any]) -> Optional[tuple[str, Dict[str, Any]]]:
+    """(clé, entrée) pour un sidecar exploitable (prompts + réponse), sinon None."""
+    if not isinstance(data, dict) or data.get("dry_run"):
+        return None
+    prompts = data.get("prompts") if isinstance(data.get("prompts"), dict) else {}
+    user = prompts.get("user")
+    system = prompts.get("system")
+    if user is None:
+        user, system = data.get("prompt"), None
+    text = data.get("markdown") or data.get("text") or data.get("response")
+    if not user or not isinstance(text, str):
+        return None
+    try:
+        latency = max(0.0, float(data.get("latency_ms") or 0))
+    except Exception:
+        latency = 0.0
+    usage = data.get("usage") if isinstance(data.get("usage"), dict) else {}
+    entry = {
+        "text": text,
+        "latency_ms": latency,
+        "usage": usage,
+        "provider": data.get("provider"),
+        "model": data.get("model_used") or data.get("model"),
+        "run_id": data.get("run_id"),
+        "ts": (data.get("timestamps") or {}).get("started_at") or data.get("timestamp"),
+    }
+    return prompt_key(system, user), entry
+
+
+class ReplayIndex:
+    """Réponses enregistrées par clé de prompt; ``lookup`` les sert à tour de rôle."""
+
+    def __init__(self, entries: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> None:
+        self.entries: Dict[str, List[Dict[str, Any]]] = entries or {}
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.entries.values())
+
+    def add_sidecar(self, data: Dict[str, Any]) -> bool:
+        item = entry_from_sidecar(data)
+        if item is None:
+            return False
+        key, entry = item
+        self.entries.setdefault(key, []).append(entry)
+        return True
+
+    def add_sidecars(self, items: Iterable[Dict[str, Any]]) -> int:
+        return sum(1 for data in items if self.add_sidecar(data))
+
+    def sort(self) -> None:
+        # Ordre d'enregistrement: un rejeu resservit la 1re réponse au 1er appel, etc.
+        for values in self.entries.values():
+            values.sort(key=lambda e: e.get("ts") or "")
+
+    def lookup(self, system: Optional[str], prompt: Optional[str]) -> Optional[Dict[str, Any]]:
+        key = prompt_key(system, prompt)
+        values = self.entries.get(key)
+        with self._lock:
+            if not values:
+                self.misses += 1
+                return None
+            self.hits += 1
+            n = self._cursor.get(key, 0)
+            self._cursor[key] = n + 1
+        return values[n % len(values)]
+
+    def latencies(self) -> List[float]:
+        return sorted(e["latency_ms"] for v in self.entries.values() for e in v if e.get("latency_ms"))
+
+    # ---- Construction / persistance ----
+
+    @classmethod
+    def from_dir(cls, root: Path) -> "ReplayIndex":
+        from core.io.compression import decode_text, glob_sidecars
+
+        index = cls()
+        for path in glob_sidecars(Path(root), "**/*.llm.json"):
+            try:
+                index.add_sidecar(json.loads(decode_text(path.read_bytes())))
+            except Exception:
+                continue
+        index.sort()
+        return index
+
+    @classmethod
+    def from_file(cls, path: Path) -> "ReplayIndex":
+        path = Path(path)
+        opener = gzip.open if path.name.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as fh:
+            data = json.load(fh)
+        return cls(data.get("entries") or {})
+
+    def save(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": INDEX_VERSION, "count": len(self), "entries": self.entries}
+        opener = gzip.open if path.name.endswith(".gz") else open
+        tmp = path.with_name(path.name + ".tmp")
+        with opener(tmp, "wt", encoding="utf-8") as fh:
+            json.dump(payload, fh, ensure_ascii=False)
+        os.replace(tmp, path)
+        return path
+
+
+# ---- Index courant (provider replay) ----------------------------------------
+
+_current: Optional[ReplayIndex] = None
+_current_lock = threading.Lock()
+
+
+def replay_source() -> Path:
+    """LLM_REPLAY_INDEX (fichier) sinon LLM_REPLAY_DIR, défaut: racine des runs."""
+    raw = (os.getenv("LLM_REPLAY_INDEX") or os.getenv("LLM_REPLAY_DIR") or "").strip()
+    return Path(raw or os.getenv("ARTIFACTS_DIR") or os.getenv("RUNS_ROOT") or ".runs")
+
+
+def get_index() -> ReplayIndex:
+    """Index partagé du process, chargé au premier appel."""
+    global _current
+    with _current_lock:
+        if _current is None:
+            src = replay_source()
+            _current = ReplayIndex.from_file(src) if src.is_file() else ReplayIndex.from_dir(src)
+        return _current
+
+
+def set_index(index: Optional[ReplayIndex]) -> None:
+    """Remplace (ou réinitialise avec None) l'index partagé."""
+    global _current
+    with _current_lock:
+        _current = index
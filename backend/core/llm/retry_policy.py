@@ -0,0 +1,268 @@
+# core/llm/retry_policy.py
+"""
+Politique de retry unifiée et budgets partagés (nœud, run).
+
+Sans coordination, les retries se multiplient d'une couche à l'autre:
+``NODE_MAX_RETRIES`` (exécuteur) x ``OPENAI_MAX_RETRIES`` (provider) x
+``fallback_order`` x boucles de réparation du manager/superviseur x
+réallocation ``_alt``. Chaque couche garde son propre plafond d'essais, mais
+tout nouvel essai est désormais prélevé sur un budget commun:
+
+- ``RetryBudget`` par nœud (nombre de retries et temps total), chaîné au
+  budget du run: un retry n'est accordé que si les deux budgets le permettent;
+- ``RetryPolicy``: backoff exponentiel à « full jitter » (pas de vagues
+  synchronisées), ``Retry-After`` respecté s'il est plus long.
+
+Le budget courant est porté par un ``ContextVar`` (comme la trace du run):
+provider, runner LLM et agents le consultent via ``allow_retry`` sans
+paramètre supplémentaire. Hors budget (appel isolé), les retries ne sont
+limités que par les plafonds de chaque couche.
+
+Variables d'environnement:
+- RETRY_BASE_MS / RETRY_MAX_MS / RETRY_FACTOR : backoff (défauts 200 / 10000 / 2)
+- RETRY_JITTER            : 1 (défaut) full jitter / 0 backoff déterministe
+- NODE_RETRY_BUDGET       : retries max par nœud, toutes couches (défaut 6)
+- NODE_RETRY_TIME_S       : temps max d'un nœud au-delà duquel on ne relance plus (défaut 300)
+- RUN_RETRY_BUDGET        : retries max par run (défaut 30, 0 = illimité)
+- RUN_RETRY_TIME_S        : idem pour le run (défaut 0 = illimité)
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.telemetry.metrics import get_retries_total, metrics_enabled
+
+log = logging.getLogger("crew.retry")
+
+_current: contextvars.ContextVar[Optional["RetryBudget"]] = contextvars.ContextVar("retry_budget", default=None)
+
+
+def _env_float(name: str, default: float, minimum: float = 0.0) -> float:
+    try:
+        raw = os.getenv(name, "")
+        return max(minimum, float(raw.strip())) if raw.strip() else default
+    except Exception:
+        return default
+
+
+@dataclass
+class RetryPolicy:
+    base_s: float = 0.2
+    max_s: float = 10.0
+    factor: float = 2.0
+    jitter: bool = True
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            base_s=_env_float("RETRY_BASE_MS", 200.0) / 1000.0,
+            max_s=_env_float("RETRY_MAX_MS", 10000.0) / 1000.0,
+            factor=_env_float("RETRY_FACTOR", 2.0, 1.0),
+            jitter=os.getenv("RETRY_JITTER", "1") != "0",
+        )
+
+    def backoff_s(
+        self, attempt: int, retry_after_s: Optional[float] = None, base_s: Optional[float] = None
+    ) -> float:
+        """Attente avant l'essai ``attempt + 1`` (``attempt`` >= 1); ``base_s`` surcharge la base."""
+        base = self.base_s if base_s is None else base_s
+        cap = min(self.max_s, base * (self.factor ** max(0, attempt - 1)))
+        wait = random.uniform(0, cap) if self.jitter else cap
+        if retry_after_s is not None:
+            wait = max(wait, float(retry_after_s))
+        return wait
+
+
+class RetryBudget:
+    """Retries et temps alloués à une portée (nœud, run); ``parent`` est aussi débité."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_retries: Optional[int] = None,
+        max_time_s: Optional[float] = None,
+        parent: Optional["RetryBudget"] = None,
+        clock=time.monotonic,
+    ) -> None:
+        self.name = name
+        self.max_retries = max_retries  # None/0 = illimité
+        self.max_time_s = max_time_s
+        self.parent = parent
+        self.clock = clock
+        self.started = clock()
+        self.retries = 0
+        self.by_layer: Dict[str, int] = {}
+        self.history: List[Dict[str, Any]] = []
+        self.exhausted: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_run(cls, run_id: str) -> "RetryBudget":
+        return cls(
+            f"run:{run_id}",
+            max_retries=int(_env_float("RUN_RETRY_BUDGET", 30)),
+            max_time_s=_env_float("RUN_RETRY_TIME_S", 0.0),
+        )
+
+    @classmethod
+    def for_node(cls, node_key: str, parent: Optional["RetryBudget"] = None) -> "RetryBudget":
+        return cls(
+            f"node:{node_key}",
+            max_retries=int(_env_float("NODE_RETRY_BUDGET", 6)),
+            max_time_s=_env_float("NODE_RETRY_TIME_S", 300.0),
+            parent=parent,
+        )
+
+    def elapsed_s(self) -> float:
+        return self.clock() - self.started
+
+    def remaining_s(self) -> Optional[float]:
+        own = None if not self.max_time_s else max(0.0, self.max_time_s - self.elapsed_s())
+        up = self.parent.remaining_s() if self.parent else None
+        if own is None:
+            return up
+        return own if up is None else min(own, up)
+
+    def _denial(self, wait_s: float) -> Optional[str]:
+        if self.max_retries and self.retries >= self.max_retries:
+            return "retries"
+        if self.max_time_s and self.elapsed_s() + wait_s > self.max_time_s:
+            return "time"
+        return None
+
+    def try_consume(self, layer: str, wait_s: float = 0.0, reason: Optional[str] = None) -> bool:
+        """Accorde un retry (attente ``wait_s`` comprise) si cette portée et ses parents le permettent."""
+        chain = []
+        node: Optional[RetryBudget] = self
+        while node is not None:
+            chain.append(node)
+            node = node.parent
+        for b in chain:
+            with b._lock:
+                denial = b._denial(wait_s)
+            if denial:
+                self._mark_exhausted(layer, denial, b.name, reason)
+                return False
+        for b in chain:
+            with b._lock:
+                b.retries += 1
+                b.by_layer[layer] = b.by_layer.get(layer, 0) + 1
+                if len(b.history) < 100:
+                    b.history.append(
+                        {"layer": layer, "wait_s": round(wait_s, 3), "at_s": round(b.elapsed_s(), 3), "reason": reason}
+                    )
+        return True
+
+    def _mark_exhausted(self, layer: str, kind: str, scope: str, reason: Optional[str]) -> None:
+        with self._lock:
+            if self.exhausted is None:
+                self.exhausted = {"layer": layer, "kind": kind, "scope": scope, "reason": reason}
+        log.warning("retry budget exhausted scope=%s kind=%s layer=%s reason=%s", scope, kind, layer, reason)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "scope": self.name,
+                "retries": self.retries,
+                "by_layer": dict(self.by_layer),
+                "max_retries": self.max_retries or None,
+                "max_time_s": self.max_time_s or None,
+                "elapsed_s": round(self.elapsed_s(), 3),
+                "exhausted": dict(self.exhausted) if self.exhausted else None,
+            }
+
+
+def current_budget() -> Optional[RetryBudget]:
+    return _current.get()
+
+
+@contextmanager
+def retry_scope(budget: Optional[RetryBudget]) -> Iterator[Optional[RetryBudget]]:
+    """Rend ``budget`` courant pour le bloc (tâches asyncio filles comprises)."""
+    token = _current.set(budget)
+    try:
+        yield budget
+    finally:
+        _current.reset(token)
+
+
+_policy: Optional[RetryPolicy] = None
+
+
+def get_policy() -> RetryPolicy:
+    global _policy
+    if _policy is None:
+        _policy = RetryPolicy.from_env()
+    return _policy
+
+
+def set_policy(policy: Optional[RetryPolicy]) -> None:
+    global _policy
+    _policy = policy
+
+
+def reset_policy() -> None:
+    """Relit RETRY_* au prochain ``get_policy`` (tests)."""
+    set_policy(None)
+
+
+def _count(layer: str, granted: bool) -> None:
+    if metrics_enabled():
+        try:
+            get_retries_total().labels(layer, "granted" if granted else "denied").inc()
+        except Exception:
+            pass
+
+
+def consume(layer: str, reason: Optional[str] = None, wait_s: float = 0.0) -> bool:
+    """Débite un retry sans backoff (fallback, réallocation, réparation); True hors budget."""
+    budget = _current.get()
+    granted = budget is None or budget.try_consume(layer, wait_s, reason)
+    _count(layer, granted)
+    return granted
+
+
+def plan_retry(
+    layer: str,
+    attempt: int,
+    *,
+    retry_after_s: Optional[float] = None,
+    reason: Optional[str] = None,
+    base_s: Optional[float] = None,
+) -> Optional[float]:
+    """Attente avant le prochain essai, ou None si le budget courant le refuse (sans dormir)."""
+    wait = get_policy().backoff_s(attempt, retry_after_s, base_s)
+    budget = _current.get()
+    if budget is not None and retry_after_s is None:
+        remaining = budget.remaining_s()
+        if remaining is not None and wait > remaining:
+            wait = remaining  # jitter tronqué à ce qui reste
+    return wait if consume(layer, reason, wait) else None
+
+
+async def allow_retry(
+    layer: str,
+    attempt: int,
+    *,
+    retry_after_s: Optional[float] = None,
+    reason: Optional[str] = None,
+    base_s: Optional[float] = None,
+    sleep: bool = True,
+) -> bool:
+    """Débite le budget courant puis attend le backoff; False = abandonner."""
+    wait = plan_retry(layer, attempt, retry_after_s=retry_after_s, reason=reason, base_s=base_s)
+    if wait is None:
+        return False
+    if sleep and wait > 0:
+        await asyncio.sleep(wait)
+    return True
@@ -0,0 +1,329 @@
+# core/llm/routing.py
+"""
+Routage des modèles d'un rôle selon des statistiques glissantes.
+
+La matrice agents/modèles (``AgentModelsMatrix.models``) liste des entrées
+``preferred`` puis ``fallbacks`` (``{"provider": ..., "model": ...,
+"cost_per_1k_tokens"?: ...}`` ou ``"provider:model"``). Le recruteur les
+conserve sur l'``AgentSpec``; à chaque appel, ``route`` choisit parmi elles
+selon l'objectif courant et les statistiques observées par ``run_llm``
+(latences p50/p95, taux d'erreur, coût par token, appels en cours).
+
+Objectifs (``goal_scope`` par run via ``options.llm.routing``, sinon ROUTING_GOAL):
+- ``preferred`` (défaut): ``preferred[0]``, comportement historique, pas de routage
+- ``fastest``  : p50 le plus bas
+- ``cheapest`` : coût par token le plus bas (observé, sinon ``cost_per_1k_tokens``)
+- ``p95<X``    : p95 <= X secondes; parmi les candidats conformes, le moins
+  chargé puis le moins cher (les nœuds d'un fan-out s'étalent sur les modèles)
+
+Candidats écartés: circuit ouvert, taux d'erreur > ROUTING_MAX_ERROR_RATE.
+Un candidat a des statistiques quand il compte ROUTING_MIN_SAMPLES appels;
+sans historique il passe après les candidats mesurés conformes, et est
+exploré avec la probabilité ROUTING_EXPLORE_RATIO.
+
+Variables d'environnement:
+- ROUTING_GOAL            : objectif par défaut (défaut "preferred")
+- ROUTING_WINDOW          : appels conservés par provider/modèle (défaut 200)
+- ROUTING_MIN_SAMPLES     : appels avant d'utiliser les statistiques (défaut 5)
+- ROUTING_MAX_ERROR_RATE  : taux d'erreur au-delà duquel on écarte (défaut 0.5)
+- ROUTING_EXPLORE_RATIO   : part d'appels vers un candidat non mesuré (défaut 0.05)
+"""
+from __future__ import annotations
+
+import contextvars
+import math
+import os
+import random
+import re
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from core.llm import circuit_breaker
+from core.planning import deadline
+from core.telemetry.metrics import get_llm_routing_decisions_total, metrics_enabled
+
+PREFERRED = "preferred"
+FASTEST = "fastest"
+CHEAPEST = "cheapest"
+
+_SLO_RE = re.compile(r"^p95\s*<=?\s*(\d+(?:\.\d+)?)\s*s?$")
+
+_goal: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("routing_goal", default=None)
+
+
+def _env_float(name: str, default: float, minimum: float = 0.0) -> float:
+    try:
+        raw = os.getenv(name, "")
+        return max(minimum, float(raw.strip())) if raw.strip() else default
+    except Exception:
+        return default
+
+
+# ---- Objectifs ------------------------------------------------------------------
+
+
+def parse_goal(goal: Optional[str]) -> Tuple[str, Optional[float]]:
+    """``"p95<8"`` -> ("p95", 8.0); ``"fastest"`` -> ("fastest", None). ValueError si inconnu."""
+    raw = (goal or PREFERRED).strip().lower()
+    if raw in (PREFERRED, FASTEST, CHEAPEST):
+        return raw, None
+    m = _SLO_RE.match(raw)
+    if m:
+        return "p95", float(m.group(1))
+    raise ValueError(f"objectif de routage inconnu: {goal!r} (preferred, fastest, cheapest, p95<X)")
+
+
+def current_goal() -> str:
+    goal = _goal.get() or os.getenv("ROUTING_GOAL") or PREFERRED
+    try:
+        parse_goal(goal)
+    except ValueError:
+        return PREFERRED
+    return goal.strip().lower()
+
+
+def effective_goal() -> str:
+    """Objectif appliqué à l'appel: ``fastest`` dès que la marge de l'échéance du run est entamée."""
+    return FASTEST if deadline.under_pressure() else current_goal()
+
+
+@contextmanager
+def goal_scope(goal: Optional[str]) -> Iterator[None]:
+    """Objectif de routage du bloc (run); None = objectif par défaut."""
+    token = _goal.set(goal)
+    try:
+        yield
+    finally:
+        _goal.reset(token)
+
+
+# ---- Candidats ------------------------------------------------------------------
+
+
+def candidates_from_models(models: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Entrées ``preferred`` puis ``fallbacks`` de la matrice, dédoublonnées."""
+    out: List[Dict[str, Any]] = []
+    seen = set()
+    if not isinstance(models, dict):
+        return out
+    for source in ("preferred", "fallbacks"):
+        for entry in models.get(source) or []:
+            if isinstance(entry, dict):
+                provider, model = entry.get("provider"), entry.get("model")
+                cost = entry.get("cost_per_1k_tokens")
+            elif isinstance(entry, str) and ":" in entry:
+                (provider, model), cost = entry.split(":", 1), None
+            else:
+                continue
+            if not provider or not model or (provider, model) in seen:
+                continue
+            seen.add((provider, model))
+            cand: Dict[str, Any] = {"provider": str(provider), "model": str(model), "source": source}
+            if cost is not None:
+                try:
+                    cand["cost_per_1k_tokens"] = float(cost)
+                except (TypeError, ValueError):
+                    pass
+            out.append(cand)
+    return out
+
+
+# ---- Statistiques glissantes ----------------------------------------------------
+
+
+class ModelStats:
+    """Latences, issues, coût et appels en cours d'un provider/modèle."""
+
+    def __init__(self, window: int) -> None:
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.cost_usd = 0.0
+        self.cost_tokens = 0.0
+        self.inflight = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        values = sorted(self.latencies)
+        if not values:
+            return None
+        return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+    def error_rate(self) -> Optional[float]:
+        if not self.outcomes:
+            return None
+        return 1.0 - sum(self.outcomes) / len(self.outcomes)
+
+    def cost_per_1k(self) -> Optional[float]:
+        return self.cost_usd / self.cost_tokens * 1000.0 if self.cost_tokens else None
+
+
+class RoutingStats:
+    def __init__(self, window: Optional[int] = None) -> None:
+        self.window = window or int(_env_float("ROUTING_WINDOW", 200, 1))
+        self._stats: Dict[Tuple[str, str], ModelStats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, provider: str, model: str) -> ModelStats:
+        key = (provider, model)
+        st = self._stats.get(key)
+        if st is None:
+            st = self._stats[key] = ModelStats(self.window)
+        return st
+
+    def begin(self, provider: str, model: str) -> None:
+        with self._lock:
+            self._get(provider, model).inflight += 1
+
+    def end(
+        self,
+        provider: str,
+        model: str,
+        ok: Optional[bool],
+        *,
+        latency_ms: Optional[float] = None,
+        tokens: Optional[float] = None,
+        cost_usd: Optional[float] = None,
+    ) -> None:
+        """``ok`` None = issue neutre (annulation, 429): seul le compteur en cours bouge."""
+        with self._lock:
+            st = self._get(provider, model)
+            st.inflight = max(0, st.inflight - 1)
+            if ok is None:
+                return
+            st.outcomes.append(bool(ok))
+            if ok and latency_ms is not None:
+                st.latencies.append(float(latency_ms))
+            # Coût rapporté par le provider, ramené aux tokens de l'appel
+            if ok and tokens and cost_usd is not None:
+                st.cost_tokens += float(tokens)
+                st.cost_usd += float(cost_usd or 0.0)
+
+    def view(self, provider: str, model: str) -> Dict[str, Any]:
+        with self._lock:
+            st = self._stats.get((provider, model))
+            if st is None:
+                return {"samples": 0, "inflight": 0}
+            return {
+                "samples": len(st.outcomes),
+                "p50_ms": st.quantile(0.5),
+                "p95_ms": st.quantile(0.95),
+                "error_rate": st.error_rate(),
+                "cost_per_1k": st.cost_per_1k(),
+                "inflight": st.inflight,
+            }
+
+
+_stats: Optional[RoutingStats] = None
+_stats_lock = threading.Lock()
+
+
+def get_stats() -> RoutingStats:
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = RoutingStats()
+        return _stats
+
+
+def reset_routing() -> None:
+    global _stats
+    with _stats_lock:
+        _stats = None
+
+
+# ---- Décision -------------------------------------------------------------------
+
+
+@dataclass
+class RoutingDecision:
+    provider: str
+    model: str
+    goal: str
+    reason: str
+    candidates: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _rank_key(kind: str, slo_s: Optional[float]):
+    def key(c: Dict[str, Any]):
+        cost = c.get("cost_per_1k")
+        cost = math.inf if cost is None else cost
+        if kind == FASTEST:
+            return (c["p50_ms"] if c.get("p50_ms") is not None else math.inf,)
+        if kind == CHEAPEST:
+            return (cost, c.get("p50_ms") or math.inf)
+        return (c["inflight"], cost, c["p95_ms"])
+
+    return key
+
+
+def route(
+    candidates: List[Dict[str, Any]],
+    *,
+    role: Optional[str] = None,
+    goal: Optional[str] = None,
+    stats: Optional[RoutingStats] = None,
+    rng: Optional[random.Random] = None,
+) -> Optional[RoutingDecision]:
+    """Choisit un provider/modèle; None si l'objectif est ``preferred`` ou sans alternative."""
+    goal = (goal or current_goal()).strip().lower()
+    kind, slo_s = parse_goal(goal)
+    if kind == PREFERRED or len(candidates) < 2:
+        return None
+    stats = stats or get_stats()
+    min_samples = int(_env_float("ROUTING_MIN_SAMPLES", 5, 1))
+    max_error = _env_float("ROUTING_MAX_ERROR_RATE", 0.5)
+
+    views: List[Dict[str, Any]] = []
+    for c in candidates:
+        v = {**c, **stats.view(c["provider"], c["model"])}
+        if v.get("cost_per_1k") is None and c.get("cost_per_1k_tokens") is not None:
+            v["cost_per_1k"] = c["cost_per_1k_tokens"]
+        v["measured"] = v["samples"] >= min_samples
+        v["available"] = circuit_breaker.is_available(c["provider"], c["model"])
+        v["eligible"] = v["available"] and not (v["measured"] and (v.get("error_rate") or 0.0) > max_error)
+        if kind == "p95" and v["eligible"] and v["measured"]:
+            v["eligible"] = v["p95_ms"] is not None and v["p95_ms"] <= slo_s * 1000.0
+        views.append(v)
+
+    pool = [v for v in views if v["available"]] or views
+    measured_ok = [v for v in pool if v["eligible"] and v["measured"]]
+    if kind == CHEAPEST:
+        # Le coût peut être connu sans historique (cost_per_1k_tokens de la matrice)
+        measured_ok = [v for v in pool if v["eligible"] and v.get("cost_per_1k") is not None]
+    unmeasured = [v for v in pool if v["eligible"] and all(v is not m for m in measured_ok)]
+
+    rng = rng or random
+    if unmeasured and (not measured_ok or rng.random() < _env_float("ROUTING_EXPLORE_RATIO", 0.05)):
+        chosen, reason = unmeasured[0], "explore"
+    elif measured_ok:
+        chosen, reason = sorted(measured_ok, key=_rank_key(kind, slo_s))[0], kind
+    else:
+        # Aucun candidat conforme: le plus rapide mesuré, sinon l'ordre de la matrice
+        measured = [v for v in pool if v["measured"] and v.get("p50_ms") is not None]
+        chosen = sorted(measured, key=_rank_key(FASTEST, None))[0] if measured else pool[0]
+        reason = "no_candidate_meets_goal"
+
+    decision = RoutingDecision(
+        provider=chosen["provider"],
+        model=chosen["model"],
+        goal=goal,
+        reason=reason,
+        candidates=[
+            {
+                k: (round(v[k], 4) if isinstance(v.get(k), float) else v.get(k))
+                for k in ("provider", "model", "source", "samples", "p50_ms", "p95_ms", "error_rate", "cost_per_1k", "inflight", "eligible")
+            }
+            for v in views
+        ],
+    )
+    if metrics_enabled():
+        try:
+            get_llm_routing_decisions_total().labels(role or "unknown", decision.provider, decision.model, kind).inc()
+        except Exception:
+            pass
+    return decision
@@ -1,23 +1,39 @@
 # core/llm/runner.py
 from __future__ import annotations
 
+import asyncio
 import os
 import logging
 import time
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from core.llm.providers.base import (
     LLMRequest,
     LLMResponse,
+    OutputDiverged,
+    ProviderRateLimited,
     ProviderTimeout,
     ProviderUnavailable,
+    usage_dict,
 )
 from core.llm.providers.ollama import OllamaProvider
+from core.llm import circuit_breaker, hedging, rate_limiter, retry_policy, routing
+from core.llm.registry import registry
+from core.planning import deadline
+from core.planning.deadline import DeadlineExceeded
 from core.telemetry.metrics import (
     metrics_enabled,
     get_llm_tokens_total,
     get_llm_cost_total,
+    get_llm_hedges_total,
+    get_llm_tokens_per_second,
+    get_llm_model_load_seconds,
+    get_llm_request_duration_seconds,
+    get_llm_time_to_first_token_seconds,
+    get_llm_prompt_tokens,
+    get_llm_queue_wait_seconds,
 )
+from core.telemetry.tracing import span
 
 log = logging.getLogger("crew.llm")
 
@@ -31,6 +47,12 @@ def _provider_factory(name: str):
         except Exception as e:
             raise ProviderUnavailable(f"OpenAI provider unavailable: {e}")
         return OpenAIProvider()
+    # Providers déclarés dans le registry (fake, replay): import paresseux = enregistrement
+    import core.llm.providers.fake  # noqa: F401
+    import core.llm.providers.replay  # noqa: F401
+    provider = registry.create(name)
+    if provider is not None:
+        return provider
     raise ProviderUnavailable(f"Unknown provider: {name}")
 
 def _unique(seq):
@@ -46,16 +68,114 @@ def _model_for_provider(current_provider: str, primary_provider: str, current_mo
     env = f"{current_provider.upper()}_FALLBACK_MODEL"
     return os.getenv(env, current_model)
 
-async def run_llm(req: LLMRequest, *, primary: Optional[str] = None, fallback_order: Optional[List[str]] = None) -> LLMResponse:
-    order: List[str] = list(_unique(fallback_order or [primary or (req.provider or 'ollama')]))
-    last_err: Exception | None = None
+def _usage_total(usage) -> Optional[float]:
+    usage = usage_dict(usage)
+    try:
+        total = usage.get("total_tokens")
+        if total is None:
+            total = int(usage.get("prompt_tokens") or 0) + int(usage.get("completion_tokens") or 0)
+        return float(total) or None
+    except Exception:
+        return None
 
-    for name in order:
-        try:
-            provider = _provider_factory(name)
-            model = _model_for_provider(name, order[0], req.model)
-            start = time.perf_counter()
-            out = await provider.generate(LLMRequest(
+
+def _cost_usd(out: LLMResponse) -> Optional[float]:
+    if not (out.raw and isinstance(out.raw, dict)):
+        return None
+    raw_usage = usage_dict(out.raw.get("usage"))
+    cost = out.raw.get("cost_usd") or raw_usage.get("cost_usd") or out.raw.get("cost") or out.raw.get("price_usd")
+    try:
+        return float(cost) if cost is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _record_usage(out: LLMResponse, model: str) -> None:
+    if not metrics_enabled():
+        return
+    provider_label = out.provider or "unknown"
+    model_label = out.model_used or model or "unknown"
+    usage = out.usage if isinstance(out.usage, dict) else {}
+    prompt_tokens = usage.get("prompt_tokens")
+    completion_tokens = usage.get("completion_tokens")
+    try:
+        prompt_tokens = int(prompt_tokens) if prompt_tokens is not None else 0
+    except Exception:
+        prompt_tokens = 0
+    try:
+        completion_tokens = int(completion_tokens) if completion_tokens is not None else 0
+    except Exception:
+        completion_tokens = 0
+    get_llm_tokens_total().labels("prompt", provider_label, model_label).inc(
+        prompt_tokens or 0
+    )
+    get_llm_tokens_total().labels("completion", provider_label, model_label).inc(
+        completion_tokens or 0
+    )
+    # Timing natif (Ollama): chargement du modèle
+    try:
+        if usage.get("load_ms") is not None:
+            get_llm_model_load_seconds().labels(provider_label, model_label).observe(float(usage["load_ms"]) / 1000.0)
+    except Exception:
+        pass
+    cost_usd = _cost_usd(out)
+    try:
+        if cost_usd is not None:
+            get_llm_cost_total().labels(provider_label, model_label).inc(
+                float(cost_usd)
+            )
+    except Exception:
+        pass
+
+
+def _observe_call(out: LLMResponse, req: LLMRequest, queue_s: float) -> None:
+    """Histogrammes par provider/modèle/rôle résolus: durée, TTFT, tokens/s, prompt, attente."""
+    if not metrics_enabled():
+        return
+    labels = (out.provider or "unknown", out.model_used or "unknown", req.role or "unknown")
+    usage = out.usage if isinstance(out.usage, dict) else {}
+    try:
+        duration_s = (out.latency_ms or 0) / 1000.0
+        get_llm_request_duration_seconds().labels(*labels).observe(duration_s)
+        get_llm_queue_wait_seconds().labels(*labels).observe(max(0.0, queue_s))
+        ttft_ms = usage.get("ttft_ms")
+        if ttft_ms is None and isinstance(out.raw, dict):
+            ttft_ms = out.raw.get("ttft_ms")
+        if ttft_ms is not None:
+            get_llm_time_to_first_token_seconds().labels(*labels).observe(float(ttft_ms) / 1000.0)
+        tps = usage.get("tokens_per_s")
+        if not tps and usage.get("completion_tokens"):
+            # Sans timing natif: génération ≈ durée de l'appel moins le TTFT connu
+            gen_s = duration_s - (float(ttft_ms) / 1000.0 if ttft_ms is not None else 0.0)
+            tps = float(usage["completion_tokens"]) / gen_s if gen_s > 0 else None
+        if tps:
+            get_llm_tokens_per_second().labels(*labels).observe(float(tps))
+        prompt_tokens = usage.get("prompt_tokens")
+        if prompt_tokens is None:
+            prompt_tokens = rate_limiter.estimate_tokens(req.system, req.prompt, 0)
+        get_llm_prompt_tokens().labels(*labels).observe(float(prompt_tokens))
+    except Exception:
+        pass
+
+
+async def _call_provider(req: LLMRequest, name: str, model: str, *, hedge: bool = False) -> LLMResponse:
+    """Une tentative sur ``name``/``model``; verdict consigné dans le disjoncteur."""
+    lease = None
+    queued = time.perf_counter()
+    stats = routing.get_stats()
+    stats.begin(name, model)
+    try:
+        provider = _provider_factory(name)
+        if rate_limiter.limiter_enabled():
+            limiter = rate_limiter.get_limiter(name, model)
+            with span("rate_limit_wait", cat="llm", provider=name, model=model):
+                lease = await limiter.acquire(
+                    rate_limiter.estimate_tokens(req.system, req.prompt, req.max_tokens)
+                )
+        start = time.perf_counter()
+        with span("llm", cat="llm", provider=name, model=model, hedge=hedge or None):
+            # Timeout du rôle réduit au temps restant du nœud/run (échéance)
+            out = await deadline.within_deadline(provider.generate(LLMRequest(
                 system=req.system,
                 prompt=req.prompt,
                 model=model,
@@ -63,64 +183,173 @@ async def run_llm(req: LLMRequest, *, primary: Optional[str] = None, fallback_or
                 temperature=req.temperature,
                 max_tokens=req.max_tokens,
                 stop=req.stop,
-                timeout_s=req.timeout_s,
-            ))
-            dur_ms = int((time.perf_counter() - start) * 1000)
-            out.provider = name
-            out.model_used = model
-            out.latency_ms = dur_ms
-            if out.raw and isinstance(out.raw, dict):
-                out.usage = out.raw.get("usage") or out.raw.get("token_usage") or out.usage
-            if metrics_enabled():
-                provider_label = out.provider or "unknown"
-                model_label = out.model_used or model or "unknown"
-                usage = out.usage if isinstance(out.usage, dict) else {}
-                prompt_tokens = usage.get("prompt_tokens")
-                completion_tokens = usage.get("completion_tokens")
-                try:
-                    prompt_tokens = int(prompt_tokens) if prompt_tokens is not None else 0
-                except Exception:
-                    prompt_tokens = 0
+                timeout_s=deadline.clamp_timeout(req.timeout_s),
+                role=req.role,
+                response_format=req.response_format,
+                stream=req.stream,
+            )))
+    except (asyncio.CancelledError, DeadlineExceeded, OutputDiverged):
+        # Perdant d'un hedge, échéance atteinte ou sortie structurée interrompue: pas de verdict
+        circuit_breaker.release(name, model)
+        stats.end(name, model, None)
+        if lease is not None:
+            lease.release("cancelled")
+        raise
+    except Exception as e:
+        circuit_breaker.record_failure(name, model, e)
+        stats.end(name, model, None if isinstance(e, ProviderRateLimited) else False)
+        if lease is not None:
+            if isinstance(e, ProviderRateLimited):
+                lease.release("rate_limited", retry_after_s=e.retry_after_s, headers=e.headers)
+            else:
+                lease.release("error")
+        raise
+    dur_ms = int((time.perf_counter() - start) * 1000)
+    out.provider = name
+    out.model_used = model
+    out.latency_ms = dur_ms
+    if out.raw and isinstance(out.raw, dict):
+        out.usage = out.raw.get("usage") or out.raw.get("token_usage") or out.usage
+    # Métriques (tokens/s, prompt) et quotas lisent un dict, quel que soit le SDK
+    out.usage = usage_dict(out.usage)
+    if lease is not None:
+        lease.release("ok", headers=(out.raw or {}).get("rate_limit"), tokens_used=_usage_total(out.usage))
+    circuit_breaker.record_success(name, model)
+    hedging.get_tracker().observe(name, model, dur_ms)
+    stats.end(name, model, True, latency_ms=dur_ms, tokens=_usage_total(out.usage), cost_usd=_cost_usd(out))
+    _observe_call(out, req, start - queued)
+    return out
+
+
+async def _call_hedged(
+    req: LLMRequest, name: str, model: str, targets: List[str], primary: str, tried: set
+) -> LLMResponse:
+    """Principal, puis hedge sur la 1re alternative passante si pas de réponse après le délai."""
+    if metrics_enabled():
+        get_llm_hedges_total().labels(name, model, "eligible").inc()
+    first = asyncio.create_task(_call_provider(req, name, model))
+    delay = hedging.hedge_delay_s(name, model, req.timeout_s)
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return first.result()
+
+    hedge_name = hedge_model = None
+    for cand in targets:
+        cand_model = _model_for_provider(cand, primary, req.model)
+        if cand in tried and cand != name:
+            continue
+        if circuit_breaker.acquire(cand, cand_model):
+            hedge_name, hedge_model = cand, cand_model
+            break
+    if hedge_name is None:
+        return await first
+    if not hedging.get_budget().try_spend():
+        circuit_breaker.release(hedge_name, hedge_model)
+        if metrics_enabled():
+            get_llm_hedges_total().labels(name, model, "budget_exhausted").inc()
+        return await first
+
+    tried.add(hedge_name)
+    if metrics_enabled():
+        get_llm_hedges_total().labels(name, model, "fired").inc()
+    log.info(
+        "llm.hedge provider=%s model=%s after_ms=%s -> provider=%s model=%s",
+        name, model, int(delay * 1000), hedge_name, hedge_model,
+    )
+    second = asyncio.create_task(_call_provider(req, hedge_name, hedge_model, hedge=True))
+    pending = {first, second}
+    errors: Dict[asyncio.Task, BaseException] = {}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if metrics_enabled():
+                        result = "won" if task is second else "lost"
+                        get_llm_hedges_total().labels(name, model, result).inc()
+                    return task.result()
+                errors[task] = task.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    # Les deux ont échoué: on remonte l'erreur du principal
+    raise errors.get(first) or errors[second]
+
+
+async def run_llm(req: LLMRequest, *, primary: Optional[str] = None, fallback_order: Optional[List[str]] = None) -> LLMResponse:
+    order: List[str] = list(_unique(fallback_order or [primary or (req.provider or 'ollama')]))
+    last_err: Exception | None = None
+    # Streaming validé: un seul flux à la fois vers le validateur, pas de hedge
+    hedge = hedging.hedging_enabled(req.role) and req.stream is None
+    if hedge:
+        hedging.get_budget().deposit()
+    tried: set = set()
+    failed = False
+
+    for idx, name in enumerate(order):
+        if name in tried:
+            continue
+        tried.add(name)
+        model = _model_for_provider(name, order[0], req.model)
+        # Échéance du run atteinte: ni appel ni bascule
+        if deadline.expired():
+            last_err = DeadlineExceeded(f"échéance du run dépassée avant {name}:{model}")
+            break
+        # Bascule après un échec réel = un retry, prélevé sur le budget du nœud/run
+        if failed and not retry_policy.consume("fallback", reason=f"{name}:{model}"):
+            log.warning("llm.retry_budget_exhausted provider=%s model=%s", name, model)
+            break
+        # Circuit ouvert: provider/modèle sauté sans payer timeout ni erreur de connexion
+        if not circuit_breaker.acquire(name, model):
+            last_err = ProviderUnavailable(f"circuit open: {name}:{model}")
+            log.info("llm.circuit_open provider=%s model=%s skipped", name, model)
+            continue
+        targets = hedging.hedge_targets(order, idx) if hedge else []
+        try:
+            # 429: nouvel essai sur le même provider; le limiteur fait respecter Retry-After
+            rl_retries = rate_limiter.max_retries() if rate_limiter.limiter_enabled() else 0
+            for rl_attempt in range(rl_retries + 1):
                 try:
-                    completion_tokens = int(completion_tokens) if completion_tokens is not None else 0
-                except Exception:
-                    completion_tokens = 0
-                get_llm_tokens_total().labels("prompt", provider_label, model_label).inc(
-                    prompt_tokens or 0
-                )
-                get_llm_tokens_total().labels("completion", provider_label, model_label).inc(
-                    completion_tokens or 0
-                )
-                cost_usd = None
-                if out.raw and isinstance(out.raw, dict):
-                    raw_usage = out.raw.get("usage") or {}
-                    cost_usd = (
-                        out.raw.get("cost_usd")
-                        or raw_usage.get("cost_usd")
-                        or out.raw.get("cost")
-                        or out.raw.get("price_usd")
+                    if targets:
+                        out = await _call_hedged(req, name, model, targets, order[0], tried)
+                    else:
+                        out = await _call_provider(req, name, model)
+                    break
+                except ProviderRateLimited as e:
+                    if rl_attempt >= rl_retries or not retry_policy.consume(
+                        "rate_limit", reason=f"{name}:{model}", wait_s=e.retry_after_s or 0.0
+                    ):
+                        raise
+                    log.info(
+                        "llm.rate_limited provider=%s model=%s retry=%s retry_after_s=%s",
+                        name, model, rl_attempt + 1, e.retry_after_s,
                     )
-                try:
-                    if cost_usd is not None:
-                        get_llm_cost_total().labels(provider_label, model_label).inc(
-                            float(cost_usd)
-                        )
-                except Exception:
-                    pass
+            _record_usage(out, model)
             return out
-        except ProviderTimeout as e:
+        except DeadlineExceeded as e:
             last_err = e
-            log.warning("llm.timeout provider=%s model=%s err=%s", name, _model_for_provider(name, order[0], req.model), repr(e))
+            break
+        except OutputDiverged:
+            # Le modèle diverge du schéma: à l'appelant de corriger le prompt
+            raise
+        except ProviderTimeout as e:
+            last_err, failed = e, True
+            log.warning("llm.timeout provider=%s model=%s err=%s", name, model, repr(e))
             continue
         except ProviderUnavailable as e:
-            last_err = e
-            log.warning("llm.unavailable provider=%s model=%s err=%s", name, _model_for_provider(name, order[0], req.model), repr(e))
+            last_err, failed = e, True
+            log.warning("llm.unavailable provider=%s model=%s err=%s", name, model, repr(e))
             continue
         except Exception as e:
-            last_err = e
-            log.error("llm.error provider=%s model=%s err=%s", name, _model_for_provider(name, order[0], req.model), repr(e))
+            last_err, failed = e, True
+            log.error("llm.error provider=%s model=%s err=%s", name, model, repr(e))
             continue
 
+    if isinstance(last_err, DeadlineExceeded):
+        log.warning("llm.deadline_exceeded attempts=%s", order)
+        raise last_err
     log.error("llm.exhausted attempts=%s last_err=%s", order, repr(last_err))
     # Permettre un fonctionnement hors-ligne pendant les tests en renvoyant
     # une réponse factice si aucun provider n'est disponible. Pour les usages
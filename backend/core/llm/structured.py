@@ -0,0 +1,419 @@
+# core/llm/structured.py
+"""
+Sorties JSON structurées (superviseur, manager).
+
+- ``response_format``: format demandé au provider selon STRUCTURED_OUTPUT
+  (``schema``: OpenAI ``json_schema`` / Ollama ``format`` = schéma du modèle;
+  ``json``: OpenAI ``json_object`` / Ollama ``format: "json"``; ``off``).
+- ``JSONStreamValidator``: reçoit le texte au fil du streaming, suit la
+  structure JSON et la confronte au schéma du modèle pydantic (clé inconnue
+  d'un objet ``extra="forbid"``, type de valeur, clé requise absente). Une
+  divergence lève ``OutputDiverged``: l'appel est interrompu sans attendre la
+  fin de la génération. Les défauts de syntaxe réparables ne l'interrompent pas.
+- ``repair_json``: corrige localement les défauts courants (fences Markdown,
+  texte autour du JSON, virgules finales, commentaires, guillemets simples,
+  clés non quotées, True/False/None, sortie tronquée) avant de payer un
+  nouvel appel.
+- ``parse_structured``: validation directe, puis après réparation.
+
+Variables d'environnement:
+- STRUCTURED_OUTPUT : schema | json | off (défaut schema)
+- STRUCTURED_STREAM : 1 pour streamer et valider au fil de l'eau (défaut 1)
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from core.llm.providers.base import OutputDiverged
+from core.telemetry.metrics import get_structured_output_total, metrics_enabled
+
+T = TypeVar("T")
+
+_FENCE_RE = re.compile(r"^\s*```[\w-]*\s*\n?(.*?)\n?\s*```\s*$", re.S)
+_FENCE_OPEN_RE = re.compile(r"```[\w-]*")
+_WORD_RE = re.compile(r"[A-Za-z_][\w-]*")
+_NUMBER_RE = re.compile(r"^-?(0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?$")
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+# ---- Format demandé au provider -------------------------------------------------
+
+
+def response_format(model: Type[BaseModel], name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    mode = (os.getenv("STRUCTURED_OUTPUT", "schema") or "schema").strip().lower()
+    if mode == "off":
+        return None
+    if mode == "json":
+        return {"type": "json_object"}
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name or model.__name__, "schema": model.model_json_schema(by_alias=True)},
+    }
+
+
+def stream_validator(model: Type[BaseModel]) -> Optional["JSONStreamValidator"]:
+    if os.getenv("STRUCTURED_STREAM", "1") != "1":
+        return None
+    return JSONStreamValidator(model)
+
+
+def record(role: str, outcome: str) -> None:
+    if metrics_enabled():
+        try:
+            get_structured_output_total().labels(role, outcome).inc()
+        except Exception:
+            pass
+
+
+# ---- Schéma ---------------------------------------------------------------------
+
+
+def _merge(by_alias: Dict[str, Any], by_name: Dict[str, Any]) -> Dict[str, Any]:
+    """Propriétés acceptées sous alias ou nom (populate_by_name); requis = l'un ou l'autre."""
+    out = dict(by_alias)
+    if "properties" in by_alias:
+        out["properties"] = {**by_name.get("properties", {}), **by_alias["properties"]}
+        out["x-required-any"] = [
+            {a, n} for a, n in zip(by_alias.get("required", []), by_name.get("required", []))
+        ]
+    return out
+
+
+@lru_cache(maxsize=32)
+def _schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    by_alias = model.model_json_schema(by_alias=True)
+    by_name = model.model_json_schema(by_alias=False)
+    out = _merge(by_alias, by_name)
+    defs_name = by_name.get("$defs", {})
+    out["$defs"] = {k: _merge(v, defs_name.get(k, {})) for k, v in by_alias.get("$defs", {}).items()}
+    return out
+
+
+_KIND_TYPES = {
+    "{": {"object"},
+    "[": {"array"},
+    '"': {"string"},
+    "t": {"boolean"},
+    "f": {"boolean"},
+    "n": {"null"},
+    "0": {"number", "integer"},
+}
+
+
+# ---- Validation incrémentale ----------------------------------------------------
+
+
+@dataclass
+class _Frame:
+    kind: str  # "obj" | "arr"
+    schema: Optional[Dict[str, Any]]
+    path: str
+    state: str
+    child: Optional[Dict[str, Any]] = None
+    key: Optional[str] = None
+    seen: set = field(default_factory=set)
+    index: int = 0
+
+
+class JSONStreamValidator:
+    """Suit un document JSON chunk par chunk et lève OutputDiverged dès qu'il
+    ne peut plus valider ``model`` (les défauts réparables sont tolérés)."""
+
+    def __init__(self, model: Type[BaseModel]) -> None:
+        self.model = model
+        self._root = _schema(model)
+        self._defs = self._root.get("$defs", {})
+        self.reset()
+
+    def reset(self) -> None:
+        self.parts: List[str] = []
+        self.complete = False
+        self.lost = False  # syntaxe hors JSON strict: laissé à la réparation
+        self.diverged: Optional[str] = None
+        self._started = False
+        self._line: List[str] = []  # ligne courante avant le document
+        self._stack: List[_Frame] = []
+        self._str: Optional[List[str]] = None
+        self._str_key = False
+        self._esc = False
+        self._lit: Optional[List[str]] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def feed(self, chunk: str) -> None:
+        self.parts.append(chunk)
+        for ch in chunk:
+            if self.complete or self.lost:
+                return
+            self._step(ch)
+
+    # -- schéma --
+
+    def _resolve(self, schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        while schema and "$ref" in schema:
+            schema = self._defs.get(schema["$ref"].rsplit("/", 1)[-1], {})
+        return schema or {}
+
+    def _branch(self, schema: Optional[Dict[str, Any]], kind: str) -> Optional[Dict[str, Any]]:
+        """Branche de ``schema`` acceptant une valeur ``kind``; None = divergence."""
+        schema = self._resolve(schema)
+        branches = schema.get("anyOf") or schema.get("oneOf")
+        if branches:
+            for b in branches:
+                found = self._branch(b, kind)
+                if found is not None:
+                    return found
+            return None
+        t = schema.get("type")
+        if t is None:
+            return schema
+        types = set(t) if isinstance(t, list) else {t}
+        return schema if types & _KIND_TYPES[kind] else None
+
+    def _diverge(self, msg: str) -> None:
+        self.diverged = msg
+        raise OutputDiverged(f"{self.model.__name__}: {msg}")
+
+    # -- automate --
+
+    def _step(self, ch: str) -> None:
+        if self._str is not None:
+            if self._esc:
+                self._esc = False
+            elif ch == "\\":
+                self._esc = True
+            elif ch == '"':
+                text, self._str = "".join(self._str), None
+                if self._str_key:
+                    self._end_key(text)
+                return
+            self._str.append(ch)
+            return
+        if self._lit is not None:
+            if ch.isalnum() or ch in "+-.":
+                self._lit.append(ch)
+                return
+            lit, self._lit = "".join(self._lit), None
+            if lit not in ("true", "false", "null") and not _NUMBER_RE.match(lit):
+                self.lost = True
+                return
+        if not self._started:
+            # Texte/fence avant le document: ignoré (réparable). Le document
+            # commence en début de ligne ou juste après une fence: un crochet
+            # au fil du texte ("Voici [le plan]:") n'ouvre rien.
+            prefix = "".join(self._line).strip()
+            if ch in "{[" and (not prefix or _FENCE_OPEN_RE.fullmatch(prefix)):
+                self._started = True
+                self._open(ch, self._root, "$")
+            elif ch == "\n":
+                self._line = []
+            elif len(self._line) < 64:
+                self._line.append(ch)
+            return
+        if ch.isspace() or not self._stack:
+            return
+        frame = self._stack[-1]
+        if frame.kind == "obj":
+            if frame.state in ("key_or_end", "key"):
+                if ch == '"':
+                    self._str, self._str_key = [], True
+                elif ch == "}":
+                    self._close()  # "key": virgule finale, réparable
+                else:
+                    self.lost = True
+            elif frame.state == "colon":
+                if ch == ":":
+                    frame.state = "value"
+                else:
+                    self.lost = True
+            elif frame.state == "value":
+                frame.state = "comma_or_end"
+                self._value(ch, frame.child, f"{frame.path}.{frame.key}")
+            elif ch == ",":
+                frame.state = "key"
+            elif ch == "}":
+                self._close()
+            else:
+                self.lost = True
+        else:
+            if frame.state in ("value_or_end", "value"):
+                if ch == "]":
+                    self._close()
+                    return
+                frame.state = "comma_or_end"
+                self._value(ch, frame.child, f"{frame.path}[{frame.index}]")
+                frame.index += 1
+            elif ch == ",":
+                frame.state = "value"
+            elif ch == "]":
+                self._close()
+            else:
+                self.lost = True
+
+    def _open(self, ch: str, schema: Optional[Dict[str, Any]], path: str) -> None:
+        branch = self._branch(schema, ch)
+        if branch is None:
+            self._diverge(f"{path}: {'objet' if ch == '{' else 'tableau'} inattendu")
+        if ch == "{":
+            self._stack.append(_Frame("obj", branch, path, "key_or_end"))
+        else:
+            self._stack.append(_Frame("arr", branch, path, "value_or_end", child=branch.get("items")))
+
+    def _value(self, ch: str, schema: Optional[Dict[str, Any]], path: str) -> None:
+        if ch in "{[":
+            self._open(ch, schema, path)
+            return
+        kind = ch if ch in '"tfn' else ("0" if ch in "-0123456789" else None)
+        if kind is None:
+            self.lost = True  # ex. 'texte' ou True: réparable
+            return
+        if self._branch(schema, kind) is None:
+            self._diverge(f"{path}: type {sorted(_KIND_TYPES[kind])[0]} inattendu")
+        if ch == '"':
+            self._str, self._str_key = [], False
+        else:
+            self._lit = [ch]
+
+    def _end_key(self, key: str) -> None:
+        frame = self._stack[-1]
+        frame.key = key
+        frame.seen.add(key)
+        frame.state = "colon"
+        schema = self._resolve(frame.schema)
+        props = schema.get("properties")
+        extra = schema.get("additionalProperties")
+        if props is not None and key in props:
+            frame.child = props[key]
+        elif props is not None and extra is False:
+            self._diverge(f"{frame.path}: clé inconnue {key!r}")
+        else:
+            frame.child = extra if isinstance(extra, dict) else None
+
+    def _close(self) -> None:
+        frame = self._stack.pop()
+        if frame.kind == "obj":
+            for names in self._resolve(frame.schema).get("x-required-any", []):
+                if not names & frame.seen:
+                    self._diverge(f"{frame.path}: clé requise absente {sorted(names)[0]!r}")
+        if not self._stack:
+            self.complete = True
+
+
+# ---- Réparation locale ----------------------------------------------------------
+
+
+def strip_fences(text: str) -> str:
+    text = (text or "").strip()
+    m = _FENCE_RE.match(text)
+    return m.group(1).strip() if m else text
+
+
+def _last(tokens: List[str]) -> int:
+    i = len(tokens) - 1
+    while i >= 0 and tokens[i].isspace():
+        i -= 1
+    return i
+
+
+def _drop_trailing_comma(tokens: List[str]) -> None:
+    i = _last(tokens)
+    if i >= 0 and tokens[i] == ",":
+        del tokens[i:]
+
+
+def _drop_dangling(tokens: List[str], closer: str) -> None:
+    """Sortie tronquée: retire la clé/virgule/deux-points en suspens avant de refermer."""
+    i = _last(tokens)
+    del tokens[i + 1 :]
+    if i >= 0 and tokens[i] == ":":
+        del tokens[i:]
+        i = _last(tokens)
+        if i >= 0 and tokens[i].startswith('"'):
+            del tokens[i:]
+    elif closer == "}" and i >= 0 and tokens[i].startswith('"'):
+        j = _last(tokens[:i])
+        if j >= 0 and tokens[j] in ("{", ","):
+            del tokens[i:]
+    _drop_trailing_comma(tokens)
+
+
+def repair_json(text: str) -> str:
+    """Corrige localement les défauts courants d'une sortie JSON de LLM."""
+    s = strip_fences(text)
+    starts = [i for i in (s.find("{"), s.find("[")) if i >= 0]
+    if not starts:
+        return s
+    s = s[min(starts):]
+    tokens: List[str] = []
+    stack: List[str] = []
+    i, n = 0, len(s)
+    while i < n:
+        ch = s[i]
+        if ch in "\"'":
+            # Chaîne (guillemets simples convertis, tronquée: refermée)
+            j, buf = i + 1, []
+            while j < n and s[j] != ch:
+                if s[j] == "\\" and j + 1 < n:
+                    buf.append("'" if s[j + 1] == "'" else s[j : j + 2])
+                    j += 2
+                    continue
+                buf.append('\\"' if s[j] == '"' else "\\n" if s[j] == "\n" else s[j])
+                j += 1
+            tokens.append('"' + "".join(buf) + '"')
+            i = j + 1
+        elif s.startswith("//", i):
+            end = s.find("\n", i)
+            i = n if end < 0 else end
+        elif s.startswith("/*", i):
+            end = s.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            tokens.append(ch)
+            i += 1
+        elif ch in "}]":
+            _drop_trailing_comma(tokens)
+            if stack:
+                tokens.append(stack.pop())
+            i += 1
+            if not stack:
+                break  # fin du document: texte suivant ignoré
+        elif ch.isalpha() or ch == "_":
+            word = _WORD_RE.match(s, i).group(0)
+            i += len(word)
+            if s[i:].lstrip().startswith(":"):
+                tokens.append(json.dumps(word))  # clé non quotée
+            else:
+                tokens.append(_LITERALS.get(word, word))
+        else:
+            tokens.append(ch)
+            i += 1
+    while stack:
+        closer = stack.pop()
+        _drop_dangling(tokens, closer)
+        tokens.append(closer)
+    return "".join(tokens)
+
+
+def parse_structured(text: str, parse: Callable[[str], T]) -> Tuple[T, bool]:
+    """``parse`` sur le texte sans fences, puis sur sa réparation locale; retourne (objet, réparé)."""
+    cleaned = strip_fences(text)
+    try:
+        return parse(cleaned), False
+    except ValueError as first:
+        repaired = repair_json(text)
+        if repaired == cleaned:
+            raise
+        try:
+            return parse(repaired), True
+        except ValueError:
+            raise first
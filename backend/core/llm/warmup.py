@@ -0,0 +1,113 @@
+# core/llm/warmup.py
+"""
+Préchargement des modèles Ollama au démarrage de l'API.
+
+Le chargement à froid d'un modèle (plusieurs secondes, parfois dizaines) est
+payé par le premier nœud qui l'utilise. La tâche de fond ``warmup_loop``
+précharge les modèles Ollama référencés par la matrice agents/modèles
+(``agent_models_matrix``, entrées ``preferred``/``fallbacks``) et ceux de
+``OLLAMA_WARMUP_MODELS``, avec le keep_alive/num_ctx des appels réels; le temps
+de chargement observé alimente ``llm_model_load_seconds``.
+
+Variables d'environnement:
+- OLLAMA_WARMUP             : 1 pour précharger au démarrage (défaut 0)
+- OLLAMA_WARMUP_MODELS      : modèles supplémentaires, séparés par virgules
+- OLLAMA_WARMUP_INTERVAL_S  : rechargement périodique (garde les modèles
+  chauds si OLLAMA_KEEP_ALIVE est fini; défaut 0 = une seule fois)
+- OLLAMA_WARMUP_TIMEOUT_S   : timeout par modèle (défaut 300)
+"""
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+import anyio
+
+from core.telemetry.metrics import get_llm_model_load_seconds, metrics_enabled
+
+log = logging.getLogger("crew.llm.warmup")
+
+
+def _env_float(name: str, default: float, minimum: float = 0.0) -> float:
+    try:
+        raw = os.getenv(name, "")
+        return max(minimum, float(raw.strip())) if raw.strip() else default
+    except Exception:
+        return default
+
+
+def warmup_enabled() -> bool:
+    return os.getenv("OLLAMA_WARMUP", "0") == "1"
+
+
+def matrix_models(matrix: Dict[str, Any], provider: str = "ollama") -> List[str]:
+    """Modèles de ``provider`` cités par la matrice ({"role:domain": {"preferred": [...], ...}})."""
+    out: List[str] = []
+    for models in (matrix or {}).values():
+        if not isinstance(models, dict):
+            continue
+        for key in ("preferred", "fallbacks"):
+            for entry in models.get(key) or []:
+                if isinstance(entry, dict):
+                    prov, model = entry.get("provider"), entry.get("model")
+                elif isinstance(entry, str) and ":" in entry:
+                    prov, model = entry.split(":", 1)
+                else:
+                    continue
+                if (prov or "").strip().lower() == provider and model and model not in out:
+                    out.append(model)
+    return out
+
+
+def extra_models() -> List[str]:
+    raw = os.getenv("OLLAMA_WARMUP_MODELS", "") or ""
+    return [m.strip() for m in raw.split(",") if m.strip()]
+
+
+async def _load_matrix(sessionmaker) -> Dict[str, Any]:
+    from core.agents.registry import get_agent_matrix
+
+    async with sessionmaker() as session:
+        return await get_agent_matrix(session)
+
+
+async def warm_up_models(models: Iterable[str], provider: Any = None) -> Dict[str, Optional[float]]:
+    """Précharge chaque modèle; retourne ``{modèle: load_ms}`` (None = échec, non bloquant)."""
+    if provider is None:
+        from core.llm.providers.ollama import OllamaProvider
+
+        provider = OllamaProvider()
+    timeout_s = _env_float("OLLAMA_WARMUP_TIMEOUT_S", 300.0, 1.0)
+    results: Dict[str, Optional[float]] = {}
+    for model in models:
+        try:
+            usage = await provider.warm_up(model, timeout_s=timeout_s)
+        except Exception as e:
+            results[model] = None
+            log.warning("warm-up ollama échoué model=%s err=%s", model, e)
+            continue
+        load_ms = usage.get("load_ms")
+        results[model] = load_ms
+        if metrics_enabled() and load_ms is not None:
+            get_llm_model_load_seconds().labels("ollama", model).observe(float(load_ms) / 1000.0)
+        log.info("warm-up ollama model=%s load_ms=%s", model, load_ms)
+    return results
+
+
+async def warmup_loop(sessionmaker, interval_s: Optional[float] = None) -> None:
+    """Tâche de fond de l'API: préchargement initial puis, si demandé, périodique."""
+    interval = _env_float("OLLAMA_WARMUP_INTERVAL_S", 0.0) if interval_s is None else interval_s
+    while True:
+        models = list(extra_models())
+        try:
+            for model in matrix_models(await _load_matrix(sessionmaker)):
+                if model not in models:
+                    models.append(model)
+        except Exception:
+            log.warning("lecture de la matrice agents pour le warm-up échouée", exc_info=True)
+        if models:
+            await warm_up_models(models)
+        if interval <= 0:
+            return
+        await anyio.sleep(interval)
@@ -0,0 +1,188 @@
+# core/planning/deadline.py
+"""
+Échéance d'un run et budgets de temps par nœud.
+
+Un run peut recevoir une échéance (``options.deadline_s`` de ``POST /tasks``,
+``--deadline-s`` en CLI, sinon RUN_DEADLINE_S). À chaque vague, l'exécuteur
+attribue à chaque nœud prêt une part du temps restant proportionnelle à son
+poids sur le chemin critique restant (durée estimée du nœud / plus long chemin
+qui part de lui). Un nœud dont la part est inférieure à DEADLINE_MIN_NODE_S
+échoue sans appel (fail fast) et le run émet ``DEADLINE_MISSED``.
+
+Pendant l'exécution, l'échéance du nœud courant est portée par un
+``ContextVar``: ``run_llm`` réduit ``timeout_s`` au temps restant et
+``agent_runner`` route vers les modèles les plus rapides quand la marge passe
+sous DEADLINE_FAST_BELOW.
+
+Variables d'environnement:
+- RUN_DEADLINE_S       : échéance par défaut des runs en secondes (vide/0 = aucune)
+- DEADLINE_NODE_EST_S  : durée estimée d'un nœud sans historique (défaut 30)
+- DEADLINE_MIN_NODE_S  : budget minimal pour lancer un nœud (défaut 2)
+- DEADLINE_FAST_BELOW  : part de l'échéance restante sous laquelle on route
+  vers les modèles les plus rapides (défaut 0.5)
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import statistics
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Deque, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_run: contextvars.ContextVar[Optional["RunDeadline"]] = contextvars.ContextVar("run_deadline", default=None)
+_node_at: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("node_deadline_at", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Temps restant du nœud/run épuisé: pas de retry ni de bascule."""
+
+
+def _env_float(name: str, default: float, minimum: float = 0.0) -> float:
+    try:
+        raw = os.getenv(name, "")
+        return max(minimum, float(raw.strip())) if raw.strip() else default
+    except Exception:
+        return default
+
+
+def default_deadline_s() -> Optional[float]:
+    value = _env_float("RUN_DEADLINE_S", 0.0)
+    return value or None
+
+
+def min_node_s() -> float:
+    return _env_float("DEADLINE_MIN_NODE_S", 2.0)
+
+
+class RunDeadline:
+    """Échéance d'un run (horloge monotone) et durées observées de ses nœuds."""
+
+    def __init__(self, total_s: float, clock=time.monotonic) -> None:
+        self.total_s = float(total_s)
+        self.clock = clock
+        self.started = clock()
+        self.at = self.started + self.total_s
+        self.missed: List[str] = []
+        self._durations: Dict[str, Deque[float]] = {}
+
+    def remaining_s(self) -> float:
+        return self.at - self.clock()
+
+    def observe(self, role: str, seconds: float) -> None:
+        self._durations.setdefault(role or "", deque(maxlen=20)).append(float(seconds))
+
+    def estimate_s(self, node: Any) -> float:
+        """Durée attendue: médiane des nœuds du même rôle dans ce run, sinon DEADLINE_NODE_EST_S."""
+        seen = self._durations.get(getattr(node, "suggested_agent_role", "") or "")
+        if seen:
+            return max(0.001, statistics.median(seen))
+        return _env_float("DEADLINE_NODE_EST_S", 30.0, 0.001)
+
+    def _longest_from(self, dag: Any, nid: str, pending: set, memo: Dict[str, float]) -> float:
+        if nid not in memo:
+            node = dag.nodes[nid]
+            tail = [
+                self._longest_from(dag, s, pending, memo)
+                for s in (getattr(node, "succ", None) or [])
+                if s in pending
+            ]
+            memo[nid] = self.estimate_s(node) + max(tail, default=0.0)
+        return memo[nid]
+
+    def node_budgets(self, dag: Any, ready: Iterable[str], pending: Iterable[str]) -> Dict[str, float]:
+        """Part du temps restant de chaque nœud prêt, au prorata du chemin critique qu'il ouvre."""
+        remaining = max(0.0, self.remaining_s())
+        pending_set = set(pending)
+        memo: Dict[str, float] = {}
+        out: Dict[str, float] = {}
+        for nid in ready:
+            path = self._longest_from(dag, nid, pending_set, memo)
+            out[nid] = remaining * (self.estimate_s(dag.nodes[nid]) / path) if path > 0 else remaining
+        return out
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "deadline_s": self.total_s,
+            "elapsed_s": round(self.clock() - self.started, 3),
+            "remaining_s": round(self.remaining_s(), 3),
+            "missed": bool(self.missed),
+            "missed_nodes": list(self.missed),
+        }
+
+
+def current_deadline() -> Optional[RunDeadline]:
+    return _run.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[RunDeadline]) -> Iterator[Optional[RunDeadline]]:
+    token = _run.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _run.reset(token)
+
+
+@contextmanager
+def node_scope(budget_s: Optional[float]) -> Iterator[None]:
+    """Échéance du nœud courant (``budget_s`` à partir de maintenant)."""
+    dl = _run.get()
+    at = None
+    if budget_s is not None and dl is not None:
+        at = min(dl.at, dl.clock() + budget_s)
+    token = _node_at.set(at)
+    try:
+        yield
+    finally:
+        _node_at.reset(token)
+
+
+def remaining_s() -> Optional[float]:
+    """Temps restant (nœud courant, sinon run); None sans échéance."""
+    dl = _run.get()
+    if dl is None:
+        return None
+    at = _node_at.get()
+    return (at if at is not None else dl.at) - dl.clock()
+
+
+def expired() -> bool:
+    rem = remaining_s()
+    return rem is not None and rem <= 0
+
+
+def clamp_timeout(timeout_s: float) -> float:
+    rem = remaining_s()
+    return timeout_s if rem is None else max(0.0, min(float(timeout_s), rem))
+
+
+def under_pressure() -> bool:
+    """Vrai quand la marge du run passe sous DEADLINE_FAST_BELOW de l'échéance initiale."""
+    dl = _run.get()
+    if dl is None or dl.total_s <= 0:
+        return False
+    return dl.remaining_s() / dl.total_s < _env_float("DEADLINE_FAST_BELOW", 0.5)
+
+
+async def within_deadline(aw: Awaitable[T]) -> T:
+    """Attend ``aw`` dans la limite du temps restant; DeadlineExceeded sinon."""
+    rem = remaining_s()
+    if rem is None:
+        return await aw
+    if rem <= 0:
+        close = getattr(aw, "close", None)
+        if close is not None:
+            close()
+        raise DeadlineExceeded("échéance du run dépassée")
+    try:
+        return await asyncio.wait_for(aw, timeout=rem)
+    except asyncio.TimeoutError:
+        # TimeoutError interne à ``aw`` (échéance encore loin): propagée telle quelle
+        if (remaining_s() or 0.0) <= 0.01:
+            raise DeadlineExceeded("échéance du run dépassée") from None
+        raise
@@ -31,6 +31,7 @@ class PlanNode:
     assumptions: List[str] = field(default_factory=list)
     notes: List[str] = field(default_factory=list)
     llm: Dict[str, Any] = field(default_factory=dict)
+    review: str = ""  # "blocking" | "async" | "off" (auto-review; vide = AUTO_REVIEW_MODE)
 
 class TaskGraph:
     def __init__(self, nodes: List[PlanNode]):
@@ -66,7 +67,8 @@ class TaskGraph:
                 risks=_as_str_list(p.get("risks")),
                 assumptions=_as_str_list(p.get("assumptions")),
                 notes=_as_str_list(p.get("notes")),
-                llm=p.get("llm") or {}
+                llm=p.get("llm") or {},
+                review=str(p.get("review") or plan.get("review") or ""),
             ))
         return cls(nodes)
 
@@ -0,0 +1,211 @@
+# core/storage/blob_store.py
+"""
+Stockage adressé par contenu (sha256) pour les artifacts volumineux.
+
+Interface volontairement calquée sur S3 (put/get/head/delete d'objets par clé)
+pour pouvoir brancher un bucket S3/MinIO; l'implémentation par défaut est un
+répertoire local:
+
+    <BLOB_STORE_DIR>/<sha[0:2]>/<sha[2:4]>/<sha>
+
+Les blobs sont immuables: un second ``put`` du même contenu (re-run, override
+identique) ne réécrit rien.
+
+Variables d'environnement:
+- ``BLOB_STORE_URL``: ``file:///chemin`` (défaut: ``<ARTIFACTS_DIR>/blobs``) ou
+  ``s3://bucket/prefix`` (boto3 requis; ``BLOB_S3_ENDPOINT_URL`` pour MinIO).
+- ``ARTIFACT_BLOB_MIN_BYTES``: taille à partir de laquelle un artifact est
+  stocké hors ligne (défaut 8192; 0 = désactivé).
+
+Avec ``ARTIFACT_COMPRESSION=zstd`` les blobs sont écrits compressés; la clé
+reste le sha256 du contenu en clair (déduplication inchangée) et la lecture
+détecte la trame zstd.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+from core.io.compression import ZSTD_CODEC, compress, compression_codec, decode_text, is_compressed
+
+PREVIEW_CHARS = 280
+
+
+def preview_text(content: str) -> str:
+    """Aperçu stocké avec la ligne d'un artifact hors ligne ("…" si tronqué)."""
+    return content[:PREVIEW_CHARS] + ("…" if len(content) > PREVIEW_CHARS else "")
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    sha256: str
+    size: int
+    codec: Optional[str] = None
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class LocalBlobStore:
+    """Blob store sur disque local (stand-in d'un bucket S3)."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[0:2] / key[2:4] / key
+
+    def head_object(self, key: str) -> Optional[int]:
+        try:
+            return self.path_for(key).stat().st_size
+        except OSError:
+            return None
+
+    def put_object(self, key: str, data: bytes) -> None:
+        target = self.path_for(key)
+        if target.exists():
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", delete=False, dir=str(target.parent)) as tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+            tmp_path = tmp.name
+        os.replace(tmp_path, target)
+
+    def get_object(self, key: str) -> bytes:
+        return self.path_for(key).read_bytes()
+
+    def peek_object(self, key: str, n: int = 4) -> bytes:
+        """Premiers octets de l'objet (b"" si absent)."""
+        try:
+            with self.path_for(key).open("rb") as fh:
+                return fh.read(n)
+        except OSError:
+            return b""
+
+    def delete_object(self, key: str) -> None:
+        try:
+            self.path_for(key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class S3BlobStore:
+    """Blob store S3-compatible (AWS, MinIO...). boto3 est importé à la demande."""
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None):
+        try:
+            import boto3  # type: ignore
+        except Exception as exc:  # pragma: no cover - dépendance optionnelle
+            raise RuntimeError("boto3 requis pour BLOB_STORE_URL=s3://...") from exc
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self._client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def head_object(self, key: str) -> Optional[int]:  # pragma: no cover - réseau
+        try:
+            res = self._client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return int(res.get("ContentLength") or 0)
+        except Exception:
+            return None
+
+    def put_object(self, key: str, data: bytes) -> None:  # pragma: no cover - réseau
+        if self.head_object(key) is not None:
+            return
+        self._client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    def get_object(self, key: str) -> bytes:  # pragma: no cover - réseau
+        res = self._client.get_object(Bucket=self.bucket, Key=self._key(key))
+        return res["Body"].read()
+
+    def peek_object(self, key: str, n: int = 4) -> bytes:  # pragma: no cover - réseau
+        try:
+            res = self._client.get_object(Bucket=self.bucket, Key=self._key(key), Range=f"bytes=0-{n - 1}")
+            return res["Body"].read()
+        except Exception:
+            return b""
+
+    def delete_object(self, key: str) -> None:  # pragma: no cover - réseau
+        self._client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+
+def _default_root() -> Path:
+    base = os.getenv("ARTIFACTS_DIR") or os.getenv("RUNS_ROOT") or ".runs"
+    return Path(base) / "blobs"
+
+
+def make_blob_store(url: Optional[str] = None):
+    url = (url if url is not None else os.getenv("BLOB_STORE_URL", "")).strip()
+    if not url:
+        return LocalBlobStore(_default_root())
+    parsed = urlparse(url)
+    if parsed.scheme == "s3":
+        return S3BlobStore(
+            parsed.netloc, parsed.path, endpoint_url=os.getenv("BLOB_S3_ENDPOINT_URL") or None
+        )
+    if parsed.scheme in ("", "file"):
+        return LocalBlobStore(parsed.path if parsed.scheme == "file" else url)
+    raise ValueError(f"BLOB_STORE_URL non supportée: {url}")
+
+
+_store = None
+_store_url: Optional[str] = None
+
+
+def get_blob_store():
+    """Blob store courant (recréé si BLOB_STORE_URL/ARTIFACTS_DIR changent)."""
+    global _store, _store_url
+    key = f"{os.getenv('BLOB_STORE_URL', '')}|{os.getenv('ARTIFACTS_DIR', '')}|{os.getenv('RUNS_ROOT', '')}"
+    if _store is None or _store_url != key:
+        _store = make_blob_store()
+        _store_url = key
+    return _store
+
+
+def blob_min_bytes() -> int:
+    try:
+        raw = os.getenv("ARTIFACT_BLOB_MIN_BYTES", "")
+        return int(raw.strip()) if raw.strip() else 8192
+    except Exception:
+        return 8192
+
+
+def put_text(text: str, store=None, *, sidecar: bool = False) -> BlobRef:
+    """
+    Écrit (une seule fois) le contenu et retourne sa référence sha256.
+
+    Le blob étant immuable, un contenu déjà stocké garde son encodage d'origine:
+    le codec renvoyé est celui des octets sur disque, pas le réglage courant.
+    """
+    data = text.encode("utf-8")
+    key = sha256_hex(data)
+    store = store or get_blob_store()
+    if store.head_object(key) is None:
+        codec = compression_codec()
+        store.put_object(key, compress(data, sidecar=sidecar) if codec else data)
+    codec = ZSTD_CODEC if is_compressed(store.peek_object(key)) else None
+    return BlobRef(sha256=key, size=len(data), codec=codec)
+
+
+def get_text(key: str, store=None) -> Optional[str]:
+    try:
+        return decode_text((store or get_blob_store()).get_object(key))
+    except Exception:
+        return None
+
+
+def resolve_content(content: Optional[str], content_hash: Optional[str]) -> Optional[str]:
+    """Contenu inline s'il existe, sinon lecture du blob référencé."""
+    if content is not None or not content_hash:
+        return content
+    return get_text(content_hash)
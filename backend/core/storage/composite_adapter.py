@@ -4,6 +4,8 @@ import inspect
 import logging
 from typing import Sequence, Callable, Optional, Any, Dict
 
+from core.telemetry.tracing import span
+
 
 class CompositeAdapter:
     """
@@ -108,10 +110,11 @@ class CompositeAdapter:
             except Exception:
                 pass
 
-            if inspect.iscoroutinefunction(fn):
-                result = await fn(*args, **call_kwargs)
-            else:
-                result = fn(*args, **call_kwargs)
+            with span(name, cat="storage", adapter=type(a).__name__):
+                if inspect.iscoroutinefunction(fn):
+                    result = await fn(*args, **call_kwargs)
+                else:
+                    result = fn(*args, **call_kwargs)
         return result
 
     # façade
@@ -130,6 +133,23 @@ class CompositeAdapter:
     async def save_feedback(self, *args, **kwargs):
         return await self._call("save_feedback", *args, **kwargs)
 
+    async def save_feedbacks(self, feedbacks: list[dict]):
+        """Écriture groupée; adaptateurs sans ``save_feedbacks``: un appel par feedback."""
+        result = None
+        for a in self.adapters:
+            uuid_ids = getattr(a, "expects_uuid_ids", False)
+            if hasattr(a, "save_feedbacks"):
+                items = [await self._normalize_ids_async(f) for f in feedbacks] if uuid_ids else feedbacks
+                fn = a.save_feedbacks
+                with span("save_feedbacks", cat="storage", adapter=type(a).__name__, count=len(items)):
+                    result = await fn(items) if inspect.iscoroutinefunction(fn) else fn(items)
+            elif hasattr(a, "save_feedback"):
+                fn = a.save_feedback
+                for f in feedbacks:
+                    item = await self._normalize_ids_async(f) if uuid_ids else f
+                    result = await fn(**item) if inspect.iscoroutinefunction(fn) else fn(**item)
+        return result
+
     async def get_run(self, *args, **kwargs):
         # premier qui répond (tolérant aux erreurs backend)
         log = logging.getLogger(__name__)
@@ -165,13 +185,17 @@ class CompositeAdapter:
                     return nid
         return None
 
-    async def list_artifacts_for_node(self, node_id: str) -> list[dict]:
+    async def list_artifacts_for_node(self, node_id: str, include_content: bool = True) -> list[dict]:
         # Parcourt les adaptateurs et renvoie le premier résultat NON VIDE.
         # Permet de chaîner file -> pg sans bloquer si le premier ne sait pas répondre.
         for ad in self.adapters:
             if hasattr(ad, "list_artifacts_for_node"):
                 try:
-                    res = await ad.list_artifacts_for_node(node_id)
+                    fn = ad.list_artifacts_for_node
+                    if "include_content" in inspect.signature(fn).parameters:
+                        res = await fn(node_id, include_content=include_content)
+                    else:
+                        res = await fn(node_id)
                     if res:
                         return res
                 except Exception:
@@ -141,6 +141,20 @@ class Artifact(SQLModel, table=True):
     summary: Optional[str] = Field(
         default=None, sa_column=Column(String, nullable=True)
     )
+    # Contenu hors ligne (blob store sha256): content=NULL, hash + taille + aperçu
+    content_hash: Optional[str] = Field(
+        default=None, sa_column=Column(String(64), nullable=True, index=True)
+    )
+    size_bytes: Optional[int] = Field(
+        default=None, sa_column=Column(Integer, nullable=True)
+    )
+    preview: Optional[str] = Field(
+        default=None, sa_column=Column(String, nullable=True)
+    )
+    # Codec du blob hors ligne ("zstd"), NULL = stocké en clair
+    codec: Optional[str] = Field(
+        default=None, sa_column=Column(String(16), nullable=True)
+    )
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(UTC),
         sa_column=Column(
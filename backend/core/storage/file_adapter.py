@@ -9,6 +9,8 @@ from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 from typing import Optional
 
+from core.io.compression import atomic_write_text as _atomic_write_encoded
+
 # ---------------------------
 # Helpers atomiques génériques
 # ---------------------------
@@ -54,12 +56,15 @@ class FileStorage:
     async def save_artifact(self, node_id: str, content: str, ext: str = ".md") -> str:
         """
         Écrit l'artifact d'un nœud de façon ATOMIQUE.
-        Nom = artifact_<node_id><ext>. Retourne le chemin écrit.
+        Nom = artifact_<node_id><ext> (+ ".zst" si ARTIFACT_COMPRESSION=zstd).
+        Retourne le chemin écrit.
         """
         path = self._artifact_path(node_id=node_id, ext=ext)
         # déporte l'I/O bloquante dans un thread pour ne pas bloquer l'event loop
-        await asyncio.to_thread(_atomic_write_text, path, content, "utf-8")
-        return path
+        written = await asyncio.to_thread(
+            _atomic_write_encoded, path, content, sidecar=ext.endswith(".llm.json")
+        )
+        return str(written)
 
     async def save_sidecar(self, node_id: str, content: str, ext: str = ".llm.json") -> str:
         return await self.save_artifact(node_id=node_id, content=content, ext=ext)
@@ -154,5 +159,5 @@ class FileAdapter(FileStorage):
     pass
     async def get_node_id_by_logical(self, run_id: str, logical_id: str) -> str | None:
         return None
-    async def list_artifacts_for_node(self, node_id: str) -> list[dict]:
+    async def list_artifacts_for_node(self, node_id: str, include_content: bool = True) -> list[dict]:
         return []
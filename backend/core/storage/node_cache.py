@@ -0,0 +1,189 @@
+# core/storage/node_cache.py
+"""
+Cache global des résultats de nœuds, adressé par contenu (mémoïsation inter-runs).
+
+La clé d'un nœud (``node_cache_key``) hache ses entrées (checksum d'entrée,
+titre, critères, rôle, provider/modèle — ou, si le routage choisit le modèle
+à l'appel, objectif et candidats —, prompt système, overrides LLM) **et**
+les checksums des sorties de ses dépendances: une modification en amont change
+la clé de tous les descendants (arbre de Merkle), un sous-graphe identique
+est resservi tel quel dans un nouveau run sans appel LLM.
+
+Une entrée est un fichier JSON (markdown + méta LLM du résultat agent)::
+
+    <NODE_CACHE_DIR>/<key[0:2]>/<key>.json
+
+Le mtime sert d'horodatage LRU (rafraîchi à chaque hit).
+
+Variables d'environnement:
+- NODE_CACHE_ENABLED     : 1 pour activer (défaut 0)
+- NODE_CACHE_DIR         : défaut ``<ARTIFACTS_DIR|RUNS_ROOT|.runs>/node_cache``
+- NODE_CACHE_TTL_S       : durée de vie d'une entrée (défaut 7 jours, 0 = illimitée)
+- NODE_CACHE_MAX_ENTRIES : borne en nombre d'entrées (défaut 5000, 0 = illimitée)
+- NODE_CACHE_MAX_BYTES   : borne en taille (défaut 512 Mio, 0 = illimitée)
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+CACHE_VERSION = 1
+
+
+def cache_enabled() -> bool:
+    return (os.getenv("NODE_CACHE_ENABLED", "0") or "0").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        raw = os.getenv(name, "")
+        return max(0, int(raw.strip())) if raw.strip() else default
+    except Exception:
+        return default
+
+
+def sha256_text(text: Optional[str]) -> str:
+    return hashlib.sha256((text or "").encode("utf-8", errors="ignore")).hexdigest()
+
+
+def node_cache_key(payload: Dict[str, Any]) -> str:
+    """Clé stable d'un dict d'entrées (JSON trié)."""
+    raw = json.dumps({"v": CACHE_VERSION, **payload}, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class NodeCache:
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        ttl_s: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        self.root = Path(root)
+        self.ttl_s = _env_int("NODE_CACHE_TTL_S", 7 * 86400) if ttl_s is None else ttl_s
+        self.max_entries = _env_int("NODE_CACHE_MAX_ENTRIES", 5000) if max_entries is None else max_entries
+        self.max_bytes = _env_int("NODE_CACHE_MAX_BYTES", 512 * 1024 * 1024) if max_bytes is None else max_bytes
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return bool(self.ttl_s) and now - created_at > self.ttl_s
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self.path_for(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        if self._expired(float(entry.get("created_at") or 0), now):
+            self.invalidate(key)
+            return None
+        try:
+            os.utime(path, (now, now))  # LRU
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> Path:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"key": key, "created_at": time.time(), **entry}
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload, ensure_ascii=False, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    def invalidate(self, key: str) -> bool:
+        try:
+            self.path_for(key).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        out = []
+        if not self.root.is_dir():
+            return out
+        for sub in os.scandir(self.root):
+            if not sub.is_dir():
+                continue
+            for f in os.scandir(sub.path):
+                if f.name.endswith(".json"):
+                    try:
+                        st = f.stat()
+                    except OSError:
+                        continue
+                    out.append((st.st_mtime, st.st_size, Path(f.path)))
+        return out
+
+    def clear(self) -> int:
+        n = 0
+        for _, _, path in self._scan():
+            try:
+                path.unlink()
+                n += 1
+            except OSError:
+                pass
+        return n
+
+    def evict(self) -> Dict[str, int]:
+        """Supprime les entrées expirées puis les moins récemment utilisées hors bornes."""
+        now = time.time()
+        entries = sorted(self._scan())  # plus ancien usage d'abord
+        expired = evicted = 0
+        kept = []
+        for mtime, size, path in entries:
+            # mtime >= created_at: une entrée non relue depuis le TTL est forcément expirée
+            if self._expired(mtime, now):
+                try:
+                    path.unlink()
+                    expired += 1
+                except OSError:
+                    pass
+            else:
+                kept.append((mtime, size, path))
+        total = sum(size for _, size, _ in kept)
+        while kept and (
+            (self.max_entries and len(kept) > self.max_entries)
+            or (self.max_bytes and total > self.max_bytes)
+        ):
+            _, size, path = kept.pop(0)
+            try:
+                path.unlink()
+                evicted += 1
+            except OSError:
+                pass
+            total -= size
+        return {"expired": expired, "evicted": evicted, "entries": len(kept), "bytes": total}
+
+    def stats(self) -> Dict[str, int]:
+        entries = self._scan()
+        return {"entries": len(entries), "bytes": sum(size for _, size, _ in entries)}
+
+
+_cache: Optional[NodeCache] = None
+_cache_key: Optional[str] = None
+
+
+def _default_root() -> Path:
+    base = os.getenv("ARTIFACTS_DIR") or os.getenv("RUNS_ROOT") or ".runs"
+    return Path(base) / "node_cache"
+
+
+def get_node_cache() -> NodeCache:
+    """Cache courant (recréé si NODE_CACHE_DIR/ARTIFACTS_DIR changent)."""
+    global _cache, _cache_key
+    key = f"{os.getenv('NODE_CACHE_DIR', '')}|{os.getenv('ARTIFACTS_DIR', '')}|{os.getenv('RUNS_ROOT', '')}"
+    if _cache is None or _cache_key != key:
+        raw = (os.getenv("NODE_CACHE_DIR") or "").strip()
+        _cache = NodeCache(Path(raw) if raw else _default_root())
+        _cache_key = key
+    return _cache
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import uuid
 from datetime import datetime, timezone
@@ -24,6 +25,8 @@ from core.storage.db_models import (
     RunStatus,
     NodeStatus,
 )
+from core.storage.run_cache import invalidate_run
+from core.storage.blob_store import blob_min_bytes, get_text, preview_text, put_text
 
 
 DATABASE_URL = os.getenv(
@@ -69,6 +72,10 @@ class PostgresAdapter:
 
     # ---------- Infra utilitaires ----------
 
+    @property
+    def engine(self):
+        return self._engine
+
     async def create_all(self):
         async with self._engine.begin() as conn:
             await conn.run_sync(SQLModel.metadata.create_all)
@@ -211,6 +218,8 @@ class PostgresAdapter:
                 # Tolère un éventuel conflit/doublon pendant des reruns
                 pass
 
+        invalidate_run(run_uuid)
+
         if row_run:
             data = dict(row_run._mapping)
             data["meta"] = data.pop("metadata", None)
@@ -338,11 +347,24 @@ class PostgresAdapter:
     async def save_artifact(
         self, artifact: Optional[Artifact] = None, **kwargs
     ) -> Artifact:
+        ext = kwargs.pop("ext", None)
         obj = self._coalesce_obj(Artifact, artifact, kwargs)
         if obj.type is None:
             obj.type = "artifact"
         if obj.created_at is None:
             obj.created_at = datetime.now(timezone.utc)
+        if obj.content is not None:
+            size = len(obj.content.encode("utf-8"))
+            obj.size_bytes = size
+            threshold = blob_min_bytes()
+            if threshold > 0 and size >= threshold:
+                # Hors ligne: blob sha256 écrit une seule fois (dédupliqué entre reruns)
+                is_sidecar = (ext or obj.path or "").endswith(".llm.json")
+                ref = await asyncio.to_thread(put_text, obj.content, sidecar=is_sidecar)
+                obj.content_hash = ref.sha256
+                obj.codec = ref.codec
+                obj.preview = preview_text(obj.content)
+                obj.content = None
         async with self.session() as s:
             try:
                 s.add(obj)
@@ -409,11 +431,36 @@ class PostgresAdapter:
                 s.add(obj)
                 await s.flush()
                 await s.commit()
+                invalidate_run(obj.run_id)
                 return obj
             except Exception:
                 await s.rollback()
                 raise
 
+    async def save_feedbacks(self, feedbacks: List[Any]) -> List[Feedback]:
+        """Insère plusieurs feedbacks en une transaction (reviewer par lots)."""
+        objs = [
+            f if isinstance(f, Feedback) else self._coalesce_obj(Feedback, None, dict(f))
+            for f in feedbacks
+        ]
+        if not objs:
+            return []
+        now = datetime.now(timezone.utc)
+        for obj in objs:
+            if obj.created_at is None:
+                obj.created_at = now
+        async with self.session() as s:
+            try:
+                s.add_all(objs)
+                await s.flush()
+                await s.commit()
+            except Exception:
+                await s.rollback()
+                raise
+        for run_id in {obj.run_id for obj in objs}:
+            invalidate_run(run_id)
+        return objs
+
     # ---------- Résolutions & ensures (optionnels) ----------
 
     async def resolve_run_uuid(self, run_key: str) -> Optional[uuid.UUID]:
@@ -493,14 +540,22 @@ class PostgresAdapter:
             row = r.first()
             return row[0] if row else None
 
-    async def list_artifacts_for_node(self, node_id: str) -> list[dict]:
+    async def list_artifacts_for_node(self, node_id: str, include_content: bool = True) -> list[dict]:
         """
         Liste brute des artifacts pour un node.
         Colonnes: artifacts(id UUID, node_id UUID, type TEXT, content TEXT, path TEXT, created_at TIMESTAMPTZ)
+        Un aperçu (280 caractères, calculé en SQL) et la taille accompagnent chaque
+        ligne; include_content=False évite de rapatrier le texte complet.
         """
+        content_col = "content" if include_content else "NULL::text AS content"
         q = text(
-            """
-            SELECT id::text, type, content, path, created_at
+            f"""
+            SELECT id::text, type, {content_col}, content_hash,
+                   coalesce(
+                       preview,
+                       left(content, 280) || CASE WHEN char_length(content) > 280 THEN '…' ELSE '' END
+                   ) AS preview,
+                   coalesce(size_bytes, octet_length(content)) AS size, path, created_at
             FROM artifacts
             WHERE node_id = :node_id
             ORDER BY created_at DESC NULLS LAST
@@ -508,18 +563,24 @@ class PostgresAdapter:
         )
         async with self.session() as s:
             r = await s.execute(q, {"node_id": node_id})
-            items = []
-            for aid, typ, content, path, created_at in r.fetchall():
-                items.append(
-                    {
-                        "id": aid,
-                        "type": typ,
-                        "content": content,
-                        "path": path,
-                        "created_at": created_at.isoformat() if created_at else None,
-                    }
-                )
-            return items
+            rows = r.fetchall()
+        items = []
+        for aid, typ, content, content_hash, preview, size, path, created_at in rows:
+            item = {
+                "id": aid,
+                "type": typ,
+                "preview": preview,
+                "size": size,
+                "content_hash": content_hash,
+                "path": path,
+                "created_at": created_at.isoformat() if created_at else None,
+            }
+            if include_content:
+                if content is None and content_hash:
+                    content = await asyncio.to_thread(get_text, content_hash)
+                item["content"] = content
+            items.append(item)
+        return items
 
     async def finalize_node_status(
         self,
@@ -0,0 +1,324 @@
+# core/storage/retention.py
+"""
+Rétention et archivage: partitions mensuelles de ``events`` et dossiers ``.runs``.
+
+``events`` est partitionnée par mois UTC (``events_pYYYYMM`` + ``events_default``,
+cf. migration a7b8c9d0e1f2). Un passage de rétention:
+
+1. crée les partitions du mois courant et des ``MONTHS_AHEAD`` suivants (les
+   lignes tombées dans ``events_default`` sont déplacées dans la nouvelle
+   partition avant son rattachement);
+2. exporte chaque partition entièrement antérieure à la limite
+   (``EVENTS_RETENTION_DAYS``) en JSONL gzip par run sous
+   ``ARCHIVE_DIR/events/<YYYY_MM>/``, puis la détache et la supprime dans une
+   transaction courte — ``DROP`` d'une partition au lieu de ``DELETE``
+   massif: ni bloat d'index ni VACUUM;
+3. archive en tar.gz puis supprime les dossiers ``.runs/<run_id>`` des runs
+   terminés avant ``RUNS_DIR_RETENTION_DAYS``.
+
+Les données archivées restent lisibles à la demande (``core.io.archive``).
+Chaque étape est désactivée quand sa rétention vaut 0 (défaut).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import anyio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.io import archive
+
+log = logging.getLogger(__name__)
+
+MONTHS_AHEAD = 2
+DEFAULT_PARTITION = "events_default"
+_PARTITION_RE = re.compile(r"^events_p(\d{4})(\d{2})$")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        raw = os.getenv(name, "")
+        return max(0.0, float(raw.strip())) if raw.strip() else default
+    except Exception:
+        return default
+
+
+def events_retention_days() -> float:
+    """Âge (jours) au-delà duquel une partition d'événements est archivée (0 = jamais)."""
+    return _env_float("EVENTS_RETENTION_DAYS", 0.0)
+
+
+def runs_dir_retention_days() -> float:
+    """Âge (jours) au-delà duquel un dossier .runs/<run_id> terminé est archivé (0 = jamais)."""
+    return _env_float("RUNS_DIR_RETENTION_DAYS", 0.0)
+
+
+def retention_interval_s() -> float:
+    """Période du job de rétention en tâche de fond (RETENTION_INTERVAL_S, 0 = désactivé)."""
+    return _env_float("RETENTION_INTERVAL_S", 3600.0)
+
+
+def month_start(ts: datetime) -> datetime:
+    ts = ts.astimezone(timezone.utc)
+    return datetime(ts.year, ts.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(d: datetime, n: int = 1) -> datetime:
+    m = d.month - 1 + n
+    return d.replace(year=d.year + m // 12, month=m % 12 + 1, day=1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"events_p{month:%Y%m}"
+
+
+def _utc(d: datetime) -> str:
+    # Borne littérale UTC (DDL: pas de paramètres liés)
+    return f"TIMESTAMP '{d:%Y-%m-%d}' AT TIME ZONE 'UTC'"
+
+
+async def is_partitioned(session: AsyncSession) -> bool:
+    kind = (
+        await session.execute(
+            text(
+                "SELECT c.relkind::text FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE n.nspname = current_schema() AND c.relname = 'events'"
+            )
+        )
+    ).scalar_one_or_none()
+    return kind == "p"
+
+
+async def list_event_partitions(session: AsyncSession) -> List[datetime]:
+    """Mois couverts par une partition mensuelle rattachée à ``events``."""
+    rows = (
+        await session.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST('events' AS regclass)"
+            )
+        )
+    ).scalars()
+    months = []
+    for name in rows:
+        m = _PARTITION_RE.match(name)
+        if m:
+            months.append(datetime(int(m.group(1)), int(m.group(2)), 1, tzinfo=timezone.utc))
+    return sorted(months)
+
+
+async def ensure_event_partition(session: AsyncSession, month: datetime) -> bool:
+    """
+    Crée la partition de *month* si absente (True si créée). Les lignes déjà
+    présentes dans ``events_default`` pour ce mois y sont déplacées.
+    """
+    month = month_start(month)
+    name = partition_name(month)
+    exists = (
+        await session.execute(text("SELECT to_regclass(:n) IS NOT NULL"), {"n": name})
+    ).scalar_one()
+    if exists:
+        return False
+    nxt = add_months(month)
+    await session.execute(
+        text(f"CREATE TABLE {name} (LIKE events INCLUDING DEFAULTS)")
+    )
+    await session.execute(
+        text(
+            f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION}
+                WHERE "timestamp" >= :lo AND "timestamp" < :hi
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+            """
+        ),
+        {"lo": month, "hi": nxt},
+    )
+    await session.execute(
+        text(f"ALTER TABLE events ATTACH PARTITION {name} FOR VALUES FROM ({_utc(month)}) TO ({_utc(nxt)})")
+    )
+    return True
+
+
+async def ensure_event_partitions(
+    session: AsyncSession, *, now: Optional[datetime] = None, months_ahead: int = MONTHS_AHEAD
+) -> List[str]:
+    """Partitions du mois courant et des *months_ahead* suivants; valide la transaction."""
+    if not await is_partitioned(session):
+        return []
+    current = month_start(now or datetime.now(timezone.utc))
+    created = []
+    for i in range(months_ahead + 1):
+        month = add_months(current, i)
+        if await ensure_event_partition(session, month):
+            created.append(partition_name(month))
+    await session.commit()
+    return created
+
+
+def _event_row(row: Any) -> Dict[str, Any]:
+    m = row._mapping
+    return {
+        "id": str(m["id"]),
+        "run_id": str(m["run_id"]) if m["run_id"] else None,
+        "node_id": str(m["node_id"]) if m["node_id"] else None,
+        "timestamp": m["timestamp"].isoformat() if m["timestamp"] else None,
+        "level": m["level"],
+        "message": m["message"],
+        "request_id": m["request_id"],
+        "extra": m["extra"],
+    }
+
+
+async def archive_event_partition(session: AsyncSession, month: datetime) -> Optional[Dict[str, Any]]:
+    """
+    Exporte la partition de *month* encore rattachée (simples lectures: les
+    écritures sur ``events`` ne sont pas bloquées), puis la détache et la
+    supprime dans une transaction courte — ``DETACH`` prend un verrou ACCESS
+    EXCLUSIVE sur ``events`` qui ne doit pas couvrir l'export. Si des lignes
+    sont arrivées entre l'export et le détachement, rien n'est supprimé et
+    None est renvoyé: le passage suivant réexporte la partition.
+    """
+    name = partition_name(month)
+    month_key = f"{month:%Y_%m}"
+    run_ids = (
+        await session.execute(text(f"SELECT DISTINCT run_id FROM {name}"))
+    ).scalars().all()
+    total = 0
+    # Un fichier par run: lecture ciblée à la demande, mémoire bornée par run
+    for run_id in run_ids:
+        cond = "run_id IS NULL" if run_id is None else "run_id = :r"
+        rows = (
+            await session.execute(
+                text(
+                    "SELECT id, run_id, node_id, \"timestamp\", level, message, request_id, extra "
+                    f"FROM {name} WHERE {cond} ORDER BY \"timestamp\", id"
+                ),
+                {} if run_id is None else {"r": run_id},
+            )
+        ).all()
+        # Transaction de lecture close avant l'écriture du fichier
+        await session.rollback()
+        total += await asyncio.to_thread(
+            archive.write_run_events,
+            month_key,
+            str(run_id) if run_id else None,
+            [_event_row(r) for r in rows],
+        )
+    await session.rollback()
+
+    await session.execute(text(f"ALTER TABLE events DETACH PARTITION {name}"))
+    count = (await session.execute(text(f"SELECT count(*) FROM {name}"))).scalar_one()
+    if count != total:
+        await session.rollback()
+        log.warning("partition %s modifiée pendant l'export (%s/%s lignes): reportée", name, total, count)
+        return None
+    await session.execute(text(f"DROP TABLE {name}"))
+    await session.commit()
+
+    manifest = {
+        "partition": name,
+        "from": month.isoformat(),
+        "to": add_months(month).isoformat(),
+        "rows": total,
+        "runs": len(run_ids),
+        "archived_at": datetime.now(timezone.utc).isoformat(),
+    }
+    await asyncio.to_thread(archive.write_manifest, month_key, manifest)
+    return manifest
+
+
+async def archive_old_events(session: AsyncSession, *, older_than: datetime) -> List[Dict[str, Any]]:
+    """Archive les partitions dont le mois entier précède *older_than*."""
+    if not await is_partitioned(session):
+        return []
+    # Lignes anciennes égarées dans la partition par défaut: leur mois devient une partition
+    stray = (
+        await session.execute(
+            text(
+                f"SELECT DISTINCT date_trunc('month', \"timestamp\", 'UTC') FROM {DEFAULT_PARTITION} "
+                "WHERE \"timestamp\" < :cutoff"
+            ),
+            {"cutoff": older_than},
+        )
+    ).scalars().all()
+    for month in stray:
+        await ensure_event_partition(session, month)
+    await session.commit()
+
+    out = []
+    for month in await list_event_partitions(session):
+        if add_months(month) > older_than:
+            continue
+        manifest = await archive_event_partition(session, month)
+        if manifest is not None:
+            out.append(manifest)
+    return out
+
+
+async def prune_run_dirs(session: AsyncSession, *, older_than: datetime) -> List[str]:
+    """Archive puis supprime les dossiers .runs/<run_id> des runs terminés avant *older_than*."""
+    root = archive.runs_root()
+    run_ids = (
+        await session.execute(
+            text(
+                "SELECT id FROM runs WHERE ended_at IS NOT NULL AND ended_at < :cutoff "
+                "AND status::text IN ('completed', 'failed', 'canceled')"
+            ),
+            {"cutoff": older_than},
+        )
+    ).scalars().all()
+    pruned = []
+    for run_id in run_ids:
+        run_dir = root / str(run_id)
+        if not run_dir.is_dir():
+            continue
+        try:
+            if await asyncio.to_thread(archive.archive_run_dir, run_dir):
+                pruned.append(str(run_id))
+        except Exception:
+            log.warning("archivage du dossier %s échoué", run_dir, exc_info=True)
+    return pruned
+
+
+async def run_retention(session: AsyncSession, *, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Passage complet: partitions à venir, archivage des événements et des dossiers de runs."""
+    now = now or datetime.now(timezone.utc)
+    summary: Dict[str, Any] = {"partitions_created": await ensure_event_partitions(session, now=now)}
+    days = events_retention_days()
+    if days:
+        summary["events_archived"] = await archive_old_events(
+            session, older_than=now - timedelta(days=days)
+        )
+    days = runs_dir_retention_days()
+    if days:
+        summary["runs_pruned"] = await prune_run_dirs(session, older_than=now - timedelta(days=days))
+    return summary
+
+
+async def retention_loop(sessionmaker, interval_s: Optional[float] = None) -> None:
+    """Boucle de rétention (tâche de fond de l'API); un échec n'interrompt pas la boucle."""
+    interval = retention_interval_s() if interval_s is None else interval_s
+    if interval <= 0:
+        return
+    while True:
+        await anyio.sleep(interval)
+        try:
+            async with sessionmaker() as session:
+                res = await run_retention(session)
+            log.debug("rétention: %s", res)
+        except Exception:
+            log.warning("job de rétention échoué", exc_info=True)
+
+
+async def load_archived_events(run_id: Any) -> List[Dict[str, Any]]:
+    """Événements archivés d'un run (lecture hors event loop)."""
+    return await asyncio.to_thread(archive.read_archived_events, str(run_id))
@@ -0,0 +1,716 @@
+# core/storage/rollups.py
+"""
+Agrégats pré-calculés pour le tableau de bord (table ``dashboard_rollups``).
+
+Les runs et feedbacks sont regroupés en tranches fixes de 5 minutes
+(``GRAIN``) via ``date_bin``; les séries demandées par l'API (1h, 1j...) sont
+obtenues en re-regroupant ces tranches en SQL, sans relire les tables brutes.
+
+- ``kind='run'``: une ligne par (tranche, statut) avec nombre de runs,
+  somme/histogramme des durées et tokens LLM (événements NODE_COMPLETED).
+- ``kind='feedback'``: une ligne par (tranche, décile de score).
+
+Rafraîchissement incrémental (``rollup_state``, ligne ``dashboard``):
+seules les tranches postérieures à la plus ancienne modification possible
+sont recalculées — runs créés ou ayant reçu un événement/audit depuis le
+dernier passage, runs encore actifs au passage précédent (``pending_from``)
+et feedbacks récents. Le watermark est reculé de ``WATERMARK_LAG`` pour ne
+pas manquer les transactions validées en retard. Le premier passage (sans
+watermark) se limite aux DASHBOARD_ROLLUP_BACKFILL_DAYS derniers jours.
+
+Le rafraîchissement n'est jamais exécuté dans la requête HTTP: la compaction
+périodique (``compaction_loop``) s'en charge et une lecture d'agrégats trop
+anciens (DASHBOARD_ROLLUP_MAX_AGE_S) en planifie un en tâche de fond
+(``schedule_refresh``).
+
+Les tranches d'un jour ou plus sont découpées en jours civils du fuseau
+demandé (heure d'été comprise); les tranches plus fines partent du minuit
+local à l'offset du début de la fenêtre.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import time
+from datetime import datetime, time as dtime, timedelta, timezone, tzinfo
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+import anyio
+from sqlalchemy.ext.asyncio import AsyncSession
+
+log = logging.getLogger(__name__)
+
+GRAIN = timedelta(minutes=5)
+DAY = timedelta(days=1)
+WATERMARK_LAG = timedelta(minutes=1)
+ORIGIN = datetime(2000, 1, 3, tzinfo=timezone.utc)  # lundi, minuit UTC
+STATE_NAME = "dashboard"
+
+# Bornes (secondes) de l'histogramme des durées de run
+DURATION_BOUNDS_S: Sequence[int] = (1, 2, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, 7200)
+TERMINAL = ("completed", "failed", "canceled")
+
+_last_refresh_monotonic: float = 0.0
+_refresh_pending = False
+
+
+def max_age_s() -> float:
+    """Âge max toléré avant de planifier un rafraîchissement (DASHBOARD_ROLLUP_MAX_AGE_S)."""
+    try:
+        raw = os.getenv("DASHBOARD_ROLLUP_MAX_AGE_S", "")
+        return float(raw.strip()) if raw.strip() else 30.0
+    except Exception:
+        return 30.0
+
+
+def backfill_days() -> int:
+    """Profondeur du premier passage sans watermark (DASHBOARD_ROLLUP_BACKFILL_DAYS, 0 = illimitée)."""
+    try:
+        raw = os.getenv("DASHBOARD_ROLLUP_BACKFILL_DAYS", "")
+        return max(0, int(raw.strip())) if raw.strip() else 90
+    except Exception:
+        return 90
+
+
+def origin_for(tz: Optional[tzinfo], at: Optional[datetime] = None) -> datetime:
+    """Origine des tranches infra-journalières: minuit local à l'offset en vigueur à *at*."""
+    if tz is None:
+        return ORIGIN
+    offset = (at or ORIGIN).astimezone(tz).utcoffset() or timedelta(0)
+    return ORIGIN - offset
+
+
+def _civil_days(tz: Optional[tzinfo], bucket: timedelta) -> bool:
+    return tz is not None and bucket >= DAY and not bucket % DAY
+
+
+def bucket_starts(start: datetime, end: datetime, bucket: timedelta, tz: Optional[tzinfo] = None) -> List[datetime]:
+    """Débuts (UTC) des tranches couvrant [start, end), alignés comme ``query_dashboard``."""
+    out: List[datetime] = []
+    if _civil_days(tz, bucket):
+        # Jours civils du fuseau: 23h/25h aux changements d'heure
+        origin = ORIGIN.date()
+        day = start.astimezone(tz).date()
+        day = origin + ((day - origin) // bucket) * bucket
+        while True:
+            cursor = datetime.combine(day, dtime(), tzinfo=tz).astimezone(timezone.utc)
+            if cursor >= end:
+                return out
+            out.append(cursor)
+            day += bucket
+    origin = origin_for(tz, start)
+    cursor = origin + ((start - origin) // bucket) * bucket
+    while cursor < end:
+        out.append(cursor)
+        cursor += bucket
+    return out
+
+
+def _bounds_sql() -> str:
+    return "ARRAY[" + ",".join(f"{b}::float8" for b in DURATION_BOUNDS_S) + "]"
+
+
+def _hist_sql() -> str:
+    return "ARRAY[" + ", ".join(
+        f"(count(*) FILTER (WHERE hb = {i}))::int" for i in range(len(DURATION_BOUNDS_S) + 1)
+    ) + "]"
+
+
+_DIRTY_FROM_SQL = """
+SELECT least(
+    CAST(:pending_from AS timestamptz),
+    (SELECT min(coalesce(r.started_at, r.created_at)) FROM runs r WHERE r.created_at > :wm),
+    (SELECT min(coalesce(r.started_at, r.created_at)) FROM runs r
+       WHERE r.id IN (SELECT e.run_id FROM events e WHERE e.timestamp > :wm AND e.run_id IS NOT NULL)),
+    (SELECT min(coalesce(r.started_at, r.created_at)) FROM runs r
+       WHERE r.id IN (SELECT a.run_id FROM audit_logs a WHERE a.created_at > :wm AND a.run_id IS NOT NULL))
+)
+"""
+
+_RUNS_INSERT_SQL = f"""
+WITH r AS (
+    SELECT id,
+           status::text AS st,
+           date_bin(CAST(:grain AS interval), coalesce(started_at, created_at),
+                    CAST(:origin AS timestamptz)) AS b,
+           CASE WHEN started_at IS NOT NULL AND ended_at IS NOT NULL AND ended_at >= started_at
+                THEN extract(epoch FROM ended_at - started_at) END AS dur_s
+    FROM runs
+    WHERE coalesce(started_at, created_at) >= :since
+),
+tok AS (
+    SELECT e.run_id,
+           sum(CASE WHEN jsonb_typeof(j.m -> 'usage' -> 'prompt_tokens') = 'number'
+                    THEN (j.m -> 'usage' ->> 'prompt_tokens')::numeric ELSE 0 END) AS pt,
+           sum(CASE WHEN jsonb_typeof(j.m -> 'usage' -> 'completion_tokens') = 'number'
+                    THEN (j.m -> 'usage' ->> 'completion_tokens')::numeric ELSE 0 END) AS ct
+    FROM events e
+    CROSS JOIN LATERAL (
+        SELECT safe_jsonb(e.message) AS m
+    ) j
+    WHERE e.level = 'NODE_COMPLETED' AND e.run_id IN (SELECT id FROM r)
+    GROUP BY e.run_id
+),
+x AS (
+    SELECT r.*, width_bucket(r.dur_s, {_bounds_sql()}) AS hb,
+           coalesce(tok.pt, 0) AS pt, coalesce(tok.ct, 0) AS ct
+    FROM r LEFT JOIN tok ON tok.run_id = r.id
+)
+INSERT INTO dashboard_rollups
+    (bucket_start, kind, key, count, duration_count, duration_sum_ms, duration_hist,
+     prompt_tokens, completion_tokens)
+SELECT b, 'run', st, count(*), count(dur_s), coalesce(round(sum(dur_s) * 1000), 0)::bigint,
+       {_hist_sql()}, sum(pt)::bigint, sum(ct)::bigint
+FROM x
+GROUP BY b, st
+"""
+
+_FEEDBACK_INSERT_SQL = """
+INSERT INTO dashboard_rollups (bucket_start, kind, key, count)
+SELECT date_bin(CAST(:grain AS interval), created_at, CAST(:origin AS timestamptz)),
+       'feedback',
+       CASE WHEN score IS NULL THEN 'none'
+            ELSE (least(greatest(score, 0), 99) / 10 * 10)::text END,
+       count(*)
+FROM feedbacks
+WHERE created_at >= :since
+GROUP BY 1, 3
+"""
+
+
+async def _grain_start(session: AsyncSession, ts: datetime) -> datetime:
+    return (
+        await session.execute(
+            text(
+                "SELECT date_bin(CAST(:grain AS interval), CAST(:ts AS timestamptz),"
+                " CAST(:origin AS timestamptz))"
+            ),
+            {"grain": GRAIN, "ts": ts, "origin": ORIGIN},
+        )
+    ).scalar_one()
+
+
+async def refresh_dashboard_rollup(session: AsyncSession, *, full: bool = False) -> Dict[str, Any]:
+    """
+    Recalcule les tranches potentiellement modifiées depuis le dernier passage
+    (``full``: reconstruction complète, sans borne de backfill).
+    Sérialisé par verrou consultatif; valide la transaction de *session*.
+    """
+    global _last_refresh_monotonic
+    await session.execute(text("SELECT pg_advisory_xact_lock(hashtext('rollup:dashboard'))"))
+    state = (
+        await session.execute(
+            text("SELECT watermark, pending_from FROM rollup_state WHERE name = :n"),
+            {"n": STATE_NAME},
+        )
+    ).first()
+    now = (await session.execute(text("SELECT now()"))).scalar_one()
+    wm = None if full or state is None else state.watermark
+    params = {"grain": GRAIN, "origin": ORIGIN}
+
+    if wm is None:
+        days = 0 if full else backfill_days()
+        run_since = now - timedelta(days=days) if days else datetime(1970, 1, 1, tzinfo=timezone.utc)
+        fb_since = run_since
+    else:
+        run_since = (
+            await session.execute(
+                text(_DIRTY_FROM_SQL), {"pending_from": state.pending_from, "wm": wm}
+            )
+        ).scalar_one()
+        fb_since = (
+            await session.execute(
+                text("SELECT min(created_at) FROM feedbacks WHERE created_at > :wm"), {"wm": wm}
+            )
+        ).scalar_one()
+
+    refreshed = {"runs_from": None, "feedbacks_from": None}
+    if run_since is not None:
+        since = await _grain_start(session, run_since)
+        await session.execute(
+            text("DELETE FROM dashboard_rollups WHERE kind = 'run' AND bucket_start >= :since"),
+            {"since": since},
+        )
+        await session.execute(text(_RUNS_INSERT_SQL), {**params, "since": since})
+        refreshed["runs_from"] = since
+    if fb_since is not None:
+        since = await _grain_start(session, fb_since)
+        await session.execute(
+            text("DELETE FROM dashboard_rollups WHERE kind = 'feedback' AND bucket_start >= :since"),
+            {"since": since},
+        )
+        await session.execute(text(_FEEDBACK_INSERT_SQL), {**params, "since": since})
+        refreshed["feedbacks_from"] = since
+
+    pending = (
+        await session.execute(
+            text(
+                "SELECT min(coalesce(started_at, created_at)) FROM runs "
+                "WHERE status::text NOT IN ('completed', 'failed', 'canceled')"
+            )
+        )
+    ).scalar_one()
+    await session.execute(
+        text(
+            """
+            INSERT INTO rollup_state (name, watermark, pending_from, updated_at)
+            VALUES (:n, :wm, :pending, now())
+            ON CONFLICT (name) DO UPDATE
+            SET watermark = excluded.watermark, pending_from = excluded.pending_from, updated_at = now()
+            """
+        ),
+        {"n": STATE_NAME, "wm": now - WATERMARK_LAG, "pending": pending},
+    )
+    await session.commit()
+    _last_refresh_monotonic = time.monotonic()
+    refreshed["refreshed_at"] = now
+    return refreshed
+
+
+def refresh_due() -> bool:
+    """Vrai si le dernier passage (dans ce process) date de plus de max_age_s()."""
+    return not _last_refresh_monotonic or time.monotonic() - _last_refresh_monotonic >= max_age_s()
+
+
+async def _refresh_in_background(sessionmaker) -> None:
+    global _refresh_pending
+    try:
+        async with sessionmaker() as session:
+            await refresh_dashboard_rollup(session)
+    except Exception:
+        log.warning("rafraîchissement des rollups du tableau de bord échoué", exc_info=True)
+    finally:
+        _refresh_pending = False
+
+
+def schedule_refresh(task_group, sessionmaker) -> bool:
+    """
+    Planifie un rafraîchissement dans *task_group* si les agrégats sont trop
+    anciens et qu'aucun n'est en cours; la lecture sert l'état courant.
+    """
+    global _refresh_pending
+    if _refresh_pending or not refresh_due():
+        return False
+    _refresh_pending = True
+    task_group.start_soon(_refresh_in_background, sessionmaker)
+    return True
+
+
+def reset_refresh_clock() -> None:
+    global _last_refresh_monotonic, _refresh_pending
+    _last_refresh_monotonic = 0.0
+    _refresh_pending = False
+
+
+def histogram_percentile(hist: Sequence[int], pct: float) -> Optional[float]:
+    """Percentile (ms) estimé par interpolation linéaire dans l'histogramme des durées."""
+    total = sum(hist or ())
+    if total <= 0:
+        return None
+    rank = pct * total
+    seen = 0
+    for i, n in enumerate(hist):
+        if n <= 0:
+            continue
+        if seen + n >= rank:
+            lo = 0.0 if i == 0 else float(DURATION_BOUNDS_S[i - 1])
+            if i >= len(DURATION_BOUNDS_S):
+                return lo * 1000.0
+            hi = float(DURATION_BOUNDS_S[i])
+            frac = (rank - seen) / n
+            return round((lo + (hi - lo) * frac) * 1000.0, 1)
+        seen += n
+    return float(DURATION_BOUNDS_S[-1]) * 1000.0
+
+
+def _merge(a: Optional[List[int]], b: Optional[Sequence[int]]) -> List[int]:
+    size = len(DURATION_BOUNDS_S) + 1
+    out = list(a or [0] * size)
+    for i, v in enumerate(b or ()):
+        if i < size:
+            out[i] += int(v or 0)
+    return out
+
+
+async def query_dashboard(
+    session: AsyncSession,
+    *,
+    start: datetime,
+    end: datetime,
+    bucket: timedelta,
+    tz: Optional[tzinfo] = None,
+) -> Dict[str, Any]:
+    """Séries re-regroupées (date_bin) sur [start, end) depuis ``dashboard_rollups``."""
+    starts = bucket_starts(start, end, bucket, tz)
+    # Même alignement que date_bin: la première tranche englobe *start*
+    first = starts[0] if starts else start
+    params: Dict[str, Any] = {"bucket": bucket, "start": first, "end": end}
+    if _civil_days(tz, bucket):
+        # Minuit local (date_trunc('day') généralisé à N jours), heure d'été comprise
+        bin_sql = (
+            "date_bin(CAST(:bucket AS interval), bucket_start AT TIME ZONE CAST(:tz AS text),"
+            " CAST(:origin AS timestamp)) AT TIME ZONE CAST(:tz AS text)"
+        )
+        params.update(tz=getattr(tz, "key", None) or str(tz), origin=ORIGIN.replace(tzinfo=None))
+    else:
+        bin_sql = "date_bin(CAST(:bucket AS interval), bucket_start, CAST(:origin AS timestamptz))"
+        params["origin"] = origin_for(tz, start)
+    run_rows = (
+        await session.execute(
+            text(
+                f"""
+                SELECT {bin_sql} AS b,
+                       key,
+                       sum(count)::bigint AS n, sum(duration_count)::bigint AS dn,
+                       sum(duration_sum_ms)::bigint AS dsum,
+                       sum(prompt_tokens)::bigint AS pt, sum(completion_tokens)::bigint AS ct,
+                       array_agg(duration_hist) FILTER (WHERE duration_hist IS NOT NULL) AS hists
+                FROM dashboard_rollups
+                WHERE kind = 'run' AND bucket_start >= :start AND bucket_start < :end
+                GROUP BY 1, 2
+                ORDER BY 1
+                """
+            ),
+            params,
+        )
+    ).all()
+    fb_rows = (
+        await session.execute(
+            text(
+                """
+                SELECT key, sum(count)::bigint AS n
+                FROM dashboard_rollups
+                WHERE kind = 'feedback' AND bucket_start >= :start AND bucket_start < :end
+                GROUP BY key
+                """
+            ),
+            {"start": first, "end": end},
+        )
+    ).all()
+
+    # Série dense: une entrée par tranche, même vide
+    series: Dict[datetime, Dict[str, Any]] = {}
+    for cursor in starts:
+        series[cursor] = {
+            "start": cursor,
+            "runs": {},
+            "total": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "_hist": None,
+            "_dn": 0,
+            "_dsum": 0,
+        }
+
+    totals_hist: Optional[List[int]] = None
+    totals_runs: Dict[str, int] = {}
+    dn_total = dsum_total = pt_total = ct_total = 0
+    for row in run_rows:
+        entry = series.get(row.b)
+        if entry is None:
+            continue
+        entry["runs"][row.key] = entry["runs"].get(row.key, 0) + int(row.n or 0)
+        entry["total"] += int(row.n or 0)
+        entry["prompt_tokens"] += int(row.pt or 0)
+        entry["completion_tokens"] += int(row.ct or 0)
+        entry["_dn"] += int(row.dn or 0)
+        entry["_dsum"] += int(row.dsum or 0)
+        for h in row.hists or ():
+            entry["_hist"] = _merge(entry["_hist"], h)
+            totals_hist = _merge(totals_hist, h)
+        totals_runs[row.key] = totals_runs.get(row.key, 0) + int(row.n or 0)
+        dn_total += int(row.dn or 0)
+        dsum_total += int(row.dsum or 0)
+        pt_total += int(row.pt or 0)
+        ct_total += int(row.ct or 0)
+
+    buckets = []
+    for entry in series.values():
+        hist = entry.pop("_hist")
+        dn = entry.pop("_dn")
+        dsum = entry.pop("_dsum")
+        entry["duration_avg_ms"] = round(dsum / dn, 1) if dn else None
+        entry["duration_p50_ms"] = histogram_percentile(hist or [], 0.5)
+        entry["duration_p95_ms"] = histogram_percentile(hist or [], 0.95)
+        entry["total_tokens"] = entry["prompt_tokens"] + entry["completion_tokens"]
+        buckets.append(entry)
+
+    total_runs = sum(totals_runs.values())
+    finished = sum(totals_runs.get(s, 0) for s in TERMINAL)
+    band_order = [str(i * 10) for i in range(10)] + ["none"]
+    fb = {row.key: int(row.n or 0) for row in fb_rows}
+    return {
+        "buckets": buckets,
+        "totals": {
+            "runs": totals_runs,
+            "total": total_runs,
+            "success_rate": (
+                round(totals_runs.get("completed", 0) / finished, 4) if finished else None
+            ),
+            "duration_avg_ms": round(dsum_total / dn_total, 1) if dn_total else None,
+            "duration_p50_ms": histogram_percentile(totals_hist or [], 0.5),
+            "duration_p95_ms": histogram_percentile(totals_hist or [], 0.95),
+            "prompt_tokens": pt_total,
+            "completion_tokens": ct_total,
+            "total_tokens": pt_total + ct_total,
+        },
+        "feedback_scores": [
+            {"band": band, "count": fb.get(band, 0)} for band in band_order if band in fb or band != "none"
+        ],
+        "feedbacks_total": sum(fb.values()),
+    }
+
+
+def bucket_count(start: datetime, end: datetime, bucket: timedelta) -> int:
+    return max(0, math.ceil((end - start) / bucket))
+
+
+# ---------------------------------------------------------------------------
+# Agrégats d'usage horaires / journaliers (usage_rollups_hourly / _daily)
+# ---------------------------------------------------------------------------
+#
+# Historique durable (les compteurs Prometheus repartent à zéro au
+# redémarrage) par (tranche, kind, statut, rôle, provider, modèle):
+# - ``kind='node'``: événements NODE_COMPLETED / NODE_FAILED (durée, latence
+#   et tokens lus dans le message JSON, rôle depuis ``nodes``);
+# - ``kind='run'``: événements RUN_COMPLETED / RUN_FAILED / RUN_CANCELED
+#   (durée depuis ``runs``).
+#
+# Les événements terminaux servent de journal append-only des nœuds et runs:
+# chaque passage de compaction ne lit que ceux postérieurs au watermark
+# (ligne ``usage`` de ``rollup_state``) et les ajoute aux tranches horaires;
+# les journées touchées sont ensuite recalculées depuis les tranches horaires.
+
+USAGE_STATE_NAME = "usage"
+USAGE_GRANULARITIES = {"hour": "usage_rollups_hourly", "day": "usage_rollups_daily"}
+USAGE_DIMENSIONS = ("status", "role", "provider", "model")
+_USAGE_LEVELS = ("NODE_COMPLETED", "NODE_FAILED", "RUN_COMPLETED", "RUN_FAILED", "RUN_CANCELED")
+
+
+def rollup_interval_s() -> float:
+    """Période de la compaction en tâche de fond (ROLLUP_INTERVAL_S, 0 = désactivée)."""
+    try:
+        raw = os.getenv("ROLLUP_INTERVAL_S", "")
+        return max(0.0, float(raw.strip())) if raw.strip() else 300.0
+    except Exception:
+        return 300.0
+
+
+def hourly_retention_days() -> int:
+    """Rétention des tranches horaires (ROLLUP_HOURLY_RETENTION_DAYS, min 2, 0 = illimitée)."""
+    try:
+        raw = os.getenv("ROLLUP_HOURLY_RETENTION_DAYS", "")
+        days = int(raw.strip()) if raw.strip() else 90
+    except Exception:
+        days = 90
+    return 0 if days <= 0 else max(2, days)
+
+
+def _num(expr: str) -> str:
+    return f"CASE WHEN jsonb_typeof({expr}) = 'number' THEN ({expr} #>> '{{}}')::numeric END"
+
+
+def _str(*exprs: str) -> str:
+    return "coalesce(" + ", ".join(f"nullif({e}, '')" for e in exprs) + ", '')"
+
+
+_USAGE_HOURLY_SQL = f"""
+WITH e AS (
+    SELECT e.timestamp AS ts, e.level, e.run_id, e.node_id,
+           CASE WHEN jsonb_typeof(j.m) = 'object' THEN j.m END AS m
+    FROM events e
+    CROSS JOIN LATERAL (SELECT safe_jsonb(e.message) AS m) j
+    WHERE e.timestamp > :lo AND e.timestamp <= :hi
+      AND e.level IN ({", ".join(f"'{lvl}'" for lvl in _USAGE_LEVELS)})
+),
+x AS (
+    SELECT date_trunc('hour', e.ts, 'UTC') AS b,
+           CASE WHEN e.level LIKE 'NODE\\_%' THEN 'node' ELSE 'run' END AS kind,
+           CASE WHEN e.level LIKE '%\\_COMPLETED' THEN 'completed'
+                WHEN e.level LIKE '%\\_FAILED' THEN 'failed'
+                ELSE 'canceled' END AS status,
+           CASE WHEN e.level LIKE 'NODE\\_%' THEN left({_str(
+               "(SELECT n.role FROM nodes n WHERE n.id = e.node_id)",
+               "(SELECT n.role FROM nodes n WHERE e.node_id IS NULL AND n.run_id = e.run_id"
+               " AND n.key = e.m ->> 'node_key' LIMIT 1)",
+               "e.m ->> 'role'",
+           )}, 64) ELSE '' END AS role,
+           left({_str("e.m ->> 'provider'", "e.m -> 'meta' ->> 'provider'")}, 64) AS provider,
+           left({_str("e.m ->> 'model_used'", "e.m ->> 'model'", "e.m -> 'meta' ->> 'model'")}, 128)
+               AS model,
+           CASE WHEN e.level LIKE 'NODE\\_%' THEN {_num("e.m -> 'duration_ms'")}
+                ELSE (SELECT CASE WHEN r.started_at IS NOT NULL AND r.ended_at >= r.started_at
+                                  THEN extract(epoch FROM r.ended_at - r.started_at) * 1000 END
+                      FROM runs r WHERE r.id = e.run_id) END AS dur_ms,
+           {_num("e.m -> 'latency_ms'")} AS lat_ms,
+           coalesce({_num("e.m -> 'usage' -> 'prompt_tokens'")}, 0) AS pt,
+           coalesce({_num("e.m -> 'usage' -> 'completion_tokens'")}, 0) AS ct
+    FROM e
+)
+INSERT INTO usage_rollups_hourly AS u
+    (bucket_start, kind, status, role, provider, model, count, duration_count, duration_sum_ms,
+     duration_max_ms, latency_count, latency_sum_ms, prompt_tokens, completion_tokens)
+SELECT b, kind, status, role, provider, model, count(*), count(dur_ms),
+       coalesce(round(sum(dur_ms)), 0)::bigint, coalesce(round(max(dur_ms)), 0)::bigint,
+       count(lat_ms), coalesce(round(sum(lat_ms)), 0)::bigint, sum(pt)::bigint, sum(ct)::bigint
+FROM x
+GROUP BY b, kind, status, role, provider, model
+ON CONFLICT (kind, bucket_start, status, role, provider, model) DO UPDATE SET
+    count = u.count + excluded.count,
+    duration_count = u.duration_count + excluded.duration_count,
+    duration_sum_ms = u.duration_sum_ms + excluded.duration_sum_ms,
+    duration_max_ms = greatest(u.duration_max_ms, excluded.duration_max_ms),
+    latency_count = u.latency_count + excluded.latency_count,
+    latency_sum_ms = u.latency_sum_ms + excluded.latency_sum_ms,
+    prompt_tokens = u.prompt_tokens + excluded.prompt_tokens,
+    completion_tokens = u.completion_tokens + excluded.completion_tokens
+"""
+
+_USAGE_DAILY_SQL = """
+INSERT INTO usage_rollups_daily
+    (bucket_start, kind, status, role, provider, model, count, duration_count, duration_sum_ms,
+     duration_max_ms, latency_count, latency_sum_ms, prompt_tokens, completion_tokens)
+SELECT date_trunc('day', bucket_start, 'UTC'), kind, status, role, provider, model,
+       sum(count), sum(duration_count), sum(duration_sum_ms), max(duration_max_ms),
+       sum(latency_count), sum(latency_sum_ms), sum(prompt_tokens), sum(completion_tokens)
+FROM usage_rollups_hourly
+WHERE bucket_start >= :since
+GROUP BY 1, 2, 3, 4, 5, 6
+"""
+
+
+async def compact_usage_rollups(session: AsyncSession) -> Dict[str, Any]:
+    """
+    Ajoute aux tranches horaires les événements terminaux arrivés depuis le
+    watermark, recalcule les journées touchées et purge les tranches horaires
+    expirées. Sérialisé par verrou consultatif; valide la transaction.
+    """
+    await session.execute(text("SELECT pg_advisory_xact_lock(hashtext('rollup:usage'))"))
+    wm = (
+        await session.execute(
+            text("SELECT watermark FROM rollup_state WHERE name = :n"), {"n": USAGE_STATE_NAME}
+        )
+    ).scalar_one_or_none()
+    now = (await session.execute(text("SELECT now()"))).scalar_one()
+    lo = wm or datetime(1970, 1, 1, tzinfo=timezone.utc)
+    hi = now - WATERMARK_LAG
+    if hi <= lo:
+        await session.rollback()
+        return {"from": lo, "to": lo, "hourly_rows": 0}
+
+    res = await session.execute(text(_USAGE_HOURLY_SQL), {"lo": lo, "hi": hi})
+    hourly_rows = int(res.rowcount or 0)
+    if hourly_rows:
+        day_from = (
+            await session.execute(
+                text("SELECT date_trunc('day', CAST(:lo AS timestamptz), 'UTC')"), {"lo": lo}
+            )
+        ).scalar_one()
+        await session.execute(
+            text("DELETE FROM usage_rollups_daily WHERE bucket_start >= :since"), {"since": day_from}
+        )
+        await session.execute(text(_USAGE_DAILY_SQL), {"since": day_from})
+
+    days = hourly_retention_days()
+    if days:
+        await session.execute(
+            text("DELETE FROM usage_rollups_hourly WHERE bucket_start < :cutoff"),
+            {"cutoff": now - timedelta(days=days)},
+        )
+    await session.execute(
+        text(
+            """
+            INSERT INTO rollup_state (name, watermark, updated_at)
+            VALUES (:n, :wm, now())
+            ON CONFLICT (name) DO UPDATE SET watermark = excluded.watermark, updated_at = now()
+            """
+        ),
+        {"n": USAGE_STATE_NAME, "wm": hi},
+    )
+    await session.commit()
+    return {"from": lo, "to": hi, "hourly_rows": hourly_rows}
+
+
+async def run_compaction(session: AsyncSession) -> Dict[str, Any]:
+    """Passage complet de la tâche de fond: agrégats d'usage puis tableau de bord."""
+    usage = await compact_usage_rollups(session)
+    await refresh_dashboard_rollup(session)
+    return usage
+
+
+async def compaction_loop(sessionmaker, interval_s: Optional[float] = None) -> None:
+    """Boucle de compaction (tâche de fond de l'API); un échec n'interrompt pas la boucle."""
+    interval = rollup_interval_s() if interval_s is None else interval_s
+    if interval <= 0:
+        return
+    while True:
+        await anyio.sleep(interval)
+        try:
+            async with sessionmaker() as session:
+                res = await run_compaction(session)
+            log.debug("rollups compactés: %s", res)
+        except Exception:
+            log.warning("compaction des rollups échouée", exc_info=True)
+
+
+async def query_usage_rollups(
+    session: AsyncSession,
+    *,
+    granularity: str,
+    start: datetime,
+    end: datetime,
+    kind: Optional[str] = None,
+    group_by: Sequence[str] = (),
+    filters: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    """Séries [start, end) regroupées par tranche et par les dimensions *group_by*."""
+    table = USAGE_GRANULARITIES[granularity]
+    dims = [d for d in USAGE_DIMENSIONS if d in group_by]
+    where = ["bucket_start >= :start", "bucket_start < :end"]
+    params: Dict[str, Any] = {"start": start, "end": end}
+    if kind:
+        where.append("kind = :kind")
+        params["kind"] = kind
+    for dim, value in (filters or {}).items():
+        if dim in USAGE_DIMENSIONS and value is not None:
+            where.append(f"{dim} = :f_{dim}")
+            params[f"f_{dim}"] = value
+    cols = ", ".join(["bucket_start", "kind", *dims])
+    rows = (
+        await session.execute(
+            text(
+                f"""
+                SELECT {cols},
+                       sum(count)::bigint AS n, sum(duration_count)::bigint AS dn,
+                       sum(duration_sum_ms)::bigint AS dsum, max(duration_max_ms)::bigint AS dmax,
+                       sum(latency_count)::bigint AS ln, sum(latency_sum_ms)::bigint AS lsum,
+                       sum(prompt_tokens)::bigint AS pt, sum(completion_tokens)::bigint AS ct
+                FROM {table}
+                WHERE {" AND ".join(where)}
+                GROUP BY {cols}
+                ORDER BY {cols}
+                """
+            ),
+            params,
+        )
+    ).all()
+    out: List[Dict[str, Any]] = []
+    for row in rows:
+        m = row._mapping
+        dn, ln = int(m["dn"] or 0), int(m["ln"] or 0)
+        out.append(
+            {
+                "start": m["bucket_start"],
+                "kind": m["kind"],
+                **{d: (m[d] if d in dims else None) for d in USAGE_DIMENSIONS},
+                "count": int(m["n"] or 0),
+                "duration_avg_ms": round(int(m["dsum"] or 0) / dn, 1) if dn else None,
+                "duration_max_ms": int(m["dmax"] or 0) if dn else None,
+                "latency_avg_ms": round(int(m["lsum"] or 0) / ln, 1) if ln else None,
+                "prompt_tokens": int(m["pt"] or 0),
+                "completion_tokens": int(m["ct"] or 0),
+            }
+        )
+    return out
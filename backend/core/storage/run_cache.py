@@ -0,0 +1,155 @@
+"""
+Cache LRU en mémoire pour les lectures de runs terminés.
+
+Un run ``completed``/``failed``/``canceled`` n'évolue plus (hors feedbacks,
+audit ou action manuelle) : on mémorise donc les réponses calculées par
+``GET /runs/{id}``, ``/summary`` et ``/incident`` pour éviter de rejouer
+toutes les agrégations SQL à chaque consultation du cockpit.
+
+- ``RUN_CACHE_MAX_ENTRIES`` (défaut 512, 0 = désactivé) borne la taille.
+- ``RUN_CACHE_TTL_S`` (défaut 300, 0 = sans expiration) protège les
+  déploiements multi-process où l'invalidation reste locale.
+
+L'invalidation est explicite via :func:`invalidate_run` (finalisation de run,
+écriture de feedback ou d'audit).
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+TERMINAL_STATUSES = frozenset({"completed", "failed", "canceled"})
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        raw = os.getenv(name, "")
+        return int(raw.strip()) if raw.strip() else default
+    except Exception:
+        return default
+
+
+def _estimate_size(value: Any) -> int:
+    """Taille approximative (octets) de la valeur mise en cache."""
+    dump = getattr(value, "model_dump_json", None)
+    if callable(dump):
+        try:
+            return len(dump())
+        except Exception:
+            pass
+    try:
+        return len(repr(value))
+    except Exception:
+        return 0
+
+
+def is_terminal(status: Any) -> bool:
+    raw = getattr(status, "value", status)
+    return str(raw or "").lower() in TERMINAL_STATUSES
+
+
+class RunCache:
+    """LRU thread-safe; clés = tuples dont le 2e élément est le run_id."""
+
+    def __init__(self, max_entries: int = 512, ttl_s: float = 300.0):
+        self.max_entries = max(0, int(max_entries))
+        self.ttl_s = max(0.0, float(ttl_s))
+        self._data: "OrderedDict[Tuple[Hashable, ...], Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def _drop(self, key: Tuple[Hashable, ...]) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[Any]:
+        kind = str(key[0]) if key else "unknown"
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl_s and time.monotonic() - entry[0] > self.ttl_s:
+                self._drop(key)
+                entry = None
+            if entry is not None:
+                self._data.move_to_end(key)
+            self._publish()
+        _record_lookup(kind, hit=entry is not None)
+        return entry[2] if entry is not None else None
+
+    def set(self, key: Tuple[Hashable, ...], value: Any) -> None:
+        if not self.enabled:
+            return
+        size = _estimate_size(value)
+        with self._lock:
+            self._drop(key)
+            self._data[key] = (time.monotonic(), size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries:
+                oldest = next(iter(self._data))
+                self._drop(oldest)
+            self._publish()
+
+    def invalidate_run(self, run_id: Any) -> int:
+        rid = str(run_id)
+        with self._lock:
+            keys = [k for k in self._data if len(k) > 1 and k[1] == rid]
+            for k in keys:
+                self._drop(k)
+            self._publish()
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self._publish()
+
+    def _publish(self) -> None:
+        try:
+            from core.telemetry.metrics import get_run_cache_entries, get_run_cache_bytes
+
+            get_run_cache_entries().set(len(self._data))
+            get_run_cache_bytes().set(self._bytes)
+        except Exception:
+            pass
+
+
+def _record_lookup(kind: str, *, hit: bool) -> None:
+    try:
+        from core.telemetry.metrics import get_run_cache_requests_total
+
+        get_run_cache_requests_total().labels(kind=kind, result="hit" if hit else "miss").inc()
+    except Exception:
+        pass
+
+
+run_cache = RunCache(
+    max_entries=_env_int("RUN_CACHE_MAX_ENTRIES", 512),
+    ttl_s=_env_int("RUN_CACHE_TTL_S", 300),
+)
+
+
+def invalidate_run(run_id: Any) -> None:
+    """Purge toutes les entrées associées à un run (tolérant aux erreurs)."""
+    if run_id is None:
+        return
+    try:
+        run_cache.invalidate_run(run_id)
+    except Exception:
+        pass
@@ -19,6 +19,27 @@ _run_duration_seconds: Optional[Histogram] = None
 _llm_tokens_total: Optional[Counter] = None
 _llm_cost_total: Optional[Counter] = None
 _http_requests_total_family: Optional[Counter] = None
+_run_cache_requests_total: Optional[Counter] = None
+_run_cache_entries: Optional[Gauge] = None
+_run_cache_bytes: Optional[Gauge] = None
+_db_queries_total: Optional[Counter] = None
+_node_cache_requests_total: Optional[Counter] = None
+_llm_circuit_state: Optional[Gauge] = None
+_llm_circuit_transitions_total: Optional[Counter] = None
+_llm_circuit_rejections_total: Optional[Counter] = None
+_llm_hedges_total: Optional[Counter] = None
+_llm_rate_limit_concurrency: Optional[Gauge] = None
+_llm_rate_limited_total: Optional[Counter] = None
+_llm_rate_limit_wait_seconds_total: Optional[Counter] = None
+_retries_total: Optional[Counter] = None
+_llm_tokens_per_second: Optional[Histogram] = None
+_llm_model_load_seconds: Optional[Histogram] = None
+_llm_request_duration_seconds: Optional[Histogram] = None
+_llm_time_to_first_token_seconds: Optional[Histogram] = None
+_llm_prompt_tokens: Optional[Histogram] = None
+_llm_queue_wait_seconds: Optional[Histogram] = None
+_llm_routing_decisions_total: Optional[Counter] = None
+_structured_output_total: Optional[Counter] = None
 
 
 def metrics_enabled() -> bool:
@@ -139,6 +160,258 @@ def get_llm_cost_total() -> Counter:
     return _llm_cost_total
 
 
+def get_run_cache_requests_total() -> Counter:
+    global _run_cache_requests_total
+    if _run_cache_requests_total is None:
+        _run_cache_requests_total = Counter(
+            "run_cache_requests_total",
+            "Lectures du cache des runs terminés",
+            ["kind", "result"],
+            registry=registry,
+        )
+    return _run_cache_requests_total
+
+
+def get_run_cache_entries() -> Gauge:
+    global _run_cache_entries
+    if _run_cache_entries is None:
+        _run_cache_entries = Gauge(
+            "run_cache_entries",
+            "Nombre d'entrées du cache des runs",
+            registry=registry,
+        )
+    return _run_cache_entries
+
+
+def get_run_cache_bytes() -> Gauge:
+    global _run_cache_bytes
+    if _run_cache_bytes is None:
+        _run_cache_bytes = Gauge(
+            "run_cache_bytes",
+            "Taille estimée (octets) du cache des runs",
+            registry=registry,
+        )
+    return _run_cache_bytes
+
+
+def get_node_cache_requests_total() -> Counter:
+    global _node_cache_requests_total
+    if _node_cache_requests_total is None:
+        _node_cache_requests_total = Counter(
+            "node_cache_requests_total",
+            "Lectures du cache global des résultats de nœuds",
+            ["result"],
+            registry=registry,
+        )
+    return _node_cache_requests_total
+
+
+def get_llm_circuit_state() -> Gauge:
+    global _llm_circuit_state
+    if _llm_circuit_state is None:
+        _llm_circuit_state = Gauge(
+            "llm_circuit_state",
+            "État du disjoncteur LLM (0 closed, 1 half_open, 2 open)",
+            ["provider", "model"],
+            registry=registry,
+        )
+    return _llm_circuit_state
+
+
+def get_llm_circuit_transitions_total() -> Counter:
+    global _llm_circuit_transitions_total
+    if _llm_circuit_transitions_total is None:
+        _llm_circuit_transitions_total = Counter(
+            "llm_circuit_transitions_total",
+            "Changements d'état des disjoncteurs LLM",
+            ["provider", "model", "state"],
+            registry=registry,
+        )
+    return _llm_circuit_transitions_total
+
+
+def get_llm_circuit_rejections_total() -> Counter:
+    global _llm_circuit_rejections_total
+    if _llm_circuit_rejections_total is None:
+        _llm_circuit_rejections_total = Counter(
+            "llm_circuit_rejections_total",
+            "Appels LLM sautés car le circuit est ouvert",
+            ["provider", "model"],
+            registry=registry,
+        )
+    return _llm_circuit_rejections_total
+
+def get_llm_hedges_total() -> Counter:
+    global _llm_hedges_total
+    if _llm_hedges_total is None:
+        _llm_hedges_total = Counter(
+            "llm_hedges_total",
+            "Hedging LLM par provider/modèle principal (eligible, fired, won, lost, budget_exhausted)",
+            ["provider", "model", "result"],
+            registry=registry,
+        )
+    return _llm_hedges_total
+
+def get_llm_rate_limit_concurrency() -> Gauge:
+    global _llm_rate_limit_concurrency
+    if _llm_rate_limit_concurrency is None:
+        _llm_rate_limit_concurrency = Gauge(
+            "llm_rate_limit_concurrency",
+            "Concurrence AIMD courante par provider/modèle",
+            ["provider", "model"],
+            registry=registry,
+        )
+    return _llm_rate_limit_concurrency
+
+
+def get_llm_rate_limited_total() -> Counter:
+    global _llm_rate_limited_total
+    if _llm_rate_limited_total is None:
+        _llm_rate_limited_total = Counter(
+            "llm_rate_limited_total",
+            "Réponses 429 reçues par provider/modèle",
+            ["provider", "model"],
+            registry=registry,
+        )
+    return _llm_rate_limited_total
+
+
+def get_llm_rate_limit_wait_seconds_total() -> Counter:
+    global _llm_rate_limit_wait_seconds_total
+    if _llm_rate_limit_wait_seconds_total is None:
+        _llm_rate_limit_wait_seconds_total = Counter(
+            "llm_rate_limit_wait_seconds_total",
+            "Attente cumulée imposée par le limiteur de débit",
+            ["provider", "model"],
+            registry=registry,
+        )
+    return _llm_rate_limit_wait_seconds_total
+
+
+def get_retries_total() -> Counter:
+    global _retries_total
+    if _retries_total is None:
+        _retries_total = Counter(
+            "retries_total",
+            "Retries demandés au budget unifié par couche (granted, denied)",
+            ["layer", "result"],
+            registry=registry,
+        )
+    return _retries_total
+
+
+def get_llm_tokens_per_second() -> Histogram:
+    global _llm_tokens_per_second
+    if _llm_tokens_per_second is None:
+        _llm_tokens_per_second = Histogram(
+            "llm_tokens_per_second",
+            "Débit de génération (tokens complétion / s) par provider/modèle/rôle",
+            ["provider", "model", "role"],
+            buckets=(1, 2, 5, 10, 20, 40, 80, 160, 320),
+            registry=registry,
+        )
+    return _llm_tokens_per_second
+
+
+def get_llm_model_load_seconds() -> Histogram:
+    global _llm_model_load_seconds
+    if _llm_model_load_seconds is None:
+        _llm_model_load_seconds = Histogram(
+            "llm_model_load_seconds",
+            "Temps de chargement du modèle (démarrage à froid) rapporté par le provider",
+            ["provider", "model"],
+            buckets=(0.05, 0.25, 1, 2.5, 5, 10, 20, 40, 80),
+            registry=registry,
+        )
+    return _llm_model_load_seconds
+
+
+def get_llm_request_duration_seconds() -> Histogram:
+    global _llm_request_duration_seconds
+    if _llm_request_duration_seconds is None:
+        _llm_request_duration_seconds = Histogram(
+            "llm_request_duration_seconds",
+            "Durée d'un appel LLM réussi (hors attente du limiteur)",
+            ["provider", "model", "role"],
+            buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+            registry=registry,
+        )
+    return _llm_request_duration_seconds
+
+
+def get_llm_time_to_first_token_seconds() -> Histogram:
+    global _llm_time_to_first_token_seconds
+    if _llm_time_to_first_token_seconds is None:
+        _llm_time_to_first_token_seconds = Histogram(
+            "llm_time_to_first_token_seconds",
+            "Délai avant le 1er token (rapporté par le provider)",
+            ["provider", "model", "role"],
+            buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30),
+            registry=registry,
+        )
+    return _llm_time_to_first_token_seconds
+
+
+def get_llm_prompt_tokens() -> Histogram:
+    global _llm_prompt_tokens
+    if _llm_prompt_tokens is None:
+        _llm_prompt_tokens = Histogram(
+            "llm_prompt_tokens",
+            "Taille des prompts envoyés (tokens, estimée à défaut d'usage)",
+            ["provider", "model", "role"],
+            buckets=(64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768),
+            registry=registry,
+        )
+    return _llm_prompt_tokens
+
+
+def get_llm_queue_wait_seconds() -> Histogram:
+    global _llm_queue_wait_seconds
+    if _llm_queue_wait_seconds is None:
+        _llm_queue_wait_seconds = Histogram(
+            "llm_queue_wait_seconds",
+            "Attente avant l'appel LLM (limiteur de débit/concurrence)",
+            ["provider", "model", "role"],
+            buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 30),
+            registry=registry,
+        )
+    return _llm_queue_wait_seconds
+
+
+def get_llm_routing_decisions_total() -> Counter:
+    global _llm_routing_decisions_total
+    if _llm_routing_decisions_total is None:
+        _llm_routing_decisions_total = Counter(
+            "llm_routing_decisions_total",
+            "Choix du routeur de modèles par rôle et objectif",
+            ["role", "provider", "model", "goal"],
+            registry=registry,
+        )
+    return _llm_routing_decisions_total
+
+
+def get_structured_output_total() -> Counter:
+    global _structured_output_total
+    if _structured_output_total is None:
+        _structured_output_total = Counter(
+            "structured_output_total",
+            "Sorties JSON structurées par rôle et issue (valid, repaired, diverged, invalid)",
+            ["role", "outcome"],
+            registry=registry,
+        )
+    return _structured_output_total
+
+def get_db_queries_total() -> Counter:
+    global _db_queries_total
+    if _db_queries_total is None:
+        _db_queries_total = Counter(
+            "db_queries_total",
+            "Requêtes SQL exécutées par le process",
+            registry=registry,
+        )
+    return _db_queries_total
+
+
 def generate_latest() -> bytes:
     """Génère le payload texte des métriques."""
     return _generate_latest(registry)
@@ -0,0 +1,272 @@
+"""
+Trace d'exécution par run (spans), exportée au format Chrome trace-event.
+
+Chaque run collecte ses spans (file d'attente, recrutement, appels LLM,
+écritures sidecar/DB, auto-review, finalisation) dans un ``RunTrace`` porté
+par un ``ContextVar``: les tâches asyncio lancées pendant le run en héritent,
+sans paramètre à propager. En fin de run, ``end_run_trace`` écrit
+``<runs_root>/<run_id>/trace.json`` (ouvrable dans chrome://tracing ou
+Perfetto: une ligne par nœud, spans imbriqués = flame chart) et, si un
+collecteur est configuré, exporte les mêmes spans en OTLP.
+
+Variables d'environnement:
+- RUN_TRACE_ENABLED   : 1 (défaut) / 0
+- RUN_TRACE_MAX_SPANS : borne du nombre de spans par run (défaut 20000)
+- RUN_TRACE_OTLP_ENDPOINT (ou OTEL_EXPORTER_OTLP_ENDPOINT): export OTLP/HTTP
+  si ``opentelemetry-sdk`` est installé; ignoré sinon
+"""
+from __future__ import annotations
+
+import contextvars
+import functools
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+log = logging.getLogger("crew.tracing")
+
+TRACE_FILE = "trace.json"
+RUN_LANE = "run"
+
+_current: contextvars.ContextVar[Optional["RunTrace"]] = contextvars.ContextVar("run_trace", default=None)
+_parent: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("run_trace_parent", default=None)
+_lane: contextvars.ContextVar[str] = contextvars.ContextVar("run_trace_lane", default=RUN_LANE)
+
+
+def tracing_enabled() -> bool:
+    return (os.getenv("RUN_TRACE_ENABLED", "1") or "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def _max_spans() -> int:
+    try:
+        return max(1, int(os.getenv("RUN_TRACE_MAX_SPANS", "20000")))
+    except Exception:
+        return 20000
+
+
+class RunTrace:
+    """Spans terminés d'un run (horloge monotone, origine = début du run)."""
+
+    def __init__(self, run_id: str) -> None:
+        self.run_id = run_id
+        self.t0_ns = time.perf_counter_ns()
+        self.epoch_ns = time.time_ns()
+        self.spans: List[Dict[str, Any]] = []
+        self.lanes: Dict[str, int] = {RUN_LANE: 0}
+        self.dropped = 0
+        self.max_spans = _max_spans()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def lane_id(self, lane: str) -> int:
+        with self._lock:
+            return self.lanes.setdefault(lane, len(self.lanes))
+
+    def add(self, span: Dict[str, Any]) -> None:
+        with self._lock:
+            if len(self.spans) >= self.max_spans:
+                self.dropped += 1
+                return
+            self.spans.append(span)
+
+    def to_chrome(self) -> Dict[str, Any]:
+        """Événements "X" (complete) en µs + métadonnées de lignes (une par nœud)."""
+        events: List[Dict[str, Any]] = [
+            {"ph": "M", "name": "process_name", "pid": 1, "tid": 0, "args": {"name": f"run {self.run_id}"}}
+        ]
+        for lane, tid in sorted(self.lanes.items(), key=lambda kv: kv[1]):
+            events.append({"ph": "M", "name": "thread_name", "pid": 1, "tid": tid, "args": {"name": lane}})
+            events.append({"ph": "M", "name": "thread_sort_index", "pid": 1, "tid": tid, "args": {"sort_index": tid}})
+        for s in sorted(self.spans, key=lambda s: (s["start_ns"], s["id"])):
+            events.append(
+                {
+                    "ph": "X",
+                    "name": s["name"],
+                    "cat": s["cat"],
+                    "pid": 1,
+                    "tid": s["tid"],
+                    "ts": round((s["start_ns"] - self.t0_ns) / 1000, 3),
+                    "dur": round((s["end_ns"] - s["start_ns"]) / 1000, 3),
+                    "args": s["args"],
+                }
+            )
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "run_id": self.run_id,
+                "started_at_epoch_ns": self.epoch_ns,
+                "spans": len(self.spans),
+                "dropped": self.dropped,
+            },
+        }
+
+    def write(self, run_dir: Path) -> Path:
+        run_dir.mkdir(parents=True, exist_ok=True)
+        path = run_dir / TRACE_FILE
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.to_chrome(), ensure_ascii=False, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+
+def current_trace() -> Optional[RunTrace]:
+    return _current.get()
+
+
+def begin_run_trace(run_id: str) -> Optional[contextvars.Token]:
+    """Active une trace pour ``run_id``; None si désactivé ou déjà active (appelant imbriqué)."""
+    active = _current.get()
+    if not tracing_enabled() or (active is not None and active.run_id == run_id):
+        return None
+    return _current.set(RunTrace(run_id))
+
+
+def end_run_trace(token: Optional[contextvars.Token], run_dir: Path) -> Optional[Path]:
+    """Écrit la trace ouverte par ``begin_run_trace`` (no-op si ``token`` est None)."""
+    if token is None:
+        return None
+    trace = _current.get()
+    try:
+        _current.reset(token)
+    except ValueError:
+        # Jeton d'un autre contexte (fin de run dans une autre tâche)
+        _current.set(None)
+    if trace is None:
+        return None
+    try:
+        path = trace.write(run_dir)
+    except Exception:
+        log.debug("trace.json non écrit pour run %s", trace.run_id, exc_info=True)
+        return None
+    try:
+        export_otlp(trace)
+    except Exception:
+        log.debug("export OTLP échoué pour run %s", trace.run_id, exc_info=True)
+    return path
+
+
+@contextmanager
+def lane(name: str) -> Iterator[None]:
+    """Range les spans du bloc sur une ligne dédiée (ex.: un nœud du DAG)."""
+    token = _lane.set(str(name))
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+@contextmanager
+def span(name: str, cat: str = "run", **args: Any) -> Iterator[Dict[str, Any]]:
+    """Mesure un bloc (sync ou ``await`` à l'intérieur); ``args`` est enrichissable.
+
+    Sans trace active, le coût se limite à une lecture de ContextVar.
+    """
+    trace = _current.get()
+    if trace is None:
+        yield args
+        return
+    sid = trace.next_id()
+    token = _parent.set(sid)
+    start = time.perf_counter_ns()
+    try:
+        yield args
+    except BaseException as e:
+        args["error"] = type(e).__name__
+        raise
+    finally:
+        end = time.perf_counter_ns()
+        _parent.reset(token)
+        trace.add(
+            {
+                "id": sid,
+                "parent": _parent.get(),
+                "name": name,
+                "cat": cat,
+                "tid": trace.lane_id(_lane.get()),
+                "start_ns": start,
+                "end_ns": end,
+                "args": {k: v for k, v in args.items() if v is not None and v != ""},
+            }
+        )
+
+
+def traced(name: str, cat: str = "run") -> Callable:
+    """Décorateur de coroutine: un span par appel."""
+
+    def deco(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*a: Any, **kw: Any) -> Any:
+            with span(name, cat):
+                return await fn(*a, **kw)
+
+        return wrapper
+
+    return deco
+
+
+# ---- Export OTLP (optionnel) -------------------------------------------------
+
+_otlp_tracer = None
+_otlp_lock = threading.Lock()
+
+
+def _otlp_endpoint() -> str:
+    return (os.getenv("RUN_TRACE_OTLP_ENDPOINT") or os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT") or "").strip()
+
+
+def _get_otlp_tracer():
+    global _otlp_tracer
+    with _otlp_lock:
+        if _otlp_tracer is None:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+            endpoint = _otlp_endpoint().rstrip("/")
+            if not endpoint.endswith("/v1/traces"):
+                endpoint += "/v1/traces"
+            provider = TracerProvider(
+                resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", "crew-orchestrator")})
+            )
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+            _otlp_tracer = provider.get_tracer("crew.run_trace")
+        return _otlp_tracer
+
+
+def export_otlp(trace: RunTrace) -> int:
+    """Rejoue les spans terminés vers le collecteur (horodatages d'origine conservés)."""
+    if not _otlp_endpoint() or not trace.spans:
+        return 0
+    try:
+        tracer = _get_otlp_tracer()
+        from opentelemetry import trace as otel_trace
+    except ImportError:
+        log.debug("opentelemetry-sdk absent: export OTLP ignoré")
+        return 0
+
+    lanes = {tid: name for name, tid in trace.lanes.items()}
+    offset = trace.epoch_ns - trace.t0_ns
+    started: Dict[int, Any] = {}
+    # Ordre de démarrage: un parent est toujours créé avant ses enfants
+    for s in sorted(trace.spans, key=lambda s: (s["start_ns"], s["id"])):
+        parent = started.get(s["parent"])
+        ctx = otel_trace.set_span_in_context(parent) if parent is not None else None
+        attrs = {f"crew.{k}": v if isinstance(v, (str, bool, int, float)) else str(v) for k, v in s["args"].items()}
+        attrs.update({"crew.run_id": trace.run_id, "crew.lane": lanes.get(s["tid"], RUN_LANE)})
+        started[s["id"]] = tracer.start_span(
+            s["name"], context=ctx, start_time=s["start_ns"] + offset, attributes=attrs
+        )
+    for s in trace.spans:
+        started[s["id"]].end(end_time=s["end_ns"] + offset)
+    return len(started)
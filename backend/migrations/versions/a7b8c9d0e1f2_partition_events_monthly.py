@@ -0,0 +1,129 @@
+"""partition events by month (RANGE on timestamp)
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2025-10-16 10:00:00.000000
+
+La table ``events`` devient une table partitionnée (une partition par mois
+UTC, ``events_pYYYYMM``, plus ``events_default``). La clé primaire inclut la
+clé de partition: ``(id, timestamp)``. Les contraintes FK existantes sont
+reprises telles quelles. Les partitions futures sont créées par le job de
+rétention (``core.storage.retention.ensure_event_partitions``).
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a7b8c9d0e1f2"
+down_revision: Union[str, Sequence[str], None] = "f6a7b8c9d0e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 2
+
+_INDEXES = (
+    ("ix_events_run", "run_id"),
+    ("ix_events_node", "node_id"),
+    ("ix_events_level", "level"),
+    ("ix_events_request", "request_id"),
+    ("events_timestamp_idx", "timestamp"),
+)
+
+
+def _is_partitioned(conn) -> bool:
+    row = conn.execute(
+        sa.text(
+            "SELECT c.relkind::text FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = current_schema() AND c.relname = 'events'"
+        )
+    ).scalar()
+    return row == "p"
+
+
+def _table_exists(conn, name: str) -> bool:
+    row = conn.execute(sa.text("SELECT to_regclass(:n) IS NOT NULL"), {"n": name}).scalar()
+    return bool(row)
+
+
+def _add_month(d: datetime, n: int = 1) -> datetime:
+    m = d.month - 1 + n
+    return d.replace(year=d.year + m // 12, month=m % 12 + 1, day=1)
+
+
+def _utc(d: datetime) -> str:
+    # Borne UTC explicite (indépendante du TimeZone de session, sans ':' pour text())
+    return f"TIMESTAMP '{d:%Y-%m-%d}' AT TIME ZONE 'UTC'"
+
+
+def _foreign_keys(conn, table: str) -> list[tuple[str, str]]:
+    return [
+        (r[0], r[1])
+        for r in conn.execute(
+            sa.text(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = CAST(:t AS regclass) AND contype = 'f'"
+            ),
+            {"t": table},
+        )
+    ]
+
+
+def _create_indexes() -> None:
+    for name, col in _INDEXES:
+        op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON events ("{col}")')
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not _table_exists(conn, "events") or _is_partitioned(conn):
+        return
+
+    fks = _foreign_keys(conn, "events")
+    op.execute("ALTER TABLE events RENAME TO events_unpartitioned")
+    op.execute(
+        "CREATE TABLE events (LIKE events_unpartitioned INCLUDING DEFAULTS) "
+        'PARTITION BY RANGE ("timestamp")'
+    )
+    op.execute('ALTER TABLE events ADD CONSTRAINT pk_events PRIMARY KEY (id, "timestamp")')
+
+    now = datetime.now(timezone.utc)
+    oldest = conn.execute(sa.text('SELECT min("timestamp") FROM events_unpartitioned')).scalar() or now
+    month = datetime(oldest.year, oldest.month, 1, tzinfo=timezone.utc)
+    last = _add_month(datetime(now.year, now.month, 1, tzinfo=timezone.utc), MONTHS_AHEAD)
+    while month <= last:
+        nxt = _add_month(month)
+        op.execute(
+            f"CREATE TABLE events_p{month:%Y%m} PARTITION OF events "
+            f"FOR VALUES FROM ({_utc(month)}) TO ({_utc(nxt)})"
+        )
+        month = nxt
+    op.execute("CREATE TABLE events_default PARTITION OF events DEFAULT")
+
+    op.execute("INSERT INTO events SELECT * FROM events_unpartitioned")
+    op.execute("DROP TABLE events_unpartitioned")
+    for name, definition in fks:
+        op.execute(f"ALTER TABLE events ADD CONSTRAINT {name} {definition}")
+    _create_indexes()
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if not _table_exists(conn, "events") or not _is_partitioned(conn):
+        return
+
+    fks = _foreign_keys(conn, "events")
+    op.execute("ALTER TABLE events RENAME TO events_partitioned")
+    for name, _col in _INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("CREATE TABLE events (LIKE events_partitioned INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO events SELECT * FROM events_partitioned")
+    op.execute("DROP TABLE events_partitioned CASCADE")
+    op.execute("ALTER TABLE events ADD PRIMARY KEY (id)")
+    for name, definition in fks:
+        op.execute(f"ALTER TABLE events ADD CONSTRAINT {name} {definition}")
+    _create_indexes()
@@ -0,0 +1,47 @@
+"""add safe_jsonb(text) (cast JSON tolérant pour les rollups, PG < 16)
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2025-10-17 10:00:00.000000
+
+Les agrégats lisent ``events.message`` (texte libre, JSON pour les événements
+structurés). ``pg_input_is_valid`` n'existe qu'à partir de PostgreSQL 16:
+``safe_jsonb`` renvoie NULL au lieu d'échouer sur un message non JSON. Seuls
+les messages commençant par ``{`` ou ``[`` entrent dans le bloc EXCEPTION
+(sous-transaction), les autres sont écartés par le test préalable.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8c9d0e1f2a3"
+down_revision: Union[str, Sequence[str], None] = "a7b8c9d0e1f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        r"""
+        CREATE OR REPLACE FUNCTION safe_jsonb(t text) RETURNS jsonb
+        LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE AS $$
+        BEGIN
+            IF t IS NULL OR t !~ '^\s*[\{\[]' THEN
+                RETURN NULL;
+            END IF;
+            BEGIN
+                RETURN t::jsonb;
+            EXCEPTION WHEN others THEN
+                RETURN NULL;
+            END;
+        END;
+        $$
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS safe_jsonb(text)")
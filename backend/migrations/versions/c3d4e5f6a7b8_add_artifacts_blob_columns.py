@@ -0,0 +1,62 @@
+"""add content_hash/size_bytes/preview on artifacts (blob store)
+
+Revision ID: c3d4e5f6a7b8
+Revises: b9c0d1e2f4a5
+Create Date: 2025-10-12 10:00:00.000000
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d4e5f6a7b8"
+down_revision: Union[str, Sequence[str], None] = "b9c0d1e2f4a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COLUMNS = (
+    ("content_hash", sa.String(length=64)),
+    ("size_bytes", sa.Integer()),
+    ("preview", sa.String()),
+)
+
+
+def _has_column(conn, column: str) -> bool:
+    return (
+        conn.execute(
+            sa.text(
+                """
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'artifacts' AND column_name = :col
+                """
+            ),
+            {"col": column},
+        ).first()
+        is not None
+    )
+
+
+def _index_exists(conn, index_name: str) -> bool:
+    row = conn.execute(sa.text("SELECT to_regclass(:n) IS NOT NULL"), {"n": index_name}).scalar()
+    return bool(row)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for name, type_ in _COLUMNS:
+        if not _has_column(conn, name):
+            op.add_column("artifacts", sa.Column(name, type_, nullable=True))
+    if not _index_exists(conn, "public.ix_artifacts_content_hash"):
+        op.create_index("ix_artifacts_content_hash", "artifacts", ["content_hash"], unique=False)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if _index_exists(conn, "public.ix_artifacts_content_hash"):
+        op.drop_index("ix_artifacts_content_hash", table_name="artifacts")
+    for name, _ in reversed(_COLUMNS):
+        if _has_column(conn, name):
+            op.drop_column("artifacts", name)
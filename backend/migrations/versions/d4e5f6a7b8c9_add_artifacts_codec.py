@@ -0,0 +1,45 @@
+"""add codec on artifacts (compression zstd des blobs)
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2025-10-13 10:00:00.000000
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d4e5f6a7b8c9"
+down_revision: Union[str, Sequence[str], None] = "c3d4e5f6a7b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(conn, column: str) -> bool:
+    return (
+        conn.execute(
+            sa.text(
+                """
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'artifacts' AND column_name = :col
+                """
+            ),
+            {"col": column},
+        ).first()
+        is not None
+    )
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not _has_column(conn, "codec"):
+        op.add_column("artifacts", sa.Column("codec", sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if _has_column(conn, "codec"):
+        op.drop_column("artifacts", "codec")
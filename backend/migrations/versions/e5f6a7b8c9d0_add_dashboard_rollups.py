@@ -0,0 +1,68 @@
+"""add dashboard_rollups + rollup_state (agrégats pré-calculés du cockpit)
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2025-10-14 10:00:00.000000
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+# revision identifiers, used by Alembic.
+revision: str = "e5f6a7b8c9d0"
+down_revision: Union[str, Sequence[str], None] = "d4e5f6a7b8c9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(conn, name: str) -> bool:
+    row = conn.execute(sa.text("SELECT to_regclass(:n) IS NOT NULL"), {"n": name}).scalar()
+    return bool(row)
+
+
+def _index_exists(conn, index_name: str) -> bool:
+    row = conn.execute(sa.text("SELECT to_regclass(:n) IS NOT NULL"), {"n": index_name}).scalar()
+    return bool(row)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not _table_exists(conn, "dashboard_rollups"):
+        op.create_table(
+            "dashboard_rollups",
+            sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("kind", sa.String(length=16), nullable=False),
+            sa.Column("key", sa.String(length=32), nullable=False),
+            sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("duration_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("duration_sum_ms", sa.BigInteger(), nullable=False, server_default="0"),
+            sa.Column("duration_hist", pg.ARRAY(sa.Integer()), nullable=True),
+            sa.Column("prompt_tokens", sa.BigInteger(), nullable=False, server_default="0"),
+            sa.Column("completion_tokens", sa.BigInteger(), nullable=False, server_default="0"),
+            sa.PrimaryKeyConstraint("kind", "bucket_start", "key", name="pk_dashboard_rollups"),
+        )
+    if not _table_exists(conn, "rollup_state"):
+        op.create_table(
+            "rollup_state",
+            sa.Column("name", sa.String(), primary_key=True, nullable=False),
+            sa.Column("watermark", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("pending_from", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        )
+    # Détection des feedbacks récents lors du rafraîchissement incrémental
+    if _table_exists(conn, "feedbacks") and not _index_exists(conn, "public.feedbacks_created_at_idx"):
+        op.create_index("feedbacks_created_at_idx", "feedbacks", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if _index_exists(conn, "public.feedbacks_created_at_idx"):
+        op.drop_index("feedbacks_created_at_idx", table_name="feedbacks")
+    if _table_exists(conn, "rollup_state"):
+        op.drop_table("rollup_state")
+    if _table_exists(conn, "dashboard_rollups"):
+        op.drop_table("dashboard_rollups")
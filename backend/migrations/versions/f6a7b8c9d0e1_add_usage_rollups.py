@@ -0,0 +1,64 @@
+"""add usage_rollups_hourly/daily (agrégats durables runs/nodes/LLM)
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2025-10-15 10:00:00.000000
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f6a7b8c9d0e1"
+down_revision: Union[str, Sequence[str], None] = "e5f6a7b8c9d0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLES = ("usage_rollups_hourly", "usage_rollups_daily")
+
+
+def _table_exists(conn, name: str) -> bool:
+    row = conn.execute(sa.text("SELECT to_regclass(:n) IS NOT NULL"), {"n": name}).scalar()
+    return bool(row)
+
+
+def _columns():
+    return [
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("kind", sa.String(length=8), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("role", sa.String(length=64), nullable=False, server_default=""),
+        sa.Column("provider", sa.String(length=64), nullable=False, server_default=""),
+        sa.Column("model", sa.String(length=128), nullable=False, server_default=""),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("duration_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("duration_sum_ms", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("duration_max_ms", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("latency_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("latency_sum_ms", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("prompt_tokens", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("completion_tokens", sa.BigInteger(), nullable=False, server_default="0"),
+    ]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for name in _TABLES:
+        if not _table_exists(conn, name):
+            op.create_table(
+                name,
+                *_columns(),
+                sa.PrimaryKeyConstraint(
+                    "kind", "bucket_start", "status", "role", "provider", "model", name=f"pk_{name}"
+                ),
+            )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    for name in reversed(_TABLES):
+        if _table_exists(conn, name):
+            op.drop_table(name)
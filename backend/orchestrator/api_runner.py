@@ -18,6 +18,10 @@ from core.telemetry.metrics import (
     get_run_duration_seconds,
 )
 from orchestrator.sidecars import normalize_llm_sidecar as _normalize_llm_sidecar
+from core.io.artifacts_fs import runs_root as _runs_root
+from core.io.run_index import record_run as _record_run_index
+from core.io.compression import glob_sidecars, read_text as read_compressed_text, resolve_path
+from core.telemetry.tracing import begin_run_trace, end_run_trace, span
 
 import json
 from pathlib import Path
@@ -64,6 +68,8 @@ def _extract_llm_meta_from_artifacts(artifacts: list[dict]) -> dict:
             }
             if obj.get("prompts") is not None:
                 out["prompts"] = obj.get("prompts")
+            if isinstance(obj.get("cache"), dict):
+                out["cache"] = obj.get("cache")
             return out
     return {}
 
@@ -73,14 +79,12 @@ def _read_llm_sidecar_fs(run_id: str, node_key: str, runs_root: str = None) -> d
     node_dir = Path(base) / run_id / "nodes" / node_key
     if not node_dir.is_dir():
         return {}
-    candidates = [node_dir / f"artifact_{node_key}.llm.json"] + sorted(
-        node_dir.glob("*.llm.json")
-    )
+    candidates = [node_dir / f"artifact_{node_key}.llm.json"] + glob_sidecars(node_dir)
     for p in candidates:
-        if not p.exists():
+        if resolve_path(p) is None:
             continue
         try:
-            raw_txt = p.read_text(encoding="utf-8")
+            raw_txt = read_compressed_text(p)
             obj = json.loads(raw_txt)
             if isinstance(obj, dict):
                 out = {
@@ -91,6 +95,8 @@ def _read_llm_sidecar_fs(run_id: str, node_key: str, runs_root: str = None) -> d
                 }
                 if obj.get("prompts") is not None:
                     out["prompts"] = obj.get("prompts")
+                if isinstance(obj.get("cache"), dict):
+                    out["cache"] = obj.get("cache")
                 return _normalize_llm_sidecar(out)
         except Exception:
             continue
@@ -113,10 +119,21 @@ async def run_task(
     # Conserve le statut/horodatage finaux pour une finalisation inconditionnelle en finally
     final_status: RunStatus | None = None
     ended: dt.datetime | None = None
-
+    # Trace du run (spans exécuteur + finalisation DB) -> <run>/trace.json
+    trace_token = begin_run_trace(run_id)
 
     dag = TaskGraph.from_plan(task_spec)
 
+    # Plan d'origine à côté des artifacts (rejeu hors ligne: tools/replay_run.py)
+    try:
+        run_dir = _runs_root() / run_id
+        run_dir.mkdir(parents=True, exist_ok=True)
+        (run_dir / "plan.json").write_text(
+            json.dumps(task_spec, ensure_ascii=False, default=str), encoding="utf-8"
+        )
+    except Exception:
+        log.debug("plan.json non écrit pour run %s", run_id, exc_info=True)
+
     node_ids: dict[str, UUID] = {}
     node_started_at: dict[str, dt.datetime] = {}
     # Compteur de fin de nœuds pour finalisation anticipée du run
@@ -189,7 +206,8 @@ async def run_task(
             if node_db_id is None and hasattr(storage, "get_node_id_by_logical"):
                 node_db_id = await storage.get_node_id_by_logical(run_id, node_key)
             if node_db_id and hasattr(storage, "list_artifacts_for_node"):
-                artifacts = await storage.list_artifacts_for_node(node_db_id)
+                # Le JSON du sidecar est lu dans le contenu: on le demande explicitement
+                artifacts = await storage.list_artifacts_for_node(node_db_id, include_content=True)
                 meta = _extract_llm_meta_from_artifacts(artifacts) or {}
         except Exception:
             meta = {}
@@ -345,6 +363,8 @@ async def run_task(
                 dry_run=bool(getattr(options, "dry_run", False)),
                 on_node_start=on_node_start,
                 on_node_end=on_node_end,
+                routing_goal=getattr(getattr(options, "llm", None), "routing", None),
+                deadline_s=getattr(options, "deadline_s", None),
             )
 
 
@@ -360,25 +380,26 @@ async def run_task(
         status_metric = "completed" if final_status == RunStatus.completed else "failed"
         if not final_event_emitted:
             try:
-                await storage.finalize_run_status(
-                    run_id=run_id,
-                    title=title,
-                    status=final_status,
-                    started_at=started,
-                    ended_at=ended,
-                    meta={"request_id": request_id},
-                    request_id=request_id,
-                )
-                await storage.save_run(
-                    run=Run(
-                        id=UUID(run_id),
+                with span("finalize_run", cat="db", status=final_status.value):
+                    await storage.finalize_run_status(
+                        run_id=run_id,
                         title=title,
                         status=final_status,
                         started_at=started,
                         ended_at=ended,
                         meta={"request_id": request_id},
+                        request_id=request_id,
+                    )
+                    await storage.save_run(
+                        run=Run(
+                            id=UUID(run_id),
+                            title=title,
+                            status=final_status,
+                            started_at=started,
+                            ended_at=ended,
+                            meta={"request_id": request_id},
+                        )
                     )
-                )
             except Exception as exc:
                 log.warning(
                     "finalize_run_status main failed run_id=%s err=%r", run_id, exc
@@ -429,25 +450,26 @@ async def run_task(
         # Filet de sécurité idempotent: finalise le run même en cas de course
         if ended is not None and final_status is not None:
             try:
-                await storage.finalize_run_status(
-                    run_id=run_id,
-                    title=title,
-                    status=final_status,
-                    started_at=started,
-                    ended_at=ended,
-                    meta={"request_id": request_id},
-                    request_id=request_id,
-                )
-                await storage.save_run(
-                    run=Run(
-                        id=UUID(run_id),
+                with span("finalize_run_guard", cat="db"):
+                    await storage.finalize_run_status(
+                        run_id=run_id,
                         title=title,
                         status=final_status,
                         started_at=started,
                         ended_at=ended,
                         meta={"request_id": request_id},
+                        request_id=request_id,
+                    )
+                    await storage.save_run(
+                        run=Run(
+                            id=UUID(run_id),
+                            title=title,
+                            status=final_status,
+                            started_at=started,
+                            ended_at=ended,
+                            meta={"request_id": request_id},
+                        )
                     )
-                )
             except Exception as exc:
                 log.warning(
                     "finalize_run_status guard failed run_id=%s err=%r",
@@ -455,12 +477,22 @@ async def run_task(
                     exc,
                 )
             await anyio.sleep(0)
+            # Statut final dans l'index FS du run (remplace run.json côté routes)
+            run_dir = _runs_root() / run_id
+            if run_dir.is_dir():
+                _record_run_index(
+                    run_dir,
+                    status=final_status.value,
+                    ended_at=ended.isoformat(),
+                    request_id=request_id,
+                )
         if not metrics_recorded:
             if metrics_enabled():
                 total = time.perf_counter() - start_ts
                 get_runs_total().labels(status=status_metric).inc()
                 get_run_duration_seconds().labels(status=status_metric).observe(total)
             metrics_recorded = True
+        end_run_trace(trace_token, _runs_root() / run_id)
         if os.getenv("FAST_TEST_RUN") == "1":
             # Chemin rapide en tests : on force un yield pour éviter tout blocage
             await anyio.sleep(0)
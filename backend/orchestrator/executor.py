@@ -15,25 +15,47 @@ import logging
 import inspect
 import os
 import asyncio
+import functools
 from typing import Optional, Set, Callable, Awaitable, Dict, Any
 from datetime import datetime, timezone
 from pathlib import Path
+from types import SimpleNamespace
 from uuid import UUID
 from time import perf_counter
 
 from core.config import get_var
 from core.planning.task_graph import TaskGraph, PlanNode
+from core.planning.deadline import (
+    DeadlineExceeded,
+    RunDeadline,
+    current_deadline,
+    deadline_scope,
+    default_deadline_s,
+    min_node_s,
+    node_scope,
+    within_deadline,
+)
 from core.storage.db_models import NodeStatus
+from core.events.types import EventType
 from core.storage.composite_adapter import CompositeAdapter
+from core.agents.context import assemble_context, context_scope
 from core.agents.executor_llm import agent_runner
 from core.agents.manager import run_manager
 from core.agents.registry import resolve_agent
 from core.agents.recruiter import arecruit as recruit
 from core.agents.schemas import PlanNodeModel
+from core.llm.providers.base import LLMRequest
+from core.llm.routing import PREFERRED, effective_goal, goal_scope, parse_goal, route
+from core.llm.runner import run_llm
+from core.llm.structured import parse_structured
+from core.llm.retry_policy import RetryBudget, consume as consume_retry, current_budget, plan_retry, retry_scope
 from core.telemetry.metrics import (
     metrics_enabled,
     get_orchestrator_node_duration_seconds,
+    get_node_cache_requests_total,
 )
+from core.storage.node_cache import cache_enabled, get_node_cache, node_cache_key, sha256_text
+from core.telemetry.tracing import begin_run_trace, end_run_trace, lane, span, traced
 
 # <<< AJOUT >>> helpers FS unifiés (option B)
 from core.io.artifacts_fs import (
@@ -42,6 +64,7 @@ from core.io.artifacts_fs import (
     node_dir as fs_node_dir,
 )
 from orchestrator.sidecars import normalize_llm_sidecar
+from orchestrator.review_queue import ReviewQueue
 
 log = logging.getLogger("crew.executor")
 
@@ -140,6 +163,60 @@ def _norm_dep_ids(node) -> list[str]:
     return out
 
 
+# ---------- Cache global des résultats (mémoïsation inter-runs) ---------------
+
+def _node_cache_key(node, role: str, spec, upstream: Dict[str, str], goal: Optional[str] = None) -> str:
+    """Entrées du nœud + agent résolu + sorties amont (Merkle).
+
+    ``goal``: objectif effectif du routage (défaut ``effective_goal()``, qui passe
+    à ``fastest`` quand l'échéance presse, comme l'agent au moment de l'appel).
+    """
+    payload = {
+        "input": _node_input_checksum(node),
+        "title": _get_attr(node, "title", ""),
+        "type": _get_attr(node, "type", ""),
+        "acceptance": _get_attr(node, "acceptance", []),
+        "notes": _get_attr(node, "notes", []),
+        "llm": _get_attr(node, "llm", {}) or {},
+        "role": role,
+        "provider": getattr(spec, "provider", None),
+        "model": getattr(spec, "model", None),
+        "system": sha256_text(getattr(spec, "system_prompt", None)),
+        "upstream": {dep: upstream.get(dep) for dep in sorted(_norm_dep_ids(node))},
+    }
+    candidates = getattr(spec, "candidates", None) or []
+    goal = goal or effective_goal()
+    if len(candidates) > 1 and parse_goal(goal)[0] != PREFERRED:
+        # Modèle choisi à l'appel par le routage: la clé couvre l'objectif et les candidats
+        payload["routing"] = {
+            "goal": goal,
+            "candidates": sorted(f"{c.get('provider')}/{c.get('model')}" for c in candidates),
+        }
+    return node_cache_key(payload)
+
+
+def _cached_artifact(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Résultat agent resservi: aucun appel LLM, donc ni latence ni tokens."""
+    meta = dict(entry.get("llm") or {})
+    meta["latency_ms"] = 0
+    meta["usage"] = {"prompt_tokens": 0, "completion_tokens": 0}
+    meta["cost"] = {"estimated": 0.0}
+    return {"markdown": entry.get("markdown"), "llm": meta}
+
+
+def _output_checksum_fs(run_id: str, node_key: str) -> str | None:
+    """Checksum de sortie d'un nœud repris du run (markdown sur disque)."""
+    from core.io.compression import read_text, resolve_path
+
+    path = fs_node_dir(run_id, node_key) / f"artifact_{node_key}.md"
+    if resolve_path(path) is None:
+        return None
+    try:
+        return sha256_text(read_text(path))
+    except Exception:
+        return None
+
+
 # ---------- Extraction méta & markdown depuis le résultat agent_runner ---------
 
 def _extract_llm_meta_from_result(artifact: Any) -> Dict[str, Any]:
@@ -176,6 +253,8 @@ def _extract_llm_meta_from_result(artifact: Any) -> Dict[str, Any]:
             }
             if isinstance(prompts, dict):
                 out["prompts"] = prompts
+            if isinstance(obj.get("routing"), dict):
+                out["routing"] = obj["routing"]
             if isinstance(markdown, str):
                 out["markdown"] = markdown
             break
@@ -268,6 +347,7 @@ async def _auto_review_node(
             pass
 
 
+@traced("auto_review", cat="review")
 async def _maybe_auto_review(
     storage: CompositeAdapter,
     run_id: str,
@@ -285,6 +365,119 @@ async def _maybe_auto_review(
         log.debug("auto-review skipped: %s", e)
 
 
+REVIEW_MODES = {"off", "async", "blocking"}
+
+
+def _review_mode(node) -> str:
+    """Mode d'auto-review du nœud: ``review`` du nœud/plan, sinon AUTO_REVIEW_MODE.
+
+    ``blocking`` (le plan conditionne la suite à la QA) revoit en ligne avant de
+    rendre le statut; ``async`` (défaut) passe par la file du run; ``off`` ignore.
+    """
+    raw = getattr(node, "review", None) or get_var("AUTO_REVIEW_MODE", "async")
+    mode = str(raw).strip().lower()
+    return mode if mode in REVIEW_MODES else "async"
+
+
+def _json_object(text: str) -> Dict[str, Any]:
+    obj = json.loads(text)
+    if not isinstance(obj, dict):
+        raise ValueError("objet JSON attendu")
+    return obj
+
+
+async def _review_llm_json(*, system: str, user: str, **_: Any) -> Dict[str, Any]:
+    """Appel JSON du reviewer par lots avec le provider de l'agent Reviewer.
+
+    Passe par ``run_llm`` (disjoncteur, limiteur, routage, métriques) comme les
+    autres agents; la sortie est réparée localement si besoin.
+    """
+    try:
+        spec = resolve_agent("Reviewer")
+    except KeyError:
+        spec = await recruit("Reviewer")
+    decision = route(spec.candidates, role="Reviewer") if spec.candidates else None
+    provider, model = (decision.provider, decision.model) if decision else (spec.provider, spec.model)
+    req = LLMRequest(
+        system=system,
+        prompt=user,
+        model=model,
+        provider=provider,
+        role="Reviewer",
+        temperature=0.0,
+        response_format={"type": "json_object"},
+    )
+    resp = await run_llm(req)
+    out, _ = parse_structured(resp.text, _json_object)
+    return out
+
+
+async def _review_batch(storage: CompositeAdapter, run_id: str, items: list[Dict[str, Any]]) -> None:
+    """Lot d'auto-review (file ou en ligne).
+
+    Les nœuds dont le rôle a une checklist QA passent par le reviewer par lots
+    (``qa_reviewer.review_nodes``: un appel par lot de même type via l'agent
+    Reviewer, feedbacks groupés) dans FEEDBACK_REVIEW_TIMEOUT_MS; les autres,
+    un stockage sans ``save_feedbacks`` ou les nœuds que le lot n'a pas pu
+    revoir sont revus un par un, chacun sur sa ligne de trace.
+    """
+    batched: list[tuple[Any, str]] = []
+    by_dbid: Dict[str, Dict[str, Any]] = {}
+    single: list[Dict[str, Any]] = []
+    try:
+        from orchestrator.hooks import qa_reviewer
+    except Exception:  # pragma: no cover - hook indisponible
+        qa_reviewer = None
+    for item in items:
+        md = (item.get("result") or {}).get("markdown")
+        ctype = qa_reviewer.checklist_type(item.get("role")) if qa_reviewer is not None else None
+        if ctype and item.get("node_dbid") and isinstance(md, str) and hasattr(storage, "save_feedbacks"):
+            node = SimpleNamespace(
+                id=item["node_dbid"],
+                type=ctype,
+                run_id=run_id,
+                sidecars_dir=fs_node_dir(run_id, item["node_key"]),
+            )
+            batched.append((node, md))
+            by_dbid[str(item["node_dbid"])] = item
+        else:
+            single.append(item)
+
+    async def _one(item: Dict[str, Any]) -> None:
+        with lane(item["node_key"]):
+            await _maybe_auto_review(storage, run_id, item["node_key"], item["node_dbid"], item["result"])
+
+    async def _batched() -> None:
+        timeout_s = int(get_var("FEEDBACK_REVIEW_TIMEOUT_MS", 3500)) / 1000
+        failed: list[Any] = []
+        with span("qa_review_batch", cat="review", items=len(batched)) as args:
+            try:
+                stats = await asyncio.wait_for(
+                    qa_reviewer.review_nodes(
+                        batched,
+                        SimpleNamespace(id=run_id),
+                        storage,
+                        timeout_s=timeout_s,
+                        critical_threshold=int(get_var("FEEDBACK_CRITICAL_THRESHOLD", 60)),
+                        call=_review_llm_json,
+                        failed=failed,
+                    ),
+                    timeout=timeout_s,
+                )
+                log.debug("qa review batch: %s", stats)
+            except Exception as e:
+                # Lot interrompu: aucun feedback écrit, tout repasse en revue individuelle
+                log.debug("qa review batch skipped: %s", e)
+                failed = [node for node, _ in batched]
+            args["fallback"] = len(failed)
+        await asyncio.gather(*(_one(by_dbid[str(node.id)]) for node in failed))
+
+    jobs = [_one(item) for item in single]
+    if batched:
+        jobs.append(_batched())
+    await asyncio.gather(*jobs)
+
+
 async def _save_artifact_db(storage: CompositeAdapter, **kwargs) -> None:
     """Persiste l'artifact sur les adaptateurs DB (ext=.md/.llm.json) si node_id est un UUID."""
     node_id = kwargs.get("node_id")
@@ -314,6 +507,7 @@ async def _save_artifact_db(storage: CompositeAdapter, **kwargs) -> None:
 
 # ---------- Exécution d'un nœud ----------------------------------------------
 
+@traced("execute_node", cat="node")
 async def _execute_node(
     node: PlanNode,
     storage: CompositeAdapter,
@@ -323,6 +517,8 @@ async def _execute_node(
     *,
     dry_run: bool = False,
     override: Dict[str, Any] | None = None,
+    upstream: Dict[str, str] | None = None,
+    use_cache: bool = False,
 ) -> Dict[str, Any]:
 
     """Exécute un nœud du plan.
@@ -332,6 +528,8 @@ async def _execute_node(
     d'exécution (backend, modèle, prompt, paramètres…).
     ``override`` permet de surcharger dynamiquement le prompt ou les paramètres
     du nœud.
+    ``use_cache`` consulte le cache global (clé incluant les checksums de
+    sortie ``upstream`` des dépendances) avant d'appeler l'agent.
     """
 
     node_log = logging.LoggerAdapter(log, {"run_id": run_id, "node_id": node_key})
@@ -345,10 +543,11 @@ async def _execute_node(
             node.llm["params"] = override["params"]
 
     role = node.suggested_agent_role if node.type != "manage" else "Manager_Generic"
-    try:
-        spec = resolve_agent(role)
-    except KeyError:
-        spec = await recruit(role)
+    with span("recruit", cat="node", role=role):
+        try:
+            spec = resolve_agent(role)
+        except KeyError:
+            spec = await recruit(role)
     node_log.debug(
         "node=%s role=%s provider=%s model=%s",
         node_key,
@@ -403,7 +602,8 @@ async def _execute_node(
             )
             for n in children
         ]
-        output = await run_manager(subplan)
+        with span("manager", cat="llm", children=len(subplan)):
+            output = await run_manager(subplan)
 
         (ndir / f"manager_{node_key}.json").write_text(
             json.dumps(output.model_dump(), indent=2, ensure_ascii=False), encoding="utf-8"
@@ -434,16 +634,43 @@ async def _execute_node(
         write_llm_sidecar(run_id, node_key, meta, node_id=str(node_dbid) if node_dbid else None)
         return {}
 
-    artifact = await agent_runner(node)
+    cache_key = cached = cache_goal = None
+    if use_cache:
+        cache_goal = effective_goal()
+        cache_key = _node_cache_key(node, role, spec, upstream or {}, goal=cache_goal)
+        with span("node_cache", cat="io") as cache_args:
+            cached = get_node_cache().get(cache_key)
+            cache_args["hit"] = cached is not None
+        if metrics_enabled():
+            get_node_cache_requests_total().labels("hit" if cached is not None else "miss").inc()
+    context = None
+    if cached is not None:
+        artifact = _cached_artifact(cached)
+    else:
+        # Livrables des dépendances, dans le budget de tokens du rôle
+        if getattr(node, "deps", None):
+            with span("context", cat="io", deps=len(node.deps)) as ctx_args:
+                try:
+                    context = assemble_context(
+                        run_id, dag, node, role=role, provider=spec.provider, model=spec.model
+                    )
+                except Exception:
+                    node_log.warning("assemblage du contexte des dépendances échoué", exc_info=True)
+                if context is not None:
+                    ctx_args.update(tokens=context.tokens, budget=context.budget)
+        with span("agent", cat="llm", role=role), context_scope(context):
+            artifact = await agent_runner(node)
 
     # Écrire éventuel markdown
     md = _extract_markdown_from_result(artifact)
     if md:
-        write_md(run_id, node_key, md)
+        with span("write_md", cat="io"):
+            write_md(run_id, node_key, md)
         if node_dbid:
             try:
                 node_uuid = UUID(str(node_dbid))
-                await _save_artifact_db(storage, node_id=node_uuid, content=md, ext=".md")
+                with span("artifact_db", cat="db", ext=".md"):
+                    await _save_artifact_db(storage, node_id=node_uuid, content=md, ext=".md")
             except Exception:
                 node_log.debug("node_db_id invalide, DB ignorée: %s", node_dbid)
         else:
@@ -472,6 +699,32 @@ async def _execute_node(
         sidecar["prompt"] = (sidecar.get("prompts", {}) or {}).get("final")
     if md:
         sidecar["markdown"] = md
+    if context is not None:
+        sidecar["context"] = context.to_dict()
+    budget = current_budget()
+    if budget is not None and (budget.retries or budget.exhausted):
+        sidecar["retry"] = budget.summary()
+    if cache_key:
+        sidecar["cache"] = {"key": cache_key, "hit": cached is not None}
+        if cached is not None:
+            sidecar["cache"].update(
+                source_run_id=cached.get("run_id"),
+                source_node=cached.get("node_key"),
+                recorded_latency_ms=(cached.get("llm") or {}).get("latency_ms"),
+            )
+        elif md and ((meta or {}).get("routing") or {}).get("goal", cache_goal) != cache_goal:
+            # Objectif abaissé pendant le nœud (échéance): modèle hors de la clé calculée
+            node_log.debug(
+                "cache nœud non écrit (objectif %s -> %s): %s", cache_goal, meta["routing"]["goal"], node_key
+            )
+        elif md:
+            try:
+                get_node_cache().put(
+                    cache_key,
+                    {"run_id": run_id, "node_key": node_key, "role": role, "markdown": md, "llm": meta},
+                )
+            except Exception:
+                node_log.debug("cache nœud non écrit: %s", node_key, exc_info=True)
 
     node_uuid_str = None
     if node_dbid:
@@ -479,19 +732,21 @@ async def _execute_node(
             node_uuid_str = str(UUID(str(node_dbid)))
         except Exception:
             node_uuid_str = None
-    sidecar = write_llm_sidecar(
-        run_id, node_key, sidecar, node_id=node_uuid_str
-    )
+    with span("write_sidecar", cat="io"):
+        sidecar = write_llm_sidecar(
+            run_id, node_key, sidecar, node_id=node_uuid_str
+        )
 
     if node_dbid and node_uuid_str:
         try:
             node_uuid = UUID(node_uuid_str)
-            await _save_artifact_db(
-                storage,
-                node_id=node_uuid,
-                content=json.dumps(sidecar, ensure_ascii=False, indent=2),
-                ext=".llm.json",
-            )
+            with span("artifact_db", cat="db", ext=".llm.json"):
+                await _save_artifact_db(
+                    storage,
+                    node_id=node_uuid,
+                    content=json.dumps(sidecar, ensure_ascii=False, indent=2),
+                    ext=".llm.json",
+                )
         except Exception:
             node_log.debug("node_db_id invalide, DB ignorée: %s", node_dbid)
     else:
@@ -515,13 +770,45 @@ async def _execute_node(
         sidecar.get("latency_ms") if sidecar else None,
     )
 
-    return {"markdown": md, "llm": sidecar}
+    out = {"markdown": md, "llm": sidecar}
+    if cache_key:
+        out["cache"] = "hit" if cached is not None else "miss"
+    return out
 
 
 # ---------- Boucle d'exécution du DAG ----------------------------------------
 
 
 async def _run_single_node(
+    node: PlanNode,
+    dag: TaskGraph,
+    storage: CompositeAdapter,
+    run_dir: Path,
+    run_id: str,
+    node_id_txt: str,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    """Exécute un nœud sur sa propre ligne de trace (span ``node``), avec son budget
+    de retry et, si le run a une échéance, sa part du temps restant."""
+    node_budget_s = kwargs.pop("node_budget_s", None)
+    budget = RetryBudget.for_node(node_id_txt, parent=current_budget())
+    if node_budget_s is not None:
+        budget.max_time_s = min(budget.max_time_s or node_budget_s, node_budget_s)
+    t0 = perf_counter()
+    with lane(node_id_txt), span(
+        "node", cat="node", node=node_id_txt, budget_s=round(node_budget_s, 3) if node_budget_s is not None else None
+    ) as args, retry_scope(budget), node_scope(node_budget_s):
+        res = await _run_node(node, dag, storage, run_dir, run_id, node_id_txt, **kwargs)
+        args["status"] = res.get("status")
+        if budget.retries:
+            args["retries"] = budget.retries
+        run_deadline = current_deadline()
+        if run_deadline is not None and res.get("status") == "completed" and res.get("replayed"):
+            run_deadline.observe(node.suggested_agent_role or "", perf_counter() - t0)
+        return res
+
+
+async def _run_node(
     node: PlanNode,
     dag: TaskGraph,
     storage: CompositeAdapter,
@@ -538,10 +825,13 @@ async def _run_single_node(
     max_retries: int,
     backoff_ms: int,
     pause_event: Optional[Any],
+    review_queue: Optional[ReviewQueue] = None,
+    node_outputs: Optional[Dict[str, str]] = None,
 ) -> Dict[str, Any]:
     node_log = logging.LoggerAdapter(log, {"run_id": run_id, "node_id": node_id_txt})
     if pause_event is not None:
-        await pause_event.wait()
+        with span("paused", cat="queue"):
+            await pause_event.wait()
     _cs = _node_input_checksum(node)
     if hasattr(node, "checksum"):
         node.checksum = _cs
@@ -609,17 +899,28 @@ async def _run_single_node(
         return {"status": "skipped", "skipped": 1, "replayed": 0}
 
     if not must_recompute:
+        if node_outputs is not None:
+            node_outputs[node_id_txt] = _output_checksum_fs(run_id, node_id_txt)
         return {"status": "skipped", "skipped": 1, "replayed": 0}
 
     if on_node_start:
         try:
-            try:
-                await on_node_start(node, node_id_txt)
-            except TypeError:
-                await on_node_start(node)
+            with span("on_node_start", cat="db"):
+                try:
+                    await on_node_start(node, node_id_txt)
+                except TypeError:
+                    await on_node_start(node)
         except Exception as e:
             print(colorize(f"[HOOK-ERR] on_node_start: {e}", RED))
 
+    # Cache global: hors dry-run, nœuds manage et recalcul forcé (override)
+    use_cache = (
+        cache_enabled()
+        and not dry_run
+        and node.type != "manage"
+        and node_id_txt not in override_completed
+    )
+    cache_hit = False
     status = "failed"
     replayed = 0
     attempt = 0
@@ -629,7 +930,7 @@ async def _run_single_node(
         attempt += 1
         t0 = perf_counter() if metrics_enabled() else None
         try:
-            result = await _execute_node(
+            result = await within_deadline(_execute_node(
                 node,
                 storage,
                 dag,
@@ -637,24 +938,36 @@ async def _run_single_node(
                 node_id_txt,
                 dry_run=dry_run,
                 override=overrides.get(node_id_txt),
-            )
+                upstream=node_outputs,
+                use_cache=use_cache,
+            ))
             status = "completed"
             replayed = 1
+            cache_hit = isinstance(result, dict) and result.get("cache") == "hit"
+            if node_outputs is not None and isinstance(result, dict) and result.get("markdown"):
+                node_outputs[node_id_txt] = sha256_text(result["markdown"])
             try:
                 node_dbid = getattr(node, "db_id", None)
             except Exception:
                 node_dbid = None
-            if not dry_run:
-                try:
-                    await _maybe_auto_review(
-                        storage,
-                        run_id,
-                        node_id_txt,
-                        str(node_dbid) if node_dbid else None,
-                        result or {},
-                    )
-                except Exception:
-                    pass
+            # Résultat resservi par le cache: contenu déjà revu lors du run d'origine
+            if not dry_run and not cache_hit:
+                review = {
+                    "node_key": node_id_txt,
+                    "node_dbid": str(node_dbid) if node_dbid else None,
+                    "role": node.suggested_agent_role,
+                    "result": result or {},
+                }
+                mode = _review_mode(node)
+                # Hors mode bloquant, la review ne retarde ni le statut ni les successeurs
+                inline = mode == "blocking" or (
+                    mode == "async" and (review_queue is None or not review_queue.submit(review))
+                )
+                if inline:
+                    try:
+                        await _review_batch(storage, run_id, [review])
+                    except Exception:
+                        pass
                 # Crée un petit artifact par défaut pour les tests/e2e
                 try:
                     await storage.save_artifact(
@@ -698,8 +1011,14 @@ async def _run_single_node(
                     if model:
                         scope.set_tag("model", model)
                     sentry_sdk.capture_exception(e)
-            if attempt <= max_retries:
-                wait = (backoff_ms / 1000.0) * (2 ** (attempt - 1))
+            # Backoff avec jitter; le retry est prélevé sur le budget du nœud/run.
+            # Échéance atteinte: aucun retry ne peut plus aboutir
+            wait = (
+                plan_retry("node", attempt, reason=str(e)[:200], base_s=backoff_ms / 1000.0)
+                if attempt <= max_retries and not isinstance(e, DeadlineExceeded)
+                else None
+            )
+            if wait is not None:
                 node_log.warning("retrying in %.2f seconds (attempt %s/%s)", wait, attempt, max_retries)
                 await asyncio.sleep(wait)
                 continue
@@ -710,14 +1029,21 @@ async def _run_single_node(
             if t0 is not None:
                 dt = perf_counter() - t0
                 role = node.suggested_agent_role or "unknown"
+                # Provider/modèle réellement utilisés: sidecar du résultat, sinon conf du nœud
+                llm_meta = (result or {}).get("llm") if isinstance(result, dict) else None
+                llm_meta = llm_meta if isinstance(llm_meta, dict) else {}
+                llm_conf = getattr(node, "llm", None) or {}
                 provider = (
-                    getattr(node, "provider", None)
-                    or getattr(getattr(node, "meta", None), "provider", None)
+                    llm_meta.get("provider")
+                    or llm_meta.get("backend")
+                    or llm_conf.get("provider")
+                    or llm_conf.get("backend")
                     or "na"
                 )
                 model = (
-                    getattr(node, "model", None)
-                    or getattr(getattr(node, "meta", None), "model", None)
+                    llm_meta.get("model_used")
+                    or llm_meta.get("model")
+                    or llm_conf.get("model")
                     or "na"
                 )
                 get_orchestrator_node_duration_seconds().labels(
@@ -733,13 +1059,18 @@ async def _run_single_node(
         ) if last_err else ""
         report = {"reason": str(last_err), "attempts": attempt, "trace": trace}
         orig_role = node.suggested_agent_role or ""
-        if orig_role and not orig_role.endswith("_alt"):
+        if (
+            orig_role
+            and not orig_role.endswith("_alt")
+            and not isinstance(last_err, DeadlineExceeded)
+            and consume_retry("reallocation", reason=str(last_err)[:200])
+        ):
             alt_role = f"{orig_role}_alt"
             try:
                 await recruit(alt_role)
                 node.suggested_agent_role = alt_role
                 node_log.info("reallocation vers %s", alt_role)
-                result = await _execute_node(
+                result = await within_deadline(_execute_node(
                     node,
                     storage,
                     dag,
@@ -747,7 +1078,7 @@ async def _run_single_node(
                     node_id_txt,
                     dry_run=dry_run,
                     override=overrides.get(node_id_txt),
-                )
+                ))
                 status = "completed"
                 replayed = 1
                 report["reallocated_role"] = alt_role
@@ -765,6 +1096,22 @@ async def _run_single_node(
                 "report": report,
             }
 
+    budget = current_budget()
+    retry_summary = budget.summary() if budget is not None and (budget.retries or budget.exhausted) else None
+    if retry_summary and signal:
+        signal["report"]["retry"] = retry_summary
+    if retry_summary and retry_summary["exhausted"]:
+        node_dbid = getattr(node, "db_id", None)
+        try:
+            await storage.save_event(
+                run_id=run_id,
+                node_id=str(node_dbid) if node_dbid else None,
+                level=EventType.RETRY_EXHAUSTED.value,
+                message=json.dumps({"node_key": node_id_txt, "status": status, **retry_summary}),
+            )
+        except Exception:
+            pass
+
     out = {
         "run_id": run_id,
         "node_id": node_id_txt,
@@ -772,16 +1119,48 @@ async def _run_single_node(
         "input_checksum": _cs,
         "ended_at": datetime.now(timezone.utc).isoformat(),
     }
+    if retry_summary:
+        out["retry"] = retry_summary
+    deadline_missed = status == "failed" and isinstance(last_err, DeadlineExceeded)
+    if deadline_missed:
+        out["reason"] = "deadline"
     status_file.write_text(json.dumps(out, indent=2, ensure_ascii=False), encoding="utf-8")
     if on_node_end:
         try:
-            try:
-                await on_node_end(node, node_id_txt, status)
-            except TypeError:
-                await on_node_end(node, status)
+            with span("on_node_end", cat="db", status=status):
+                try:
+                    await on_node_end(node, node_id_txt, status)
+                except TypeError:
+                    await on_node_end(node, status)
         except Exception as e:
             print(colorize(f"[HOOK-ERR] on_node_end: {e}", RED))
-    return {"status": status, "skipped": 0, "replayed": replayed, "signal": signal}
+    return {
+        "status": status,
+        "skipped": 0,
+        "replayed": replayed,
+        "cached": int(cache_hit and status == "completed"),
+        "signal": signal,
+        "deadline_missed": deadline_missed,
+    }
+
+
+async def _report_deadline_missed(
+    storage: CompositeAdapter, run_id: str, run_deadline: RunDeadline, node_keys: list[str], dag: TaskGraph
+) -> None:
+    """Consigne les nœuds hors échéance (événement ``DEADLINE_MISSED``)."""
+    run_deadline.missed.extend(nid for nid in node_keys if nid not in run_deadline.missed)
+    print(colorize(f"[DEADLINE] {', '.join(node_keys)} — échéance du run dépassée", YELLOW))
+    for nid in node_keys:
+        node_dbid = getattr(dag.nodes.get(nid), "db_id", None) if isinstance(dag.nodes, dict) else None
+        try:
+            await storage.save_event(
+                run_id=run_id,
+                node_id=str(node_dbid) if node_dbid else None,
+                level=EventType.DEADLINE_MISSED.value,
+                message=json.dumps({"node_key": nid, **run_deadline.snapshot()}),
+            )
+        except Exception:
+            pass
 
 
 async def run_graph(
@@ -795,12 +1174,68 @@ async def run_graph(
     pause_event: Optional[Any] = None,
     skip_nodes: Optional[Set[str]] = None,
     overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+    routing_goal: Optional[str] = None,
+    deadline_s: Optional[float] = None,
 ):
     RUNS_ROOT = get_var("RUNS_ROOT", ".runs")
     Path(RUNS_ROOT).mkdir(parents=True, exist_ok=True)
     run_dir = Path(RUNS_ROOT) / run_id
     run_dir.mkdir(parents=True, exist_ok=True)
 
+    # Trace du run (trace.json); déjà ouverte si l'appelant (api_runner) la porte
+    trace_token = begin_run_trace(run_id)
+    review_queue = ReviewQueue(functools.partial(_review_batch, storage, run_id))
+    run_budget = RetryBudget.for_run(run_id)
+    deadline_s = deadline_s or default_deadline_s()
+    run_deadline = RunDeadline(deadline_s) if deadline_s else None
+    try:
+        with span(
+            "run_graph",
+            cat="run",
+            nodes=len(dag.nodes),
+            dry_run=dry_run or None,
+            routing=routing_goal,
+            deadline_s=deadline_s,
+        ) as args, retry_scope(run_budget), goal_scope(routing_goal), deadline_scope(run_deadline):
+            # Workers lancés au niveau du run: ils n'héritent d'aucune portée de nœud
+            review_queue.start()
+            res = await _run_graph(
+                dag,
+                storage,
+                run_id,
+                run_dir,
+                review_queue,
+                override_completed=override_completed,
+                dry_run=dry_run,
+                on_node_start=on_node_start,
+                on_node_end=on_node_end,
+                pause_event=pause_event,
+                skip_nodes=skip_nodes,
+                overrides=overrides,
+            )
+            args["status"] = res.get("status")
+            return res
+    finally:
+        await review_queue.close()
+        end_run_trace(trace_token, run_dir)
+
+
+async def _run_graph(
+    dag: TaskGraph,
+    storage: CompositeAdapter,
+    run_id: str,
+    run_dir: Path,
+    review_queue: ReviewQueue,
+    *,
+    override_completed: Set[str] | None,
+    dry_run: bool,
+    on_node_start: Optional[Callable[..., Awaitable[None]]],
+    on_node_end: Optional[Callable[..., Awaitable[None]]],
+    pause_event: Optional[Any],
+    skip_nodes: Optional[Set[str]],
+    overrides: Optional[Dict[str, Dict[str, Any]]],
+):
+
     skip_nodes = skip_nodes or set()
     overrides = overrides or {}
     override_completed = override_completed or set()
@@ -813,7 +1248,12 @@ async def run_graph(
     failed_ids: Set[str] = set()
     skipped_count = 0
     replayed_count = 0
+    cached_ids: Set[str] = set()
+    # Checksums des sorties par nœud (clés Merkle du cache global)
+    node_outputs: Dict[str, str] = {}
     signals: list[dict[str, Any]] = []
+    run_deadline = current_deadline()
+    budgets: Dict[str, float] = {}
 
     while pending:
         ready = [
@@ -823,6 +1263,18 @@ async def run_graph(
         if not ready:
             failed_ids.update(pending.keys())
             break
+        if run_deadline is not None:
+            # Part du temps restant au prorata du chemin critique; trop court: échec immédiat
+            budgets = run_deadline.node_budgets(dag, ready, pending)
+            late = [nid for nid in ready if budgets[nid] < min_node_s()]
+            if late:
+                for nid in late:
+                    failed_ids.add(nid)
+                    pending.pop(nid, None)
+                await _report_deadline_missed(storage, run_id, run_deadline, late, dag)
+                ready = [nid for nid in ready if nid not in late]
+                if not ready:
+                    continue
         tasks = [
             _run_single_node(
                 pending[nid],
@@ -840,16 +1292,28 @@ async def run_graph(
                 max_retries=max_retries,
                 backoff_ms=backoff_ms,
                 pause_event=pause_event,
+                review_queue=review_queue,
+                node_outputs=node_outputs,
+                node_budget_s=budgets.get(nid),
             )
             for nid in ready
         ]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        with span("wave", cat="queue", ready=len(ready)):
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        timed_out = [
+            nid for nid, res in zip(ready, results)
+            if isinstance(res, DeadlineExceeded) or (isinstance(res, dict) and res.get("deadline_missed"))
+        ]
+        if timed_out and run_deadline is not None:
+            await _report_deadline_missed(storage, run_id, run_deadline, timed_out, dag)
         for nid, res in zip(ready, results):
             if isinstance(res, Exception):
                 failed_ids.add(nid)
             else:
                 skipped_count += res.get("skipped", 0)
                 replayed_count += res.get("replayed", 0)
+                if res.get("cached"):
+                    cached_ids.add(nid)
                 sig = res.get("signal")
                 if sig:
                     signals.append(sig)
@@ -859,6 +1323,17 @@ async def run_graph(
                     completed_ids.add(nid)
             pending.pop(nid, None)
 
+    # Reviews en attente: feedbacks consignés avant la fin du run
+    with span("review_drain", cat="review", **review_queue.stats()):
+        await review_queue.drain()
+
+    if cache_enabled():
+        try:
+            with span("node_cache_evict", cat="io") as evict_args:
+                evict_args.update(await asyncio.to_thread(get_node_cache().evict))
+        except Exception:
+            log.debug("éviction du cache nœuds échouée", exc_info=True)
+
     # Écrire un status "failed" pour les nœuds restants non exécutés
     for nid in failed_ids:
         node_dir = run_dir / "nodes" / nid
@@ -873,6 +1348,8 @@ async def run_graph(
                 "input_checksum": _cs,
                 "ended_at": datetime.now(timezone.utc).isoformat(),
             }
+            if run_deadline is not None and nid in run_deadline.missed:
+                out["reason"] = "deadline"
             status_file.write_text(
                 json.dumps(out, indent=2, ensure_ascii=False), encoding="utf-8"
             )
@@ -890,9 +1367,15 @@ async def run_graph(
         "failed": sorted(failed_ids),
         "skipped_count": skipped_count,
         "replayed_count": replayed_count,
+        "cache_skipped": sorted(cached_ids),
         "utc_time": now_utc.isoformat(),
         "paris_time": now_paris.isoformat(),
     }
+    run_budget = current_budget()
+    if run_budget is not None:
+        summary["retry"] = run_budget.summary()
+    if run_deadline is not None:
+        summary["deadline"] = run_deadline.snapshot()
     summary_path = run_dir / "summary.json"
     summary_path.write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8")
 
@@ -913,6 +1396,8 @@ async def run_graph(
             "succeeded": len(completed_ids),
             "failed": len(failed_ids),
             "skipped": skipped_count,
+            "cached": len(cached_ids),
         },
         "signals": signals,
+        **({"deadline": run_deadline.snapshot()} if run_deadline is not None else {}),
     }
@@ -1,15 +1,43 @@
 from __future__ import annotations
 import asyncio
+import copy
+import functools
 import hashlib
 import json
+import logging
+import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 
 from core.llm import call_json  # doit retourner un dict JSON
 from backend.api.fastapi_app.clients.feedbacks import create_feedback  # POST /feedbacks
 
-CHECKLISTS_ROOT = Path("quality/checklists")
+# <repo>/quality, indépendamment du répertoire courant
+QUALITY_ROOT = Path(__file__).resolve().parents[3] / "quality"
+CHECKLISTS_ROOT = QUALITY_ROOT / "checklists"
 CHECKLISTS_ALIAS = CHECKLISTS_ROOT / "latest"
+PROMPTS_ROOT = QUALITY_ROOT / "prompts"
+REVIEWER_ID = "agent:qa-reviewer@v1"
+
+log = logging.getLogger("crew.qa_reviewer")
+
+# Rôle d'agent -> checklist (fragment du rôle en minuscules, type de checklist)
+ROLE_CHECKLISTS: Tuple[Tuple[str, str], ...] = (
+    ("review", "review"),
+    ("research", "research"),
+    ("writ", "write"),
+    ("redact", "write"),
+    ("build", "build"),
+    ("dev", "build"),
+    ("cod", "build"),
+)
+
+# Mode lot: le contrat de sortie s'applique à chaque livrable
+BATCH_SYSTEM_SUFFIX = (
+    "\nMode lot : plusieurs livrables sont fournis. Applique le contrat ci-dessus à "
+    'chacun, indépendamment, et renvoie {"items": [...]} avec un élément par livrable, '
+    "dans le même ordre."
+)
 
 def _resolve_checklist_path(node_type: str, version: Optional[str] = None) -> Path:
     if version is None:
@@ -21,35 +49,87 @@ def _resolve_checklist_path(node_type: str, version: Optional[str] = None) -> Pa
         version_dir = version
     return CHECKLISTS_ROOT / version_dir / f"qa.{node_type}.v1.json"
 
+@functools.lru_cache(maxsize=64)
+def _read_checklist(path: str) -> Dict[str, Any]:
+    # Répertoires versionnés immuables: une lecture disque par (version, type)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@functools.lru_cache(maxsize=16)
+def _read_templates(version: str) -> Tuple[str, str, str]:
+    """(system, user, user lot) d'une version de prompts, mis en cache ("" si pas de gabarit de lot)."""
+    prompts_dir = PROMPTS_ROOT / version
+    with open(prompts_dir / "reviewer.system.txt", "r", encoding="utf-8") as f:
+        sys = f.read()
+    with open(prompts_dir / "reviewer.user.md", "r", encoding="utf-8") as f:
+        user_tmpl = f.read()
+    batch = prompts_dir / "reviewer.batch.user.md"
+    batch_tmpl = batch.read_text(encoding="utf-8") if batch.exists() else ""
+    return sys, user_tmpl, batch_tmpl
+
+
+def clear_caches() -> None:
+    _read_checklist.cache_clear()
+    _read_templates.cache_clear()
+
+
+def checklist_type(role: Optional[str]) -> Optional[str]:
+    """Type de checklist d'un rôle d'agent (``Writer_FR`` -> ``write``); None si aucune disponible."""
+    name = (role or "").lower()
+    for fragment, node_type in ROLE_CHECKLISTS:
+        if fragment in name:
+            try:
+                return node_type if _resolve_checklist_path(node_type).is_file() else None
+            except OSError:
+                return None
+    return None
+
+
 def load_checklist(node_type: str, version: Optional[str] = None) -> Dict[str, Any]:
     p = _resolve_checklist_path(node_type, version)
-    with open(p, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return copy.deepcopy(_read_checklist(str(p)))
 
 def sha256_text(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
 
+def _node_type(node: Any) -> Optional[str]:
+    return getattr(node, "role", None) or getattr(node, "type", None)
+
+
+def _node_meta(node: Any, run: Any) -> Dict[str, Any]:
+    return {"id": str(node.id), "type": _node_type(node), "run_id": str(run.id)}
+
+
 def build_prompts(checklist: Dict[str, Any], node: Any, run: Any, artifact_text: str) -> tuple[str, str]:
     """Construit (system, user) à partir des fichiers versionnés."""
-    prompts_dir = Path("quality/prompts") / checklist["version"]
-    with open(prompts_dir / "reviewer.system.txt", "r", encoding="utf-8") as f:
-        sys = f.read()
-    with open(prompts_dir / "reviewer.user.md", "r", encoding="utf-8") as f:
-        user_tmpl = f.read()
-    node_type = getattr(node, "role", None) or getattr(node, "type", None)
-    node_meta = {
-        "id": str(node.id),
-        "type": node_type,
-        "run_id": str(run.id),
-    }
+    sys, user_tmpl, _ = _read_templates(checklist["version"])
     user = (
         user_tmpl
         .replace("{{CHECKLIST_JSON}}", json.dumps(checklist, ensure_ascii=False, indent=2))
-        .replace("{{NODE_META}}", json.dumps(node_meta, ensure_ascii=False, indent=2))
+        .replace("{{NODE_META}}", json.dumps(_node_meta(node, run), ensure_ascii=False, indent=2))
         .replace("{{LIVRABLE}}", artifact_text)
     )
     return sys, user
 
+
+def build_batch_prompts(
+    checklist: Dict[str, Any], items: Sequence[Tuple[Any, str]], run: Any
+) -> tuple[str, str]:
+    """(system, user) pour plusieurs livrables d'un même type: checklist envoyée une fois."""
+    sys, _, batch_tmpl = _read_templates(checklist["version"])
+    blocks = []
+    for i, (node, text) in enumerate(items, 1):
+        meta = json.dumps(_node_meta(node, run), ensure_ascii=False, indent=2)
+        blocks.append(f"### Livrable {i}\n```json\n{meta}\n```\n\n{text}")
+    user = (
+        batch_tmpl
+        .replace("{{CHECKLIST_JSON}}", json.dumps(checklist, ensure_ascii=False, indent=2))
+        .replace("{{COUNT}}", str(len(items)))
+        .replace("{{LIVRABLES}}", "\n\n".join(blocks))
+    )
+    return sys + BATCH_SYSTEM_SUFFIX, user
+
 async def write_sidecar(node: Any, data: Dict[str, Any]) -> None:
     """Écrit {ts}.qa.json à côté du llm.json si disponible ; sinon dans le répertoire node."""
     base = getattr(node, "sidecars_dir", None)
@@ -61,14 +141,33 @@ async def write_sidecar(node: Any, data: Dict[str, Any]) -> None:
     with open(out, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
-async def post_node_hook(node: Any, run: Any, artifact_text: str, *, timeout_s: int = 30) -> None:
+def _feedback_payload(node: Any, run: Any, eval_json: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "run_id": str(run.id),
+        "node_id": str(node.id),
+        "source": "auto",
+        "reviewer": REVIEWER_ID,
+        "score": int(eval_json.get("overall_score", 0) or 0),
+        "comment": (eval_json.get("summary_comment") or "")[:400],
+        "evaluation": eval_json,
+    }
+
+
+async def post_node_hook(
+    node: Any,
+    run: Any,
+    artifact_text: str,
+    *,
+    timeout_s: int = 30,
+    storage: Any = None,
+) -> None:
     """
     Hook post-nœud : appelle le reviewer LLM avec la checklist du node.type,
     persiste un feedback auto (Fil J) et écrit un sidecar .qa.json.
+    Avec ``storage``, le feedback est écrit directement (sans POST /feedbacks).
     Non bloquant : en cas d'échec/timeout, log + sortie gracieuse.
     """
-    node_type = getattr(node, "role", None) or getattr(node, "type", None)
-    checklist = load_checklist(node_type, version=None)
+    checklist = load_checklist(_node_type(node), version=None)
     sys_prompt, user_prompt = build_prompts(checklist, node, run, artifact_text)
     content_hash = sha256_text(artifact_text or "")
     try:
@@ -83,24 +182,169 @@ async def post_node_hook(node: Any, run: Any, artifact_text: str, *, timeout_s:
             timeout=timeout_s,
         )
         eval_json.setdefault("meta", {})["content_sha256"] = content_hash
-        score = int(eval_json.get("overall_score", 0))
-        comment = (eval_json.get("summary_comment") or "")[:400]
-        feedback_payload = {
-            "run_id": str(run.id),
-            "node_id": str(node.id),
-            "source": "auto",
-            "reviewer": "agent:qa-reviewer@v1",
-            "score": score,
-            "comment": comment,
-            "evaluation": eval_json,
-        }
-        headers = {}
-        req_id = getattr(node, "request_id", None)
-        if req_id:
-            headers["X-Request-ID"] = req_id
-        await create_feedback(feedback_payload, headers=headers)
+        feedback_payload = _feedback_payload(node, run, eval_json)
+        if storage is not None:
+            await storage.save_feedback(**feedback_payload)
+        else:
+            headers = {}
+            req_id = getattr(node, "request_id", None)
+            if req_id:
+                headers["X-Request-ID"] = req_id
+            await create_feedback(feedback_payload, headers=headers)
         await write_sidecar(node, eval_json)
     except asyncio.TimeoutError:
         print(f"[qa_reviewer] timeout after {timeout_s}s on node {node.id}")
     except Exception as e:  # pragma: no cover - log
         print(f"[qa_reviewer] error on node {node.id}: {e}")
+
+
+# ---------- Reviewer par lots ----------
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except Exception:
+        return default
+
+
+def pack_batches(
+    items: Sequence[Tuple[Any, str]], *, max_items: int, max_chars: int
+) -> List[List[Tuple[Any, str]]]:
+    """Regroupe par type de nœud (même checklist) puis par taille (nombre, caractères)."""
+    by_type: Dict[Any, List[Tuple[Any, str]]] = {}
+    for node, text in items:
+        by_type.setdefault(_node_type(node), []).append((node, text or ""))
+    batches: List[List[Tuple[Any, str]]] = []
+    for group in by_type.values():
+        current: List[Tuple[Any, str]] = []
+        size = 0
+        for node, text in group:
+            if current and (len(current) >= max_items or size + len(text) > max_chars):
+                batches.append(current)
+                current, size = [], 0
+            current.append((node, text))
+            size += len(text)
+        if current:
+            batches.append(current)
+    return batches
+
+
+def _match_results(batch: Sequence[Tuple[Any, str]], out: Dict[str, Any]) -> List[Optional[Dict[str, Any]]]:
+    """Résultat par livrable: par ``node.id`` si présent, sinon par position."""
+    results = out.get("items") if isinstance(out, dict) else None
+    if not isinstance(results, list):
+        return [None] * len(batch)
+    by_id = {
+        str((r.get("node") or {}).get("id")): r
+        for r in results
+        if isinstance(r, dict) and isinstance(r.get("node"), dict)
+    }
+    matched: List[Optional[Dict[str, Any]]] = []
+    for i, (node, _) in enumerate(batch):
+        r = by_id.get(str(node.id))
+        if r is None and len(results) == len(batch) and isinstance(results[i], dict):
+            r = results[i]
+        matched.append(r)
+    return matched
+
+
+async def review_nodes(
+    items: Sequence[Tuple[Any, str]],
+    run: Any,
+    storage: Any,
+    *,
+    timeout_s: int = 60,
+    max_items: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    critical_threshold: Optional[int] = None,
+    call: Optional[Callable[..., Awaitable[Dict[str, Any]]]] = None,
+    failed: Optional[List[Any]] = None,
+) -> Dict[str, int]:
+    """
+    Revue QA de plusieurs nœuds ``(node, texte)`` d'un run: un appel JSON
+    structuré par lot de même type (QA_REVIEW_BATCH_SIZE livrables,
+    QA_REVIEW_BATCH_MAX_CHARS caractères), feedbacks écrits en une fois via
+    ``storage.save_feedbacks``. Un livrable absent de la réponse est revu seul.
+    Avec ``critical_threshold``, un score inférieur émet ``feedback.critical``.
+
+    ``call`` remplace ``call_json`` (mêmes arguments nommés, dict en retour);
+    les nœuds non revus sont ajoutés à ``failed`` pour un repli de l'appelant.
+    """
+    max_items = max_items or _env_int("QA_REVIEW_BATCH_SIZE", 8)
+    max_chars = max_chars or _env_int("QA_REVIEW_BATCH_MAX_CHARS", 24000)
+    model = getattr(run, "review_model", "openai:gpt-4o-mini")
+    stats = {"items": len(items), "calls": 0, "reviewed": 0, "failed": 0}
+    feedbacks: List[Dict[str, Any]] = []
+    sidecars: List[Tuple[Any, Dict[str, Any]]] = []
+
+    call = call or call_json
+
+    async def _call(system: str, user: str) -> Dict[str, Any]:
+        stats["calls"] += 1
+        out = await asyncio.wait_for(
+            call(system=system, user=user, model=model, json_mode=True, temperature=0.0),
+            timeout=timeout_s,
+        )
+        if not isinstance(out, dict):
+            raise ValueError("réponse du reviewer non JSON objet")
+        return out
+
+    def _failed(nodes: Sequence[Any]) -> None:
+        stats["failed"] += len(nodes)
+        if failed is not None:
+            failed.extend(nodes)
+
+    for batch in pack_batches(items, max_items=max_items, max_chars=max_chars):
+        try:
+            checklist = load_checklist(_node_type(batch[0][0]), version=None)
+        except Exception as e:
+            log.warning("checklist indisponible (%s): %s", _node_type(batch[0][0]), e)
+            _failed([node for node, _ in batch])
+            continue
+        # Version de prompts sans gabarit de lot: revue individuelle
+        if len(batch) == 1 or not _read_templates(checklist["version"])[2]:
+            results: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+        else:
+            try:
+                out = await _call(*build_batch_prompts(checklist, batch, run))
+            except Exception as e:
+                log.warning("revue par lot échouée (%s nœuds): %s", len(batch), e)
+                out = {}
+            results = _match_results(batch, out)
+        for (node, text), eval_json in zip(batch, results):
+            if not isinstance(eval_json, dict):
+                # Livrable seul ou manquant dans la réponse du lot: revue individuelle
+                try:
+                    eval_json = await _call(*build_prompts(checklist, node, run, text))
+                except Exception as e:
+                    log.warning("revue du nœud %s échouée: %s", node.id, e)
+                    _failed([node])
+                    continue
+            eval_json.setdefault("meta", {})["content_sha256"] = sha256_text(text)
+            feedbacks.append(_feedback_payload(node, run, eval_json))
+            sidecars.append((node, eval_json))
+
+    if feedbacks:
+        try:
+            await storage.save_feedbacks(feedbacks)
+        except Exception as e:  # pragma: no cover - log
+            log.warning("écriture groupée des feedbacks échouée: %s", e)
+            _failed([node for node, _ in sidecars])
+            return stats
+    for node, eval_json in sidecars:
+        try:
+            await write_sidecar(node, eval_json)
+        except Exception:
+            pass
+    if critical_threshold is not None:
+        for fb in feedbacks:
+            if fb["score"] < critical_threshold:
+                try:
+                    await storage.save_event(
+                        run_id=fb["run_id"], node_id=fb["node_id"], level="warn", message="feedback.critical"
+                    )
+                except Exception:
+                    pass
+    stats["reviewed"] = len(feedbacks)
+    return stats
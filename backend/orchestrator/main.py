@@ -102,6 +102,12 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     p.add_argument("--resume", action="store_true", help="Reprendre un run existant (nécessite --run-id)")
     p.add_argument("--override", action="append", default=[], help="Node ID à relancer même s'il est 'completed'")
     p.add_argument("--dry-run", action="store_true", help="Affiche les décisions de skip/recalc sans exécuter")
+    p.add_argument(
+        "--deadline-s",
+        type=float,
+        default=None,
+        help="Échéance du run en secondes (budgets par nœud, échec rapide des nœuds hors délai)",
+    )
 
     # génération via superviseur
     p.add_argument("--use-supervisor", action="store_true", help="Génère le plan via le superviseur LLM")
@@ -222,6 +228,7 @@ def main() -> None:
             dry_run=args.dry_run,
             on_node_start=tracker.on_node_start,
             on_node_end=tracker.on_node_end,
+            deadline_s=args.deadline_s,
         )
     )
 
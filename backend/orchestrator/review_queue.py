@@ -0,0 +1,120 @@
+# orchestrator/review_queue.py
+"""
+File d'auto-review asynchrone d'un run.
+
+Les nœuds terminés y sont déposés au lieu d'être revus en ligne: un pool
+borné de workers les dépile par lots (``review_batch``) et écrit feedbacks
+et événements ``feedback.critical``; les successeurs n'attendent plus le
+reviewer. ``drain`` est appelé en fin de run (les reviews restent
+consignées avant le retour de ``run_graph``).
+
+Les workers copient le contexte (ContextVars) de la tâche qui les crée:
+``start`` est appelé par ``run_graph`` hors de toute portée de nœud, pour
+qu'une review ne tourne pas sous l'échéance, le budget de retries ou la
+ligne de trace du premier nœud soumis.
+
+Variables d'environnement:
+- AUTO_REVIEW_WORKERS   : workers concurrents (défaut 2)
+- AUTO_REVIEW_BATCH_SIZE: nœuds max par lot (défaut 4)
+- AUTO_REVIEW_QUEUE_MAX : profondeur max; au-delà ``submit`` refuse et
+  l'appelant revoit en ligne (contre-pression, défaut 256)
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+log = logging.getLogger("crew.review_queue")
+
+ReviewItem = Dict[str, Any]
+ReviewBatch = Callable[[List[ReviewItem]], Awaitable[None]]
+
+
+def _env_int(name: str, default: int, minimum: int = 1) -> int:
+    try:
+        return max(minimum, int(os.getenv(name, str(default))))
+    except Exception:
+        return default
+
+
+class ReviewQueue:
+    def __init__(
+        self,
+        review_batch: ReviewBatch,
+        *,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        maxsize: Optional[int] = None,
+    ) -> None:
+        self.review_batch = review_batch
+        self.workers = workers or _env_int("AUTO_REVIEW_WORKERS", 2)
+        self.batch_size = batch_size or _env_int("AUTO_REVIEW_BATCH_SIZE", 4)
+        self.maxsize = maxsize or _env_int("AUTO_REVIEW_QUEUE_MAX", 256)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.submitted = 0
+        self.reviewed = 0
+        self.batches = 0
+        self.failed = 0
+
+    def start(self) -> asyncio.Queue:
+        """Démarre les workers (idempotent) dans le contexte courant."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        return self._queue
+
+    def submit(self, item: ReviewItem) -> bool:
+        """Dépose un nœud à revoir; False si la file est pleine."""
+        try:
+            self.start().put_nowait(item)
+        except asyncio.QueueFull:
+            return False
+        self.submitted += 1
+        return True
+
+    async def _worker(self, idx: int) -> None:
+        queue = self._queue
+        assert queue is not None
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await self.review_batch(batch)
+                self.reviewed += len(batch)
+            except Exception as e:  # pragma: no cover - reviewer tolérant
+                self.failed += len(batch)
+                log.warning("auto-review batch failed worker=%s size=%s err=%s", idx, len(batch), e)
+            finally:
+                self.batches += 1
+                for _ in batch:
+                    queue.task_done()
+
+    async def drain(self) -> None:
+        """Attend la fin des reviews en attente puis arrête les workers."""
+        if self._queue is not None:
+            await self._queue.join()
+        await self.close()
+
+    async def close(self) -> None:
+        """Arrête les workers (reviews en attente abandonnées)."""
+        tasks, self._tasks = self._tasks, []
+        for t in tasks:
+            t.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._queue = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "submitted": self.submitted,
+            "reviewed": self.reviewed,
+            "batches": self.batches,
+            "failed": self.failed,
+        }
@@ -20,12 +20,16 @@ from sqlmodel import SQLModel
 # --- importe l'app et les deps ---
 # Réduit le bruit en tests: ne pas charger .env ni vérifier les variables manquantes
 os.environ.setdefault("CONFIG_SKIP_DOTENV", "1")
+os.environ.setdefault("ROLLUP_INTERVAL_S", "0")
+os.environ.setdefault("RETENTION_INTERVAL_S", "0")
 
 from backend.api.fastapi_app.app import app
 from backend.api.fastapi_app import deps as api_deps  # <-- contient get_db et (probablement) les deps d'auth
 
 # --- importe tes modèles & Base ---
 from core.storage.db_models import Run, Node, Artifact, Event
+from core.storage.run_cache import run_cache
+from core.storage.rollups import reset_refresh_clock
 
 
 # ---------- Engine & Session de test (PostgreSQL) ----------
@@ -227,6 +231,8 @@ def reset_app_state(app_lifespan):
         state.event_publisher.disabled = False
     if hasattr(state, "shutting_down"):
         state.shutting_down = False
+    run_cache.clear()
+    reset_refresh_clock()
     yield
 
 
@@ -75,3 +75,100 @@ async def test_artifacts_ordering(client: AsyncClient, db_session, seed_sample):
     finally:
         await db_session.execute(delete(Artifact).where(Artifact.id == extra["id"]))
         await db_session.commit()
+
+
+async def test_artifacts_list_without_content(client: AsyncClient, db_session, seed_sample):
+    node_id = seed_sample["node_ids"][0]
+    now = dt.datetime.now(dt.timezone.utc)
+    big = {
+        "id": uuid.uuid4(),
+        "node_id": node_id,
+        "type": "markdown",
+        "path": "/tmp/big.md",
+        "content": "é" * 1000,
+        "summary": None,
+        "created_at": now + dt.timedelta(minutes=1),
+    }
+    await db_session.execute(insert(Artifact), [big])
+    await db_session.commit()
+    try:
+        r = await client.get(f"/nodes/{node_id}/artifacts", params={"include_content": "false"})
+        assert r.status_code == 200
+        items = r.json()["items"]
+        assert all(it["content"] is None for it in items)
+        first = items[0]
+        assert first["id"] == str(big["id"])
+        assert first["preview"] == "é" * 280 + "…"
+
+        # Contenu complet par défaut (compatibilité); le mode léger reste opt-in
+        r = await client.get(f"/nodes/{node_id}/artifacts")
+        assert r.json()["items"][0]["content"] == big["content"]
+    finally:
+        await db_session.execute(delete(Artifact).where(Artifact.id == big["id"]))
+        await db_session.commit()
+
+
+async def test_artifact_content_range(client: AsyncClient, db_session, seed_sample):
+    node_id = seed_sample["node_ids"][0]
+    art = {
+        "id": uuid.uuid4(),
+        "node_id": node_id,
+        "type": "markdown",
+        "path": "/tmp/range.md",
+        "content": "0123456789",
+        "created_at": dt.datetime.now(dt.timezone.utc),
+    }
+    await db_session.execute(insert(Artifact), [art])
+    await db_session.commit()
+    try:
+        r = await client.get(f"/artifacts/{art['id']}/content")
+        assert r.status_code == 200
+        assert r.text == "0123456789"
+        assert r.headers["accept-ranges"] == "bytes"
+
+        r = await client.get(f"/artifacts/{art['id']}/content", headers={"Range": "bytes=2-5"})
+        assert r.status_code == 206
+        assert r.content == b"2345"
+        assert r.headers["content-range"] == "bytes 2-5/10"
+
+        r = await client.get(f"/artifacts/{art['id']}/content", headers={"Range": "bytes=-3"})
+        assert r.status_code == 206
+        assert r.content == b"789"
+
+        r = await client.get(f"/artifacts/{art['id']}/content", headers={"Range": "bytes=20-"})
+        assert r.status_code == 416
+    finally:
+        await db_session.execute(delete(Artifact).where(Artifact.id == art["id"]))
+        await db_session.commit()
+
+
+async def test_artifact_content_gzip_passthrough(client: AsyncClient, db_session, seed_sample, tmp_path, monkeypatch):
+    import gzip
+    from backend.api.fastapi_app import deps as api_deps
+
+    monkeypatch.setattr(api_deps.settings, "artifacts_dir", str(tmp_path))
+    target = tmp_path / "doc.md"
+    target.write_text("# doc\n" * 50, encoding="utf-8")
+    (tmp_path / "doc.md.gz").write_bytes(gzip.compress(target.read_bytes()))
+    art = {
+        "id": uuid.uuid4(),
+        "node_id": seed_sample["node_ids"][0],
+        "type": "markdown",
+        "path": str(target),
+        "content": None,
+        "created_at": dt.datetime.now(dt.timezone.utc),
+    }
+    await db_session.execute(insert(Artifact), [art])
+    await db_session.commit()
+    try:
+        r = await client.get(f"/artifacts/{art['id']}/content", headers={"Accept-Encoding": "gzip"})
+        assert r.status_code == 200
+        assert r.headers["content-encoding"] == "gzip"
+        assert r.text == "# doc\n" * 50
+
+        r = await client.get(f"/artifacts/{art['id']}/content", headers={"Range": "bytes=0-4"})
+        assert r.status_code == 206
+        assert r.content == b"# doc"
+    finally:
+        await db_session.execute(delete(Artifact).where(Artifact.id == art["id"]))
+        await db_session.commit()
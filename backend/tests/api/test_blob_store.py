@@ -0,0 +1,106 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete, insert
+
+from core.storage.blob_store import LocalBlobStore, get_text, put_text, sha256_hex
+from core.storage.db_models import Artifact, Node, Run, RunStatus, NodeStatus
+from core.storage.postgres_adapter import PostgresAdapter
+
+
+def test_local_blob_store_dedup(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    ref1 = put_text("# même contenu", store=store)
+    path = store.path_for(ref1.sha256)
+    mtime = path.stat().st_mtime_ns
+    ref2 = put_text("# même contenu", store=store)
+    assert ref1 == ref2
+    assert ref1.sha256 == sha256_hex("# même contenu".encode("utf-8"))
+    assert path.stat().st_mtime_ns == mtime
+    assert get_text(ref1.sha256, store=store) == "# même contenu"
+    assert store.head_object("0" * 64) is None
+
+
+@pytest.mark.asyncio
+async def test_save_artifact_out_of_line(pg_test_db, tmp_path, monkeypatch, client: AsyncClient, db_session):
+    monkeypatch.setenv("BLOB_STORE_URL", f"file://{tmp_path}")
+    monkeypatch.setenv("ARTIFACT_BLOB_MIN_BYTES", "64")
+    run_id, node_id = uuid.uuid4(), uuid.uuid4()
+    await db_session.execute(insert(Run).values(id=run_id, title="blob", status=RunStatus.completed))
+    await db_session.execute(
+        insert(Node).values(id=node_id, run_id=run_id, key="n1", title="n1", status=NodeStatus.completed)
+    )
+    await db_session.commit()
+
+    adapter = PostgresAdapter(pg_test_db)
+    body = "# Rapport\n" + "ligne\n" * 100
+    try:
+        first = await adapter.save_artifact(node_id=node_id, type="markdown", content=body)
+        second = await adapter.save_artifact(node_id=node_id, type="markdown", content=body)
+        small = await adapter.save_artifact(node_id=node_id, type="markdown", content="court")
+        assert first.content is None and first.content_hash == second.content_hash
+        assert first.size_bytes == len(body.encode("utf-8"))
+        assert first.preview == body[:280] + "…"
+        assert small.content == "court" and small.content_hash is None
+        assert len(list(tmp_path.rglob("*"))) == 3  # 2 niveaux + 1 blob
+
+        listed = await adapter.list_artifacts_for_node(node_id, include_content=True)
+        assert {it["content"] for it in listed} == {body, "court"}
+        assert {it["preview"] for it in listed} == {body[:280] + "…", "court"}
+
+        r = await client.get(f"/nodes/{node_id}/artifacts")
+        assert {it["preview"] for it in r.json()["items"]} == {body[:280] + "…", "court"}
+
+        r = await client.get(f"/artifacts/{first.id}")
+        assert r.status_code == 200
+        assert r.json()["content"] == body
+
+        r = await client.get(f"/artifacts/{first.id}/content", headers={"Range": "bytes=0-8"})
+        assert r.status_code == 206
+        assert r.content == b"# Rapport"
+    finally:
+        await db_session.execute(delete(Artifact).where(Artifact.node_id == node_id))
+        await db_session.execute(delete(Node).where(Node.id == node_id))
+        await db_session.execute(delete(Run).where(Run.id == run_id))
+        await db_session.commit()
+        await adapter.dispose()
+
+
+@pytest.mark.asyncio
+async def test_save_artifact_compressed_blob(pg_test_db, tmp_path, monkeypatch, client: AsyncClient, db_session):
+    pytest.importorskip("zstandard")
+    monkeypatch.setenv("BLOB_STORE_URL", f"file://{tmp_path}")
+    monkeypatch.setenv("ARTIFACT_BLOB_MIN_BYTES", "64")
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "zstd")
+    run_id, node_id = uuid.uuid4(), uuid.uuid4()
+    await db_session.execute(insert(Run).values(id=run_id, title="zstd", status=RunStatus.completed))
+    await db_session.execute(
+        insert(Node).values(id=node_id, run_id=run_id, key="n1", title="n1", status=NodeStatus.completed)
+    )
+    await db_session.commit()
+
+    adapter = PostgresAdapter(pg_test_db)
+    body = "# Rapport\n" + "ligne répétée\n" * 200
+    try:
+        art = await adapter.save_artifact(node_id=node_id, type="markdown", content=body)
+        assert art.codec == "zstd"
+        blob = LocalBlobStore(tmp_path).path_for(art.content_hash)
+        assert blob.stat().st_size < len(body.encode("utf-8"))
+
+        r = await client.get(f"/artifacts/{art.id}")
+        assert r.json()["content"] == body
+
+        r = await client.get(f"/artifacts/{art.id}/content")
+        assert r.status_code == 200
+        assert r.content == body.encode("utf-8")
+
+        r = await client.get(f"/artifacts/{art.id}/content", headers={"Range": "bytes=0-8"})
+        assert r.status_code == 206
+        assert r.content == b"# Rapport"
+    finally:
+        await db_session.execute(delete(Artifact).where(Artifact.node_id == node_id))
+        await db_session.execute(delete(Node).where(Node.id == node_id))
+        await db_session.execute(delete(Run).where(Run.id == run_id))
+        await db_session.commit()
+        await adapter.dispose()
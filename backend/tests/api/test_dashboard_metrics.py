@@ -0,0 +1,168 @@
+import datetime as dt
+import json
+import uuid
+
+import pytest
+from sqlalchemy import delete, insert, text
+
+from core.storage.db_models import Event, Feedback, Node, Run
+from zoneinfo import ZoneInfo
+
+from core.storage.rollups import bucket_starts, histogram_percentile, refresh_dashboard_rollup
+
+DAY = dt.datetime(2024, 3, 1, tzinfo=dt.timezone.utc)
+
+
+def test_histogram_percentile_interpolates():
+    # 2 runs dans ]5s, 10s], 2 runs dans ]30s, 60s]
+    hist = [0, 0, 0, 2, 0, 2, 0, 0, 0, 0, 0, 0, 0]
+    assert histogram_percentile(hist, 0.5) == 10000.0
+    assert histogram_percentile(hist, 1.0) == 60000.0
+    assert histogram_percentile([], 0.5) is None
+
+
+def test_daily_buckets_follow_local_midnight_across_dst():
+    paris = ZoneInfo("Europe/Paris")
+    start = dt.datetime(2024, 3, 29, tzinfo=paris)
+    starts = bucket_starts(start, start + dt.timedelta(days=4), dt.timedelta(days=1), paris)
+    # Minuit local: 23:00Z en hiver, 22:00Z après le passage à l'heure d'été (31/03)
+    assert [s.astimezone(paris).hour for s in starts] == [0, 0, 0, 0]
+    assert [s.astimezone(dt.timezone.utc).hour for s in starts] == [23, 23, 23, 22]
+    # Tranches horaires: même fenêtre, alignées sur l'heure
+    hours = bucket_starts(start, start + dt.timedelta(hours=3), dt.timedelta(hours=1), paris)
+    assert [h.minute for h in hours] == [0, 0, 0]
+
+
+def _run(run_id, status, start, seconds):
+    return {
+        "id": run_id,
+        "title": "dash",
+        "status": status,
+        "started_at": start,
+        "ended_at": start + dt.timedelta(seconds=seconds),
+    }
+
+
+@pytest.mark.asyncio
+async def test_dashboard_metrics_buckets_and_incremental_refresh(client, db_session, monkeypatch):
+    monkeypatch.setenv("DASHBOARD_ROLLUP_MAX_AGE_S", "0")
+    runs = [
+        _run(uuid.uuid4(), "completed", DAY + dt.timedelta(hours=1, minutes=10), 8),
+        _run(uuid.uuid4(), "completed", DAY + dt.timedelta(hours=1, minutes=40), 50),
+        _run(uuid.uuid4(), "failed", DAY + dt.timedelta(hours=3), 20),
+    ]
+    node_id = uuid.uuid4()
+    await db_session.execute(insert(Run), runs)
+    await db_session.execute(
+        insert(Node).values(id=node_id, run_id=runs[0]["id"], key="n1", title="n1", status="completed")
+    )
+    await db_session.execute(
+        insert(Event).values(
+            id=uuid.uuid4(),
+            run_id=runs[0]["id"],
+            node_id=node_id,
+            level="NODE_COMPLETED",
+            message=json.dumps({"usage": {"prompt_tokens": 12, "completion_tokens": 30}}),
+        )
+    )
+    await db_session.execute(
+        insert(Event).values(id=uuid.uuid4(), run_id=runs[1]["id"], level="NODE_COMPLETED", message="pas du json")
+    )
+    await db_session.execute(
+        insert(Feedback).values(
+            id=uuid.uuid4(),
+            run_id=runs[0]["id"],
+            node_id=node_id,
+            source="human",
+            reviewer="qa",
+            score=85,
+            comment="ok",
+            created_at=DAY + dt.timedelta(hours=2),
+        )
+    )
+    await db_session.commit()
+    extra_id = uuid.uuid4()
+    params = {"from": DAY.isoformat(), "to": (DAY + dt.timedelta(hours=6)).isoformat(), "bucket": "1h"}
+    try:
+        await refresh_dashboard_rollup(db_session, full=True)
+        r = await client.get("/metrics/dashboard", params=params)
+        assert r.status_code == 200, r.text
+        body = r.json()
+        assert body["bucket_s"] == 3600
+        assert len(body["buckets"]) == 6
+        h1 = body["buckets"][1]
+        assert h1["runs"] == {"completed": 2}
+        assert h1["prompt_tokens"] == 12 and h1["total_tokens"] == 42
+        assert h1["duration_avg_ms"] == 29000.0
+        assert body["buckets"][3]["runs"] == {"failed": 1}
+        assert body["totals"]["total"] == 3
+        assert body["totals"]["success_rate"] == pytest.approx(2 / 3, rel=1e-3)
+        assert {"band": "80", "count": 1} in body["feedback_scores"]
+
+        # Un run ajouté après coup (créé maintenant, démarré dans la fenêtre)
+        await db_session.execute(
+            insert(Run).values(**_run(extra_id, "canceled", DAY + dt.timedelta(hours=5), 3))
+        )
+        await db_session.commit()
+        # Lecture sans recalcul en ligne: la tranche n'apparaît qu'après un passage
+        r = await client.get("/metrics/dashboard", params=params)
+        assert r.status_code == 200
+        await refresh_dashboard_rollup(db_session)
+        r = await client.get("/metrics/dashboard", params=params)
+        assert r.json()["buckets"][5]["runs"] == {"canceled": 1}
+        assert r.json()["totals"]["total"] == 4
+
+        r = await client.get("/metrics/dashboard", params={**params, "bucket": "7m"})
+        assert r.status_code == 400
+    finally:
+        ids = [x["id"] for x in runs] + [extra_id]
+        await db_session.execute(delete(Feedback).where(Feedback.run_id.in_(ids)))
+        await db_session.execute(delete(Event).where(Event.run_id.in_(ids)))
+        await db_session.execute(delete(Node).where(Node.id == node_id))
+        await db_session.execute(delete(Run).where(Run.id.in_(ids)))
+        await db_session.commit()
+        await refresh_dashboard_rollup(db_session, full=True)
+
+
+@pytest.mark.asyncio
+async def test_refresh_tolerates_non_json_event_messages(client, db_session):
+    run_id, node_id = uuid.uuid4(), uuid.uuid4()
+    summer = dt.datetime(2024, 7, 10, 12, tzinfo=dt.timezone.utc)
+    await db_session.execute(insert(Run).values(**_run(run_id, "completed", summer, 4)))
+    await db_session.execute(
+        insert(Node).values(id=node_id, run_id=run_id, key="n1", title="n1", status="completed")
+    )
+    messages = [
+        json.dumps({"usage": {"prompt_tokens": 5, "completion_tokens": 7}}),
+        '{"usage": {"prompt_tokens": 1',  # JSON tronqué: entre dans le bloc EXCEPTION
+        "[1, 2]",
+        "texte libre",
+    ]
+    await db_session.execute(
+        insert(Event),
+        [
+            {"id": uuid.uuid4(), "run_id": run_id, "node_id": node_id, "level": "NODE_COMPLETED", "message": m}
+            for m in messages
+        ],
+    )
+    await db_session.commit()
+    try:
+        assert (await db_session.execute(text("SELECT safe_jsonb('{oops')"))).scalar() is None
+        await refresh_dashboard_rollup(db_session, full=True)
+        # Jour civil de Paris en été: la tranche démarre à 22:00Z la veille
+        params = {
+            "from": dt.datetime(2024, 7, 10, tzinfo=ZoneInfo("Europe/Paris")).isoformat(),
+            "to": dt.datetime(2024, 7, 11, tzinfo=ZoneInfo("Europe/Paris")).isoformat(),
+            "bucket": "1d",
+        }
+        r = await client.get("/metrics/dashboard", params=params, headers={"X-Timezone": "Europe/Paris"})
+        assert r.status_code == 200, r.text
+        (day,) = r.json()["buckets"]
+        assert day["start"].startswith("2024-07-10T00:00:00+02:00")
+        assert day["runs"] == {"completed": 1} and day["total_tokens"] == 12
+    finally:
+        await db_session.execute(delete(Event).where(Event.run_id == run_id))
+        await db_session.execute(delete(Node).where(Node.id == node_id))
+        await db_session.execute(delete(Run).where(Run.id == run_id))
+        await db_session.commit()
+        await refresh_dashboard_rollup(db_session, full=True)
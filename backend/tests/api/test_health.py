@@ -6,3 +6,15 @@ async def test_health_ok(client):
     assert r.status_code == 200
     body = r.json()
     assert body["status"] in ("ok", "degraded")
+
+
+@pytest.mark.asyncio
+async def test_health_exposes_llm_circuits(client):
+    from core.llm.circuit_breaker import record_failure
+    from core.llm.providers.base import ProviderUnavailable
+
+    for _ in range(3):
+        record_failure("ollama", "llama3.1:8b", ProviderUnavailable("down"))
+    body = (await client.get("/health")).json()
+    assert "ollama:*" in body["llm"]["open"]
+    assert {c["state"] for c in body["llm"]["circuits"]} == {"open"}
@@ -0,0 +1,123 @@
+import asyncio
+import datetime as dt
+import json
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete, insert, text
+
+from core.io import archive
+from core.io.run_index import aload_index
+from core.storage.db_models import Event, Run
+from core.storage.retention import (
+    archive_old_events,
+    ensure_event_partitions,
+    is_partitioned,
+    prune_run_dirs,
+)
+
+OLD = dt.datetime(2023, 1, 15, 12, tzinfo=dt.timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_events_partition_archive_and_run_dir_prune(client, db_session, tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("ARTIFACTS_DIR", str(tmp_path / "runs"))
+    monkeypatch.setenv("ARCHIVE_DIR", str(tmp_path / "archive"))
+    assert await is_partitioned(db_session)
+    assert await ensure_event_partitions(db_session) == []  # créées par la migration
+
+    run_id = uuid.uuid4()
+    await db_session.execute(
+        insert(Run).values(
+            id=run_id, title="old", status="completed", started_at=OLD, ended_at=OLD + dt.timedelta(minutes=1)
+        )
+    )
+    await db_session.execute(
+        insert(Event),
+        [
+            {"id": uuid.uuid4(), "run_id": run_id, "level": "RUN_STARTED", "message": "{}",
+             "timestamp": OLD},
+            {"id": uuid.uuid4(), "run_id": run_id, "level": "RUN_COMPLETED",
+             "message": json.dumps({"request_id": "r-old"}), "request_id": "r-old",
+             "timestamp": OLD + dt.timedelta(minutes=1)},
+        ],
+    )
+    await db_session.commit()
+    run_dir = tmp_path / "runs" / str(run_id)
+    (run_dir / "nodes" / "n1").mkdir(parents=True)
+    (run_dir / "nodes" / "n1" / "artifact_n1.md").write_text("# archivé", encoding="utf-8")
+    (run_dir / "run.json").write_text(json.dumps({"status": "completed", "ended_at": "2023-01-15"}))
+    try:
+        cutoff = dt.datetime(2023, 3, 1, tzinfo=dt.timezone.utc)
+        archived = await archive_old_events(db_session, older_than=cutoff)
+        assert [a["partition"] for a in archived] == ["events_p202301"]
+        assert archived[0]["rows"] == 2
+        assert (
+            await db_session.execute(text("SELECT to_regclass('events_p202301') IS NULL"))
+        ).scalar_one()
+
+        r = await client.get("/events", params={"run_id": str(run_id)})
+        assert r.status_code == 200, r.text
+        body = r.json()
+        assert body["total"] == 2
+        assert [e["level"] for e in body["items"]] == ["RUN_COMPLETED", "RUN_STARTED"]
+        r = await client.get("/events", params={"run_id": str(run_id), "level": "RUN_STARTED"})
+        assert r.json()["total"] == 1
+
+        assert await prune_run_dirs(db_session, older_than=cutoff) == [str(run_id)]
+        assert not run_dir.exists()
+        assert (tmp_path / "archive" / "runs" / f"{run_id}.tar.gz").is_file()
+        # Lecture à la demande: le dossier est ré-extrait depuis l'archive
+        index = await aload_index(run_dir)
+        assert index["nodes"]["n1"]["markdown"]["preview"] == "# archivé"
+        assert run_dir.is_dir()
+    finally:
+        await db_session.rollback()
+        await db_session.execute(delete(Event).where(Event.run_id == run_id))
+        await db_session.execute(delete(Run).where(Run.id == run_id))
+        await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_partition_export_does_not_block_event_writes(db_session, tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("ARCHIVE_DIR", str(tmp_path / "archive"))
+    run_id = uuid.uuid4()
+    await db_session.execute(insert(Run).values(id=run_id, title="old", status="completed"))
+    await db_session.execute(
+        insert(Event).values(id=uuid.uuid4(), run_id=run_id, level="RUN_STARTED", message="{}", timestamp=OLD)
+    )
+    await db_session.commit()
+    loop = asyncio.get_running_loop()
+    engine = db_session.bind
+    real_write = archive.write_run_events
+
+    async def late_event():
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(Event).values(
+                    id=uuid.uuid4(), run_id=run_id, level="RUN_COMPLETED", message="{}", timestamp=OLD
+                )
+            )
+
+    def write_during_insert(*args):
+        # Écriture concurrente pendant l'export: ne doit pas attendre le détachement
+        asyncio.run_coroutine_threadsafe(asyncio.wait_for(late_event(), 5), loop).result()
+        return real_write(*args)
+
+    monkeypatch.setattr(archive, "write_run_events", write_during_insert)
+    cutoff = dt.datetime(2023, 3, 1, tzinfo=dt.timezone.utc)
+    try:
+        # Ligne arrivée pendant l'export: partition conservée, archivée au passage suivant
+        assert await archive_old_events(db_session, older_than=cutoff) == []
+        assert (
+            await db_session.execute(text("SELECT count(*) FROM events_p202301"))
+        ).scalar_one() == 2
+        monkeypatch.setattr(archive, "write_run_events", real_write)
+        (manifest,) = await archive_old_events(db_session, older_than=cutoff)
+        assert manifest["rows"] == 2
+    finally:
+        await db_session.rollback()
+        await db_session.execute(delete(Event).where(Event.run_id == run_id))
+        await db_session.execute(delete(Run).where(Run.id == run_id))
+        await db_session.commit()
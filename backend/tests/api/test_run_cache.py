@@ -0,0 +1,93 @@
+import datetime as dt
+import uuid
+
+import pytest
+from sqlalchemy import delete, insert
+
+from core.storage.db_models import Event, Feedback, Run
+from core.storage.run_cache import RunCache, run_cache
+from core.telemetry.metrics import get_run_cache_requests_total
+
+
+def _lookups(kind: str, result: str) -> float:
+    return get_run_cache_requests_total().labels(kind=kind, result=result)._value.get()
+
+
+def test_run_cache_lru_eviction_and_invalidation():
+    cache = RunCache(max_entries=2, ttl_s=0)
+    cache.set(("summary", "r1"), {"a": 1})
+    cache.set(("summary", "r2"), {"a": 2})
+    assert cache.get(("summary", "r1")) == {"a": 1}
+    cache.set(("summary", "r3"), {"a": 3})
+    # r2 est le moins récemment utilisé
+    assert cache.get(("summary", "r2")) is None
+    assert cache.get(("summary", "r1")) is not None
+    assert cache.size_bytes > 0
+
+    assert cache.invalidate_run("r1") == 1
+    assert cache.get(("summary", "r1")) is None
+    assert len(cache) == 1
+
+
+def test_run_cache_disabled():
+    cache = RunCache(max_entries=0)
+    cache.set(("summary", "r1"), {"a": 1})
+    assert cache.get(("summary", "r1")) is None
+
+
+@pytest.mark.asyncio
+async def test_summary_cached_for_terminal_run(client, db_session, seed_sample):
+    run_id = seed_sample["run_id"]
+    hits_before = _lookups("summary", "hit")
+
+    r1 = await client.get(f"/runs/{run_id}/summary")
+    assert r1.status_code == 200
+    assert r1.json()["events_total"] == 2
+
+    # Écriture hors API : la réponse en cache reste servie
+    await db_session.execute(
+        insert(Event).values(id=uuid.uuid4(), run_id=run_id, level="INFO", message="late")
+    )
+    await db_session.commit()
+    r2 = await client.get(f"/runs/{run_id}/summary")
+    assert r2.json()["events_total"] == 2
+    assert _lookups("summary", "hit") == hits_before + 1
+
+    # Un feedback invalide le run
+    payload = {
+        "run_id": str(run_id),
+        "node_id": str(seed_sample["node_ids"][0]),
+        "source": "human",
+        "score": 70,
+        "comment": "ok",
+    }
+    resp = await client.post("/feedbacks", json=payload, headers={"X-Request-ID": "cache-req"})
+    assert resp.status_code == 201, resp.text
+    r3 = await client.get(f"/runs/{run_id}/summary")
+    assert r3.json()["events_total"] == 3
+
+    await db_session.execute(delete(Feedback).where(Feedback.run_id == run_id))
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_running_run_not_cached(client, db_session):
+    run_id = uuid.uuid4()
+    await db_session.execute(
+        insert(Run).values(
+            id=run_id,
+            title="Live",
+            status="running",
+            started_at=dt.datetime.now(dt.timezone.utc),
+        )
+    )
+    await db_session.commit()
+    try:
+        r = await client.get(f"/runs/{run_id}")
+        assert r.status_code == 200
+        r = await client.get(f"/runs/{run_id}/incident")
+        assert r.status_code == 200
+        assert not any(key[1] == str(run_id) for key in list(run_cache._data))
+    finally:
+        await db_session.execute(delete(Run).where(Run.id == run_id))
+        await db_session.commit()
@@ -0,0 +1,58 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import delete, select
+
+from api.database.models import Run, Node, Artifact, Event
+from ..conftest import wait_status
+
+
+@pytest.mark.asyncio
+async def test_run_trace_is_served_as_chrome_trace(async_client, db_session, tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACTS_DIR", str(tmp_path))
+    monkeypatch.setenv("RUNS_ROOT", str(tmp_path))
+    headers = {"X-API-Key": "test-key"}
+    r = await async_client.post(
+        "/tasks",
+        headers=headers,
+        json={
+            "title": "Trace",
+            "task": {"title": "Trace", "plan": [{"id": "n1", "title": "T1"}]},
+            "options": {"resume": False, "dry_run": False, "override": []},
+        },
+    )
+    assert r.status_code == 202
+    rid = r.json()["run_id"]
+    assert await wait_status(async_client, rid, "completed", timeout=5.0)
+
+    # trace.json est écrit à la toute fin de run_task (après la finalisation)
+    res = None
+    for _ in range(50):
+        res = await async_client.get(f"/runs/{rid}/trace", headers=headers)
+        if res.status_code == 200:
+            break
+        await asyncio.sleep(0.1)
+    assert res.status_code == 200
+    trace = res.json()
+    assert trace["otherData"]["run_id"] == rid
+    spans = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    names = {e["name"] for e in spans}
+    assert {"run_graph", "node", "execute_node", "agent", "on_node_end"} <= names
+    lanes = {e["args"]["name"]: e["tid"] for e in trace["traceEvents"] if e["name"] == "thread_name"}
+    node = next(e for e in spans if e["name"] == "node")
+    assert node["tid"] == lanes["n1"] and node["args"]["status"] == "completed"
+
+    exported = await async_client.get(f"/runs/{rid}/trace?export=true", headers=headers)
+    assert "attachment" in exported.headers["content-disposition"]
+    missing = await async_client.get(f"/runs/{uuid.uuid4()}/trace", headers=headers)
+    assert missing.status_code == 404
+
+    run_uuid = uuid.UUID(rid)
+    await db_session.execute(delete(Event).where(Event.run_id == run_uuid))
+    await db_session.execute(
+        delete(Artifact).where(Artifact.node_id.in_(select(Node.id).where(Node.run_id == run_uuid)))
+    )
+    await db_session.execute(delete(Node).where(Node.run_id == run_uuid))
+    await db_session.execute(delete(Run).where(Run.id == run_uuid))
+    await db_session.commit()
@@ -0,0 +1,158 @@
+import datetime as dt
+import json
+import uuid
+
+import pytest
+from sqlalchemy import delete, insert, text
+
+from core.storage.db_models import Event, Node, Run
+from core.storage.rollups import compact_usage_rollups
+
+DAY = dt.datetime(2024, 4, 2, tzinfo=dt.timezone.utc)
+
+
+def _event(run_id, level, ts, node_id=None, **payload):
+    return {
+        "id": uuid.uuid4(),
+        "run_id": run_id,
+        "node_id": node_id,
+        "level": level,
+        "timestamp": ts,
+        "message": json.dumps(payload),
+    }
+
+
+async def _reset(session):
+    await session.execute(text("DELETE FROM usage_rollups_hourly"))
+    await session.execute(text("DELETE FROM usage_rollups_daily"))
+    await session.execute(text("DELETE FROM rollup_state WHERE name = 'usage'"))
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_usage_rollups_compaction_and_query(client, db_session, monkeypatch):
+    # Données de 2024: pas de purge des tranches horaires pendant le test
+    monkeypatch.setenv("ROLLUP_HOURLY_RETENTION_DAYS", "0")
+    run_id = uuid.uuid4()
+    n1, n2 = uuid.uuid4(), uuid.uuid4()
+    await db_session.execute(
+        insert(Run).values(
+            id=run_id,
+            title="usage",
+            status="completed",
+            started_at=DAY + dt.timedelta(hours=1),
+            ended_at=DAY + dt.timedelta(hours=1, seconds=90),
+        )
+    )
+    await db_session.execute(
+        insert(Node),
+        [
+            {"id": n1, "run_id": run_id, "key": "n1", "title": "n1", "status": "completed", "role": "writer"},
+            {"id": n2, "run_id": run_id, "key": "n2", "title": "n2", "status": "failed", "role": "writer"},
+        ],
+    )
+    usage = {"prompt_tokens": 10, "completion_tokens": 5}
+    await db_session.execute(
+        insert(Event),
+        [
+            _event(run_id, "NODE_COMPLETED", DAY + dt.timedelta(hours=1, minutes=5), n1,
+                   provider="ollama", model="llama3", duration_ms=1000, latency_ms=800, usage=usage),
+            _event(run_id, "NODE_COMPLETED", DAY + dt.timedelta(hours=1, minutes=6), None, node_key="n1",
+                   provider="ollama", model="llama3", duration_ms=3000, latency_ms=1200, usage=usage),
+            _event(run_id, "NODE_FAILED", DAY + dt.timedelta(hours=1, minutes=7), n2,
+                   provider="openai", model="gpt-4o-mini", duration_ms=500),
+            _event(run_id, "RUN_COMPLETED", DAY + dt.timedelta(hours=1, minutes=8)),
+            _event(run_id, "NODE_STARTED", DAY + dt.timedelta(hours=1, minutes=9), n1),
+        ],
+    )
+    await db_session.commit()
+    try:
+        await _reset(db_session)
+        res = await compact_usage_rollups(db_session)
+        assert res["hourly_rows"] == 3
+
+        params = {
+            "from": DAY.isoformat(),
+            "to": (DAY + dt.timedelta(days=1)).isoformat(),
+            "kind": "node",
+            "group_by": "status,provider,model,role",
+        }
+        r = await client.get("/metrics/rollups", params=params)
+        assert r.status_code == 200, r.text
+        body = r.json()
+        assert body["watermark"] is not None
+        items = {(it["status"], it["provider"]): it for it in body["items"]}
+        ok = items[("completed", "ollama")]
+        assert ok["role"] == "writer" and ok["model"] == "llama3"
+        assert ok["count"] == 2
+        assert ok["duration_avg_ms"] == 2000.0 and ok["duration_max_ms"] == 3000
+        assert ok["latency_avg_ms"] == 1000.0
+        assert ok["prompt_tokens"] == 20 and ok["completion_tokens"] == 10
+        assert items[("failed", "openai")]["latency_avg_ms"] is None
+
+        r = await client.get("/metrics/rollups", params={**params, "kind": "run", "group_by": "status"})
+        (run_row,) = r.json()["items"]
+        assert run_row["status"] == "completed" and run_row["duration_avg_ms"] == 90000.0
+
+        # Passage incrémental: seuls les événements postérieurs au watermark sont ajoutés
+        await db_session.execute(
+            text("UPDATE rollup_state SET watermark = :wm WHERE name = 'usage'"),
+            {"wm": DAY + dt.timedelta(hours=4)},
+        )
+        await db_session.execute(
+            insert(Event).values(
+                **_event(run_id, "NODE_COMPLETED", DAY + dt.timedelta(hours=5), n1,
+                         provider="ollama", model="llama3", duration_ms=6000, usage=usage)
+            )
+        )
+        await db_session.commit()
+        await compact_usage_rollups(db_session)
+        r = await client.get(
+            "/metrics/rollups",
+            params={**params, "granularity": "day", "group_by": "provider", "provider": "ollama"},
+        )
+        (day_row,) = r.json()["items"]
+        assert day_row["start"].startswith("2024-04-02T00:00:00")
+        assert day_row["count"] == 3
+        assert day_row["duration_max_ms"] == 6000
+        assert day_row["prompt_tokens"] == 30
+
+        r = await client.get("/metrics/rollups", params={**params, "group_by": "tenant"})
+        assert r.status_code == 400
+    finally:
+        await db_session.execute(delete(Event).where(Event.run_id == run_id))
+        await db_session.execute(delete(Node).where(Node.run_id == run_id))
+        await db_session.execute(delete(Run).where(Run.id == run_id))
+        await db_session.commit()
+        await _reset(db_session)
+
+
+@pytest.mark.asyncio
+async def test_usage_compaction_tolerates_non_json_messages(db_session, monkeypatch):
+    monkeypatch.setenv("ROLLUP_HOURLY_RETENTION_DAYS", "0")
+    run_id = uuid.uuid4()
+    await db_session.execute(insert(Run).values(id=run_id, title="usage", status="failed"))
+    ts = DAY + dt.timedelta(hours=2)
+    await db_session.execute(
+        insert(Event),
+        [
+            {**_event(run_id, "NODE_FAILED", ts), "message": message}
+            for message in ('{"provider": "ollama", "usage": {', "[1, 2]", "boom: timeout")
+        ],
+    )
+    await db_session.commit()
+    try:
+        await _reset(db_session)
+        res = await compact_usage_rollups(db_session)
+        assert res["hourly_rows"] == 1
+        row = (
+            await db_session.execute(
+                text("SELECT count, provider, prompt_tokens FROM usage_rollups_hourly WHERE kind = 'node'")
+            )
+        ).one()
+        assert tuple(row) == (3, "", 0)
+    finally:
+        await db_session.execute(delete(Event).where(Event.run_id == run_id))
+        await db_session.execute(delete(Run).where(Run.id == run_id))
+        await db_session.commit()
+        await _reset(db_session)
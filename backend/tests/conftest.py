@@ -38,6 +38,23 @@ def env_fast_test(monkeypatch):
     yield
 
 
+@pytest.fixture(autouse=True)
+def _reset_llm_state():
+    """Disjoncteurs, hedging, limiteurs, retry et stats de routage globaux au process: état neuf par test."""
+    from core.llm.circuit_breaker import reset_breakers
+    from core.llm.hedging import reset_hedging
+    from core.llm.rate_limiter import reset_limiters
+    from core.llm.retry_policy import reset_policy
+    from core.llm.routing import reset_routing
+
+    resets = (reset_breakers, reset_hedging, reset_limiters, reset_policy, reset_routing)
+    for reset in resets:
+        reset()
+    yield
+    for reset in resets:
+        reset()
+
+
 @pytest.fixture
 def artifacts_tmpdir(tmp_path, monkeypatch):
     """Isole les artifacts dans un répertoire temporaire."""
@@ -0,0 +1,177 @@
+import json
+import uuid
+from pathlib import Path
+
+import pytest
+
+from core.planning.task_graph import PlanNode, TaskGraph
+import orchestrator.executor as exec_mod
+
+
+class DummyStorage:
+    async def save_run(self, *a, **k):
+        pass
+
+    async def save_node(self, *a, **k):
+        pass
+
+    async def save_artifact(self, *a, **k):
+        pass
+
+    async def save_feedback(self, **k):
+        pass
+
+    async def save_event(self, **k):
+        pass
+
+
+@pytest.fixture
+def cached_env(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("ARTIFACTS_DIR", str(tmp_path / "runs"))
+    monkeypatch.setenv("RUNS_ROOT", str(tmp_path / "runs"))
+    monkeypatch.setenv("NODE_CACHE_ENABLED", "1")
+    monkeypatch.delenv("NODE_CACHE_DIR", raising=False)
+    monkeypatch.setenv("AUTO_REVIEW_MODE", "off")
+
+    calls = []
+    outputs = {}
+
+    async def fake_agent(node):
+        calls.append(node.id)
+        text = outputs.get(node.id, f"# {node.title}")
+        return {"markdown": text, "llm": {"provider": "p", "model_used": "m", "latency_ms": 42}}
+
+    monkeypatch.setattr(exec_mod, "agent_runner", fake_agent)
+    return tmp_path / "runs", calls, outputs
+
+
+def _dag(titles):
+    nodes = [
+        PlanNode(id="a", title=titles.get("a", "A"), type="execute", suggested_agent_role="Researcher"),
+        PlanNode(id="b", title=titles.get("b", "B"), type="execute", suggested_agent_role="Researcher", deps=["a"]),
+        PlanNode(id="c", title=titles.get("c", "C"), type="execute", suggested_agent_role="Researcher", deps=["b"]),
+        PlanNode(id="d", title=titles.get("d", "D"), type="execute", suggested_agent_role="Researcher"),
+    ]
+    return TaskGraph(nodes)
+
+
+async def _run(titles=None):
+    run_id = str(uuid.uuid4())
+    res = await exec_mod.run_graph(_dag(titles or {}), DummyStorage(), run_id)
+    assert res["status"] == "succeeded"
+    return run_id, res
+
+
+@pytest.mark.asyncio
+async def test_second_run_is_served_from_cache(cached_env):
+    root, calls, _ = cached_env
+    first, res1 = await _run()
+    assert sorted(calls) == ["a", "b", "c", "d"]
+    assert res1["stats"]["cached"] == 0
+
+    calls.clear()
+    second, res2 = await _run()
+    assert calls == []
+    assert res2["stats"]["cached"] == 4
+    summary = json.loads(Path(root, second, "summary.json").read_text())
+    assert summary["cache_skipped"] == ["a", "b", "c", "d"]
+
+    # Artifacts complets dans le nouveau run, sidecar marqué "hit"
+    assert Path(root, second, "nodes", "b", "artifact_b.md").read_text() == "# B"
+    side = json.loads(Path(root, second, "nodes", "b", "artifact_b.llm.json").read_text())
+    assert side["cache"]["hit"] is True and side["cache"]["source_run_id"] == first
+    assert side["cache"]["recorded_latency_ms"] == 42
+    assert side["latency_ms"] == 0
+
+
+@pytest.mark.asyncio
+async def test_upstream_change_invalidates_descendants_only(cached_env):
+    _, calls, outputs = cached_env
+    await _run()
+
+    calls.clear()
+    await _run({"b": "B2"})
+    assert sorted(calls) == ["b", "c"]
+
+    # Entrée modifiée mais sortie identique: les descendants restent en cache
+    calls.clear()
+    outputs["a"] = "# A"
+    await _run({"a": "A-bis", "b": "B2"})
+    assert calls == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_cache_disabled_calls_agent(cached_env, monkeypatch):
+    _, calls, _ = cached_env
+    await _run()
+    calls.clear()
+
+    monkeypatch.setenv("NODE_CACHE_ENABLED", "0")
+    await _run()
+    assert sorted(calls) == ["a", "b", "c", "d"]
+
+
+def test_cache_key_covers_routing_goal_and_candidates(monkeypatch):
+    from core.agents.registry import AgentSpec
+    from core.llm.routing import goal_scope
+
+    monkeypatch.delenv("ROUTING_GOAL", raising=False)
+    node = PlanNode(id="a", title="A", type="execute", suggested_agent_role="Researcher")
+    pair = [{"provider": "openai", "model": "gpt-4o"}, {"provider": "ollama", "model": "llama3"}]
+    spec = AgentSpec(role="Researcher", system_prompt="s", provider="openai", model="gpt-4o", tools=[], candidates=pair)
+
+    def key(s):
+        return exec_mod._node_cache_key(node, "Researcher", s, {})
+
+    # Objectif "preferred": modèle de la spec, clé inchangée
+    plain = AgentSpec(role="Researcher", system_prompt="s", provider="openai", model="gpt-4o", tools=[])
+    assert key(spec) == key(plain)
+    with goal_scope("fastest"):
+        fastest = key(spec)
+        assert fastest != key(plain)
+        assert key(AgentSpec(**{**spec.__dict__, "candidates": pair[:1] + [{"provider": "x", "model": "y"}]})) != fastest
+    with goal_scope("cheapest"):
+        assert key(spec) != fastest
+
+
+def test_cache_key_follows_deadline_downgrade(monkeypatch):
+    from core.agents.registry import AgentSpec
+    from core.llm.routing import goal_scope
+    from core.planning.deadline import RunDeadline, deadline_scope
+
+    monkeypatch.delenv("ROUTING_GOAL", raising=False)
+    monkeypatch.setenv("DEADLINE_FAST_BELOW", "0.5")
+    node = PlanNode(id="a", title="A", type="execute", suggested_agent_role="Researcher")
+    pair = [{"provider": "openai", "model": "gpt-4o"}, {"provider": "ollama", "model": "llama3"}]
+    spec = AgentSpec(role="Researcher", system_prompt="s", provider="openai", model="gpt-4o", tools=[], candidates=pair)
+    now = [0.0]
+
+    def key():
+        return exec_mod._node_cache_key(node, "Researcher", spec, {})
+
+    preferred = key()
+    with goal_scope("fastest"):
+        fastest = key()
+    with deadline_scope(RunDeadline(40, clock=lambda: now[0])):
+        assert key() == preferred
+        # Marge entamée: l'agent route en "fastest", la clé aussi
+        now[0] = 25
+        assert key() == fastest
+
+
+@pytest.mark.asyncio
+async def test_result_downgraded_during_node_is_not_cached(cached_env, monkeypatch):
+    _, calls, _ = cached_env
+
+    async def downgraded_agent(node):
+        calls.append(node.id)
+        routing = {"provider": "ollama", "model": "llama3", "goal": "fastest", "reason": "fastest"}
+        return {"markdown": f"# {node.title}", "llm": {"provider": "ollama", "model_used": "llama3", "routing": routing}}
+
+    monkeypatch.setattr(exec_mod, "agent_runner", downgraded_agent)
+    await _run()
+    calls.clear()
+    # Clé calculée en "preferred", réponse routée en "fastest": rien n'a été mis en cache
+    await _run()
+    assert sorted(calls) == ["a", "b", "c", "d"]
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import uuid
 from pathlib import Path
@@ -6,6 +7,7 @@ import pytest
 
 from core.planning.task_graph import PlanNode, TaskGraph
 import orchestrator.executor as exec_mod
+from orchestrator.review_queue import ReviewQueue
 
 
 class DummyStorage:
@@ -63,3 +65,207 @@ async def test_autoreview_creates_feedback_and_event(tmp_path, monkeypatch):
     assert storage.events, "critical event should be emitted"
     assert storage.events[0]["message"] == "feedback.critical"
 
+
+
+def _chain(review: str = ""):
+    nodes = [
+        PlanNode(id="n1", title="N1", type="execute", suggested_agent_role="Researcher", review=review),
+        PlanNode(id="n2", title="N2", type="execute", suggested_agent_role="Researcher", deps=["n1"], review=review),
+    ]
+    for n in nodes:
+        n.db_id = str(uuid.uuid4())
+    return TaskGraph(nodes)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("review,blocked", [("", False), ("blocking", True)])
+async def test_async_review_does_not_delay_successors(tmp_path, monkeypatch, review, blocked):
+    monkeypatch.chdir(tmp_path)
+    loop = asyncio.get_running_loop()
+    timeline = {}
+
+    async def fake_execute(node, *a, **k):
+        timeline[f"{node.id}.start"] = loop.time()
+        timeline[f"{node.id}.end"] = loop.time()
+        return {"markdown": "ok", "llm": {}}
+
+    async def slow_review(content):
+        await asyncio.sleep(0.3)
+        return {"score": 90, "comment": "ok", "llm": {}}
+
+    monkeypatch.setattr(exec_mod, "_execute_node", fake_execute)
+    monkeypatch.setattr(exec_mod, "_invoke_auto_reviewer", slow_review)
+    storage = DummyStorage()
+
+    await exec_mod.run_graph(_chain(review), storage, str(uuid.uuid4()))
+
+    gap = timeline["n2.start"] - timeline["n1.end"]
+    assert (gap >= 0.3) is blocked
+    # Reviews asynchrones drainées avant le retour de run_graph
+    assert len(storage.feedbacks) == 2
+
+
+@pytest.mark.asyncio
+async def test_review_workers_run_outside_node_scopes(tmp_path, monkeypatch):
+    from core.llm.retry_policy import current_budget
+    from core.planning import deadline
+
+    monkeypatch.chdir(tmp_path)
+    seen = []
+
+    async def fake_execute(node, *a, **k):
+        return {"markdown": "ok", "llm": {}}
+
+    async def record_review(storage, run_id, items):
+        seen.append((current_budget().name, deadline.remaining_s()))
+
+    monkeypatch.setattr(exec_mod, "_execute_node", fake_execute)
+    monkeypatch.setattr(exec_mod, "_review_batch", record_review)
+    monkeypatch.setenv("AUTO_REVIEW_BATCH_SIZE", "1")
+    run_id = str(uuid.uuid4())
+
+    await exec_mod.run_graph(_chain(), DummyStorage(), run_id, deadline_s=30)
+
+    # Budget et échéance du run, pas ceux du premier nœud soumis
+    assert [name for name, _ in seen] == [f"run:{run_id}"] * 2
+    assert all(remaining > 20 for _, remaining in seen)
+
+
+@pytest.mark.asyncio
+async def test_review_queue_batches_and_applies_backpressure():
+    batches = []
+    gate = asyncio.Event()
+
+    async def review_batch(items):
+        await gate.wait()
+        batches.append([i["n"] for i in items])
+
+    queue = ReviewQueue(review_batch, workers=1, batch_size=3, maxsize=4)
+    assert all(queue.submit({"n": i}) for i in range(4))
+    await asyncio.sleep(0)
+    # Le worker a pris un lot de 3: trois places se libèrent, puis la file sature
+    assert all(queue.submit({"n": i}) for i in range(4, 7))
+    assert not queue.submit({"n": 7})
+    gate.set()
+    await queue.drain()
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+    assert queue.stats() == {"submitted": 7, "reviewed": 7, "batches": 3, "failed": 0}
+
+
+def test_review_mode_resolution(monkeypatch):
+    node = PlanNode(id="n", title="N", type="execute", suggested_agent_role="R")
+    assert exec_mod._review_mode(node) == "async"
+    monkeypatch.setenv("AUTO_REVIEW_MODE", "off")
+    assert exec_mod._review_mode(node) == "off"
+    node.review = "blocking"
+    assert exec_mod._review_mode(node) == "blocking"
+    plan = TaskGraph.from_plan({"review": "blocking", "plan": [{"id": "a"}, {"id": "b", "review": "off"}]})
+    assert [n.review for n in plan.nodes.values()] == ["blocking", "off"]
+
+
+class BulkStorage(DummyStorage):
+    def __init__(self):
+        super().__init__()
+        self.bulk = []
+
+    async def save_feedbacks(self, feedbacks):
+        self.bulk.append(list(feedbacks))
+
+
+def _review_items(n):
+    return [
+        {"node_key": f"n{i}", "node_dbid": str(uuid.uuid4()), "role": "Writer_FR", "result": {"markdown": f"# {i}"}}
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def reviewer_agent(tmp_path, monkeypatch):
+    from core.agents import registry
+    from orchestrator.hooks import qa_reviewer
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("FEEDBACK_REVIEW_TIMEOUT_MS", "2000")
+    qa_reviewer.clear_caches()
+    # Déploiement sans OpenAI: le lot passe par le provider de l'agent Reviewer
+    spec = registry.AgentSpec(role="Reviewer", system_prompt="s", provider="ollama", model="llama3", tools=[])
+    monkeypatch.setitem(registry._DYNAMIC_REGISTRY, "Reviewer", spec)
+    calls = []
+
+    async def no_call_json(**kw):
+        raise AssertionError("call_json (OpenAI direct) inattendu")
+
+    monkeypatch.setattr(qa_reviewer, "call_json", no_call_json)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_review_batch_uses_batched_qa_reviewer(tmp_path, monkeypatch, reviewer_agent):
+    from core.llm.providers.base import LLMResponse
+
+    calls = reviewer_agent
+
+    async def fake_run_llm(req):
+        calls.append(req)
+        ids = [json.loads(block.split("```")[0])["id"] for block in req.prompt.split("```json\n")[2:]]
+        items = [{"node": {"id": i}, "overall_score": 50 if n == 0 else 90} for n, i in enumerate(ids)]
+        return LLMResponse(text="```json\n" + json.dumps({"items": items}) + "\n```")
+
+    async def no_single_review(content):
+        raise AssertionError("revue individuelle inattendue")
+
+    monkeypatch.setattr(exec_mod, "run_llm", fake_run_llm)
+    monkeypatch.setattr(exec_mod, "_invoke_auto_reviewer", no_single_review)
+    storage = BulkStorage()
+    run_id = str(uuid.uuid4())
+    items = _review_items(3)
+
+    await exec_mod._review_batch(storage, run_id, items)
+
+    # Trois livrables de même type: un appel run_llm (agent Reviewer), une écriture groupée
+    assert len(calls) == 1 and "Mode lot" in calls[0].system
+    assert (calls[0].provider, calls[0].model, calls[0].role) == ("ollama", "llama3", "Reviewer")
+    assert [len(b) for b in storage.bulk] == [3] and not storage.feedbacks
+    assert [e["node_id"] for e in storage.events] == [items[0]["node_dbid"]]
+    assert storage.events[0]["message"] == "feedback.critical"
+    assert list((tmp_path / ".runs" / run_id / "nodes" / "n0").glob("*.qa.json"))
+
+
+@pytest.mark.asyncio
+async def test_review_batch_falls_back_to_single_reviews(tmp_path, monkeypatch, reviewer_agent):
+    reviewed = []
+
+    async def failing_run_llm(req):
+        raise RuntimeError("provider indisponible")
+
+    async def single_review(content):
+        reviewed.append(content)
+        return {"score": 80, "comment": "ok"}
+
+    monkeypatch.setattr(exec_mod, "run_llm", failing_run_llm)
+    monkeypatch.setattr(exec_mod, "_invoke_auto_reviewer", single_review)
+    storage = BulkStorage()
+    items = _review_items(2)
+
+    await exec_mod._review_batch(storage, str(uuid.uuid4()), items)
+
+    assert not storage.bulk and len(reviewed) == 2
+    assert sorted(fb["node_id"] for fb in storage.feedbacks) == sorted(i["node_dbid"] for i in items)
+
+
+@pytest.mark.asyncio
+async def test_review_batch_is_bounded_by_review_timeout(tmp_path, monkeypatch, reviewer_agent):
+    monkeypatch.setenv("FEEDBACK_REVIEW_TIMEOUT_MS", "100")
+
+    async def slow_run_llm(req):
+        await asyncio.sleep(5)
+
+    async def single_review(content):
+        return {"score": 80}
+
+    monkeypatch.setattr(exec_mod, "run_llm", slow_run_llm)
+    monkeypatch.setattr(exec_mod, "_invoke_auto_reviewer", single_review)
+    storage = BulkStorage()
+
+    await asyncio.wait_for(exec_mod._review_batch(storage, str(uuid.uuid4()), _review_items(3)), timeout=2)
+    assert len(storage.feedbacks) == 3
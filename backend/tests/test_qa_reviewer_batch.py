@@ -0,0 +1,92 @@
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from orchestrator.hooks import qa_reviewer
+
+
+class BulkStorage:
+    def __init__(self):
+        self.bulk = []
+
+    async def save_feedbacks(self, feedbacks):
+        self.bulk.append(list(feedbacks))
+
+
+def _node(tmp_path, node_type):
+    nid = uuid.uuid4()
+    return SimpleNamespace(id=nid, type=node_type, sidecars_dir=tmp_path / str(nid))
+
+
+@pytest.mark.asyncio
+async def test_batched_review_packs_same_type_artifacts(tmp_path, monkeypatch):
+    qa_reviewer.clear_caches()
+    calls = []
+
+    async def fake_call_json(*, system, user, **kw):
+        calls.append(system)
+        if "Mode lot" not in system:  # revue individuelle
+            return {"overall_score": 70, "summary_comment": "seul"}
+        ids = [json.loads(block.split("```")[0])["id"] for block in user.split("```json\n")[2:]]
+        items = [{"node": {"id": i}, "overall_score": 90, "summary_comment": "ok"} for i in ids]
+        # Le modèle oublie le dernier livrable du premier lot
+        return {"items": items[:-1] if len(calls) == 1 else items}
+
+    monkeypatch.setattr(qa_reviewer, "call_json", fake_call_json)
+    run = SimpleNamespace(id=uuid.uuid4())
+    items = [(_node(tmp_path, "write"), f"texte {i}") for i in range(10)]
+    items += [(_node(tmp_path, "research"), f"source {i}") for i in range(2)]
+    storage = BulkStorage()
+
+    stats = await qa_reviewer.review_nodes(items, run, storage, max_items=8)
+
+    # write: lots de 8 + 2, research: 1 lot, + 1 revue du livrable oublié
+    assert stats == {"items": 12, "calls": 4, "reviewed": 12, "failed": 0}
+    assert ["Mode lot" in c for c in calls] == [True, False, True, True]
+    assert len(storage.bulk) == 1 and len(storage.bulk[0]) == 12
+    scores = {fb["node_id"]: fb["score"] for fb in storage.bulk[0]}
+    assert scores[str(items[7][0].id)] == 70 and scores[str(items[0][0].id)] == 90
+    fb = storage.bulk[0][0]
+    assert fb["source"] == "auto" and fb["reviewer"] == qa_reviewer.REVIEWER_ID
+    assert fb["evaluation"]["meta"]["content_sha256"] == qa_reviewer.sha256_text("texte 0")
+    assert list(items[0][0].sidecars_dir.glob("*.qa.json"))
+    # Checklists et gabarits lus une fois par version
+    assert qa_reviewer._read_checklist.cache_info().misses == 2
+    assert qa_reviewer._read_templates.cache_info().misses == 1
+
+
+def test_pack_batches_respects_char_budget():
+    nodes = [SimpleNamespace(id=i, type="write") for i in range(4)]
+    batches = qa_reviewer.pack_batches(
+        [(nodes[0], "a" * 60), (nodes[1], "b" * 60), (nodes[2], "c" * 10), (nodes[3], "d" * 200)],
+        max_items=8,
+        max_chars=100,
+    )
+    assert [[n.id for n, _ in b] for b in batches] == [[0], [1, 2], [3]]
+
+
+@pytest.mark.asyncio
+async def test_prompts_without_batch_template_fall_back_to_single_reviews(tmp_path, monkeypatch):
+    prompts = tmp_path / "prompts" / "1.0.0"
+    prompts.mkdir(parents=True)
+    for name in ("reviewer.system.txt", "reviewer.user.md"):
+        (prompts / name).write_text((qa_reviewer.PROMPTS_ROOT / "1.0.0" / name).read_text(encoding="utf-8"))
+    monkeypatch.setattr(qa_reviewer, "PROMPTS_ROOT", tmp_path / "prompts")
+    qa_reviewer.clear_caches()
+    calls = []
+
+    async def fake_call_json(*, system, user, **kw):
+        calls.append(system)
+        return {"overall_score": 80}
+
+    monkeypatch.setattr(qa_reviewer, "call_json", fake_call_json)
+    storage = BulkStorage()
+    items = [(_node(tmp_path, "write"), f"texte {i}") for i in range(3)]
+
+    stats = await qa_reviewer.review_nodes(items, SimpleNamespace(id=uuid.uuid4()), storage)
+
+    assert stats == {"items": 3, "calls": 3, "reviewed": 3, "failed": 0}
+    assert not any("Mode lot" in c for c in calls)
+    assert len(storage.bulk[0]) == 3
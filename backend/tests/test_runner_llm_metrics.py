@@ -1,10 +1,15 @@
+import asyncio
+
 import pytest
+from openai.types import CompletionUsage
 
 from core.llm.providers.base import LLMRequest, LLMResponse
 from core.llm import runner
 from core.telemetry.metrics import (
     get_llm_tokens_total,
     get_llm_cost_total,
+    get_llm_prompt_tokens,
+    get_llm_tokens_per_second,
 )
 
 
@@ -19,6 +24,15 @@ class DummyProvider:
         )
 
 
+class SdkUsageProvider:
+    """Usage tel que renvoyé par le SDK OpenAI: objet pydantic, pas un dict."""
+
+    async def generate(self, req):
+        await asyncio.sleep(0.01)
+        usage = CompletionUsage(prompt_tokens=300, completion_tokens=500, total_tokens=800)
+        return LLMResponse(text="ok", raw={"usage": usage})
+
+
 class DummyNoUsageProvider:
     async def generate(self, req):
         return LLMResponse(text="ok")
@@ -76,3 +90,28 @@ async def test_run_llm_metrics_no_usage(monkeypatch):
     }
     assert ("dummy2", "bar") not in cost_samples
 
+
+
+def _hist(metric, labels):
+    samples = {s.name: s.value for s in metric.collect()[0].samples if s.labels.items() >= labels.items()}
+    return samples.get(metric._name + "_count", 0), samples.get(metric._name + "_sum", 0)
+
+
+@pytest.mark.asyncio
+async def test_run_llm_metrics_with_sdk_usage_object(monkeypatch):
+    monkeypatch.setenv("METRICS_ENABLED", "1")
+    monkeypatch.setattr(runner, "_provider_factory", lambda name: SdkUsageProvider())
+    labels = {"provider": "sdk", "model": "gpt-x", "role": "Writer"}
+    tps_before = _hist(get_llm_tokens_per_second(), labels)
+    prompt_before = _hist(get_llm_prompt_tokens(), labels)
+
+    req = LLMRequest(system=None, prompt="x", model="gpt-x", provider="sdk", role="Writer")
+    out = await runner.run_llm(req, primary="sdk", fallback_order=["sdk"])
+
+    assert out.usage["completion_tokens"] == 500
+    tps_count, _ = _hist(get_llm_tokens_per_second(), labels)
+    prompt_count, prompt_sum = _hist(get_llm_prompt_tokens(), labels)
+    assert tps_count == tps_before[0] + 1
+    # Tokens réels du SDK, pas l'estimation par caractères
+    assert (prompt_count, prompt_sum) == (prompt_before[0] + 1, prompt_before[1] + 300)
+    assert get_llm_tokens_total().labels("completion", "sdk", "gpt-x")._value.get() >= 500
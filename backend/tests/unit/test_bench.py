@@ -0,0 +1,56 @@
+import pytest
+
+from bench import dags
+from bench.harness import check_baseline, check_budgets, parse_db_queries, percentiles
+from core.planning.task_graph import TaskGraph
+
+
+@pytest.mark.parametrize("shape", list(dags.SHAPES))
+def test_dag_shapes_are_valid_plans(shape):
+    plan = dags.build(shape, 9, seed=3)
+    assert len(plan) == 9
+    ids = [n["id"] for n in plan]
+    assert len(set(ids)) == len(ids)
+    # Dépendances déjà déclarées (ordre topologique) -> acyclique
+    seen = set()
+    for node in plan:
+        assert set(node["deps"]) <= seen
+        seen.add(node["id"])
+    graph = TaskGraph.from_plan({"plan": plan})
+    assert len(graph.nodes) == 9
+    assert dags.build(shape, 9, seed=3) == plan
+
+
+def test_dag_shapes_topology():
+    assert [n["deps"] for n in dags.chain(3)] == [[], ["n1"], ["n2"]]
+    fan = dags.fanout(5)
+    assert fan[-1]["deps"] == ["n2", "n3", "n4"]
+    assert dags.diamond(4)[3]["deps"] == ["n2", "n3"]
+    with pytest.raises(ValueError):
+        dags.build("star", 3)
+
+
+def test_percentiles_and_budgets():
+    pct = percentiles(range(1, 101))
+    assert (pct["p50"], pct["p95"], pct["p99"], pct["max"]) == (50, 95, 99, 100)
+    assert percentiles([])["p95"] is None
+
+    results = {"runs_per_s": 2.0, "latency_ms": {"events": {"p95": 120.0}}, "db_queries_per_node": None}
+    budgets = {
+        "min": {"runs_per_s": 3},
+        "max": {"latency_ms.events.p95": 200, "db_queries_per_node": 10},
+    }
+    violations = check_budgets(results, budgets)
+    assert len(violations) == 1 and violations[0].startswith("runs_per_s=2")
+
+    baseline = {"runs_per_s": 2.2, "latency_ms": {"events": {"p95": 80.0}}}
+    paths = ["runs_per_s", "latency_ms.events.p95"]
+    assert check_baseline(results, baseline, paths, 0.2) == [
+        "latency_ms.events.p95=120 régresse vs référence 80 (tolérance 20%)"
+    ]
+
+
+def test_parse_db_queries():
+    text = "# HELP db_queries_total x\n# TYPE db_queries_total counter\ndb_queries_total 42.0\n"
+    assert parse_db_queries(text) == 42.0
+    assert parse_db_queries("") is None
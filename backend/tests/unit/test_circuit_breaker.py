@@ -0,0 +1,140 @@
+import pytest
+
+from core.llm import circuit_breaker as cb_mod
+from core.llm import runner
+from core.llm.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from core.llm.providers.base import (
+    LLMRequest,
+    LLMResponse,
+    ModelUnavailable,
+    ProviderRateLimited,
+    ProviderTimeout,
+    ProviderUnavailable,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def _breaker(clock, **kw):
+    params = dict(window=10, min_calls=4, failure_rate=0.5, consecutive=3, open_s=10, open_max_s=40)
+    params.update(kw)
+    return CircuitBreaker("p", "m", clock=clock, **params)
+
+
+def test_opens_after_consecutive_failures_and_recovers():
+    clock = Clock()
+    cb = _breaker(clock)
+    for _ in range(3):
+        assert cb.acquire()
+        cb.record_failure(timeout=True)
+    assert cb.state == OPEN and not cb.acquire()
+    assert cb.snapshot()["retry_in_s"] == 10 and cb.snapshot()["timeouts"] == 3
+
+    clock.t = 10
+    assert cb.acquire()  # essai half-open
+    assert cb.state == HALF_OPEN and not cb.acquire()
+    cb.record_success()
+    assert cb.state == CLOSED and cb.acquire()
+
+
+def test_failure_rate_over_window_and_backoff():
+    clock = Clock()
+    cb = _breaker(clock)
+    for ok in (True, False, True, False):
+        cb.record_success() if ok else cb.record_failure()
+    assert cb.state == OPEN  # 2/4 >= 0.5 sans échecs consécutifs
+
+    clock.t = 10
+    assert cb.acquire()
+    cb.record_failure()
+    assert cb.state == OPEN and cb.snapshot()["retry_in_s"] == 20  # cooldown doublé
+    clock.t = 29
+    assert not cb.available()
+    clock.t = 30
+    assert cb.available()
+
+
+@pytest.mark.asyncio
+async def test_run_llm_skips_open_provider(monkeypatch):
+    monkeypatch.setenv("LLM_CB_CONSECUTIVE", "2")
+    calls = []
+
+    class Down:
+        async def generate(self, req):
+            calls.append(req.provider)
+            raise ProviderUnavailable("connection refused")
+
+    class Up:
+        async def generate(self, req):
+            calls.append(req.provider)
+            return LLMResponse(text="ok")
+
+    monkeypatch.setattr(runner, "_provider_factory", lambda name: Down() if name == "ollama" else Up())
+    req = LLMRequest(system=None, prompt="x", model="llama3.1:8b", timeout_s=5)
+    for _ in range(4):
+        res = await runner.run_llm(req, fallback_order=["ollama", "openai"])
+        assert res.provider == "openai"
+    # Deux échecs puis circuit ouvert: ollama n'est plus appelé
+    assert calls == ["ollama", "openai", "ollama", "openai", "openai", "openai"]
+    summary = cb_mod.breakers_summary()
+    assert "ollama:*" in summary["open"]
+    assert any(c["provider"] == "ollama" and c["rejected"] for c in summary["circuits"])
+
+
+def test_model_errors_do_not_open_provider_and_429_is_neutral(monkeypatch):
+    monkeypatch.setenv("LLM_CB_CONSECUTIVE", "2")
+    for _ in range(3):
+        cb_mod.record_failure("ollama", "missing", ModelUnavailable("404"))
+        cb_mod.record_failure("openai", "gpt", ProviderRateLimited("429", retry_after_s=1))
+    assert not cb_mod.acquire("ollama", "missing")
+    assert cb_mod.acquire("ollama", "llama3.1:8b")
+    assert cb_mod.acquire("openai", "gpt")
+
+    monkeypatch.setenv("LLM_CB_ENABLED", "0")
+    assert cb_mod.acquire("ollama", "missing")
+
+
+@pytest.mark.asyncio
+async def test_neutral_outcomes_release_half_open_probe(monkeypatch):
+    monkeypatch.setenv("LLM_CB_CONSECUTIVE", "1")
+    clock = Clock()
+    prov, model = cb_mod.get_breaker("openai"), cb_mod.get_breaker("openai", "gpt")
+    for cb in (prov, model):
+        cb.clock = clock
+        cb.record_failure()
+    clock.t += 1000
+    errors = iter([ProviderRateLimited("429", retry_after_s=1), ModelUnavailable("404")])
+
+    class Failing:
+        async def generate(self, req):
+            raise next(errors)
+
+    monkeypatch.setattr(runner, "_provider_factory", lambda name: Failing())
+    req = LLMRequest(system="s", prompt="p", model="gpt")
+    for exc in (ProviderRateLimited, ModelUnavailable):
+        assert cb_mod.acquire("openai", "gpt")
+        with pytest.raises(exc):
+            await runner._call_provider(req, "openai", "gpt")
+    # 429: essais rendus aux deux niveaux; 404 modèle: rendu au provider seulement
+    assert prov.state == HALF_OPEN and prov.available()
+    assert model.state == OPEN
+    assert cb_mod.acquire("openai", "gpt-4o")
+
+
+@pytest.mark.asyncio
+async def test_probe_reopens_circuit_early(monkeypatch):
+    monkeypatch.setenv("LLM_CB_CONSECUTIVE", "1")
+    cb_mod.record_failure("ollama", "m", ProviderTimeout("connect"))
+    assert cb_mod.get_breaker("ollama").state == OPEN
+
+    async def up():
+        return True
+
+    assert await cb_mod.probe_once({"ollama": up}) == {"ollama": True}
+    assert cb_mod.get_breaker("ollama").state == HALF_OPEN
@@ -0,0 +1,117 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+zstd = pytest.importorskip("zstandard")
+
+from core.io import compression  # noqa: E402
+from core.io.artifacts_fs import read_first_llm_meta, write_llm_sidecar, write_md  # noqa: E402
+from core.io.run_index import aread_text, load_index  # noqa: E402
+
+
+def test_fs_writers_compress_and_read_back(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ARTIFACTS_DIR", str(tmp_path))
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "zstd")
+    md = write_md("run1", "n1", "# Titre\n" + "x" * 400)
+    write_llm_sidecar("run1", "n1", {"provider": "openai", "model": "gpt", "latency_ms": 5})
+
+    node_dir = tmp_path / "run1" / "nodes" / "n1"
+    assert md.name == "artifact_n1.md.zst"
+    assert sorted(p.name for p in node_dir.iterdir()) == [
+        "artifact_n1.llm.json.zst",
+        "artifact_n1.md.zst",
+    ]
+    assert compression.is_compressed(md.read_bytes())
+    assert compression.read_text(node_dir / "artifact_n1.md").startswith("# Titre")
+    assert read_first_llm_meta("run1", "n1")["model"] == "gpt"
+
+    entry = load_index(tmp_path / "run1")["nodes"]["n1"]
+    assert entry["markdown"]["path"] == "nodes/n1/artifact_n1.md.zst"
+    assert entry["markdown"]["size"] == len("# Titre\n" + "x" * 400)
+
+    # Retour en clair: la variante compressée est remplacée
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "none")
+    write_md("run1", "n1", "# v2")
+    assert not (node_dir / "artifact_n1.md.zst").exists()
+    assert (node_dir / "artifact_n1.md").read_text(encoding="utf-8") == "# v2"
+
+
+@pytest.mark.asyncio
+async def test_aread_text_decodes_zst(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "zstd")
+    p = compression.write_text(tmp_path / "a.md", "contenu")
+    assert p.suffix == ".zst"
+    assert await aread_text(p) == "contenu"
+
+
+def test_sidecar_dictionary_roundtrip(tmp_path: Path, monkeypatch) -> None:
+    samples = [
+        json.dumps(
+            {"version": "1", "provider": "ollama", "model": f"m{i}", "latency_ms": i, "usage": {"prompt_tokens": i}},
+            indent=2,
+        ).encode("utf-8")
+        for i in range(200)
+    ]
+    dict_path = tmp_path / "sidecars.zdict"
+    dict_path.write_bytes(compression.train_dictionary(samples, dict_size=2048))
+    monkeypatch.setenv("ARTIFACT_ZSTD_DICT", str(dict_path))
+
+    with_dict = compression.compress(samples[0], sidecar=True)
+    without = compression.compress(samples[0])
+    assert zstd.get_frame_parameters(with_dict).dict_id != 0
+    assert len(with_dict) < len(without)
+    assert compression.decompress(with_dict) == samples[0]
+
+    monkeypatch.delenv("ARTIFACT_ZSTD_DICT")
+    with pytest.raises(RuntimeError):
+        compression.decompress(with_dict)
+
+
+def test_validate_sidecars_accepts_zst(tmp_path: Path) -> None:
+    run_id = "11111111-1111-4111-8111-111111111111"
+    folder = tmp_path / run_id / "nodes" / "n1"
+    folder.mkdir(parents=True)
+    sidecar = {
+        "version": "1",
+        "provider": "openai",
+        "model": "m1",
+        "latency_ms": 1,
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1},
+        "cost": {"estimated": 0.0},
+        "prompts": {"system": "s", "user": "u"},
+        "timestamps": {"started_at": "2025-01-01T00:00:00Z", "ended_at": "2025-01-01T00:01:00Z"},
+        "run_id": run_id,
+        "node_id": "33333333-3333-4333-8333-333333333333",
+    }
+    (folder / "artifact_n1.llm.json.zst").write_bytes(
+        zstd.ZstdCompressor().compress(json.dumps(sidecar).encode("utf-8"))
+    )
+    res = subprocess.run(
+        [sys.executable, "backend/tools/validate_sidecars.py"],
+        env={"RUNS_ROOT": str(tmp_path)},
+        capture_output=True,
+        text=True,
+    )
+    assert res.returncode == 0, res.stdout + res.stderr
+    assert "OK: 1 KO: 0" in res.stdout
+
+
+def test_blob_codec_reflects_stored_bytes(tmp_path: Path, monkeypatch) -> None:
+    from core.storage.blob_store import LocalBlobStore, get_text, put_text
+
+    store = LocalBlobStore(tmp_path)
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "zstd")
+    first = put_text("même contenu " * 50, store)
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "none")
+    # Blob immuable déjà compressé: le codec suit les octets, pas le réglage
+    again = put_text("même contenu " * 50, store)
+    assert first.codec == again.codec == "zstd"
+    assert compression.is_compressed(store.peek_object(first.sha256))
+
+    plain = put_text("autre contenu", store)
+    monkeypatch.setenv("ARTIFACT_COMPRESSION", "zstd")
+    assert plain.codec is None and put_text("autre contenu", store).codec is None
+    assert get_text(first.sha256, store) == "même contenu " * 50
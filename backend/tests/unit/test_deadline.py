@@ -0,0 +1,136 @@
+import asyncio
+import json
+import uuid
+from pathlib import Path
+
+import pytest
+
+from core.llm import circuit_breaker, runner
+from core.llm.providers.base import LLMRequest, LLMResponse
+from core.planning import deadline
+from core.planning.deadline import DeadlineExceeded, RunDeadline, deadline_scope, node_scope
+from core.planning.task_graph import PlanNode, TaskGraph
+import orchestrator.executor as exec_mod
+
+
+class Clock:
+    def __init__(self):
+        self.t = 100.0
+
+    def __call__(self):
+        return self.t
+
+
+class DummyStorage:
+    def __init__(self):
+        self.events = []
+
+    async def save_artifact(self, *a, **k):
+        pass
+
+    async def save_event(self, **k):
+        self.events.append(k)
+
+
+def _chain_dag():
+    # a -> b -> c (chemin critique) et d isolé
+    return TaskGraph(
+        [
+            PlanNode(id="a", title="A", type="execute", suggested_agent_role="Researcher"),
+            PlanNode(id="b", title="B", type="execute", deps=["a"], suggested_agent_role="Researcher"),
+            PlanNode(id="c", title="C", type="execute", deps=["b"], suggested_agent_role="Researcher"),
+            PlanNode(id="d", title="D", type="execute", suggested_agent_role="Writer_FR"),
+        ]
+    )
+
+
+def test_node_budgets_follow_critical_path(monkeypatch):
+    monkeypatch.setenv("DEADLINE_NODE_EST_S", "10")
+    clock = Clock()
+    dl = RunDeadline(60, clock=clock)
+    dag = _chain_dag()
+    budgets = dl.node_budgets(dag, ["a", "d"], dag.nodes.keys())
+    assert budgets["a"] == pytest.approx(20.0)  # 10 / (10+10+10) du temps restant
+    assert budgets["d"] == pytest.approx(60.0)
+
+    # Durées observées du rôle: l'estimation suit le run
+    dl.observe("Researcher", 2.0)
+    clock.t += 30
+    budgets = dl.node_budgets(dag, ["b"], ["b", "c", "d"])
+    assert budgets["b"] == pytest.approx(15.0)
+    assert dl.snapshot()["remaining_s"] == 30.0
+
+
+def test_scopes_clamp_timeouts_and_signal_pressure(monkeypatch):
+    monkeypatch.setenv("DEADLINE_FAST_BELOW", "0.5")
+    clock = Clock()
+    assert deadline.remaining_s() is None and deadline.clamp_timeout(60) == 60
+    with deadline_scope(RunDeadline(40, clock=clock)):
+        assert deadline.clamp_timeout(60) == 40
+        with node_scope(5):
+            assert deadline.clamp_timeout(60) == 5
+            clock.t += 6
+            assert deadline.expired() and deadline.clamp_timeout(60) == 0
+        assert not deadline.under_pressure()
+        clock.t += 15
+        assert deadline.under_pressure()
+    assert deadline.remaining_s() is None
+
+
+@pytest.mark.asyncio
+async def test_run_llm_shrinks_timeout_and_stops_at_deadline(monkeypatch):
+    seen = []
+
+    class Slow:
+        async def generate(self, req):
+            seen.append(req.timeout_s)
+            await asyncio.sleep(5)
+            return LLMResponse(text="late")
+
+    monkeypatch.setattr(runner, "_provider_factory", lambda name: Slow())
+    req = LLMRequest(system="s", prompt="p", model="m", timeout_s=60)
+    with deadline_scope(RunDeadline(0.2)):
+        with pytest.raises(DeadlineExceeded):
+            await runner.run_llm(req, fallback_order=["a", "b"])
+    # Un seul appel, timeout réduit au temps restant, pas de bascule
+    assert len(seen) == 1 and seen[0] <= 0.2
+    # L'échéance n'est pas une panne du provider
+    assert circuit_breaker.is_available("a", "m")
+
+
+@pytest.mark.asyncio
+async def test_run_graph_fails_fast_and_reports_deadline_missed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("RUNS_ROOT", str(tmp_path / "runs"))
+    monkeypatch.setenv("ARTIFACTS_DIR", str(tmp_path / "runs"))
+    monkeypatch.setenv("AUTO_REVIEW_MODE", "off")
+    monkeypatch.setenv("NODE_MAX_RETRIES", "3")
+    monkeypatch.setenv("DEADLINE_MIN_NODE_S", "0.05")
+    calls = []
+
+    async def agent(node):
+        calls.append(node.id)
+        if node.id == "a":
+            await asyncio.sleep(5)
+        return {"markdown": f"# {node.id}", "llm": {}}
+
+    monkeypatch.setattr(exec_mod, "agent_runner", agent)
+    storage = DummyStorage()
+    run_id = str(uuid.uuid4())
+    res = await exec_mod.run_graph(_chain_dag(), storage, run_id, deadline_s=0.6)
+
+    # "a" (1/3 du temps restant) dépasse son budget, sans retry; b et c ne partent pas
+    assert sorted(calls) == ["a", "d"]
+    assert res["completed"] == ["d"] and res["failed"] == ["a", "b", "c"]
+    assert res["deadline"]["missed_nodes"] == ["a"]
+    status = json.loads(Path(tmp_path, "runs", run_id, "nodes", "a", "status.json").read_text())
+    assert status["reason"] == "deadline" and "retry" not in status
+    assert [e["level"] for e in storage.events] == ["DEADLINE_MISSED"]
+    assert json.loads(storage.events[0]["message"])["node_key"] == "a"
+
+    # Budget sous le minimum: échec immédiat, aucun appel
+    calls.clear()
+    monkeypatch.setenv("DEADLINE_MIN_NODE_S", "2")
+    res = await exec_mod.run_graph(_chain_dag(), DummyStorage(), str(uuid.uuid4()), deadline_s=1)
+    assert calls == [] and res["status"] == "failed"
+    assert sorted(res["deadline"]["missed_nodes"]) == ["a", "d"]
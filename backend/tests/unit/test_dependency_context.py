@@ -0,0 +1,94 @@
+import json
+import uuid
+from pathlib import Path
+
+import pytest
+
+from core.agents import context as ctx_mod
+from core.agents import executor_llm
+from core.agents.context import _allocate, context_budget, count_tokens, extract
+from core.agents.registry import AgentSpec, register_agent
+from core.llm.providers.base import LLMResponse
+from core.planning.task_graph import PlanNode, TaskGraph
+import orchestrator.executor as exec_mod
+
+LONG_MD = "\n\n".join(
+    f"## Section {i}\n\nPhrase clé numéro {i}. " + "Détail secondaire très long. " * 20 for i in range(6)
+)
+
+
+class _Storage:
+    async def save_artifact(self, *a, **k):
+        pass
+
+    async def save_event(self, **k):
+        pass
+
+
+def test_allocation_gives_short_deps_in_full():
+    assert _allocate({"a": 10, "b": 500, "c": 800}, 300) == {"a": 10, "b": 145, "c": 145}
+    assert _allocate({"a": 10, "b": 20}, 300) == {"a": 10, "b": 20}
+
+
+def test_extract_keeps_structure_and_is_cached(monkeypatch):
+    ctx_mod.reset_context_cache()
+    out = extract(LONG_MD, 120)
+    assert count_tokens(out) <= 120
+    assert out.startswith("## Section 0")
+    assert "Phrase clé numéro 0." in out and "[…]" in out
+    assert extract("court", 120) == "court"
+
+    def boom(*a, **k):
+        raise AssertionError("extrait recalculé")
+
+    monkeypatch.setattr(ctx_mod, "_extract", boom)
+    assert extract(LONG_MD, 120) == out  # même hash, même budget: cache
+
+
+def test_budget_per_role_and_ollama_window(monkeypatch):
+    monkeypatch.setenv("CONTEXT_MAX_TOKENS", "1500")
+    monkeypatch.setenv("CONTEXT_MAX_TOKENS_WRITER_FR", "4000")
+    monkeypatch.setenv("OLLAMA_NUM_CTX", "4096")
+    assert context_budget("Researcher") == 1500
+    assert context_budget("Writer_FR", "openai") == 4000
+    assert context_budget("Writer_FR", "ollama") == 2048
+
+
+@pytest.mark.asyncio
+async def test_downstream_prompt_carries_budgeted_dependency_outputs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("RUNS_ROOT", str(tmp_path / "runs"))
+    monkeypatch.setenv("ARTIFACTS_DIR", str(tmp_path / "runs"))
+    monkeypatch.setenv("AUTO_REVIEW_MODE", "off")
+    monkeypatch.setenv("CONTEXT_MAX_TOKENS", "200")
+    register_agent(AgentSpec(role="Ctx_Exec", system_prompt="s", provider="openai", model="gpt-4o", tools=[]))
+    prompts = {}
+
+    async def fake_run_llm(req):
+        title = req.prompt.splitlines()[0].removeprefix("Titre: ")
+        prompts[title] = req.prompt
+        text = {"A": LONG_MD, "B": "Synthèse courte de B."}.get(title, "fin")
+        return LLMResponse(text=text, provider="openai", model_used="gpt-4o")
+
+    monkeypatch.setattr(executor_llm, "run_llm", fake_run_llm)
+    dag = TaskGraph(
+        [
+            PlanNode(id="a", title="A", type="execute", suggested_agent_role="Ctx_Exec"),
+            PlanNode(id="b", title="B", type="execute", suggested_agent_role="Ctx_Exec"),
+            PlanNode(id="c", title="C", type="execute", deps=["a", "b"], suggested_agent_role="Ctx_Exec"),
+        ]
+    )
+    run_id = str(uuid.uuid4())
+    res = await exec_mod.run_graph(dag, _Storage(), run_id)
+    assert res["status"] == "succeeded"
+
+    assert "Contexte" not in prompts["A"]
+    prompt = prompts["C"]
+    assert "### B (b)\nSynthèse courte de B." in prompt
+    assert "### A (a)\n## Section 0" in prompt and "[…]" in prompt
+    assert count_tokens(prompt) < count_tokens(LONG_MD) // 2
+
+    sidecar = json.loads(Path(tmp_path, "runs", run_id, "nodes", "c", "artifact_c.llm.json").read_text())
+    sources = {s["node_key"]: s for s in sidecar["context"]["sources"]}
+    assert sources["a"]["truncated"] and not sources["b"]["truncated"]
+    assert sidecar["context"]["tokens"] <= sidecar["context"]["budget"] == 200
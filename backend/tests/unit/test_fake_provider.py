@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from core.llm.providers.base import LLMRequest, ProviderRateLimited, ProviderTimeout, ProviderUnavailable
+from core.llm.providers import fake
+from core.llm.providers.fake import FakeConfig, FakeProvider
+from core.llm.runner import _provider_factory, run_llm
+
+
+@pytest.fixture(autouse=True)
+def _reset_counts():
+    fake.reset_call_counts()
+    yield
+    fake.reset_call_counts()
+
+
+def _req(prompt: str = "écrire une section", **kw) -> LLMRequest:
+    return LLMRequest(system="s", prompt=prompt, model="fake-1", timeout_s=1, **kw)
+
+
+async def test_responses_are_seeded_and_deterministic():
+    cfg = FakeConfig(latency="lognormal", latency_ms=10, seed=7)
+    first = [FakeProvider(FakeConfig(**vars(cfg))).plan(_req(f"p{i}")) for i in range(5)]
+    fake.reset_call_counts()
+    # Ordre d'appel différent: mêmes tirages par prompt
+    second = {i: FakeProvider(FakeConfig(**vars(cfg))).plan(_req(f"p{i}")) for i in reversed(range(5))}
+    assert [p.ttft_ms for p in first] == [second[i].ttft_ms for i in range(5)]
+    assert [p.text for p in first] == [second[i].text for i in range(5)]
+    # Un second appel sur le même prompt tire un nouvel échantillon
+    assert FakeProvider(FakeConfig(**vars(cfg))).plan(_req("p0")).ttft_ms != first[0].ttft_ms
+
+    res = await FakeProvider(FakeConfig(completion_tokens=64)).generate(_req())
+    assert res.provider == "fake" and res.model_used == "fake-1"
+    assert res.usage["completion_tokens"] == 64
+    assert res.usage["prompt_tokens"] > 0
+
+
+def test_call_counts_are_bounded_lru(monkeypatch):
+    monkeypatch.setenv("FAKE_LLM_CALL_COUNTS_MAX", "3")
+    provider = FakeProvider(FakeConfig())
+    for prompt in ("a", "b", "a", "c", "d"):
+        provider.plan(_req(prompt))
+    # "b", le moins récemment utilisé, est évincé; "a" garde son compteur
+    assert sorted(fake._call_counts.values()) == [1, 1, 2]
+
+
+async def test_failure_injection():
+    with pytest.raises(ProviderRateLimited) as exc:
+        await FakeProvider(FakeConfig(rate_429=1.0, retry_after_s=3)).generate(_req())
+    assert exc.value.retry_after_s == 3
+    with pytest.raises(ProviderUnavailable):
+        await FakeProvider(FakeConfig(rate_5xx=1.0)).generate(_req())
+    with pytest.raises(ProviderTimeout):
+        await FakeProvider(FakeConfig(rate_timeout=1.0, timeout_ms=1)).generate(_req())
+
+    cfg = FakeConfig(rate_429=0.3, rate_5xx=0.2, seed=1)
+    outcomes = [FakeProvider(cfg).plan(_req(f"n{i}")).outcome for i in range(400)]
+    assert 0.2 < outcomes.count("429") / 400 < 0.4
+    assert 0.1 < outcomes.count("5xx") / 400 < 0.3
+
+
+async def test_streaming_chunks_rebuild_the_response():
+    provider = FakeProvider(FakeConfig(completion_tokens=40, chunk_tokens=4))
+    chunks = [c async for c in provider.stream(_req())]
+    fake.reset_call_counts()
+    full = await provider.generate(_req())
+    assert len(chunks) == 10
+    assert "".join(chunks) == full.text
+    assert full.raw["chunks"] == 10
+
+
+def test_replay_latencies_from_sidecars(tmp_path):
+    for i, latency in enumerate([120, 0, 80]):
+        d = tmp_path / "run" / "nodes" / f"n{i}"
+        d.mkdir(parents=True)
+        (d / f"artifact_n{i}.llm.json").write_text(json.dumps({"latency_ms": latency}))
+    assert fake.load_replay_latencies(str(tmp_path)) == [80.0, 120.0]
+    provider = FakeProvider(FakeConfig(latency="replay", replay_dir=str(tmp_path)))
+    assert {provider.plan(_req(f"r{i}")).ttft_ms for i in range(20)} == {80.0, 120.0}
+
+
+async def test_runner_resolves_fake_from_registry(monkeypatch):
+    monkeypatch.setenv("FAKE_LLM_LATENCY_MS", "0")
+    assert isinstance(_provider_factory("fake"), FakeProvider)
+    out = await run_llm(_req(provider="fake"))
+    assert out.provider == "fake"
+    assert out.text.startswith("# Réponse simulée")
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from core.llm import hedging, runner
+from core.llm.providers.base import LLMRequest, LLMResponse, ProviderUnavailable
+
+
+class Provider:
+    def __init__(self, name, delay, log, fail=False):
+        self.name, self.delay, self.log, self.fail = name, delay, log, fail
+
+    async def generate(self, req):
+        self.log.append(("start", self.name))
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.log.append(("cancelled", self.name))
+            raise
+        if self.fail:
+            raise ProviderUnavailable(f"{self.name} down")
+        return LLMResponse(text=self.name)
+
+
+def _factory(monkeypatch, delays, failing=()):
+    log = []
+    monkeypatch.setattr(
+        runner, "_provider_factory", lambda name: Provider(name, delays[name], log, name in failing)
+    )
+    return log
+
+
+def _req(role="Writer_FR"):
+    return LLMRequest(system="s", prompt="p", model="m", provider="ollama", timeout_s=5, role=role)
+
+
+@pytest.fixture
+def hedge_env(monkeypatch):
+    monkeypatch.setenv("LLM_HEDGE_ROLES", "writer_fr")
+    monkeypatch.setenv("LLM_HEDGE_DELAY_MS", "50")
+    monkeypatch.setenv("LLM_HEDGE_MIN_DELAY_MS", "0")
+    monkeypatch.setenv("LLM_FALLBACK_ORDER", "ollama,openai")
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_loser_cancelled(monkeypatch, hedge_env):
+    log = _factory(monkeypatch, {"ollama": 1.0, "openai": 0.01})
+    res = await runner.run_llm(_req())
+    assert res.text == "openai" and res.provider == "openai"
+    assert ("cancelled", "ollama") in log
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_or_other_role_is_not_hedged(monkeypatch, hedge_env):
+    log = _factory(monkeypatch, {"ollama": 0.0, "openai": 0.0})
+    assert (await runner.run_llm(_req())).text == "ollama"
+    log.clear()
+    _factory(monkeypatch, {"ollama": 0.1, "openai": 0.0})
+    assert (await runner.run_llm(_req(role="Researcher"))).text == "ollama"
+
+
+@pytest.mark.asyncio
+async def test_hedge_failure_keeps_waiting_for_primary(monkeypatch, hedge_env):
+    _factory(monkeypatch, {"ollama": 0.2, "openai": 0.0}, failing={"openai"})
+    assert (await runner.run_llm(_req())).text == "ollama"
+
+
+@pytest.mark.asyncio
+async def test_budget_caps_hedges(monkeypatch, hedge_env):
+    monkeypatch.setenv("LLM_HEDGE_BURST", "1")
+    monkeypatch.setenv("LLM_HEDGE_MAX_RATIO", "0")
+    _factory(monkeypatch, {"ollama": 0.15, "openai": 0.0})
+    assert (await runner.run_llm(_req())).text == "openai"
+    # Budget épuisé: on attend le principal
+    assert (await runner.run_llm(_req())).text == "ollama"
+
+
+def test_delay_follows_rolling_quantile(monkeypatch):
+    monkeypatch.setenv("LLM_HEDGE_MIN_SAMPLES", "10")
+    monkeypatch.setenv("LLM_HEDGE_DELAY_MS", "5000")
+    monkeypatch.setenv("LLM_HEDGE_MIN_DELAY_MS", "0")
+    assert hedging.hedge_delay_s("p", "m", 60) == 5.0
+    for ms in range(100, 1100, 100):
+        hedging.get_tracker().observe("p", "m", ms)
+    assert hedging.hedge_delay_s("p", "m", 60) == 0.9
+    assert hedging.hedge_delay_s("p", "m", 0.5) == 0.5
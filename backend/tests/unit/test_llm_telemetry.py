@@ -0,0 +1,62 @@
+import uuid
+
+import pytest
+
+from core.llm import runner
+from core.llm.providers.base import LLMRequest
+from core.planning.task_graph import PlanNode, TaskGraph
+from core.telemetry import metrics
+import orchestrator.executor as exec_mod
+
+
+def _sample(name, **labels):
+    return metrics.registry.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_run_llm_observes_latency_ttft_throughput_prompt_and_queue(monkeypatch):
+    monkeypatch.setenv("METRICS_ENABLED", "1")
+    monkeypatch.setenv("FAKE_LLM_LATENCY_MS", "20")
+    monkeypatch.setenv("FAKE_LLM_COMPLETION_TOKENS", "40")
+    monkeypatch.setenv("FAKE_LLM_CHUNK_INTERVAL_MS", "5")
+    labels = {"provider": "fake", "model": "fake-1", "role": "Researcher"}
+    before = _sample("llm_request_duration_seconds_count", **labels)
+
+    req = LLMRequest(system="s", prompt="x" * 400, model="fake-1", role="Researcher")
+    out = await runner.run_llm(req, primary="fake")
+    assert out.provider == "fake"
+
+    assert _sample("llm_request_duration_seconds_count", **labels) == before + 1
+    assert _sample("llm_queue_wait_seconds_count", **labels) >= 1
+    assert _sample("llm_time_to_first_token_seconds_sum", **labels) >= 0.02
+    assert _sample("llm_prompt_tokens_sum", **labels) >= 100
+    # Pas de débit natif: 40 tokens / (durée - TTFT) > 0
+    assert _sample("llm_tokens_per_second_count", **labels) >= 1
+
+
+@pytest.mark.asyncio
+async def test_node_duration_labels_come_from_sidecar(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("METRICS_ENABLED", "1")
+    monkeypatch.setenv("RUNS_ROOT", str(tmp_path / "runs"))
+    monkeypatch.setenv("ARTIFACTS_DIR", str(tmp_path / "runs"))
+    monkeypatch.setenv("AUTO_REVIEW_MODE", "off")
+
+    async def fake_agent(node):
+        return {"markdown": "# ok", "llm": {"provider": "ollama", "model_used": "qwen2", "latency_ms": 5}}
+
+    monkeypatch.setattr(exec_mod, "agent_runner", fake_agent)
+    dag = TaskGraph([PlanNode(id="a", title="A", type="execute", suggested_agent_role="Researcher")])
+    res = await exec_mod.run_graph(dag, _Storage(), str(uuid.uuid4()))
+    assert res["status"] == "succeeded"
+    assert _sample(
+        "orchestrator_node_duration_seconds_count", role="Researcher", provider="ollama", model="qwen2"
+    ) >= 1
+
+
+class _Storage:
+    async def save_artifact(self, *a, **k):
+        pass
+
+    async def save_event(self, **k):
+        pass
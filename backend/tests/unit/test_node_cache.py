@@ -0,0 +1,74 @@
+import json
+import os
+import time
+
+from core.storage.node_cache import NodeCache, get_node_cache, node_cache_key
+
+
+def _age(cache: NodeCache, key: str, seconds: float) -> None:
+    path = cache.path_for(key)
+    t = time.time() - seconds
+    os.utime(path, (t, t))
+
+
+def test_key_is_stable_and_order_insensitive():
+    a = node_cache_key({"title": "T", "upstream": {"a": "1", "b": "2"}})
+    b = node_cache_key({"upstream": {"b": "2", "a": "1"}, "title": "T"})
+    assert a == b
+    assert a != node_cache_key({"title": "T", "upstream": {"a": "1", "b": "3"}})
+
+
+def test_put_get_invalidate(tmp_path):
+    cache = NodeCache(tmp_path)
+    key = node_cache_key({"x": 1})
+    assert cache.get(key) is None
+    cache.put(key, {"markdown": "# ok", "llm": {"model": "m"}})
+    entry = cache.get(key)
+    assert entry["markdown"] == "# ok" and entry["key"] == key
+    assert cache.path_for(key).parent.name == key[:2]
+    assert cache.invalidate(key) is True
+    assert cache.get(key) is None
+
+
+def test_ttl_expires_entries(tmp_path):
+    cache = NodeCache(tmp_path, ttl_s=60)
+    key = node_cache_key({"x": 1})
+    path = cache.put(key, {"markdown": "a"})
+    assert cache.get(key) is not None
+    path.write_text(json.dumps({"key": key, "created_at": time.time() - 120, "markdown": "a"}), encoding="utf-8")
+    assert cache.get(key) is None
+    assert not path.exists()
+
+
+def test_evict_expired_then_lru(tmp_path):
+    cache = NodeCache(tmp_path, ttl_s=3600, max_entries=2, max_bytes=0)
+    keys = [node_cache_key({"i": i}) for i in range(4)]
+    for k in keys:
+        cache.put(k, {"markdown": "m"})
+    _age(cache, keys[0], 7200)  # expirée
+    _age(cache, keys[1], 300)  # la moins récemment utilisée des restantes
+    _age(cache, keys[2], 200)
+    cache.get(keys[2])  # hit: redevient récente
+    stats = cache.evict()
+    assert stats == {"expired": 1, "evicted": 1, "entries": 2, "bytes": stats["bytes"]}
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None and cache.get(keys[3]) is not None
+
+
+def test_evict_by_bytes_and_clear(tmp_path):
+    cache = NodeCache(tmp_path, ttl_s=0, max_entries=0, max_bytes=1)
+    for i in range(3):
+        cache.put(node_cache_key({"i": i}), {"markdown": "x" * 100})
+    assert cache.evict()["entries"] == 0
+    for i in range(3):
+        cache.put(node_cache_key({"i": i}), {"markdown": "x"})
+    assert cache.clear() == 3
+    assert cache.stats() == {"entries": 0, "bytes": 0}
+
+
+def test_get_node_cache_follows_env(tmp_path, monkeypatch):
+    monkeypatch.delenv("NODE_CACHE_DIR", raising=False)
+    monkeypatch.setenv("ARTIFACTS_DIR", str(tmp_path / "runs"))
+    assert get_node_cache().root == tmp_path / "runs" / "node_cache"
+    monkeypatch.setenv("NODE_CACHE_DIR", str(tmp_path / "nc"))
+    assert get_node_cache().root == tmp_path / "nc"
@@ -0,0 +1,107 @@
+import httpx
+import pytest
+
+from core.llm import runner, warmup
+from core.llm.providers import ollama
+from core.llm.providers.base import LLMRequest
+from core.telemetry import metrics
+
+OLLAMA_CHAT = {
+    "model": "llama3.1:8b",
+    "message": {"role": "assistant", "content": "bonjour"},
+    "done": True,
+    "total_duration": 5_200_000_000,
+    "load_duration": 3_000_000_000,
+    "prompt_eval_count": 120,
+    "prompt_eval_duration": 400_000_000,
+    "eval_count": 80,
+    "eval_duration": 1_600_000_000,
+}
+
+
+@pytest.fixture
+def ollama_http(monkeypatch):
+    """Remplace le transport httpx d'Ollama; retourne les requêtes envoyées."""
+    sent = []
+    real_client = httpx.AsyncClient
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        import json
+
+        sent.append((request.url.path, json.loads(request.content)))
+        if request.url.path == "/api/generate":
+            return httpx.Response(200, json={"model": "m", "done": True, "load_duration": 2_500_000_000})
+        return httpx.Response(200, json=OLLAMA_CHAT)
+
+    def client(*a, **kw):
+        kw["transport"] = httpx.MockTransport(handler)
+        return real_client(*a, **kw)
+
+    monkeypatch.setattr(ollama.httpx, "AsyncClient", client)
+    return sent
+
+
+def test_normalize_usage_converts_native_timings():
+    usage = ollama.normalize_usage(OLLAMA_CHAT)
+    assert usage["prompt_tokens"] == 120
+    assert usage["completion_tokens"] == 80
+    assert usage["total_tokens"] == 200
+    assert usage["load_ms"] == 3000.0
+    assert usage["eval_ms"] == 1600.0
+    assert usage["tokens_per_s"] == 50.0
+    assert usage["ttft_ms"] == 3400.0
+    assert ollama.normalize_usage({"message": {}}) == {}
+
+
+@pytest.mark.asyncio
+async def test_chat_payload_carries_performance_profile(ollama_http, monkeypatch):
+    monkeypatch.setenv("OLLAMA_KEEP_ALIVE", "-1")
+    monkeypatch.setenv("OLLAMA_NUM_CTX", "8192")
+    req = LLMRequest(system="s", prompt="p", model="llama3.1:8b", max_tokens=256, stop=["###"])
+    resp = await ollama.OllamaProvider().generate(req)
+
+    path, payload = ollama_http[0]
+    assert path == "/api/chat"
+    assert payload["keep_alive"] == -1
+    assert payload["options"] == {"temperature": 0.2, "num_predict": 256, "num_ctx": 8192, "stop": ["###"]}
+    assert resp.usage["completion_tokens"] == 80
+
+
+@pytest.mark.asyncio
+async def test_run_llm_records_ollama_tokens_and_timings(ollama_http, monkeypatch):
+    monkeypatch.setenv("METRICS_ENABLED", "true")
+    monkeypatch.setenv("OLLAMA_KEEP_ALIVE", "")
+    out = await runner.run_llm(LLMRequest(system=None, prompt="p", model="llama3.1:8b"), primary="ollama")
+
+    assert "keep_alive" not in ollama_http[0][1]
+    assert out.usage["prompt_tokens"] == 120
+    labels = {"provider": "ollama", "model": "llama3.1:8b"}
+    assert metrics.registry.get_sample_value("llm_tokens_total", {"kind": "completion", **labels}) >= 80
+    assert metrics.registry.get_sample_value("llm_tokens_per_second_count", {**labels, "role": "unknown"}) >= 1
+    assert metrics.registry.get_sample_value("llm_model_load_seconds_sum", labels) >= 3.0
+
+
+@pytest.mark.asyncio
+async def test_warmup_preloads_matrix_models(ollama_http, monkeypatch):
+    monkeypatch.setenv("OLLAMA_WARMUP_MODELS", "phi3,llama3.1:8b")
+    matrix = {
+        "executor:research": {
+            "preferred": [{"provider": "ollama", "model": "llama3.1:8b"}],
+            "fallbacks": [{"provider": "openai", "model": "gpt-4o-mini"}, "ollama:mistral"],
+        },
+        "manager:general": {"preferred": [{"provider": "ollama", "model": "qwen2"}]},
+    }
+    assert warmup.matrix_models(matrix) == ["llama3.1:8b", "mistral", "qwen2"]
+
+    async def fake_matrix(_sm):
+        return matrix
+
+    monkeypatch.setattr(warmup, "_load_matrix", fake_matrix)
+    await warmup.warmup_loop(sessionmaker=None, interval_s=0)
+
+    assert [p["model"] for path, p in ollama_http if path == "/api/generate"] == [
+        "phi3",
+        "llama3.1:8b",
+        "mistral",
+        "qwen2",
+    ]
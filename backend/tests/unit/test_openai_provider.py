@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+import httpx
+import openai
+import pytest
+
+from core.llm.providers import openai as openai_mod
+from core.llm.providers.base import LLMRequest
+
+USAGE = {"prompt_tokens": 12, "completion_tokens": 5, "total_tokens": 17}
+
+
+def _completion(text):
+    return {
+        "id": "cmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-x",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+        "usage": USAGE,
+    }
+
+
+def _chunk(delta=None, usage=None):
+    choices = [{"index": 0, "delta": {"content": delta}, "finish_reason": None}] if delta else []
+    return {"id": "cmpl-2", "object": "chat.completion.chunk", "created": 0, "model": "gpt-x",
+            "choices": choices, "usage": usage}
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Provider réel, transport HTTP simulé (``handler`` async)."""
+    state = {}
+    real = openai.AsyncOpenAI
+
+    async def dispatch(request):
+        return await state["handler"](request)
+
+    def client(**kw):
+        return real(http_client=httpx.AsyncClient(transport=httpx.MockTransport(dispatch)), **kw)
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://openai.test/v1")
+    monkeypatch.setattr(openai, "AsyncOpenAI", client)
+    prov = openai_mod.OpenAIProvider()
+    prov.handler = lambda h: state.__setitem__("handler", h)
+    return prov
+
+
+@pytest.mark.asyncio
+async def test_chat_returns_text_usage_and_rate_limit_headers(provider):
+    async def handler(request):
+        return httpx.Response(200, json=_completion("bonjour"), headers={"x-ratelimit-remaining-tokens": "99"})
+
+    provider.handler(handler)
+    out = await provider.generate(LLMRequest(system="s", prompt="p", model="gpt-x"))
+    assert out.text == "bonjour"
+    assert out.raw["usage"]["total_tokens"] == 17
+    assert out.raw["rate_limit"] == {"x-ratelimit-remaining-tokens": "99"}
+
+
+@pytest.mark.asyncio
+async def test_stream_feeds_sink_and_keeps_final_usage(provider):
+    fed = []
+
+    class Sink:
+        def reset(self):
+            fed.clear()
+
+        def feed(self, chunk):
+            fed.append(chunk)
+
+    events = [_chunk("bon"), _chunk("jour"), _chunk(usage=USAGE)]
+    body = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+
+    async def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, content=body.encode(), headers={"content-type": "text/event-stream"})
+
+    provider.handler(handler)
+    out = await provider.generate(LLMRequest(system=None, prompt="p", model="gpt-x", stream=Sink()))
+    assert out.text == "bonjour" and fed == ["bon", "jour"]
+    assert out.raw["usage"]["completion_tokens"] == 5
+
+
+@pytest.mark.asyncio
+async def test_cancellation_aborts_the_http_request(provider):
+    started, aborted = asyncio.Event(), asyncio.Event()
+
+    async def handler(request):
+        started.set()
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            aborted.set()
+            raise
+        return httpx.Response(200, json=_completion("trop tard"))
+
+    provider.handler(handler)
+    task = asyncio.create_task(provider.generate(LLMRequest(system=None, prompt="p", model="gpt-x")))
+    await asyncio.wait_for(started.wait(), 2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    # La requête elle-même est interrompue (pas un thread laissé en vol)
+    assert aborted.is_set()
@@ -3,7 +3,10 @@ import pytest
 
 from core.storage.postgres_adapter import PostgresAdapter
 from core.storage.db_models import Run, RunStatus
-from backend.tests.api.conftest import pg_test_db
+from backend.tests.api import conftest as api_conftest
+
+# Fixture Postgres partagée avec tests/api (hors de portée de son conftest)
+pg_test_db = api_conftest.pg_test_db
 
 
 @pytest.mark.asyncio
@@ -13,3 +16,28 @@ async def test_save_run_returns_model_with_meta(pg_test_db):
     saved = await adapter.save_run(run)
     assert isinstance(saved, Run)
     assert saved.meta == {"k": "v"}
+
+
+@pytest.mark.asyncio
+async def test_save_feedbacks_inserts_in_bulk(pg_test_db):
+    from sqlalchemy import text
+    from core.storage.db_models import Node, NodeStatus
+
+    adapter = PostgresAdapter(pg_test_db)
+    run = await adapter.save_run(Run(id=uuid.uuid4(), title="T", status=RunStatus.running))
+    nodes = [
+        await adapter.save_node(Node(id=uuid.uuid4(), run_id=run.id, key=f"n{i}", title="N", status=NodeStatus.completed))
+        for i in range(3)
+    ]
+    saved = await adapter.save_feedbacks(
+        [
+            {"run_id": run.id, "node_id": n.id, "source": "auto", "reviewer": "qa", "score": 80 + i, "comment": "ok"}
+            for i, n in enumerate(nodes)
+        ]
+    )
+    assert len(saved) == 3
+    async with adapter.session() as s:
+        count = (
+            await s.execute(text("SELECT count(*) FROM feedbacks WHERE run_id = :r"), {"r": run.id})
+        ).scalar_one()
+    assert count == 3
@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from core.llm import rate_limiter, runner
+from core.llm.providers.base import LLMRequest, LLMResponse, ProviderRateLimited
+from core.llm.rate_limiter import RateLimiter, TokenBucket, parse_duration_s, parse_retry_after
+
+
+class Clock:
+    def __init__(self):
+        self.t = 100.0
+
+    def __call__(self):
+        return self.t
+
+
+def _lease(rl):
+    return rate_limiter.Lease(rl, 0.0, 0.0)
+
+
+def test_parse_headers():
+    assert parse_duration_s("6m0s") == 360
+    assert parse_duration_s("20ms") == pytest.approx(0.02)
+    assert parse_duration_s("1.5") == 1.5
+    assert parse_retry_after({"Retry-After": "3"}) == 3
+    assert parse_retry_after({"retry-after-ms": "250", "retry-after": "9"}) == 0.25
+    assert parse_retry_after({}) is None
+
+
+def test_token_bucket_refill_and_header_sync():
+    clock = Clock()
+    bucket = TokenBucket(60, clock)  # 1 requête/s
+    assert bucket.wait_s(60, clock.t) == 0
+    bucket.take(60, clock.t)
+    assert bucket.wait_s(1, clock.t) == pytest.approx(1.0)
+    clock.t += 1
+    assert bucket.wait_s(1, clock.t) == 0
+
+    # Provider: limite 30/min, plus rien avant 2 s
+    bucket.sync(30, 0, 2.0, clock.t, headroom=1.0)
+    assert bucket.capacity == 30
+    assert bucket.wait_s(1, clock.t) == pytest.approx(4.0)
+
+
+def test_aimd_decrease_once_per_interval_and_additive_increase(monkeypatch):
+    monkeypatch.setenv("LLM_RL_DECREASE_INTERVAL_S", "1")
+    clock = Clock()
+    rl = RateLimiter("openai", "gpt", rpm=0, tpm=0, max_concurrency=8, clock=clock)
+    for _ in range(3):
+        rl._release(_lease(rl), "rate_limited", retry_after_s=0.5, headers=None, tokens_used=None)
+    assert rl.limit == 4  # une seule baisse pour la rafale
+    assert rl.blocked_until == pytest.approx(clock.t + 0.5)
+    clock.t += 1.5
+    rl._release(_lease(rl), "rate_limited", retry_after_s=None, headers={"retry-after": "2"}, tokens_used=None)
+    assert rl.limit == 2 and rl.blocked_until == pytest.approx(clock.t + 2)
+    for _ in range(4):
+        rl._release(_lease(rl), "ok", retry_after_s=None, headers=None, tokens_used=None)
+    assert 3 <= rl.limit < 4
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_retry_after_pause():
+    rl = RateLimiter("p", "m", rpm=0, tpm=0, max_concurrency=1)
+    lease = await rl.acquire()
+    assert rl._try_take(0) > 0  # slot occupé
+    lease.release("rate_limited", retry_after_s=0.15)
+    t0 = time.monotonic()
+    second = await rl.acquire()
+    assert time.monotonic() - t0 >= 0.12
+    second.release("ok")
+    assert rl.snapshot()["rate_limited"] == 1 and rl.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_run_llm_waits_retry_after_then_retries_same_provider(monkeypatch):
+    monkeypatch.setenv("LLM_RL_MAX_RETRIES", "2")
+    calls = []
+
+    class Limited:
+        async def generate(self, req):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise ProviderRateLimited("429", retry_after_s=0.1, headers={"x-ratelimit-remaining-requests": "0"})
+            return LLMResponse(text="ok", raw={"rate_limit": {"x-ratelimit-limit-requests": "600"}})
+
+    monkeypatch.setattr(runner, "_provider_factory", lambda name: Limited())
+    req = LLMRequest(system=None, prompt="x", model="gpt", provider="openai", timeout_s=5)
+    res = await runner.run_llm(req)
+    assert res.text == "ok" and res.provider == "openai"
+    assert len(calls) == 2 and calls[1] - calls[0] >= 0.08
+    snap = rate_limiter.limiters_snapshot()[0]
+    assert snap["rate_limited"] == 1 and snap["rpm"] == pytest.approx(570)
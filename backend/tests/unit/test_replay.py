@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from core.llm import replay
+from core.llm.providers.base import LLMRequest, ProviderUnavailable
+from core.llm.providers.replay import ReplayProvider
+from core.llm.replay import ReplayIndex, prompt_key
+from core.llm.runner import _provider_factory
+
+
+def _sidecar(user: str, text: str, latency: float, ts: str) -> dict:
+    return {
+        "provider": "ollama",
+        "model_used": "llama3.1:8b",
+        "latency_ms": latency,
+        "usage": {"completion_tokens": 12},
+        "prompts": {"system": "sys", "user": user, "final": f"sys\n{user}"},
+        "markdown": text,
+        "timestamps": {"started_at": ts, "ended_at": ts},
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    runs = [
+        ("a", "écrire A", "A2", 200, "2026-01-01T00:00:02"),
+        ("a2", "écrire A", "A1", 100, "2026-01-01T00:00:01"),
+        ("b", "écrire B", "B1", 300, "2026-01-01T00:00:03"),
+    ]
+    for node, user, text, latency, ts in runs:
+        d = tmp_path / "run" / "nodes" / node
+        d.mkdir(parents=True)
+        (d / f"artifact_{node}.llm.json").write_text(json.dumps(_sidecar(user, text, latency, ts)))
+    # Sidecar sans réponse (auto-review): ignoré
+    (tmp_path / "run" / "nodes" / "b" / "b.review.llm.json").write_text(
+        json.dumps({"prompts": {"system": "r", "user": "Titre"}, "latency_ms": 5})
+    )
+    yield ReplayIndex.from_dir(tmp_path)
+    replay.set_index(None)
+
+
+def test_index_round_robin_in_recording_order(index, tmp_path):
+    assert len(index) == 3 and len(index.entries) == 2
+    assert [index.lookup("sys", "écrire A")["text"] for _ in range(3)] == ["A1", "A2", "A1"]
+    assert index.lookup("sys", "inconnu") is None
+    assert (index.hits, index.misses) == (3, 1)
+    # La clé ne dépend que des prompts tronqués comme dans les sidecars
+    assert prompt_key("sys", "x" * 900) == prompt_key("sys", "x" * 800 + "y" * 100)
+
+    path = index.save(tmp_path / "idx.json.gz")
+    loaded = ReplayIndex.from_file(path)
+    assert loaded.entries == index.entries
+    assert loaded.lookup("sys", "écrire B")["latency_ms"] == 300
+
+
+async def test_provider_serves_hits_and_falls_back_on_miss(index):
+    provider = ReplayProvider(index, speed=0)
+    hit = await provider.generate(LLMRequest(system="sys", prompt="écrire B", model="m"))
+    assert hit.text == "B1" and hit.provider == "replay"
+    assert hit.model_used == "llama3.1:8b"
+    assert hit.usage == {"completion_tokens": 12}
+    assert hit.raw["replay"]["hit"] is True
+    assert hit.raw["replay"]["recorded_latency_ms"] == 300
+    assert provider.scaled_s(300) == 0.0
+    assert ReplayProvider(index, speed=10).scaled_s(300) == pytest.approx(0.03)
+
+    miss = await provider.generate(LLMRequest(system="sys", prompt="autre", model="m"))
+    assert miss.provider == "fake" and miss.raw["replay"]["hit"] is False
+    with pytest.raises(ProviderUnavailable):
+        await ReplayProvider(index, speed=0, miss="error").generate(LLMRequest(system="sys", prompt="autre", model="m"))
+
+
+def test_runner_resolves_replay_from_env(tmp_path, monkeypatch, index):
+    path = index.save(tmp_path / "idx.json")
+    replay.set_index(None)
+    monkeypatch.setenv("LLM_REPLAY_INDEX", str(path))
+    monkeypatch.setenv("LLM_REPLAY_SPEED", "0")
+    provider = _provider_factory("replay")
+    assert isinstance(provider, ReplayProvider)
+    assert provider.speed == 0 and len(provider.index) == 3
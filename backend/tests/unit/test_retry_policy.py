@@ -0,0 +1,136 @@
+import json
+import uuid
+from pathlib import Path
+
+import pytest
+
+from core.llm import retry_policy, runner
+from core.llm.providers.base import LLMRequest, ProviderUnavailable
+from core.llm.retry_policy import RetryBudget, RetryPolicy, allow_retry, consume, retry_scope
+from core.planning.task_graph import PlanNode, TaskGraph
+import orchestrator.executor as exec_mod
+
+
+class Clock:
+    def __init__(self):
+        self.t = 10.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_backoff_full_jitter_bounds_and_retry_after():
+    policy = RetryPolicy(base_s=0.1, max_s=1.0, factor=2.0, jitter=True)
+    for attempt in range(1, 8):
+        cap = min(1.0, 0.1 * 2 ** (attempt - 1))
+        assert 0 <= policy.backoff_s(attempt) <= cap
+    fixed = RetryPolicy(base_s=0.1, max_s=1.0, factor=2.0, jitter=False)
+    assert fixed.backoff_s(3) == pytest.approx(0.4)
+    assert fixed.backoff_s(10) == 1.0
+    assert fixed.backoff_s(1, retry_after_s=2.5) == 2.5
+    assert fixed.backoff_s(2, base_s=0) == 0
+
+
+def test_node_budget_debits_parent_and_stops_at_run_limit():
+    run = RetryBudget("run:r", max_retries=3)
+    n1 = RetryBudget("node:a", max_retries=2, parent=run)
+    n2 = RetryBudget("node:b", max_retries=2, parent=run)
+    assert n1.try_consume("node") and n1.try_consume("provider")
+    assert not n1.try_consume("fallback")  # budget du nœud épuisé
+    assert n1.summary()["exhausted"] == {"layer": "fallback", "kind": "retries", "scope": "node:a", "reason": None}
+    assert n2.try_consume("node")
+    assert not n2.try_consume("node", reason="boom")  # budget du run épuisé
+    assert n2.summary()["exhausted"]["scope"] == "run:r"
+    assert run.summary()["retries"] == 3
+    assert run.summary()["by_layer"] == {"node": 2, "provider": 1}
+
+
+def test_time_budget_refuses_wait_beyond_deadline():
+    clock = Clock()
+    budget = RetryBudget("node:a", max_time_s=5.0, clock=clock)
+    assert budget.try_consume("node", wait_s=4.0)
+    clock.t += 3
+    assert budget.remaining_s() == pytest.approx(2.0)
+    assert not budget.try_consume("node", wait_s=2.5)
+    assert budget.summary()["exhausted"]["kind"] == "time"
+
+
+@pytest.mark.asyncio
+async def test_allow_retry_without_scope_is_unbounded_and_scoped_is_capped():
+    retry_policy.set_policy(RetryPolicy(base_s=0.0, jitter=False))
+    assert all([await allow_retry("provider", i) for i in range(1, 20)])
+    with retry_scope(RetryBudget("node:x", max_retries=2)) as budget:
+        granted = [await allow_retry("provider", i) for i in range(1, 5)]
+        assert not consume("fallback")
+    assert granted == [True, True, False, False]
+    assert budget.retries == 2
+    assert retry_policy.current_budget() is None
+
+
+@pytest.mark.asyncio
+async def test_run_llm_fallback_is_charged_to_the_budget(monkeypatch):
+    calls = []
+
+    class Failing:
+        def __init__(self, name):
+            self.name = name
+
+        async def generate(self, req):
+            calls.append(self.name)
+            raise ProviderUnavailable(f"{self.name} down")
+
+    monkeypatch.setattr(runner, "_provider_factory", lambda name: Failing(name))
+    monkeypatch.setenv("LLM_RAISE_ON_FAIL", "1")
+    req = LLMRequest(system="s", prompt="p", model="m")
+    with retry_scope(RetryBudget("node:x", max_retries=1)) as budget:
+        with pytest.raises(ProviderUnavailable):
+            await runner.run_llm(req, fallback_order=["a", "b", "c"])
+    assert calls == ["a", "b"]  # "c" refusé: budget épuisé
+    assert budget.by_layer == {"fallback": 1}
+    assert budget.exhausted["layer"] == "fallback"
+
+
+class DummyStorage:
+    def __init__(self):
+        self.events = []
+
+    async def save_artifact(self, *a, **k):
+        pass
+
+    async def save_event(self, **k):
+        self.events.append(k)
+
+
+@pytest.mark.asyncio
+async def test_node_retries_bounded_by_node_budget(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("RUNS_ROOT", str(tmp_path / "runs"))
+    monkeypatch.setenv("ARTIFACTS_DIR", str(tmp_path / "runs"))
+    monkeypatch.setenv("NODE_MAX_RETRIES", "10")
+    monkeypatch.setenv("NODE_RETRY_BUDGET", "3")
+    monkeypatch.setenv("AUTO_REVIEW_MODE", "off")
+    calls = []
+
+    async def failing_agent(node):
+        calls.append(node.suggested_agent_role)
+        raise RuntimeError("agent down")
+
+    monkeypatch.setattr(exec_mod, "agent_runner", failing_agent)
+    storage = DummyStorage()
+    run_id = str(uuid.uuid4())
+    dag = TaskGraph([PlanNode(id="a", title="A", type="execute", suggested_agent_role="Researcher")])
+    res = await exec_mod.run_graph(dag, storage, run_id)
+
+    assert res["status"] == "failed"
+    # 1 essai + 3 retries accordés; ni la 11e tentative ni la réallocation _alt
+    assert calls == ["Researcher"] * 4
+    report = res["signals"][0]["report"]
+    assert report["retry"]["exhausted"]["layer"] == "node"
+    assert "reallocated_role" not in report and "reallocation_error" not in report
+    status = json.loads(Path(tmp_path, "runs", run_id, "nodes", "a", "status.json").read_text())
+    assert status["retry"]["retries"] == 3
+    summary = json.loads(Path(tmp_path, "runs", run_id, "summary.json").read_text())
+    assert summary["retry"]["by_layer"] == {"node": 3}
+    levels = [e["level"] for e in storage.events]
+    assert levels == ["RETRY_EXHAUSTED"]
+    assert json.loads(storage.events[0]["message"])["node_key"] == "a"
@@ -0,0 +1,144 @@
+import random
+
+import pytest
+
+from core.agents import executor_llm
+from core.agents.registry import AgentSpec, register_agent
+from core.agents.schemas import PlanNodeModel
+from core.llm import circuit_breaker, routing
+from core.llm.providers.base import LLMResponse
+from core.llm.routing import RoutingStats, candidates_from_models, goal_scope, parse_goal, route
+
+MODELS = {
+    "preferred": [{"provider": "openai", "model": "gpt-4o", "cost_per_1k_tokens": 5.0}],
+    "fallbacks": [
+        {"provider": "openai", "model": "gpt-4o-mini", "cost_per_1k_tokens": 0.3},
+        "ollama:llama3.1:8b",
+        {"provider": "openai", "model": "gpt-4o"},
+    ],
+}
+
+
+def _stats(latencies, errors=None):
+    stats = RoutingStats(window=50)
+    for (provider, model), values in latencies.items():
+        for ms in values:
+            stats.begin(provider, model)
+            stats.end(provider, model, True, latency_ms=ms)
+    for (provider, model), n in (errors or {}).items():
+        for _ in range(n):
+            stats.begin(provider, model)
+            stats.end(provider, model, False)
+    return stats
+
+
+def test_candidates_and_goals():
+    cands = candidates_from_models(MODELS)
+    assert [(c["provider"], c["model"], c["source"]) for c in cands] == [
+        ("openai", "gpt-4o", "preferred"),
+        ("openai", "gpt-4o-mini", "fallbacks"),
+        ("ollama", "llama3.1:8b", "fallbacks"),
+    ]
+    assert parse_goal("p95<8s") == ("p95", 8.0)
+    assert parse_goal(" Fastest ") == ("fastest", None)
+    with pytest.raises(ValueError):
+        parse_goal("slowest")
+    # Objectif par défaut: pas de routage (preferred[0] du recrutement)
+    assert route(cands) is None
+
+
+def test_fastest_and_cheapest_use_rolling_stats(monkeypatch):
+    monkeypatch.setenv("ROUTING_EXPLORE_RATIO", "0")
+    cands = candidates_from_models(MODELS)
+    stats = _stats(
+        {
+            ("openai", "gpt-4o"): [900] * 6,
+            ("openai", "gpt-4o-mini"): [400] * 6,
+            ("ollama", "llama3.1:8b"): [150] * 6,
+        }
+    )
+    fast = route(cands, goal="fastest", stats=stats)
+    assert (fast.provider, fast.model, fast.reason) == ("ollama", "llama3.1:8b", "fastest")
+    assert {c["model"]: c["p50_ms"] for c in fast.candidates}["gpt-4o"] == 900
+
+    cheap = route(cands, goal="cheapest", stats=stats)
+    # Coût connu via la matrice seulement pour les entrées openai
+    assert (cheap.provider, cheap.model) == ("openai", "gpt-4o-mini")
+
+    # Trop d'erreurs: écarté malgré sa latence
+    for _ in range(10):
+        stats.begin("ollama", "llama3.1:8b")
+        stats.end("ollama", "llama3.1:8b", False)
+    assert route(cands, goal="fastest", stats=stats).model == "gpt-4o-mini"
+
+
+def test_p95_slo_spreads_fan_out_and_skips_open_circuits(monkeypatch):
+    monkeypatch.setenv("ROUTING_EXPLORE_RATIO", "0")
+    cands = candidates_from_models(MODELS)
+    stats = _stats(
+        {
+            ("openai", "gpt-4o"): [3000] * 6,
+            ("openai", "gpt-4o-mini"): [800] * 6,
+            ("ollama", "llama3.1:8b"): [900] * 6,
+        }
+    )
+    picks = []
+    for _ in range(4):
+        d = route(cands, goal="p95<2", stats=stats)
+        picks.append(d.model)
+        stats.begin(d.provider, d.model)  # appel en cours
+    assert "gpt-4o" not in picks
+    assert sorted(picks) == ["gpt-4o-mini", "gpt-4o-mini", "llama3.1:8b", "llama3.1:8b"]
+
+    for _ in range(10):
+        circuit_breaker.record_failure("ollama", None, RuntimeError("down"))
+    assert all(route(cands, goal="p95<2", stats=stats).provider == "openai" for _ in range(3))
+
+    none_ok = route(cands, goal="p95<0.1", stats=stats)
+    assert none_ok.reason == "no_candidate_meets_goal" and none_ok.model == "gpt-4o-mini"
+
+
+def test_unmeasured_candidates_are_explored(monkeypatch):
+    monkeypatch.setenv("ROUTING_EXPLORE_RATIO", "0.5")
+    cands = candidates_from_models(MODELS)
+    stats = _stats({("openai", "gpt-4o"): [500] * 6})
+    rng = random.Random(1)
+    reasons = {route(cands, goal="fastest", stats=stats, rng=rng).reason for _ in range(20)}
+    assert reasons == {"fastest", "explore"}
+
+
+@pytest.mark.asyncio
+async def test_agent_runner_routes_and_records_decision(monkeypatch):
+    monkeypatch.setenv("ROUTING_EXPLORE_RATIO", "0")
+    register_agent(
+        AgentSpec(
+            role="Routed_Exec",
+            system_prompt="s",
+            provider="openai",
+            model="gpt-4o",
+            tools=[],
+            candidates=candidates_from_models(MODELS),
+        )
+    )
+    stats = routing.get_stats()
+    for model, ms in (("gpt-4o", 900), ("gpt-4o-mini", 200)):
+        for _ in range(6):
+            stats.begin("openai", model)
+            stats.end("openai", model, True, latency_ms=ms)
+    seen = []
+
+    async def fake_run_llm(req):
+        seen.append((req.provider, req.model))
+        return LLMResponse(text="ok", provider=req.provider, model_used=req.model)
+
+    monkeypatch.setattr(executor_llm, "run_llm", fake_run_llm)
+    node = PlanNodeModel(id="n1", title="T", type="execute", suggested_agent_role="Routed_Exec")
+
+    res = await executor_llm.agent_runner(node)
+    assert seen[-1] == ("openai", "gpt-4o") and "routing" not in res["llm"]
+
+    with goal_scope("fastest"):
+        res = await executor_llm.agent_runner(node)
+    assert seen[-1] == ("openai", "gpt-4o-mini")
+    assert res["llm"]["routing"]["goal"] == "fastest"
+    assert res["llm"]["routing"]["reason"] == "fastest"
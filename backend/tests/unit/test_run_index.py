@@ -0,0 +1,80 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from core.io.artifacts_fs import write_llm_sidecar, write_md
+from core.io import run_index
+from core.io.run_index import SIDECAR_FIELDS, aload_index, index_path, load_index, record_run, sidecar_meta
+
+
+def test_index_updated_by_fs_writers(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ARTIFACTS_DIR", str(tmp_path))
+    write_md("run1", "n1", "# Titre\n" + "x" * 400)
+    write_llm_sidecar(
+        "run1",
+        "n1",
+        {"provider": "openai", "model": "gpt", "latency_ms": 12, "usage": {"prompt_tokens": 3}},
+        node_id="00000000-0000-0000-0000-000000000001",
+    )
+    record_run(tmp_path / "run1", status="completed", ended_at="2024-01-01T00:00:00+00:00")
+
+    data = json.loads(index_path(tmp_path / "run1").read_text(encoding="utf-8"))
+    entry = data["nodes"]["n1"]
+    assert entry["markdown"]["path"] == "nodes/n1/artifact_n1.md"
+    assert entry["markdown"]["preview"].endswith("…")
+    assert entry["sidecar"]["path"] == "nodes/n1/artifact_n1.llm.json"
+    assert entry["llm"]["provider"] == "openai"
+    assert entry["llm"]["model"] == "gpt"
+    assert entry["node_id"] == "00000000-0000-0000-0000-000000000001"
+    assert data["run"]["status"] == "completed"
+
+    # Fallback events: même forme que le sidecar, champs hors index à None
+    sidecar = json.loads((tmp_path / "run1" / entry["sidecar"]["path"]).read_text(encoding="utf-8"))
+    meta = sidecar_meta(entry, "run1")
+    assert set(meta) == set(SIDECAR_FIELDS) >= set(sidecar) - {"warnings"}
+    assert meta["usage"] == sidecar["usage"] and meta["model_used"] == "gpt"
+    assert meta["prompts"] is None and meta["cost"] is None
+
+
+def test_index_rebuilt_once_for_legacy_run(tmp_path: Path) -> None:
+    run_dir = tmp_path / "legacy"
+    node_dir = run_dir / "nodes" / "n1"
+    node_dir.mkdir(parents=True)
+    (run_dir / "run.json").write_text(
+        json.dumps({"status": "failed", "ended_at": "2024-01-01", "meta": {"request_id": "r-1"}})
+    )
+    (node_dir / "artifact_n1.llm.json").write_text(json.dumps({"model_used": "m"}))
+
+    data = load_index(run_dir)
+    assert data["run"] == {"status": "failed", "ended_at": "2024-01-01", "request_id": "r-1"}
+    assert data["nodes"]["n1"]["llm"]["model"] == "m"
+    assert index_path(run_dir).exists()
+
+
+@pytest.mark.asyncio
+async def test_aload_index_missing_run(tmp_path: Path) -> None:
+    assert await aload_index(tmp_path / "absent") == {}
+
+
+def test_index_lock_is_per_run(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("ARTIFACTS_DIR", str(tmp_path))
+    run_a, run_b = tmp_path / "a", tmp_path / "b"
+    assert run_index._run_lock(run_a) is run_index._run_lock(tmp_path / "x" / ".." / "a")
+
+    # Run A verrouillé: les écritures du run B ne l'attendent pas
+    with run_index._run_lock(run_a):
+        writer = threading.Thread(target=record_run, args=(run_b,), kwargs={"status": "running"})
+        writer.start()
+        writer.join(timeout=5)
+        assert not writer.is_alive()
+    assert load_index(run_b)["run"]["status"] == "running"
+
+    # Écritures concurrentes d'un même run: aucune mise à jour perdue
+    threads = [threading.Thread(target=write_md, args=("a", f"n{i}", f"# {i}")) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert set(load_index(run_a)["nodes"]) == {f"n{i}" for i in range(8)}
@@ -0,0 +1,165 @@
+import json
+
+import httpx
+import pytest
+
+from core.agents import supervisor as supervisor_mod
+from core.agents.schemas import ManagerOutput, SupervisorPlan, parse_manager_json, parse_supervisor_json
+from core.llm import circuit_breaker, runner, structured
+from core.llm.providers import ollama
+from core.llm.providers.base import LLMRequest, LLMResponse, OutputDiverged
+from core.llm.structured import JSONStreamValidator, parse_structured, repair_json
+
+PLAN = {"plan": [{"id": "a", "title": "L'intro", "type": "task", "suggested_agent_role": "Writer_FR"}]}
+
+
+def _feed(validator, text, size=5):
+    for i in range(0, len(text), size):
+        validator.feed(text[i : i + size])
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "Voici le plan:\n```json\n" + json.dumps(PLAN) + "\n```\nBonne lecture.",
+        '{"plan": [{"id": "a", "title": "L\'intro", "type": "task", "suggested_agent_role": "Writer_FR",},],}',
+        "{'plan': [{id: 'a', title: \"L'intro\", type: 'task', suggested_agent_role: 'Writer_FR'}], "
+        "decompose: False /* défaut */}",
+        # Sortie tronquée au milieu du 2e nœud
+        '{"plan": [{"id": "a", "title": "L\'intro", "type": "task", "suggested_agent_role": "Writer_FR"}], "decompose": ',
+    ],
+)
+def test_common_defects_are_repaired_locally(raw):
+    plan, repaired = parse_structured(raw, parse_supervisor_json)
+    assert repaired and plan.plan[0].title == "L'intro"
+
+
+def test_valid_output_and_unrepairable_output():
+    plan, repaired = parse_structured("```json\n" + json.dumps(PLAN) + "\n```", parse_supervisor_json)
+    assert not repaired and plan.plan[0].id == "a"
+    with pytest.raises(ValueError):
+        parse_structured("oops", parse_supervisor_json)
+    assert repair_json('{"a": [1, 2') == '{"a": [1, 2]}'
+
+
+def test_stream_validator_tolerates_repairable_syntax_and_aliases():
+    v = JSONStreamValidator(ManagerOutput)
+    _feed(v, '```json\n{"assignments": [{"node_id": "a", "agent": "X"}, {"node_id": "b", "agent_role": "Y"},],')
+    _feed(v, ' "quality_checks": ["qc"]}\n```')
+    assert v.complete and not v.diverged
+
+
+@pytest.mark.parametrize(
+    "text, complete",
+    [
+        ("Voici [le plan]:\n```json\n" + json.dumps(PLAN) + "\n```", True),
+        ("Plan {brouillon}:\n" + json.dumps(PLAN), True),
+        # Document au fil d'une phrase: non suivi, laissé à la réparation
+        ("Plan: " + json.dumps(PLAN), False),
+    ],
+)
+def test_stream_validator_ignores_brackets_in_leading_prose(text, complete):
+    v = JSONStreamValidator(SupervisorPlan)
+    _feed(v, text)
+    assert v.complete is complete and not v.diverged
+
+
+@pytest.mark.parametrize(
+    "text, reason",
+    [
+        ('{"plan": [{"id": "a", "titre": "x"', "clé inconnue 'titre'"),
+        ('{"plan": {"id": "a"', "$.plan: objet inattendu"),
+        ('{"plan": [{"id": 3', "$.plan[0].id: type"),
+        ('{"decompose": false}', "clé requise absente 'plan'"),
+    ],
+)
+def test_stream_validator_diverges_as_soon_as_schema_is_broken(text, reason):
+    v = JSONStreamValidator(SupervisorPlan)
+    with pytest.raises(OutputDiverged) as exc:
+        _feed(v, text + ' "suite": "jamais lue"}')
+    assert reason in str(exc.value)
+
+
+@pytest.mark.asyncio
+async def test_run_llm_stops_stream_on_divergence_without_fallback(monkeypatch):
+    chunks = ['{"plan": [{"id": "a", ', '"owner": "x", ', '"title": "A"}]}'] + ['  '] * 50
+    calls = []
+
+    class Streaming:
+        def __init__(self, name):
+            self.name = name
+
+        async def generate(self, req):
+            calls.append(self.name)
+            req.stream.reset()
+            for i, chunk in enumerate(chunks):
+                req.stream.feed(chunk)
+                calls.append(i)
+            return LLMResponse(text="".join(chunks))
+
+    monkeypatch.setattr(runner, "_provider_factory", lambda name: Streaming(name))
+    req = LLMRequest(system="s", prompt="p", model="m", stream=JSONStreamValidator(SupervisorPlan))
+    with pytest.raises(OutputDiverged):
+        await runner.run_llm(req, fallback_order=["a", "b"])
+    # Interrompu au 2e chunk, pas de bascule ni de verdict disjoncteur
+    assert calls == ["a", 0]
+    assert circuit_breaker.is_available("a", "m")
+
+
+@pytest.mark.asyncio
+async def test_supervisor_requests_schema_and_repairs_before_retrying(monkeypatch):
+    seen = []
+
+    async def fake_run_llm(req, primary=None, fallback_order=None):
+        seen.append(req)
+        return LLMResponse(text="```json\n" + json.dumps(PLAN)[:-1] + ",}\n```")
+
+    monkeypatch.setattr(supervisor_mod.llm_runner, "run_llm", fake_run_llm)
+    plan = await supervisor_mod.run({"title": "demo"})
+    assert len(seen) == 1 and plan.plan[0].id == "a"
+    fmt = seen[0].response_format
+    assert fmt["type"] == "json_schema" and fmt["json_schema"]["name"] == "SupervisorPlan"
+    assert isinstance(seen[0].stream, JSONStreamValidator)
+
+    monkeypatch.setenv("STRUCTURED_OUTPUT", "json")
+    monkeypatch.setenv("STRUCTURED_STREAM", "0")
+    await supervisor_mod.run({"title": "demo"})
+    assert seen[-1].response_format == {"type": "json_object"} and seen[-1].stream is None
+
+
+@pytest.mark.asyncio
+async def test_ollama_streams_ndjson_with_schema_format(monkeypatch):
+    sent = []
+    body = json.dumps({"assignments": [], "quality_checks": ["qc"]})
+    lines = [
+        json.dumps({"message": {"role": "assistant", "content": body[i : i + 7]}, "done": False})
+        for i in range(0, len(body), 7)
+    ]
+    lines.append(json.dumps({"message": {"content": ""}, "done": True, "prompt_eval_count": 12, "eval_count": 9}))
+
+    def handler(request):
+        sent.append(json.loads(request.content))
+        return httpx.Response(200, content="\n".join(lines).encode())
+
+    real_client = httpx.AsyncClient
+
+    def client(*a, **kw):
+        kw["transport"] = httpx.MockTransport(handler)
+        return real_client(*a, **kw)
+
+    monkeypatch.setattr(ollama.httpx, "AsyncClient", client)
+    sink = JSONStreamValidator(ManagerOutput)
+    req = LLMRequest(
+        system=None,
+        prompt="p",
+        model="qwen2",
+        response_format=structured.response_format(ManagerOutput),
+        stream=sink,
+    )
+    resp = await ollama.OllamaProvider().generate(req)
+
+    assert sent[0]["stream"] is True
+    assert sent[0]["format"]["properties"].keys() >= {"assignments", "quality_checks"}
+    assert sink.complete and sink.text == body
+    assert parse_manager_json(resp.text).quality_checks == ["qc"]
+    assert resp.usage["completion_tokens"] == 9
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+from core.telemetry import tracing
+from core.telemetry.tracing import begin_run_trace, current_trace, end_run_trace, lane, span, traced
+
+
+@traced("work", cat="test")
+async def _work(delay: float) -> str:
+    with span("inner", cat="test", delay=delay):
+        await asyncio.sleep(delay)
+    return "ok"
+
+
+async def _node(key: str) -> None:
+    with lane(key), span("node", cat="node", node=key):
+        await _work(0.01)
+
+
+async def test_spans_nest_per_lane_and_export_chrome_trace(tmp_path):
+    token = begin_run_trace("r1")
+    assert begin_run_trace("r1") is None  # appelant imbriqué: même trace
+    with span("run_graph") as args:
+        await asyncio.gather(_node("a"), _node("b"))
+        args["status"] = "succeeded"
+    trace = current_trace()
+    path = end_run_trace(token, tmp_path)
+    assert current_trace() is None
+
+    by_id = {s["id"]: s for s in trace.spans}
+    root = next(s for s in trace.spans if s["name"] == "run_graph")
+    assert root["parent"] is None and root["args"] == {"status": "succeeded"}
+    for s in trace.spans:
+        if s["name"] == "node":
+            assert s["parent"] == root["id"]
+        if s["name"] in {"work", "inner"}:
+            # Même ligne que le nœud parent
+            assert by_id[s["parent"]]["tid"] == s["tid"] != root["tid"]
+
+    data = json.loads(path.read_text())
+    events = [e for e in data["traceEvents"] if e["ph"] == "X"]
+    assert len(events) == 7 and data["otherData"]["run_id"] == "r1"
+    lanes = {e["args"]["name"] for e in data["traceEvents"] if e["name"] == "thread_name"}
+    assert lanes == {"run", "a", "b"}
+    inner = next(e for e in events if e["name"] == "inner")
+    assert inner["dur"] >= 10_000 and inner["args"]["delay"] == 0.01
+
+
+async def test_errors_bound_and_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv("RUN_TRACE_MAX_SPANS", "2")
+    token = begin_run_trace("r2")
+    try:
+        with span("boom"):
+            raise ValueError("x")
+    except ValueError:
+        pass
+    for _ in range(3):
+        with span("s"):
+            pass
+    trace = current_trace()
+    end_run_trace(token, tmp_path)
+    assert trace.spans[0]["args"] == {"error": "ValueError"}
+    assert len(trace.spans) == 2 and trace.dropped == 2
+
+    # Sans trace active (ou désactivée): no-op, pas de fichier
+    monkeypatch.setenv("RUN_TRACE_ENABLED", "0")
+    assert begin_run_trace("r3") is None
+    assert await _work(0) == "ok"
+    assert end_run_trace(None, tmp_path / "r3") is None
+    assert not (tmp_path / "r3").exists()
+    assert tracing.export_otlp(trace) == 0  # pas de collecteur configuré
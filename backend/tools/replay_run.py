@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Rejeu hors ligne du trafic LLM enregistré (sidecars ``*.llm.json``).
+
+  index : construit l'index de rejeu (clé = hash des prompts) depuis ``.runs``
+          et/ou les artifacts DB, l'écrit en JSON (``.json.gz`` accepté)
+  run   : ré-exécute le plan d'un run passé (``<run>/plan.json``) ou un plan
+          JSON, de bout en bout, avec le provider ``replay`` pour tous les
+          rôles; ``--speed`` 1 = temps réel, 10 = dix fois plus vite, 0 = sans attente
+
+Exemples:
+  python backend/tools/replay_run.py index --out .runs/replay_index.json.gz
+  python backend/tools/replay_run.py run --run-id <uuid> --speed 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.llm.replay import ReplayIndex, set_index  # noqa: E402
+
+ROLES = ("EXECUTOR", "MANAGER", "REVIEWER", "SUPERVISOR")
+
+
+def _runs_root(raw: Optional[str]) -> Path:
+    return Path(raw or os.getenv("ARTIFACTS_DIR") or os.getenv("RUNS_ROOT") or ".runs")
+
+
+async def _db_sidecars(url: str) -> list[Dict[str, Any]]:
+    """Sidecars stockés en DB (artifacts JSON avec prompts), blobs résolus."""
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from core.storage.blob_store import resolve_content
+
+    engine = create_async_engine(url.replace("postgresql+psycopg", "postgresql+asyncpg"))
+    out = []
+    try:
+        async with engine.connect() as conn:
+            rows = await conn.execute(
+                text(
+                    "SELECT content, content_hash FROM artifacts "
+                    "WHERE content LIKE '{%' OR (content IS NULL AND content_hash IS NOT NULL) "
+                    "ORDER BY created_at"
+                )
+            )
+            for content, content_hash in rows:
+                raw = await asyncio.to_thread(resolve_content, content, content_hash)
+                try:
+                    data = json.loads(raw or "")
+                except ValueError:
+                    continue
+                if isinstance(data, dict) and "prompts" in data:
+                    out.append(data)
+    finally:
+        await engine.dispose()
+    return out
+
+
+def build_index(runs_root: Optional[Path], database_url: Optional[str]) -> ReplayIndex:
+    index = ReplayIndex.from_dir(runs_root) if runs_root else ReplayIndex()
+    if database_url:
+        index.add_sidecars(asyncio.run(_db_sidecars(database_url)))
+        index.sort()
+    return index
+
+
+def load_plan(args: argparse.Namespace) -> Dict[str, Any]:
+    path = Path(args.plan) if args.plan else _runs_root(args.runs_root) / args.run_id / "plan.json"
+    if not path.is_file():
+        raise SystemExit(f"plan introuvable: {path} (passer --plan)")
+    plan = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(plan, dict) or not plan.get("plan"):
+        raise SystemExit(f"plan vide ou mal formé: {path}")
+    return plan
+
+
+def recorded_span_s(run_dir: Path) -> Optional[float]:
+    """Durée enregistrée du run d'origine: premier début -> dernière fin des sidecars."""
+    from core.io.compression import decode_text, glob_sidecars
+
+    starts, ends = [], []
+    for path in glob_sidecars(run_dir, "**/*.llm.json"):
+        try:
+            ts = json.loads(decode_text(path.read_bytes())).get("timestamps") or {}
+            starts.append(datetime.fromisoformat(ts["started_at"]))
+            ends.append(datetime.fromisoformat(ts["ended_at"]))
+        except Exception:
+            continue
+    if not starts:
+        return None
+    return round((max(ends) - min(starts)).total_seconds(), 3)
+
+
+def cmd_index(args: argparse.Namespace) -> int:
+    root = None if args.no_fs else _runs_root(args.runs_root)
+    index = build_index(root, args.database_url or None)
+    index.save(Path(args.out))
+    print(json.dumps({"out": args.out, "prompts": len(index.entries), "responses": len(index)}))
+    return 0
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    source_root = _runs_root(args.runs_root)
+    plan = load_plan(args)
+    index = ReplayIndex.from_file(Path(args.index)) if args.index else ReplayIndex.from_dir(source_root)
+    set_index(index)
+
+    out_root = Path(args.out_root or tempfile.mkdtemp(prefix="crew-replay-"))
+    os.environ["ARTIFACTS_DIR"] = os.environ["RUNS_ROOT"] = str(out_root)
+    os.environ["LLM_REPLAY_SPEED"] = str(args.speed)
+    for role in ROLES:
+        os.environ[f"{role}_PROVIDER"] = "replay"
+
+    # Imports après configuration: l'orchestrateur lit son environnement au chargement
+    from core.planning.task_graph import TaskGraph
+    from core.storage.composite_adapter import CompositeAdapter
+    from core.storage.file_adapter import FileAdapter
+    from orchestrator.executor import run_graph
+    from orchestrator.main import SafeTracker
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    run_id = f"replay-{args.run_id or Path(args.plan).stem}-{stamp}"
+    storage = CompositeAdapter([FileAdapter(str(out_root))])
+    tracker = SafeTracker(run_key=run_id, run_title=plan.get("title") or "Replay", storage=storage)
+    graph = TaskGraph.from_plan(plan)
+
+    t0 = time.perf_counter()
+    result = asyncio.run(
+        run_graph(
+            dag=graph,
+            storage=storage,
+            run_id=run_id,
+            on_node_start=tracker.on_node_start,
+            on_node_end=tracker.on_node_end,
+        )
+    )
+    summary = {
+        "replay_of": args.run_id,
+        "run_id": run_id,
+        "out_root": str(out_root),
+        "speed": args.speed,
+        "status": result.get("status"),
+        "nodes": len(graph.nodes),
+        "duration_s": round(time.perf_counter() - t0, 3),
+        "recorded_duration_s": recorded_span_s(source_root / args.run_id) if args.run_id else None,
+        "hits": index.hits,
+        "misses": index.misses,
+    }
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["status"] == "succeeded" else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_index = sub.add_parser("index", help="construit l'index de rejeu")
+    p_index.add_argument("--runs-root", default=None, help="défaut: ARTIFACTS_DIR/RUNS_ROOT/.runs")
+    p_index.add_argument("--no-fs", action="store_true", help="ignore les sidecars disque")
+    p_index.add_argument("--database-url", default=os.getenv("DATABASE_URL", ""), help="ajoute les sidecars DB")
+    p_index.add_argument("--out", required=True)
+    p_index.set_defaults(func=cmd_index)
+
+    p_run = sub.add_parser("run", help="rejoue un run passé ou un plan")
+    src = p_run.add_mutually_exclusive_group(required=True)
+    src.add_argument("--run-id")
+    src.add_argument("--plan", help="plan JSON ({'plan': [...]})")
+    p_run.add_argument("--runs-root", default=None, help="source des plans et sidecars")
+    p_run.add_argument("--index", default=None, help="index pré-calculé (défaut: scan de --runs-root)")
+    p_run.add_argument("--speed", type=float, default=1.0, help="1 = temps réel, 10 = x10, 0 = sans attente")
+    p_run.add_argument("--out-root", default=None, help="racine des artifacts rejoués (défaut: temporaire)")
+    p_run.set_defaults(func=cmd_run)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
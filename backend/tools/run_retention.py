@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Lance un passage de rétention/archivage (partitions events + dossiers .runs)."""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from core.storage.retention import run_retention  # noqa: E402
+
+
+async def _main(url: str) -> dict:
+    engine = create_async_engine(url.replace("postgresql+psycopg", "postgresql+asyncpg"))
+    try:
+        async with async_sessionmaker(engine, class_=AsyncSession)() as session:
+            return await run_retention(session)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", ""))
+    parser.add_argument("--events-days", type=float, help="surcharge EVENTS_RETENTION_DAYS")
+    parser.add_argument("--runs-days", type=float, help="surcharge RUNS_DIR_RETENTION_DAYS")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("DATABASE_URL requis")
+    if args.events_days is not None:
+        os.environ["EVENTS_RETENTION_DAYS"] = str(args.events_days)
+    if args.runs_days is not None:
+        os.environ["RUNS_DIR_RETENTION_DAYS"] = str(args.runs_days)
+    print(json.dumps(asyncio.run(_main(args.database_url)), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""CLI d'entraînement d'un dictionnaire zstd pour les sidecars LLM."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.io.compression import decode_text, train_dictionary  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", required=True, help="fichier dictionnaire à écrire")
+    parser.add_argument("--size", type=int, default=16 * 1024, help="taille cible (octets)")
+    parser.add_argument("--limit", type=int, default=2000, help="nombre max d'échantillons")
+    args = parser.parse_args()
+
+    runs_root = Path(os.environ.get("RUNS_ROOT", ".runs"))
+    files = (
+        sorted(set(runs_root.rglob("*.llm.json")) | set(runs_root.rglob("*.llm.json.zst")))
+        if runs_root.exists()
+        else []
+    )
+    samples = []
+    for path in files[: args.limit]:
+        try:
+            samples.append(decode_text(path.read_bytes()).encode("utf-8"))
+        except Exception:  # noqa: BLE001
+            continue
+    if len(samples) < 8:
+        print(f"Échantillons insuffisants: {len(samples)} (minimum 8)")
+        sys.exit(1)
+
+    data = train_dictionary(samples, dict_size=args.size)
+    Path(args.out).write_bytes(data)
+    print(f"Dictionnaire: {args.out} ({len(data)} octets, {len(samples)} sidecars)")
+    print(f"Activer avec ARTIFACT_COMPRESSION=zstd ARTIFACT_ZSTD_DICT={args.out}")
+
+
+if __name__ == "__main__":
+    main()
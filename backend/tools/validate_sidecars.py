@@ -30,6 +30,18 @@ def parse_rfc3339(value: str) -> datetime:
     return datetime.fromisoformat(value)
 
 
+def read_sidecar(path: Path) -> str:
+    """Contenu texte d'un sidecar, décompressé s'il est suffixé .zst."""
+    if path.name.endswith(".zst"):
+        try:
+            from core.io.compression import decode_text
+        except ImportError:  # exécution hors backend/ (PYTHONPATH)
+            sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+            from core.io.compression import decode_text
+        return decode_text(path.read_bytes())
+    return path.read_text(encoding="utf-8")
+
+
 def load_schema() -> Dict[str, Any]:
     schema_path = Path(__file__).resolve().parent.parent / "schemas/llm_sidecar.schema.json"
     with schema_path.open("r", encoding="utf-8") as fh:
@@ -63,7 +75,11 @@ def main() -> None:
     known_props = set(schema.get("properties", {}).keys())
 
     runs_root = Path(os.environ.get("RUNS_ROOT", ".runs"))
-    files = sorted(runs_root.rglob("*.llm.json")) if runs_root.exists() else []
+    files = (
+        sorted(set(runs_root.rglob("*.llm.json")) | set(runs_root.rglob("*.llm.json.zst")))
+        if runs_root.exists()
+        else []
+    )
 
     ok = 0
     skipped = 0
@@ -84,8 +100,7 @@ def main() -> None:
             skipped += 1
             continue
         try:
-            with path.open("r", encoding="utf-8") as fh:
-                data = json.load(fh)
+            data = json.loads(read_sidecar(path))
         except Exception as exc:  # noqa: BLE001
             errors[path] = [f"JSON invalide: {exc}"]
             continue
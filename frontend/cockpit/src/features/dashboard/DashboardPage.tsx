@@ -4,7 +4,7 @@ import React, { useEffect, useMemo, useState } from "react";
 import Link from "next/link";
 import { APP_NAME } from "@/lib/config";
 import { useQuery } from "@tanstack/react-query";
-import { fetchRuns, fetchAgents, fetchFeedbacks, fetchTasks, type RunListItem, type TaskListItem } from "@/lib/api";
+import { fetchRuns, fetchAgents, fetchTasks, fetchDashboardMetrics, type RunListItem, type TaskListItem } from "@/lib/api";
 import { resolveApiUrl, defaultApiHeaders } from "@/lib/config";
 import {
   Activity,
@@ -691,22 +691,35 @@ export function DashboardPage() {
     return () => window.removeEventListener("popstate", handler);
   }, []);
 
-  // Fenêtre temporelle pour l'API selon le range sélectionné
+  // Fenêtre temporelle pour l'API selon le range sélectionné:
+  // 24 tranches horaires (24h) ou 7/30 tranches journalières alignées sur minuit local
   const fromDate = useMemo(() => {
-    const now = new Date();
-    const d = new Date(now);
-    if (range === "24h") d.setDate(d.getDate() - 1);
-    else if (range === "7j") d.setDate(d.getDate() - 7);
-    else d.setDate(d.getDate() - 30);
+    const d = new Date();
+    if (range === "24h") {
+      d.setMinutes(0, 0, 0);
+      d.setHours(d.getHours() - 23);
+    } else {
+      d.setHours(0, 0, 0, 0);
+      d.setDate(d.getDate() - (range === "7j" ? 6 : 29));
+    }
     return d;
   }, [range]);
   const fromIso = useMemo(() => fromDate.toISOString(), [fromDate]);
 
-  // Runs pour KPIs + timeline
+  // Séries agrégées côté serveur (KPIs + timeline + sévérités)
+  const metricsQuery = useQuery({
+    queryKey: ["dashboard:metrics", { from: fromIso, range }],
+    queryFn: ({ signal }) =>
+      fetchDashboardMetrics({ from: fromIso, bucket: range === "24h" ? "1h" : "1d" }, { signal }),
+    refetchInterval: 30_000,
+    staleTime: 30_000,
+  });
+
+  // Derniers runs (tableau)
   const runsQuery = useQuery({
     queryKey: ["dashboard:runs", { from: fromIso, range }],
     queryFn: ({ signal }) =>
-      fetchRuns({ limit: range === "30j" ? 1000 : 500, orderBy: "started_at", orderDir: "desc", startedFrom: fromIso }, { signal }),
+      fetchRuns({ limit: 20, orderBy: "started_at", orderDir: "desc", startedFrom: fromIso }, { signal }),
     refetchInterval: 30_000,
     staleTime: 30_000,
   });
@@ -718,13 +731,6 @@ export function DashboardPage() {
     staleTime: 60_000,
   });
 
-  // Feedbacks pour la distribution de sévérité
-  const feedbacksQuery = useQuery({
-    queryKey: ["dashboard:feedbacks", { from: fromIso }],
-    queryFn: ({ signal }) => fetchFeedbacks({ limit: 200, orderBy: "created_at", orderDir: "desc" }, { signal }),
-    staleTime: 60_000,
-  });
-
   // Tâches récentes
   const tasksQuery = useQuery({
     queryKey: ["dashboard:tasks", { limit: 20 }],
@@ -772,46 +778,23 @@ export function DashboardPage() {
     });
   }, [runsQuery.data]);
 
-  // Buckets de runs (jour ou heure)
-  type Bucket = { d: string; start: Date; end: Date; success: number; failed: number; canceled: number };
+  // Buckets de runs (jour ou heure), calculés par l'API
+  type Bucket = { d: string; start: Date; success: number; failed: number; canceled: number };
   const runsBuckets: Bucket[] = useMemo(() => {
-    const granularity: "hour" | "day" = range === "24h" ? "hour" : "day";
-    const bucketCount = range === "30j" ? 30 : range === "7j" ? 7 : 24;
-    const now = new Date();
-    const buckets: Bucket[] = [];
-    for (let i = bucketCount - 1; i >= 0; i--) {
-      if (granularity === "day") {
-        const start = new Date(now);
-        start.setHours(0, 0, 0, 0);
-        start.setDate(start.getDate() - i);
-        const end = new Date(start);
-        end.setHours(23, 59, 59, 999);
-        const d = start.toLocaleDateString("fr-FR", { day: "2-digit", month: "2-digit" });
-        buckets.push({ d, start, end, success: 0, failed: 0, canceled: 0 });
-      } else {
-        const start = new Date(now);
-        start.setMinutes(0, 0, 0);
-        start.setHours(start.getHours() - i);
-        const end = new Date(start);
-        end.setMinutes(59, 59, 999);
-        const d = `${String(start.getHours()).padStart(2, "0")}h`;
-        buckets.push({ d, start, end, success: 0, failed: 0, canceled: 0 });
+    const items = metricsQuery.data?.buckets ?? [];
+    return items.map((b) => {
+      const start = new Date(b.start);
+      const d =
+        range === "24h"
+          ? `${String(start.getHours()).padStart(2, "0")}h`
+          : start.toLocaleDateString("fr-FR", { day: "2-digit", month: "2-digit" });
+      const bucket: Bucket = { d, start, success: 0, failed: 0, canceled: 0 };
+      for (const [status, count] of Object.entries(b.runs)) {
+        bucket[toStatusName(status)] += count;
       }
-    }
-    const items = runsQuery.data?.items ?? [];
-    for (const r of items) {
-      if (!r.started_at) continue;
-      const startedAt = new Date(r.started_at);
-      for (const b of buckets) {
-        if (startedAt >= b.start && startedAt <= b.end) {
-          const s = toStatusName(r.status);
-          b[s] += 1;
-          break;
-        }
-      }
-    }
-    return buckets;
-  }, [runsQuery.data, range]);
+      return bucket;
+    });
+  }, [metricsQuery.data, range]);
 
   const kpiTrend = useMemo(() => runsBuckets.map((b) => ({ d: b.d, v: b.success + b.failed + b.canceled })), [runsBuckets]);
 
@@ -829,37 +812,28 @@ export function DashboardPage() {
   }, [runsBuckets]);
 
   const medianDuration = useMemo(() => {
-    const items = runsQuery.data?.items ?? [];
-    const durations: number[] = [];
-    for (const r of items) {
-      if (!r.started_at || !r.ended_at) continue;
-      const s = new Date(r.started_at).getTime();
-      const e = new Date(r.ended_at).getTime();
-      if (e > s) durations.push(Math.round((e - s) / 1000));
-    }
-    if (durations.length === 0) return "—";
-    durations.sort((a, b) => a - b);
-    const mid = Math.floor(durations.length / 2);
-    const value = durations.length % 2 ? durations[mid] : Math.round((durations[mid - 1] + durations[mid]) / 2);
-    return formatSeconds(value);
-  }, [runsQuery.data]);
+    const p50 = metricsQuery.data?.totals.duration_p50_ms;
+    if (p50 == null) return "—";
+    return formatSeconds(Math.round(p50 / 1000));
+  }, [metricsQuery.data]);
 
   const totalRuns = useMemo(() => runsBuckets.reduce((acc, b) => acc + b.success + b.failed + b.canceled, 0), [runsBuckets]);
 
+  // Déciles de score -> sévérité (sans score = critique)
   const severityData: SeverityItem[] = useMemo(() => {
-    const data = feedbacksQuery.data?.items ?? [];
+    const bands = metricsQuery.data?.feedback_scores ?? [];
     const counts = { Critique: 0, Majeur: 0, Mineur: 0 } as Record<Exclude<SeverityName, "Tous">, number>;
-    for (const f of data) {
-      const score = typeof f.score === "number" ? f.score : undefined;
-      const name: Exclude<SeverityName, "Tous"> = !score || score <= 40 ? "Critique" : score <= 70 ? "Majeur" : "Mineur";
-      counts[name] += 1;
+    for (const { band, count } of bands) {
+      const low = band === "none" ? 0 : Number(band);
+      const name: Exclude<SeverityName, "Tous"> = low < 40 ? "Critique" : low < 70 ? "Majeur" : "Mineur";
+      counts[name] += count;
     }
     return [
       { name: "Critique", value: counts.Critique, color: "#ef4444" },
       { name: "Majeur", value: counts.Majeur, color: "#f59e0b" },
       { name: "Mineur", value: counts.Mineur, color: ACCENT },
     ];
-  }, [feedbacksQuery.data]);
+  }, [metricsQuery.data]);
 
   const feedbackCount = useMemo(() => severityData.reduce((acc, item) => acc + item.value, 0), [severityData]);
 
@@ -230,6 +230,44 @@ export function fetchRun(runId: string, options?: FetchOptions) {
   );
 }
 
+// Dashboard (séries pré-agrégées côté serveur)
+export interface DashboardBucket {
+  start: string;
+  runs: Record<string, number>;
+  total: number;
+  duration_avg_ms?: number | null;
+  duration_p50_ms?: number | null;
+  duration_p95_ms?: number | null;
+  prompt_tokens: number;
+  completion_tokens: number;
+  total_tokens: number;
+}
+
+export interface DashboardMetrics {
+  start: string;
+  end: string;
+  bucket_s: number;
+  refreshed_at?: string | null;
+  buckets: DashboardBucket[];
+  totals: Omit<DashboardBucket, "start"> & { success_rate?: number | null };
+  feedback_scores: { band: string; count: number }[];
+  feedbacks_total: number;
+}
+
+export interface FetchDashboardMetricsParams {
+  from?: string;
+  to?: string;
+  bucket?: string;
+}
+
+export function fetchDashboardMetrics(params: FetchDashboardMetricsParams = {}, options?: FetchOptions) {
+  return getJson<DashboardMetrics>("/metrics/dashboard", {
+    from: params.from,
+    to: params.to,
+    bucket: params.bucket,
+  }, options);
+}
+
 // Tasks
 export interface TaskListItem {
   id: string;
@@ -323,6 +361,21 @@ export function fetchRunNodes(
   }, options);
 }
 
+// Liste légère (aperçu seul, opt-in côté API); contenu complet via /artifacts/{id}/content
+export function fetchNodeArtifacts(
+  nodeId: string,
+  params: { limit?: number; offset?: number; type?: string; includeContent?: boolean } = {},
+  options?: FetchOptions
+) {
+  return getJson<ApiPage<ArtifactSummary>>(`/nodes/${nodeId}/artifacts`, {
+    limit: params.limit ?? 50,
+    offset: params.offset ?? 0,
+    type: params.type,
+    include_content: params.includeContent ?? false,
+    order_by: "-created_at",
+  }, options);
+}
+
 export interface AuditLogItem {
   id: string;
   run_id?: string | null;